@@ -1,9 +1,14 @@
 import streamlit as st
 import pandas as pd
-import requests
 from datetime import timedelta, datetime
 
-from utils.supremo_config import TOKEN_SUPREMO
+from utils.cache import cache_dados
+from utils.dados import ARQ_LEADS, data_snapshot, ler_leads
+from utils.formatacao import formata_moeda
+from utils.desempenho import cronometro, etapa, fechar_rerun, iniciar_rerun, marco, parar
+from utils.visoes import le_visao, ler_planilha_normalizada
+
+iniciar_rerun("app_dashboard")
 
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
@@ -53,185 +58,58 @@ except Exception:
     pass
 
 # ---------------------------------------------------------
-# PLANILHA – GOOGLE SHEETS
+# PRIMEIRA PINTURA (ANTES DE QUALQUER DOWNLOAD)
+# Título e cabeçalho da sidebar saem já; planilha e leads vêm depois
 # ---------------------------------------------------------
-SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
-GID_ANALISES = "1574157905"
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}"
-
+st.title("📊 Dashboard Imobiliária – MR Imóveis")
+st.sidebar.title("Filtros 🔎")
+aviso_carga = st.empty()
 
-def limpar_para_data(serie: pd.Series) -> pd.Series:
-    dt = pd.to_datetime(serie, dayfirst=True, errors="coerce")
-    return dt.dt.date
+marco()
 
+# ---------------------------------------------------------
+# PLANILHA – GOOGLE SHEETS
+# ---------------------------------------------------------
 
+@cache_dados(ttl=60, nome="app.carregar_dados_planilha", compartilhado=True)
+@cronometro("carregar_dados_planilha")
 def carregar_dados_planilha() -> pd.DataFrame:
     """
-    Carrega SEM cache do Streamlit, sempre pega a versão atual da planilha.
+    A planilha crua vem do snapshot em disco (no máximo 60s, o mesmo das
+    outras páginas) ou da rede; a versão normalizada é mapeada do snapshot
+    que todas as páginas e processos dividem (utils/visoes.py) e fica
+    compartilhada (somente leitura) entre todas as sessões.
     """
-    df = pd.read_csv(CSV_URL)
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # DATA / DIA
-    if "DATA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DATA"])
-    elif "DIA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DIA"])
-    else:
-        df["DIA"] = pd.NaT
-
-    # EQUIPE / CORRETOR
-    for col in ["EQUIPE", "CORRETOR"]:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .fillna("NÃO INFORMADO")
-                .astype(str)
-                .str.upper()
-                .str.strip()
-            )
-        else:
-            df[col] = "NÃO INFORMADO"
+    return ler_planilha_normalizada()
 
-    # STATUS BASE
-    possiveis_cols_situacao = [
-        "SITUAÇÃO", "SITUAÇÃO ATUAL", "STATUS",
-        "SITUACAO", "SITUACAO ATUAL"
-    ]
-    col_situacao = next((c for c in possiveis_cols_situacao if c in df.columns), None)
-
-    df["STATUS_BASE"] = ""
-    if col_situacao:
-        s = df[col_situacao].fillna("").astype(str).str.upper()
-        df.loc[s.str.contains("EM ANÁLISE"), "STATUS_BASE"] = "EM ANÁLISE"
-        df.loc[s.str.contains("REANÁLISE"), "STATUS_BASE"] = "REANÁLISE"
-        df.loc[s.str.contains("APROV"), "STATUS_BASE"] = "APROVADO"
-        df.loc[s.str.contains("REPROV"), "STATUS_BASE"] = "REPROVADO"
-        df.loc[s.str.contains("VENDA GERADA"), "STATUS_BASE"] = "VENDA GERADA"
-        df.loc[s.str.contains("VENDA INFORMADA"), "STATUS_BASE"] = "VENDA INFORMADA"
-
-    # VGV
-    if "OBSERVAÇÕES" in df.columns:
-        df["VGV"] = pd.to_numeric(df["OBSERVAÇÕES"], errors="coerce").fillna(0)
-    else:
-        df["VGV"] = 0
 
-    # NOME / CPF BASE
-    possiveis_nome = ["NOME", "CLIENTE", "NOME CLIENTE", "NOME DO CLIENTE"]
-    possiveis_cpf = ["CPF", "CPF CLIENTE", "CPF DO CLIENTE"]
-
-    col_nome = next((c for c in possiveis_nome if c in df.columns), None)
-    col_cpf = next((c for c in possiveis_cpf if c in df.columns), None)
-
-    if col_nome is None:
-        df["NOME_CLIENTE_BASE"] = "NÃO INFORMADO"
-    else:
-        df["NOME_CLIENTE_BASE"] = (
-            df[col_nome]
-            .fillna("NÃO INFORMADO")
-            .astype(str)
-            .str.upper()
-            .str.strip()
-        )
-
-    if col_cpf is None:
-        df["CPF_CLIENTE_BASE"] = ""
-    else:
-        df["CPF_CLIENTE_BASE"] = (
-            df[col_cpf]
-            .fillna("")
-            .astype(str)
-            .str.replace(r"\D", "", regex=True)
-        )
-
-    return df
-
-
-df = carregar_dados_planilha()
+with aviso_carga, st.spinner("Carregando planilha..."):
+    df = carregar_dados_planilha()
 
 if df.empty:
     st.error("Erro ao carregar planilha.")
-    st.stop()
+    parar()
+
+etapa("PLANILHA – GOOGLE SHEETS")
 
 # ---------------------------------------------------------
-# LEADS – CHAMADA DIRETA NA API (SEM CACHE)
+# LEADS – API DO SUPREMO (SNAPSHOT EM DISCO DE ATÉ 60s)
+# Depois de um deploy o aquecer_cache.py já deixou o snapshot pronto
 # ---------------------------------------------------------
-BASE_URL_LEADS = "https://api.supremocrm.com.br/v1/leads"
-
-
-def carregar_leads_direto(limit: int = 1000, max_pages: int = 100) -> pd.DataFrame:
-    """
-    Busca os leads diretamente na API do Supremo, sem usar cache em disco
-    e sem st.cache_data. Chama a API sempre que a página é executada.
-    """
-    headers = {"Authorization": f"Bearer {TOKEN_SUPREMO}"}
-
-    dfs = []
-    total = 0
-    pagina = 1
-
-    while total < limit and pagina <= max_pages:
-        params = {"pagina": pagina}
-        try:
-            resp = requests.get(
-                BASE_URL_LEADS,
-                headers=headers,
-                params=params,
-                timeout=30,
-            )
-        except Exception as e:
-            # Se der erro de conexão, interrompe e usa o que já veio
-            break
-
-        if resp.status_code != 200:
-            break
-
-        try:
-            data = resp.json()
-        except Exception:
-            break
-
-        if isinstance(data, dict) and "data" in data:
-            df_page = pd.DataFrame(data["data"])
-        elif isinstance(data, list):
-            df_page = pd.DataFrame(data)
-        else:
-            df_page = pd.DataFrame()
-
-        if df_page.empty:
-            break
-
-        dfs.append(df_page)
-        total += len(df_page)
-        pagina += 1
-
-    if not dfs:
-        return pd.DataFrame()
-
-    df_all = pd.concat(dfs, ignore_index=True)
-
-    if "id" in df_all.columns:
-        df_all = df_all.drop_duplicates(subset="id")
-
-    if "data_captura" in df_all.columns:
-        df_all["data_captura"] = pd.to_datetime(
-            df_all["data_captura"], errors="coerce"
-        )
-
-    return df_all.head(limit)
-
-
-df_leads = carregar_leads_direto()
-ts_atualizacao_leads = datetime.now()
+with aviso_carga, st.spinner("Carregando leads do Supremo..."):
+    df_leads = ler_leads()
+aviso_carga.empty()
+ts_atualizacao_leads = data_snapshot(ARQ_LEADS) or datetime.now()
 
 # Guarda em sessão só pra reaproveitar dentro da mesma sessão (não tem disco)
 if "df_leads" not in st.session_state:
     st.session_state["df_leads"] = df_leads
 
+etapa("LEADS – API DO SUPREMO")
+
 # ---------------------------------------------------------
 # SIDEBAR – FILTROS
 # ---------------------------------------------------------
-st.sidebar.title("Filtros 🔎")
 
 dias_validos = df["DIA"].dropna()
 data_min = dias_validos.min()
@@ -259,73 +137,107 @@ else:
 lista_corretor = sorted(base_cor["CORRETOR"].unique())
 corretor_sel = st.sidebar.selectbox("Corretor", ["Todos"] + lista_corretor)
 
+marco()
+
 # ---------------------------------------------------------
 # FILTRO PRINCIPAL
 # ---------------------------------------------------------
-df_filtrado = df[
-    (df["DIA"] >= data_ini) &
-    (df["DIA"] <= data_fim)
-].copy()
+# Período padrão com corretor "Todos" (o que todo mundo abre primeiro): os
+# números já vêm prontos do materializar_visoes.py, se ele publicou para
+# esta mesma planilha
+kpis = None
+visao_kpis = le_visao("kpis_home", df)
+if visao_kpis is not None and corretor_sel == "Todos":
+    linha = visao_kpis[
+        (visao_kpis["EQUIPE_FILTRO"] == equipe_sel)
+        & (visao_kpis["DATA_INI"] == data_ini)
+        & (visao_kpis["DATA_FIM"] == data_fim)
+    ]
+    if not linha.empty:
+        kpis = linha.iloc[0]
+
+if kpis is not None:
+    registros_filtrados = int(kpis["REGISTROS"])
+else:
+    df_filtrado = df[
+        (df["DIA"] >= data_ini) &
+        (df["DIA"] <= data_fim)
+    ].copy()
 
-if equipe_sel != "Todas":
-    df_filtrado = df_filtrado[df_filtrado["EQUIPE"] == equipe_sel]
+    if equipe_sel != "Todas":
+        df_filtrado = df_filtrado[df_filtrado["EQUIPE"] == equipe_sel]
 
-if corretor_sel != "Todos":
-    df_filtrado = df_filtrado[df_filtrado["CORRETOR"] == corretor_sel]
+    if corretor_sel != "Todos":
+        df_filtrado = df_filtrado[df_filtrado["CORRETOR"] == corretor_sel]
 
-registros_filtrados = len(df_filtrado)
+    registros_filtrados = len(df_filtrado)
+
+etapa("FILTRO PRINCIPAL")
 
 # ---------------------------------------------------------
-# TÍTULO
+# RESUMO DO FILTRO (título já foi desenhado na primeira pintura)
 # ---------------------------------------------------------
-st.title("📊 Dashboard Imobiliária – MR Imóveis")
 st.caption(
     f"Período: {data_ini.strftime('%d/%m/%Y')} até {data_fim.strftime('%d/%m/%Y')} • "
     f"Registros filtrados: {registros_filtrados}"
 )
 
-# Mostra hora da atualização dos leads (agora, sem cache)
+# Mostra hora em que os leads foram buscados na API (snapshot em disco)
 st.caption(
     f"🕒 Leads (Supremo) carregados em: {ts_atualizacao_leads.strftime('%d/%m/%Y %H:%M:%S')}"
 )
 
+marco()
+
 # ---------------------------------------------------------
 # CÁLCULOS PRINCIPAIS
 # ---------------------------------------------------------
-em_analise = (df_filtrado["STATUS_BASE"] == "EM ANÁLISE").sum()
-reanalise = (df_filtrado["STATUS_BASE"] == "REANÁLISE").sum()
-aprovacoes = (df_filtrado["STATUS_BASE"] == "APROVADO").sum()
-reprovacoes = (df_filtrado["STATUS_BASE"] == "REPROVADO").sum()
-
-analises_total = em_analise + reanalise
-
-# VENDAS – status final por cliente
-df_vendas_ref = df_filtrado[
-    df_filtrado["STATUS_BASE"].isin(["VENDA GERADA", "VENDA INFORMADA"])
-].copy()
-
-if not df_vendas_ref.empty:
-    df_vendas_ref["CHAVE_CLIENTE"] = (
-        df_vendas_ref["NOME_CLIENTE_BASE"].fillna("NÃO INFORMADO")
-        + " | "
-        + df_vendas_ref["CPF_CLIENTE_BASE"].fillna("")
-    )
-
-    df_vendas_ref = df_vendas_ref.sort_values("DIA")
-    df_vendas_ult = df_vendas_ref.groupby("CHAVE_CLIENTE").tail(1)
-
-    venda_gerada = (df_vendas_ult["STATUS_BASE"] == "VENDA GERADA").sum()
-    venda_informada = (df_vendas_ult["STATUS_BASE"] == "VENDA INFORMADA").sum()
-    vendas_total = int(venda_gerada + venda_informada)
-
-    vgv_total = df_vendas_ult["VGV"].sum()
-    maior_vgv = df_vendas_ult["VGV"].max() if vendas_total > 0 else 0
+if kpis is not None:
+    em_analise = int(kpis["EM_ANALISE"])
+    reanalise = int(kpis["REANALISE"])
+    aprovacoes = int(kpis["APROVACOES"])
+    reprovacoes = int(kpis["REPROVACOES"])
+    venda_gerada = int(kpis["VENDA_GERADA"])
+    venda_informada = int(kpis["VENDA_INFORMADA"])
+    vendas_total = venda_gerada + venda_informada
+    vgv_total = float(kpis["VGV_TOTAL"])
+    maior_vgv = float(kpis["MAIOR_VGV"])
+    analises_total = em_analise + reanalise
 else:
-    venda_gerada = 0
-    venda_informada = 0
-    vendas_total = 0
-    vgv_total = 0
-    maior_vgv = 0
+    em_analise = (df_filtrado["STATUS_BASE"] == "EM ANÁLISE").sum()
+    reanalise = (df_filtrado["STATUS_BASE"] == "REANÁLISE").sum()
+    aprovacoes = (df_filtrado["STATUS_BASE"] == "APROVADO").sum()
+    reprovacoes = (df_filtrado["STATUS_BASE"] == "REPROVADO").sum()
+
+    analises_total = em_analise + reanalise
+
+    # VENDAS – status final por cliente
+    df_vendas_ref = df_filtrado[
+        df_filtrado["STATUS_BASE"].isin(["VENDA GERADA", "VENDA INFORMADA"])
+    ].copy()
+
+    if not df_vendas_ref.empty:
+        df_vendas_ref["CHAVE_CLIENTE"] = (
+            df_vendas_ref["NOME_CLIENTE_BASE"].fillna("NÃO INFORMADO")
+            + " | "
+            + df_vendas_ref["CPF_CLIENTE_BASE"].fillna("")
+        )
+
+        df_vendas_ref = df_vendas_ref.sort_values("DIA")
+        df_vendas_ult = df_vendas_ref.groupby("CHAVE_CLIENTE").tail(1)
+
+        venda_gerada = (df_vendas_ult["STATUS_BASE"] == "VENDA GERADA").sum()
+        venda_informada = (df_vendas_ult["STATUS_BASE"] == "VENDA INFORMADA").sum()
+        vendas_total = int(venda_gerada + venda_informada)
+
+        vgv_total = df_vendas_ult["VGV"].sum()
+        maior_vgv = df_vendas_ult["VGV"].max() if vendas_total > 0 else 0
+    else:
+        venda_gerada = 0
+        venda_informada = 0
+        vendas_total = 0
+        vgv_total = 0
+        maior_vgv = 0
 
 ticket_medio = (vgv_total / vendas_total) if vendas_total > 0 else 0
 
@@ -333,6 +245,8 @@ taxa_aprov_analise = (aprovacoes / analises_total * 100) if analises_total else
 taxa_venda_analise = (vendas_total / analises_total * 100) if analises_total else 0
 taxa_venda_aprov = (vendas_total / aprovacoes * 100) if aprovacoes else 0
 
+etapa("CÁLCULOS PRINCIPAIS")
+
 # ---------------------------------------------------------
 # CARDS
 # ---------------------------------------------------------
@@ -354,6 +268,8 @@ c8.metric("Aprov./Análises", f"{taxa_aprov_analise:.1f}%")
 c9.metric("Vendas/Análises", f"{taxa_venda_analise:.1f}%")
 c10.metric("Vendas/Aprovações", f"{taxa_venda_aprov:.1f}%")
 
+marco()
+
 # ---------------------------------------------------------
 # LEADS – RESUMO
 # ---------------------------------------------------------
@@ -392,6 +308,8 @@ if not df_leads_use.empty and "data_captura" in df_leads_use.columns:
 else:
     st.info("Nenhum lead carregado ou campo 'data_captura' ausente na base.")
 
+etapa("LEADS – RESUMO")
+
 # ---------------------------------------------------------
 # INDICADORES DE VGV
 # ---------------------------------------------------------
@@ -399,14 +317,10 @@ st.markdown("---")
 st.subheader("💰 Indicadores de VGV (apenas clientes com venda)")
 
 
-def format_currency(valor: float) -> str:
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-
 c11, c12, c13 = st.columns(3)
-c11.metric("VGV Total", format_currency(vgv_total))
-c12.metric("Ticket Médio", format_currency(ticket_medio))
-c13.metric("Maior VGV", format_currency(maior_vgv))
+c11.metric("VGV Total", formata_moeda(vgv_total))
+c12.metric("Ticket Médio", formata_moeda(ticket_medio))
+c13.metric("Maior VGV", formata_moeda(maior_vgv))
 
 st.markdown(
     "<hr><p style='text-align:center; color:#6b7280;'>"
@@ -414,3 +328,6 @@ st.markdown(
     "</p>",
     unsafe_allow_html=True,
 )
+
+etapa("INDICADORES DE VGV")
+fechar_rerun({"periodo": (data_ini, data_fim), "equipe": equipe_sel, "corretor": corretor_sel})
@@ -0,0 +1,105 @@
+"""
+Aquecimento do cache antes de subir o Streamlit.
+
+Baixa a planilha de análises e os leads do Supremo e grava os snapshots em
+.cache/ (utils/dados.py). Em seguida monta o que as páginas derivam da
+planilha (utils/visoes.materializar): a planilha normalizada que todas as
+páginas mapeiam, o índice de clientes, rankings, alertas e KPIs da home (e
+SQLite / Parquet / pacote JSON, se ligados). O Streamlit roda em outro
+processo, então o que se aquece aqui é o disco: o primeiro visitante depois
+do deploy não paga download, paginação da API de leads nem normalização,
+só mapeia os snapshots prontos.
+
+--intervalo N repete o aquecimento a cada N segundos (use um valor menor
+que IDADE_MAX_SNAPSHOT). É opcional: baixa a planilha e os leads mesmo sem
+ninguém acessando. Rodando em segundo plano, mande a saída para um log.
+
+Uso (falha aqui não deve impedir o servidor de subir):
+    python aquecer_cache.py; streamlit run app_dashboard.py
+    python aquecer_cache.py --sem-leads
+    python -u aquecer_cache.py --intervalo 50 >> .cache/aquecer.log 2>&1 &
+"""
+
+import argparse
+import sys
+import time
+
+from utils.dados import (
+    ARQ_LEADS,
+    ARQ_PLANILHA,
+    CHAVE_ASSINATURA_CSV,
+    baixar_leads,
+    ler_planilha,
+    salva_snapshot,
+)
+from utils.visoes import DIR_VISOES, assinatura_publicada, materializar
+
+
+def aquecer_derivados(df) -> bool:
+    """Normalização e visões da planilha, se ainda não publicadas para este CSV."""
+    assinatura = df.attrs.get(CHAVE_ASSINATURA_CSV)
+    if assinatura is not None and assinatura == assinatura_publicada():
+        print("Derivados: já publicados para este CSV")
+        return True
+
+    ini = time.perf_counter()
+    try:
+        tempos = materializar(df)
+    except Exception as e:
+        # Páginas normalizam na hora; materializar_visoes.py tenta de novo
+        print(f"Derivados: falhou ({e})")
+        return False
+    print(f"Derivados: {', '.join(tempos)} • {time.perf_counter() - ini:.1f}s → {DIR_VISOES}")
+    return True
+
+
+def aquecer(com_leads: bool = True) -> bool:
+    ok = True
+
+    ini = time.perf_counter()
+    df = None
+    try:
+        # idade_max=0 força ir na rede (e regravar o snapshot)
+        df = ler_planilha(idade_max=0)
+        print(f"Planilha: {len(df)} linhas • {time.perf_counter() - ini:.1f}s → {ARQ_PLANILHA}")
+    except Exception as e:
+        print(f"Planilha: falhou ({e})")
+        ok = False
+
+    if df is not None and not aquecer_derivados(df):
+        ok = False
+
+    if com_leads:
+        ini = time.perf_counter()
+        df_leads = baixar_leads()
+        if df_leads.empty:
+            print("Leads: API não devolveu nada, snapshot anterior mantido")
+            ok = False
+        else:
+            salva_snapshot(df_leads, ARQ_LEADS)
+            print(f"Leads: {len(df_leads)} • {time.perf_counter() - ini:.1f}s → {ARQ_LEADS}")
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-carrega planilha, leads e derivados em .cache/")
+    parser.add_argument("--sem-leads", action="store_true", help="não chama a API do Supremo")
+    parser.add_argument(
+        "--intervalo",
+        type=float,
+        default=0,
+        help="segundos entre reaquecimentos (0 = roda uma vez e sai; opcional, polling contínuo)",
+    )
+    args = parser.parse_args()
+
+    ok = aquecer(com_leads=not args.sem_leads)
+    while args.intervalo > 0:
+        time.sleep(args.intervalo)
+        aquecer(com_leads=not args.sem_leads)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
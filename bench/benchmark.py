@@ -0,0 +1,211 @@
+"""
+Benchmark dos caminhos quentes do dashboard sobre dados sintéticos.
+
+Para cada tamanho gera a planilha (bench/gerar_dados.py), grava o CSV num
+diretório temporário e mede, com N repetições, as operações que as
+páginas fazem a cada rerun. São as funções de utils/consultas.py que as
+próprias páginas chamam (direto, pelo MotorPandas ou quando a visão
+materializada não está pronta):
+
+    ingestao        pd.read_csv da planilha
+    normalizacao    normalizar_planilha (DIA, DATA_BASE, STATUS_BASE, VGV, chaves)
+    status_base     mapear_status sobre a coluna SITUAÇÃO
+    periodo         filtrar_periodo (últimos 30 dias, todas as equipes)
+    funil_equipe    funil_por_equipe no período
+    ranking         ranking_por_data_base na DATA BASE mais recente
+    status_atual    status_atual (última linha por cliente)
+    busca_nome      buscar_cliente por trecho de nome
+    busca_cpf       buscar_cliente por trecho de CPF
+    alertas         calcular_alertas (corretores parados)
+
+Com --sqlite também carrega o banco local (utils/banco_local.py) e mede o
+mesmo período/funil empurrados para o SQL:
+
+    sqlite_periodo       banco_local.filtrar_periodo (últimos 30 dias, uma equipe)
+    sqlite_funil_equipe  banco_local.funil_por_equipe no período
+
+O resultado vai para um JSON com o commit atual e as versões de
+python/pandas/numpy; com --comparar o relatório mostra a razão contra um
+JSON anterior (> 1 = ficou mais lento).
+
+Uso (a partir da raiz do repositório):
+    python -m bench.benchmark
+    python -m bench.benchmark --tamanhos 10000 100000 1000000 --repeticoes 5 --saida bench_novo.json
+    python -m bench.benchmark --saida bench_novo.json --comparar bench_antigo.json
+    python -m bench.benchmark --tamanhos 100000 --sqlite
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from bench.gerar_dados import SEMENTE_PADRAO, gerar_planilha
+from utils import banco_local
+from utils.consultas import (
+    buscar_cliente,
+    calcular_alertas,
+    filtrar_periodo,
+    funil_por_equipe,
+    mapear_status,
+    normalizar_planilha,
+    ranking_por_data_base,
+    status_atual,
+)
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+REPETICOES_PADRAO = 3
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+
+def _commit_atual() -> str:
+    try:
+        saida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=RAIZ_REPO,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return saida.stdout.strip()
+    except Exception:
+        return "desconhecido"
+
+
+def _medir(funcao, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        ini = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - ini) * 1000)
+    return {
+        "min_ms": round(min(tempos), 3),
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "max_ms": round(max(tempos), 3),
+    }
+
+
+# ---------------------------------------------------------
+# CASOS
+# ---------------------------------------------------------
+def medir_tamanho(n_linhas: int, repeticoes: int, semente: int, sqlite: bool = False) -> dict:
+    bruto = gerar_planilha(n_linhas, semente=semente)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho_csv = Path(tmp) / "planilha_analises.csv"
+        bruto.to_csv(caminho_csv, index=False)
+        resultados = {"ingestao": _medir(lambda: pd.read_csv(caminho_csv), repeticoes)}
+        df_csv = pd.read_csv(caminho_csv)
+
+    resultados["normalizacao"] = _medir(lambda: normalizar_planilha(df_csv), repeticoes)
+    df = normalizar_planilha(df_csv)
+
+    col_situacao = next(c for c in df_csv.columns if c.strip().upper() == "SITUAÇÃO")
+    resultados["status_base"] = _medir(lambda: mapear_status(df_csv[col_situacao]), repeticoes)
+
+    dias_validos = df["DIA"].dropna()
+    data_fim = dias_validos.max()
+    data_ini = data_fim - timedelta(days=30)
+    resultados["periodo"] = _medir(lambda: filtrar_periodo(df, data_ini, data_fim), repeticoes)
+    df_periodo = filtrar_periodo(df, data_ini, data_fim)
+
+    resultados["funil_equipe"] = _medir(lambda: funil_por_equipe(df_periodo), repeticoes)
+
+    data_base = df["DATA_BASE"].dropna().max()
+    resultados["ranking"] = _medir(lambda: ranking_por_data_base(df, data_base), repeticoes)
+
+    resultados["status_atual"] = _medir(lambda: status_atual(df), repeticoes)
+
+    # Termos tirados da própria base para a busca sempre achar algo
+    nome_amostra = df["NOME_CLIENTE_BASE"].iloc[len(df) // 2].split()[-1]
+    cpf_amostra = df["CPF_CLIENTE_BASE"].iloc[len(df) // 2][:5]
+    resultados["busca_nome"] = _medir(lambda: buscar_cliente(df, nome_amostra, por="nome"), repeticoes)
+    resultados["busca_cpf"] = _medir(lambda: buscar_cliente(df, cpf_amostra, por="cpf"), repeticoes)
+
+    resultados["alertas"] = _medir(lambda: calcular_alertas(df), repeticoes)
+
+    if sqlite:
+        equipe = df["EQUIPE"].iloc[0]
+        with tempfile.TemporaryDirectory() as tmp:
+            arquivo = Path(tmp) / "eventos.sqlite"
+            banco_local.publicar(df, arquivo=arquivo)
+            con = banco_local.conectar(arquivo)
+            try:
+                resultados["sqlite_periodo"] = _medir(
+                    lambda: banco_local.filtrar_periodo(con, data_ini, data_fim, equipe), repeticoes
+                )
+                resultados["sqlite_funil_equipe"] = _medir(
+                    lambda: banco_local.funil_por_equipe(con, data_ini, data_fim), repeticoes
+                )
+            finally:
+                con.close()
+
+    return {
+        "linhas": n_linhas,
+        "memoria_mb": round(df.memory_usage(deep=True).sum() / 1024**2, 1),
+        "casos": resultados,
+    }
+
+
+# ---------------------------------------------------------
+# RELATÓRIO
+# ---------------------------------------------------------
+def imprimir(resultado: dict, anterior=None) -> None:
+    base = {}
+    if anterior:
+        for item in anterior.get("tamanhos", []):
+            base[item["linhas"]] = item["casos"]
+        print(f"Comparando {resultado['commit']} com {anterior.get('commit', '?')} (razão da mediana)")
+
+    for item in resultado["tamanhos"]:
+        print(f"\n{item['linhas']:,} linhas • {item['memoria_mb']} MB".replace(",", "."))
+        casos_base = base.get(item["linhas"], {})
+        for nome, t in item["casos"].items():
+            linha = f"  {nome:<20} mediana {t['mediana_ms']:>10.1f} ms   min {t['min_ms']:>10.1f} ms"
+            if nome in casos_base and casos_base[nome]["mediana_ms"] > 0:
+                razao = t["mediana_ms"] / casos_base[nome]["mediana_ms"]
+                linha += f"   x{razao:.2f}"
+            print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede os caminhos quentes do dashboard")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO, help="linhas da planilha")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES_PADRAO)
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    parser.add_argument("--saida", type=Path, default=None, help="grava o resultado em JSON")
+    parser.add_argument("--comparar", type=Path, default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--sqlite", action="store_true", help="mede também o banco SQLite local")
+    args = parser.parse_args()
+
+    resultado = {
+        "commit": _commit_atual(),
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeticoes": args.repeticoes,
+        "tamanhos": [],
+    }
+    for n in args.tamanhos:
+        print(f"Medindo {n:,} linhas...".replace(",", "."), flush=True)
+        resultado["tamanhos"].append(medir_tamanho(n, args.repeticoes, args.semente, args.sqlite))
+
+    anterior = json.loads(args.comparar.read_text(encoding="utf-8")) if args.comparar else None
+    imprimir(resultado, anterior)
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nResultado gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
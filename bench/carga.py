@@ -0,0 +1,253 @@
+"""
+Teste de carga: N sessões simultâneas navegando pelo dashboard.
+
+Simula a segunda de manhã (gestores + TV abrindo tudo ao mesmo tempo):
+cada sessão é uma thread que abre páginas sorteadas com o AppTest do
+Streamlit e faz trocas de filtro realistas (período, equipe, busca de
+cliente – as mesmas interações de bench/render_paginas.py), com um tempo
+de "leitura" entre cliques. Todas as sessões rodam no mesmo processo, como
+no servidor real, então dividem o cache em memória (utils/cache.py) e os
+snapshots em disco – é isso que o teste mostra.
+
+Dados vêm do servidor local (bench/servidor_local.py). Ao final:
+    vazão            reruns por segundo somando todas as sessões
+    p50/p95/p99      latência dos reruns (geral e por página)
+    RSS              memória residente do processo (início, pico, fim)
+    requisições      quantas vezes cada rota externa foi chamada
+
+Uso (a partir da raiz do repositório):
+    python -m bench.carga --sessoes 10 --duracao 60
+    python -m bench.carga --sessoes 25 --duracao 120 --pensar 500 --saida carga.json
+    python -m bench.carga --sessoes 10 --sem-aquecimento   # primeira onda sem snapshot em disco
+"""
+
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from bench.render_paginas import INTERACOES, TIMEOUT_PADRAO, alvos, prepara_ambiente
+from bench.servidor_local import ServidorLocal
+
+
+# ---------------------------------------------------------
+# MEMÓRIA DO PROCESSO
+# ---------------------------------------------------------
+def rss_mb() -> float:
+    """RSS atual (Linux via /proc); fora do Linux cai no pico do getrusage."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class AmostradorMemoria(threading.Thread):
+    def __init__(self, intervalo: float = 0.5):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.inicio = rss_mb()
+        self.pico = self.inicio
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            self.pico = max(self.pico, rss_mb())
+
+    def parar(self) -> dict:
+        self._parar.set()
+        fim = rss_mb()
+        self.pico = max(self.pico, fim)
+        return {"inicio_mb": round(self.inicio, 1), "pico_mb": round(self.pico, 1), "fim_mb": round(fim, 1)}
+
+
+# ---------------------------------------------------------
+# SESSÃO
+# ---------------------------------------------------------
+class Sessao(threading.Thread):
+    """
+    Uma aba aberta: sorteia a página, roda, faz de 0 a `max_interacoes`
+    trocas de filtro e navega de novo até o prazo acabar.
+    """
+
+    def __init__(self, indice, paginas, prazo, pensar_ms, max_interacoes, timeout, semente):
+        super().__init__(daemon=True)
+        self.indice = indice
+        self.paginas = paginas
+        self.prazo = prazo
+        self.pensar_ms = pensar_ms
+        self.max_interacoes = max_interacoes
+        self.timeout = timeout
+        self.rng = random.Random(semente + indice)
+        self.medidas = []  # (página, ação, ms)
+        self.erros = 0
+
+    def _roda(self, at, pagina, acao):
+        ini = time.perf_counter()
+        try:
+            at.run(timeout=self.timeout)
+        except Exception:
+            self.erros += 1
+            return False
+        self.medidas.append((pagina, acao, (time.perf_counter() - ini) * 1000))
+        self.erros += len(at.exception)
+        return True
+
+    def _pensa(self):
+        if self.pensar_ms > 0:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.pensar_ms / 1000)
+
+    def run(self):
+        from streamlit.testing.v1 import AppTest
+
+        while time.monotonic() < self.prazo:
+            arquivo = self.rng.choice(self.paginas)
+            at = AppTest.from_file(str(arquivo), default_timeout=self.timeout)
+            if not self._roda(at, arquivo.name, "abrir"):
+                continue
+
+            for _ in range(self.rng.randint(0, self.max_interacoes)):
+                if time.monotonic() >= self.prazo:
+                    break
+                self._pensa()
+                nome, interage = self.rng.choice(INTERACOES)
+                try:
+                    mudou = interage(at)
+                except Exception:
+                    mudou = False
+                if mudou:
+                    self._roda(at, arquivo.name, nome)
+
+            self._pensa()
+
+
+# ---------------------------------------------------------
+# RELATÓRIO
+# ---------------------------------------------------------
+def _percentis(tempos) -> dict:
+    if not tempos:
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(tempos, [50, 95, 99])
+    return {"n": len(tempos), "p50_ms": round(float(p50), 1), "p95_ms": round(float(p95), 1), "p99_ms": round(float(p99), 1)}
+
+
+def resumir(sessoes, duracao_s, memoria, requisicoes) -> dict:
+    medidas = [m for s in sessoes for m in s.medidas]
+    por_pagina = defaultdict(list)
+    for pagina, _, ms in medidas:
+        por_pagina[pagina].append(ms)
+
+    return {
+        "sessoes": len(sessoes),
+        "duracao_s": round(duracao_s, 1),
+        "reruns": len(medidas),
+        "vazao_reruns_s": round(len(medidas) / duracao_s, 2) if duracao_s else 0,
+        "erros": sum(s.erros for s in sessoes),
+        "geral": _percentis([ms for _, _, ms in medidas]),
+        "por_pagina": {p: _percentis(t) for p, t in sorted(por_pagina.items())},
+        "memoria": memoria,
+        "requisicoes": dict(requisicoes),
+    }
+
+
+def imprimir(resumo: dict) -> None:
+    g = resumo["geral"]
+    print(
+        f"\n{resumo['sessoes']} sessões • {resumo['duracao_s']}s • {resumo['reruns']} reruns "
+        f"• {resumo['vazao_reruns_s']} reruns/s • {resumo['erros']} erros"
+    )
+    if g["n"]:
+        print(f"Latência geral: p50 {g['p50_ms']:.0f} ms • p95 {g['p95_ms']:.0f} ms • p99 {g['p99_ms']:.0f} ms")
+
+    print(f"\n{'página':<34}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for pagina, p in resumo["por_pagina"].items():
+        print(f"{pagina:<34}{p['n']:>6}{p['p50_ms']:>8.0f}ms{p['p95_ms']:>8.0f}ms{p['p99_ms']:>8.0f}ms")
+
+    m = resumo["memoria"]
+    print(f"\nRSS: início {m['inicio_mb']} MB • pico {m['pico_mb']} MB • fim {m['fim_mb']} MB")
+    print(f"Requisições externas: {resumo['requisicoes']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sessões simultâneas navegando pelo dashboard")
+    parser.add_argument("--sessoes", type=int, default=10)
+    parser.add_argument("--duracao", type=float, default=60, help="segundos de carga")
+    parser.add_argument("--pensar", type=float, default=1000, help="ms médios entre cliques de cada sessão")
+    parser.add_argument("--interacoes", type=int, default=3, help="máximo de trocas de filtro por página aberta")
+    parser.add_argument("--paginas", nargs="*", default=None, help="prefixos (ex.: 04 10 app)")
+    parser.add_argument("--linhas", type=int, default=100_000, help="linhas da planilha sintética")
+    parser.add_argument("--leads", type=int, default=1_000)
+    parser.add_argument("--latencia-planilha", type=float, default=800, help="ms por download da planilha")
+    parser.add_argument("--latencia-leads", type=float, default=150, help="ms por página de leads")
+    parser.add_argument("--variacao", type=float, default=0.2, help="ruído relativo da latência")
+    parser.add_argument(
+        "--sem-aquecimento",
+        action="store_true",
+        help="não roda aquecer_cache antes (a primeira onda de sessões vai toda na rede)",
+    )
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_PADRAO, help="segundos por rerun")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", type=Path, default=None, help="grava o resumo em JSON")
+    args = parser.parse_args()
+
+    dir_cache = Path(tempfile.mkdtemp(prefix="mr_carga_"))
+    servidor = ServidorLocal(
+        n_linhas=args.linhas,
+        n_leads=args.leads,
+        latencia_planilha_ms=args.latencia_planilha,
+        latencia_leads_ms=args.latencia_leads,
+        variacao=args.variacao,
+    ).iniciar()
+    prepara_ambiente(servidor, dir_cache)
+
+    if not args.sem_aquecimento:
+        # Mesmo cenário do deploy: aquecer_cache.py já rodou antes do primeiro acesso
+        from aquecer_cache import aquecer
+
+        aquecer()
+        servidor.requisicoes.clear()
+
+    paginas = alvos(args.paginas)
+    memoria = AmostradorMemoria()
+    memoria.start()
+
+    ini = time.monotonic()
+    prazo = ini + args.duracao
+    sessoes = [
+        Sessao(i, paginas, prazo, args.pensar, args.interacoes, args.timeout, args.semente)
+        for i in range(args.sessoes)
+    ]
+    print(f"{args.sessoes} sessões por {args.duracao:.0f}s em {len(paginas)} páginas...", flush=True)
+    try:
+        for s in sessoes:
+            s.start()
+        for s in sessoes:
+            s.join()
+    finally:
+        duracao = time.monotonic() - ini
+        servidor.parar()
+        shutil.rmtree(dir_cache, ignore_errors=True)
+
+    resumo = resumir(sessoes, duracao, memoria.parar(), servidor.requisicoes)
+    imprimir(resumo)
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resumo, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nResumo gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Confere e mede os motores de utils/motor_consultas.py (pandas × DuckDB × SQLite).
+
+Gera a planilha sintética (bench/gerar_dados.py), normaliza, publica o
+Parquet e o banco SQLite num diretório temporário e roda as consultas das
+páginas 03, 04, 05 e 10 nos três motores para alguns períodos (30 dias,
+1 ano, base inteira). Cada resultado do DuckDB e do SQLite tem que ser
+igual ao do pandas (pandas.testing.assert_frame_equal); depois mostra a
+mediana de cada um.
+
+Precisa de duckdb e pyarrow instalados:
+    pip install duckdb
+    python -m bench.comparar_motores
+    python -m bench.comparar_motores --linhas 2000000 --repeticoes 5
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from bench.gerar_dados import SEMENTE_PADRAO, gerar_planilha
+from utils.consultas import normalizar_planilha
+from utils import banco_local
+from utils.motor_consultas import MotorDuckDB, MotorPandas, MotorSQLite, publicar_parquet
+
+
+def consultas_paginas(df: pd.DataFrame):
+    """(nome, função(motor)) com as consultas das páginas em alguns períodos."""
+    dias = df["DIA"].dropna()
+    data_fim = dias.max()
+    periodos = {
+        "30d": (data_fim - timedelta(days=30), data_fim),
+        "1ano": (data_fim - timedelta(days=365), data_fim),
+        "tudo": (dias.min(), data_fim),
+    }
+    equipe = sorted(df["EQUIPE"].unique())[0]
+    corretor = sorted(df["CORRETOR"].unique())[0]
+
+    casos = []
+    for rotulo, (ini, fim) in periodos.items():
+        casos += [
+            (f"04_funil_equipe_{rotulo}", lambda m, i=ini, f=fim: m.funil(i, f, "EQUIPE")),
+            (f"05_funil_corretor_{rotulo}", lambda m, i=ini, f=fim: m.funil(i, f, "CORRETOR", corretor=corretor)),
+            (f"03_ranking_equipes_{rotulo}", lambda m, i=ini, f=fim: m.ranking_equipes(i, f)),
+            (f"10_vendas_equipe_{rotulo}", lambda m, i=ini, f=fim: m.vendas_por_grupo(i, f, ["EQUIPE"])),
+            (
+                f"10_vendas_corretor_{rotulo}",
+                lambda m, i=ini, f=fim: m.vendas_por_grupo(i, f, ["CORRETOR", "EQUIPE"], equipe=equipe),
+            ),
+            (f"10_mix_construtora_{rotulo}", lambda m, i=ini, f=fim: m.vendas_por_grupo(i, f, ["CONSTRUTORA_BASE"])),
+            (
+                f"10_mix_empreendimento_{rotulo}",
+                lambda m, i=ini, f=fim: m.vendas_por_grupo(i, f, ["EMPREENDIMENTO_BASE"]),
+            ),
+        ]
+    return casos
+
+
+def _mediana_ms(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        ini = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - ini) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os motores pandas, DuckDB e SQLite")
+    parser.add_argument("--linhas", type=int, default=500_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    args = parser.parse_args()
+
+    print(f"Gerando {args.linhas:,} linhas...".replace(",", "."), flush=True)
+    df = normalizar_planilha(gerar_planilha(args.linhas, semente=args.semente))
+
+    divergentes = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = Path(tmp) / "eventos.parquet"
+        publicar_parquet(df, arquivo=arquivo)
+        banco = Path(tmp) / "eventos.sqlite"
+        banco_local.publicar(df, arquivo=banco)
+        pandas_, duckdb_, sqlite_ = MotorPandas(df), MotorDuckDB(arquivo), MotorSQLite(banco)
+
+        print(f"\n{'consulta':<32} {'pandas':>10} {'duckdb':>10} {'sqlite':>10}   ")
+        for nome, consulta in consultas_paginas(df):
+            esperado = consulta(pandas_)
+            marcas = []
+            for motor in (duckdb_, sqlite_):
+                try:
+                    pd.testing.assert_frame_equal(esperado, consulta(motor), check_dtype=False, check_exact=True)
+                except AssertionError as e:
+                    divergentes += 1
+                    marcas.append(f"{motor.nome} DIFERENTE: {str(e).splitlines()[0]}")
+            marca = "; ".join(marcas) or "igual"
+
+            t_pandas = _mediana_ms(lambda: consulta(pandas_), args.repeticoes)
+            t_duckdb = _mediana_ms(lambda: consulta(duckdb_), args.repeticoes)
+            t_sqlite = _mediana_ms(lambda: consulta(sqlite_), args.repeticoes)
+            print(f"{nome:<32} {t_pandas:>8.1f}ms {t_duckdb:>8.1f}ms {t_sqlite:>8.1f}ms   {marca}")
+
+    if divergentes:
+        print(f"\n{divergentes} consulta(s) com resultado diferente")
+        sys.exit(1)
+    print("\nTodos os resultados iguais")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""
+Gerador de dados sintéticos: planilha de análises + páginas de leads do Supremo.
+
+A planilha imita o Google Sheets real (mesmas colunas que as páginas e o
+dashboard.py leem): clientes percorrendo EM ANÁLISE → REANÁLISE →
+APROVAÇÃO/REPROVAÇÃO → VENDA, DATA BASE mensal, nomes e situações com e
+sem acento, CPF em vários formatos e OBSERVAÇÕES ora com VGV numérico,
+ora com texto livre. Tudo vetorizado com numpy para aguentar de 10 mil a
+10 milhões de linhas.
+
+Uso:
+    python -m bench.gerar_dados --linhas 100000
+    python -m bench.gerar_dados --linhas 1000000 --leads 20000 --saida dados_sinteticos
+    python -m bench.gerar_dados --linhas 50000 --csv-dashboard dados_imobiliaria.csv
+"""
+
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SEMENTE_PADRAO = 42
+INICIO_PADRAO = date(2024, 1, 1)
+DIAS_PADRAO = 365
+TAMANHO_PAGINA_LEADS = 50
+
+EQUIPES = [
+    "ALFA", "BETA", "GAMA", "DELTA", "ÔMEGA", "SIGMA", "ÁGUIA", "FÊNIX",
+    "LEÃO", "TUBARÃO", "IMPÉRIO", "ESTRELA",
+]
+
+PRIMEIROS_NOMES = [
+    "JOÃO", "MARIA", "JOSÉ", "ANA", "ANTÔNIO", "FRANCISCA", "CARLOS", "ADRIANA",
+    "PAULO", "JULIANA", "PEDRO", "MÁRCIA", "LUCAS", "FERNANDA", "LUÍS", "PATRÍCIA",
+    "MARCOS", "ALINE", "RAFAEL", "SÔNIA", "GABRIEL", "LETÍCIA", "ANDRÉ", "CONCEIÇÃO",
+]
+
+SOBRENOMES = [
+    "SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "RODRIGUES", "FERREIRA", "ALVES",
+    "PEREIRA", "LIMA", "GOMES", "RIBEIRO", "CARVALHO", "ARAÚJO", "MELO",
+    "BARBOSA", "CONCEIÇÃO", "GONÇALVES", "ROCHA", "DIAS", "NASCIMENTO",
+    "ASSUNÇÃO", "BRANDÃO", "FALCÃO", "MAGALHÃES",
+]
+
+CONSTRUTORAS = {
+    "MRV": ["PARQUE DAS ÁGUAS", "RESIDENCIAL JARDIM", "SPAZIO SOL"],
+    "DIRECIONAL": ["CONQUISTA NORTE", "VIVER BEM", "ALLEGRO"],
+    "CURY": ["NOVA CONQUISTA", "PRAÇA DAS FLORES"],
+    "TENDA": ["VILA TENDA", "BELA VISTA", "MONTE AZUL"],
+    "PLANO&PLANO": ["PLANO FLORESTA", "PLANO CENTRO"],
+    "VIC ENGENHARIA": ["SÃO JOÃO", "RECANTO DO SABIÁ"],
+}
+
+# Jornadas possíveis do cliente (status em ordem) e a chance de cada uma.
+# APROVAÇÃO / APROVADO BACEN / REPROVAÇÃO seguem os rótulos exatos do
+# dashboard.py; nas páginas entram via contains("APROV") / ("REPROV").
+JORNADAS = [
+    (["EM ANÁLISE"], 0.22),
+    (["EM ANÁLISE", "REANÁLISE"], 0.08),
+    (["EM ANÁLISE", "REPROVAÇÃO"], 0.14),
+    (["EM ANÁLISE", "REANÁLISE", "REPROVAÇÃO"], 0.04),
+    (["EM ANÁLISE", "PENDÊNCIA"], 0.04),
+    (["EM ANÁLISE", "PENDÊNCIA", "APROVAÇÃO"], 0.03),
+    (["EM ANÁLISE", "APROVAÇÃO"], 0.14),
+    (["EM ANÁLISE", "APROVADO BACEN"], 0.04),
+    (["EM ANÁLISE", "REANÁLISE", "APROVAÇÃO"], 0.05),
+    (["EM ANÁLISE", "APROVAÇÃO", "VENDA GERADA"], 0.11),
+    (["EM ANÁLISE", "APROVAÇÃO", "VENDA INFORMADA"], 0.05),
+    (["EM ANÁLISE", "REANÁLISE", "APROVAÇÃO", "VENDA GERADA"], 0.04),
+    (["EM ANÁLISE", "APROVADO BACEN", "VENDA INFORMADA"], 0.02),
+]
+
+STATUS = [
+    "EM ANÁLISE", "REANÁLISE", "PENDÊNCIA", "APROVAÇÃO", "APROVADO BACEN",
+    "REPROVAÇÃO", "VENDA GERADA", "VENDA INFORMADA",
+]
+
+OBSERVACOES_TEXTO = [
+    "",
+    "AGUARDANDO DOCUMENTAÇÃO",
+    "CLIENTE PEDIU RETORNO",
+    "renda informal, verificar",
+    "FGTS em análise",
+    "Reanálise com fiador",
+    "PENDENTE CERTIDÃO",
+    "sem observações",
+]
+
+ORIGENS_LEAD = ["FACEBOOK", "INSTAGRAM", "SITE", "INDICAÇÃO", "PORTAL ZAP", "WHATSAPP"]
+ETAPAS_LEAD = ["NOVO", "EM ATENDIMENTO", "VISITA", "ANÁLISE", "PERDIDO", "CONVERTIDO"]
+
+_SEM_ACENTO = str.maketrans("ÁÀÂÃÉÊÍÓÔÕÚÇáàâãéêíóôõúç", "AAAAEEIOOOUCaaaaeeiooouc")
+
+
+def _sem_acento(texto: str) -> str:
+    return texto.translate(_SEM_ACENTO)
+
+
+def _escolhe(rng, valores, tamanho, p=None):
+    """Sorteia índices e devolve array de objetos (reaproveita as mesmas strings)."""
+    valores = np.asarray(valores, dtype=object)
+    return valores[rng.choice(len(valores), size=tamanho, p=p)]
+
+
+def _suja(rng, serie: np.ndarray, taxa: float, variantes) -> np.ndarray:
+    """
+    Troca uma fração `taxa` dos valores por uma variante "suja" (sem
+    acento, minúsculo, com espaço sobrando) – calculada só uma vez por
+    valor distinto, não por linha.
+    """
+    if taxa <= 0:
+        return serie
+
+    marcados = np.flatnonzero(rng.random(len(serie)) < taxa)
+    if marcados.size == 0:
+        return serie
+
+    serie = serie.copy()
+    distintos, inverso = np.unique(serie[marcados].astype(str), return_inverse=True)
+    escolha = rng.integers(0, len(variantes), size=marcados.size)
+
+    tabela = np.array(
+        [[variante(v) for variante in variantes] for v in distintos],
+        dtype=object,
+    )
+    serie[marcados] = tabela[inverso, escolha]
+    return serie
+
+
+def _cpf_pontuado(cpfs: np.ndarray) -> np.ndarray:
+    s = pd.Series(cpfs, dtype=object)
+    return (s.str[:3] + "." + s.str[3:6] + "." + s.str[6:9] + "-" + s.str[9:]).to_numpy(dtype=object)
+
+
+# ---------------------------------------------------------
+# EQUIPES E CORRETORES
+# ---------------------------------------------------------
+def gerar_corretores(n_corretores: int, n_equipes: int, rng) -> pd.DataFrame:
+    equipes = EQUIPES[:n_equipes] if n_equipes <= len(EQUIPES) else [
+        f"EQUIPE {i + 1:02d}" for i in range(n_equipes)
+    ]
+    nomes = [
+        f"{PRIMEIROS_NOMES[i % len(PRIMEIROS_NOMES)]} "
+        f"{SOBRENOMES[(i // len(PRIMEIROS_NOMES)) % len(SOBRENOMES)]}"
+        + ("" if i < len(PRIMEIROS_NOMES) * len(SOBRENOMES) else f" {i}")
+        for i in rng.permutation(n_corretores)
+    ]
+    # Equipes de tamanho desigual, como na vida real
+    pesos = rng.dirichlet(np.full(len(equipes), 2.0))
+    return pd.DataFrame(
+        {
+            "CORRETOR": nomes,
+            "EQUIPE": _escolhe(rng, equipes, n_corretores, p=pesos),
+        }
+    )
+
+
+# ---------------------------------------------------------
+# PLANILHA DE ANÁLISES
+# ---------------------------------------------------------
+def gerar_planilha(
+    n_linhas: int,
+    n_equipes: int = 8,
+    n_corretores: int = 120,
+    inicio: date = INICIO_PADRAO,
+    dias: int = DIAS_PADRAO,
+    taxa_sujeira: float = 0.03,
+    semente: int = SEMENTE_PADRAO,
+) -> pd.DataFrame:
+    """
+    Monta `n_linhas` movimentações. Cada cliente sorteia uma jornada e
+    gera uma linha por etapa, com alguns dias entre uma e outra.
+    """
+    rng = np.random.default_rng(semente)
+    corretores = gerar_corretores(n_corretores, n_equipes, rng)
+
+    # --- jornadas: matriz [jornada, etapa] com o índice do status ---
+    max_etapas = max(len(j) for j, _ in JORNADAS)
+    matriz = np.full((len(JORNADAS), max_etapas), -1, dtype=np.int8)
+    for i, (jornada, _) in enumerate(JORNADAS):
+        matriz[i, : len(jornada)] = [STATUS.index(s) for s in jornada]
+    comprimentos = (matriz >= 0).sum(axis=1)
+    probs = np.array([p for _, p in JORNADAS])
+    probs = probs / probs.sum()
+
+    # sorteia clientes de sobra e corta no primeiro que completa n_linhas
+    media = float((comprimentos * probs).sum())
+    n_clientes = int(n_linhas / media * 1.2) + 10
+
+    jornada_cli = rng.choice(len(JORNADAS), size=n_clientes, p=probs)
+    len_cli = comprimentos[jornada_cli]
+    fim_cli = np.cumsum(len_cli)
+    n_clientes = min(int(np.searchsorted(fim_cli, n_linhas)) + 1, n_clientes)
+    jornada_cli = jornada_cli[:n_clientes]
+    len_cli = len_cli[:n_clientes]
+
+    cliente = np.repeat(np.arange(n_clientes), len_cli)
+    inicio_cli = np.cumsum(len_cli) - len_cli
+    etapa = np.arange(len(cliente)) - np.repeat(inicio_cli, len_cli)
+
+    cliente = cliente[:n_linhas]
+    etapa = etapa[:n_linhas]
+    status_idx = matriz[jornada_cli[cliente], etapa]
+
+    # --- datas: início do cliente + 1 a 12 dias entre etapas ---
+    dia_ini_cli = rng.integers(0, dias, size=n_clientes)
+    passos = rng.integers(1, 13, size=len(cliente))
+    passos[etapa == 0] = 0
+    # soma acumulada dos passos, zerando no começo de cada cliente
+    acum = np.cumsum(passos)
+    dentro = acum - acum[inicio_cli[cliente]]
+    offset = np.minimum(dia_ini_cli[cliente] + dentro, dias - 1)
+
+    dias_possiveis = pd.date_range(inicio, periods=dias, freq="D")
+    data_txt = np.asarray(dias_possiveis.strftime("%d/%m/%Y"), dtype=object)[offset]
+    data_base_txt = np.asarray(
+        dias_possiveis.to_period("M").to_timestamp().strftime("%d/%m/%Y"),
+        dtype=object,
+    )[offset]
+
+    # --- corretor / equipe do cliente (fixo durante a jornada) ---
+    corretor_cli = rng.integers(0, len(corretores), size=n_clientes)
+    corretor = corretores["CORRETOR"].to_numpy(dtype=object)[corretor_cli[cliente]]
+    equipe = corretores["EQUIPE"].to_numpy(dtype=object)[corretor_cli[cliente]]
+
+    # --- cliente: nome e CPF (formato varia por linha, como na planilha) ---
+    nomes_cli = (
+        _escolhe(rng, PRIMEIROS_NOMES, n_clientes)
+        + " "
+        + _escolhe(rng, SOBRENOMES, n_clientes)
+        + " "
+        + _escolhe(rng, SOBRENOMES, n_clientes)
+    )
+    nome = nomes_cli[cliente]
+
+    cpf_num = np.char.zfill(
+        rng.integers(10**9, 10**11 - 1, size=n_clientes).astype(str), 11
+    ).astype(object)[cliente]
+    # 0 = só dígitos, 1 = 000.000.000-00, 2 = pontuado com espaço, 3 = vazio
+    formato_cpf = rng.choice(4, size=len(cliente), p=[0.45, 0.35, 0.15, 0.05])
+    cpf = cpf_num.copy()
+    m = formato_cpf == 1
+    cpf[m] = _cpf_pontuado(cpf_num[m])
+    m = formato_cpf == 2
+    cpf[m] = " " + _cpf_pontuado(cpf_num[m])
+    cpf[formato_cpf == 3] = ""
+
+    # --- empreendimento ---
+    pares = [(c, e) for c, lista in CONSTRUTORAS.items() for e in lista]
+    par_cli = rng.integers(0, len(pares), size=n_clientes)[cliente]
+    construtora = np.array([p[0] for p in pares], dtype=object)[par_cli]
+    empreendimento = np.array([p[1] for p in pares], dtype=object)[par_cli]
+
+    situacao = np.asarray(STATUS, dtype=object)[status_idx]
+
+    # --- OBSERVAÇÕES: VGV numérico nas vendas, texto no resto ---
+    venda = np.isin(status_idx, [STATUS.index("VENDA GERADA"), STATUS.index("VENDA INFORMADA")])
+    obs = _escolhe(rng, OBSERVACOES_TEXTO, len(cliente))
+    vgv = np.round(rng.lognormal(mean=12.3, sigma=0.35, size=int(venda.sum())), -2)
+    vgv_txt = vgv.astype(np.int64).astype(str).astype(object)
+    # uma parte das vendas vem digitada "à mão" (R$ 1.234,00) e vira 0 no to_numeric
+    mao = rng.random(vgv_txt.size) < taxa_sujeira
+    vgv_txt[mao] = [f"R$ {v:,.2f}".translate(str.maketrans(",.", ".,")) for v in vgv[mao]]
+    obs[venda] = vgv_txt
+
+    # --- sujeira: acentos, caixa, espaços ---
+    variantes = [_sem_acento, str.lower, lambda v: f" {v} ", lambda v: v.title()]
+    nome = _suja(rng, nome, taxa_sujeira, variantes)
+    corretor = _suja(rng, corretor, taxa_sujeira, variantes[1:])
+    situacao = _suja(rng, situacao, taxa_sujeira / 3, [_sem_acento, str.lower])
+
+    return pd.DataFrame(
+        {
+            "DATA": data_txt,
+            "DATA BASE": data_base_txt,
+            "EQUIPE": equipe,
+            "CORRETOR": corretor,
+            "CLIENTE": nome,
+            "CPF": cpf,
+            "CONSTRUTORA": construtora,
+            "EMPREENDIMENTO": empreendimento,
+            "SITUAÇÃO": situacao,
+            "OBSERVAÇÕES": obs,
+        }
+    )
+
+
+# ---------------------------------------------------------
+# LEADS DO SUPREMO (MESMO FORMATO DA API /v1/leads)
+# ---------------------------------------------------------
+def gerar_leads(
+    n_leads: int,
+    corretores,
+    inicio: date = INICIO_PADRAO,
+    dias: int = DIAS_PADRAO,
+    semente: int = SEMENTE_PADRAO,
+) -> list:
+    """Lista de dicts como os que vêm em `data` de cada página da API."""
+    rng = np.random.default_rng(semente + 1)
+
+    segundos = rng.integers(0, dias * 86400, size=n_leads)
+    base = datetime.combine(inicio, datetime.min.time())
+    nomes = (
+        _escolhe(rng, PRIMEIROS_NOMES, n_leads)
+        + " "
+        + _escolhe(rng, SOBRENOMES, n_leads)
+    )
+    corretor = _escolhe(rng, list(corretores), n_leads)
+    origem = _escolhe(rng, ORIGENS_LEAD, n_leads)
+    etapa = _escolhe(rng, ETAPAS_LEAD, n_leads)
+    telefone = rng.integers(10**10, 10**11 - 1, size=n_leads)
+
+    return [
+        {
+            "id": i + 1,
+            "nome": nomes[i].title(),
+            "email": f"{_sem_acento(nomes[i]).lower().replace(' ', '.')}{i}@exemplo.com.br",
+            "telefone": str(telefone[i]),
+            "data_captura": (base + timedelta(seconds=int(segundos[i]))).strftime("%Y-%m-%d %H:%M:%S"),
+            "nome_corretor": corretor[i],
+            "origem": origem[i],
+            "etapa": etapa[i],
+        }
+        for i in range(n_leads)
+    ]
+
+
+def paginar_leads(leads: list, tamanho: int = TAMANHO_PAGINA_LEADS) -> list:
+    """Quebra em páginas {"data": [...]} – a página depois da última vem vazia, como na API."""
+    paginas = [
+        {"pagina": n + 1, "data": leads[i : i + tamanho]}
+        for n, i in enumerate(range(0, len(leads), tamanho))
+    ]
+    paginas.append({"pagina": len(paginas) + 1, "data": []})
+    return paginas
+
+
+# ---------------------------------------------------------
+# GRAVAÇÃO
+# ---------------------------------------------------------
+def salvar(df: pd.DataFrame, leads: list, saida: Path, csv_dashboard=None) -> None:
+    saida.mkdir(parents=True, exist_ok=True)
+
+    # utf-8-sig: mesmo encoding que dashboard.py / gera_dashboard_web.py leem
+    df.to_csv(saida / "planilha_analises.csv", index=False, encoding="utf-8-sig", chunksize=500_000)
+    if csv_dashboard:
+        df.to_csv(csv_dashboard, index=False, encoding="utf-8-sig", chunksize=500_000)
+
+    dir_leads = saida / "leads"
+    dir_leads.mkdir(exist_ok=True)
+    for pagina in paginar_leads(leads):
+        with open(dir_leads / f"pagina_{pagina['pagina']:04d}.json", "w", encoding="utf-8") as f:
+            json.dump({"data": pagina["data"]}, f, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera planilha de análises e leads sintéticos")
+    parser.add_argument("--linhas", type=int, default=100_000, help="linhas da planilha (10 mil a 10 milhões)")
+    parser.add_argument("--equipes", type=int, default=8)
+    parser.add_argument("--corretores", type=int, default=120)
+    parser.add_argument("--dias", type=int, default=DIAS_PADRAO, help="dias cobertos a partir de --inicio")
+    parser.add_argument("--inicio", type=date.fromisoformat, default=INICIO_PADRAO, help="AAAA-MM-DD")
+    parser.add_argument("--leads", type=int, default=5_000)
+    parser.add_argument("--sujeira", type=float, default=0.03, help="fração de valores com acento/caixa/espaço bagunçados")
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    parser.add_argument("--saida", type=Path, default=Path("dados_sinteticos"))
+    parser.add_argument("--csv-dashboard", type=Path, default=None, help="também grava o CSV lido pelo dashboard.py")
+    args = parser.parse_args()
+
+    ini = time.perf_counter()
+    df = gerar_planilha(
+        args.linhas,
+        n_equipes=args.equipes,
+        n_corretores=args.corretores,
+        inicio=args.inicio,
+        dias=args.dias,
+        taxa_sujeira=args.sujeira,
+        semente=args.semente,
+    )
+    leads = gerar_leads(
+        args.leads,
+        df["CORRETOR"].str.upper().str.strip().unique(),
+        inicio=args.inicio,
+        dias=args.dias,
+        semente=args.semente,
+    )
+    t_gera = time.perf_counter() - ini
+
+    salvar(df, leads, args.saida, args.csv_dashboard)
+    print(
+        f"{len(df)} linhas, {len(leads)} leads • gerado em {t_gera:.1f}s, "
+        f"gravado em {time.perf_counter() - ini - t_gera:.1f}s → {args.saida}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Latência de renderização ponta a ponta de cada página, sem navegador.
+
+Roda app_dashboard.py e cada arquivo de pages/ com o AppTest do Streamlit
+(streamlit.testing.v1) contra o servidor local de bench/servidor_local.py,
+que faz o papel do Google Sheets e do Supremo com latência configurável.
+Nada sai da máquina: as URLs e o diretório de snapshots vêm das variáveis
+MR_CSV_URL, MR_LEADS_URL e MR_DIR_CACHE (utils/dados.py).
+
+Para cada página mede:
+    frio            primeira execução, sem cache em memória nem snapshot em disco
+    quente          rerun sem mudar nada (só caches)
+    periodo         troca o período (date_input ou radio de dias)
+    equipe          escolhe a primeira equipe do selectbox
+    busca           procura um cliente no campo de busca
+
+Interações que a página não tem ficam de fora. Exceções do script
+aparecem na coluna "erros".
+
+Uso (a partir da raiz do repositório):
+    python -m bench.render_paginas
+    python -m bench.render_paginas --linhas 200000 --latencia-planilha 1200 --latencia-leads 200
+    python -m bench.render_paginas --paginas 04 10 --saida render.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from bench.servidor_local import ServidorLocal
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+TIMEOUT_PADRAO = 120
+TERMO_BUSCA = "SILVA"
+
+
+def alvos(filtro=None) -> list:
+    """app_dashboard.py + pages/*.py, opcionalmente só os que começam com algum prefixo do filtro."""
+    arquivos = [RAIZ_REPO / "app_dashboard.py"] + sorted((RAIZ_REPO / "pages").glob("*.py"))
+    if filtro:
+        arquivos = [a for a in arquivos if any(a.name.startswith(f) for f in filtro)]
+    return arquivos
+
+
+def _cronometra(at, timeout: float) -> float:
+    ini = time.perf_counter()
+    at.run(timeout=timeout)
+    return (time.perf_counter() - ini) * 1000
+
+
+def prepara_ambiente(servidor: ServidorLocal, dir_cache: Path) -> None:
+    """Aponta o app para o servidor local. Chamar antes de qualquer página importar utils.dados."""
+    if str(RAIZ_REPO) not in sys.path:
+        sys.path.insert(0, str(RAIZ_REPO))
+    os.environ.update(servidor.variaveis_ambiente())
+    os.environ["MR_DIR_CACHE"] = str(dir_cache)
+
+
+def _com_rotulo(elementos, trecho: str):
+    trecho = trecho.lower()
+    return [e for e in elementos if trecho in (e.label or "").lower()]
+
+
+# ---------------------------------------------------------
+# INTERAÇÕES (cada uma altera um widget; o rerun é cronometrado fora)
+# ---------------------------------------------------------
+def muda_periodo(at) -> bool:
+    if len(at.date_input):
+        campo = at.date_input[0]
+        valor = campo.value
+        if isinstance(valor, (tuple, list)) and len(valor) == 2:
+            campo.set_value((valor[1] - timedelta(days=7), valor[1]))
+        elif valor is not None:
+            campo.set_value(valor - timedelta(days=1))
+        else:
+            return False
+        return True
+
+    radios = _com_rotulo(at.radio, "período")
+    if radios and len(radios[0].options) > 1:
+        radios[0].set_value(radios[0].options[0])
+        return True
+    return False
+
+
+def escolhe_equipe(at) -> bool:
+    for caixa in _com_rotulo(at.selectbox, "equipe"):
+        if len(caixa.options) > 1:
+            caixa.select_index(1)
+            return True
+    return False
+
+
+def busca_cliente(at) -> bool:
+    campos = _com_rotulo(at.text_input, "cliente")
+    if not campos:
+        return False
+    campos[0].input(TERMO_BUSCA)
+    return True
+
+
+INTERACOES = [
+    ("periodo", muda_periodo),
+    ("equipe", escolhe_equipe),
+    ("busca", busca_cliente),
+]
+
+
+# ---------------------------------------------------------
+# MEDIÇÃO DE UMA PÁGINA
+# ---------------------------------------------------------
+def medir_pagina(arquivo: Path, dir_cache: Path, timeout: float) -> dict:
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from utils.cache import limpar
+
+    # Frio de verdade: sem cache em memória e sem snapshot em disco
+    limpar()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    shutil.rmtree(dir_cache, ignore_errors=True)
+
+    at = AppTest.from_file(str(arquivo), default_timeout=timeout)
+    tempos = {"frio": _cronometra(at, timeout)}
+    erros = len(at.exception)
+
+    tempos["quente"] = _cronometra(at, timeout)
+
+    for nome, interage in INTERACOES:
+        if interage(at):
+            tempos[nome] = _cronometra(at, timeout)
+            erros += len(at.exception)
+
+    return {
+        "pagina": arquivo.name,
+        "tempos_ms": {k: round(v, 1) for k, v in tempos.items()},
+        "erros": erros,
+    }
+
+
+def imprimir(resultados: list) -> None:
+    colunas = ["frio", "quente"] + [nome for nome, _ in INTERACOES]
+    print(f"\n{'página':<34}" + "".join(f"{c:>11}" for c in colunas) + f"{'erros':>7}")
+    for r in resultados:
+        linha = f"{r['pagina']:<34}"
+        for c in colunas:
+            t = r["tempos_ms"].get(c)
+            linha += f"{t:>9.0f}ms" if t is not None else f"{'-':>11}"
+        print(linha + f"{r['erros']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a renderização de cada página contra o servidor local")
+    parser.add_argument("--linhas", type=int, default=100_000, help="linhas da planilha sintética")
+    parser.add_argument("--leads", type=int, default=1_000)
+    parser.add_argument("--latencia-planilha", type=float, default=800, help="ms por download da planilha")
+    parser.add_argument("--latencia-leads", type=float, default=150, help="ms por página de leads")
+    parser.add_argument("--paginas", nargs="*", default=None, help="prefixos (ex.: 04 10 app)")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_PADRAO, help="segundos por execução")
+    parser.add_argument("--saida", type=Path, default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    dir_cache = Path(tempfile.mkdtemp(prefix="mr_render_"))
+    servidor = ServidorLocal(
+        n_linhas=args.linhas,
+        n_leads=args.leads,
+        latencia_planilha_ms=args.latencia_planilha,
+        latencia_leads_ms=args.latencia_leads,
+    ).iniciar()
+    prepara_ambiente(servidor, dir_cache)
+
+    resultados = []
+    try:
+        for arquivo in alvos(args.paginas):
+            print(f"Renderizando {arquivo.name}...", flush=True)
+            resultados.append(medir_pagina(arquivo, dir_cache, args.timeout))
+    finally:
+        servidor.parar()
+        shutil.rmtree(dir_cache, ignore_errors=True)
+
+    imprimir(resultados)
+    print(f"\nRequisições ao servidor local: {dict(servidor.requisicoes)}")
+
+    if args.saida:
+        saida = {
+            "linhas": args.linhas,
+            "latencia_planilha_ms": args.latencia_planilha,
+            "latencia_leads_ms": args.latencia_leads,
+            "paginas": resultados,
+            "requisicoes": dict(servidor.requisicoes),
+        }
+        args.saida.write_text(json.dumps(saida, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Resultado gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Servidor HTTP local que faz o papel do Google Sheets e da API do Supremo.
+
+Serve a planilha sintética em CSV e os leads paginados no mesmo formato da
+API real, com latência configurável, para medir o app sem sair da máquina:
+
+    GET /planilha.csv            planilha de análises (export CSV do Sheets)
+    GET /v1/leads?pagina=N       {"pagina": N, "data": [...]} (página vazia no fim)
+
+O app passa a usar o servidor pelas variáveis MR_CSV_URL e MR_LEADS_URL
+(utils/dados.py); `variaveis_ambiente()` devolve os valores prontos.
+
+Uso:
+    python -m bench.servidor_local --linhas 100000 --latencia-planilha 800 --latencia-leads 150
+    MR_CSV_URL=http://127.0.0.1:8765/planilha.csv MR_LEADS_URL=http://127.0.0.1:8765/v1/leads \\
+        streamlit run app_dashboard.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bench.gerar_dados import (
+    SEMENTE_PADRAO,
+    TAMANHO_PAGINA_LEADS,
+    gerar_leads,
+    gerar_planilha,
+    paginar_leads,
+)
+
+PORTA_PADRAO = 8765
+
+
+class ServidorLocal:
+    """
+    Sobe o servidor numa thread. Latências em milissegundos; `variacao` é a
+    fração de ruído aleatório somada a cada resposta (0.2 = até ±20%).
+    """
+
+    def __init__(
+        self,
+        n_linhas: int = 100_000,
+        n_leads: int = 1_000,
+        latencia_planilha_ms: float = 0,
+        latencia_leads_ms: float = 0,
+        variacao: float = 0.0,
+        porta: int = 0,
+        semente: int = SEMENTE_PADRAO,
+    ):
+        df = gerar_planilha(n_linhas, semente=semente)
+        corretores = df["CORRETOR"].str.strip().str.upper().unique().tolist()
+        leads = gerar_leads(n_leads, corretores, semente=semente)
+
+        self.csv = df.to_csv(index=False).encode("utf-8-sig")
+        self.paginas = [
+            json.dumps(p, ensure_ascii=False).encode("utf-8")
+            for p in paginar_leads(leads, TAMANHO_PAGINA_LEADS)
+        ]
+        self.latencia_planilha_ms = latencia_planilha_ms
+        self.latencia_leads_ms = latencia_leads_ms
+        self.variacao = variacao
+        self.requisicoes = Counter()
+        self._trava = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", porta), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    # -----------------------------------------------------
+    @property
+    def porta(self) -> int:
+        return self._httpd.server_address[1]
+
+    @property
+    def url_planilha(self) -> str:
+        return f"http://127.0.0.1:{self.porta}/planilha.csv"
+
+    @property
+    def url_leads(self) -> str:
+        return f"http://127.0.0.1:{self.porta}/v1/leads"
+
+    def variaveis_ambiente(self) -> dict:
+        return {"MR_CSV_URL": self.url_planilha, "MR_LEADS_URL": self.url_leads}
+
+    def conta(self, rota: str) -> None:
+        with self._trava:
+            self.requisicoes[rota] += 1
+
+    def espera(self, latencia_ms: float) -> None:
+        if latencia_ms <= 0:
+            return
+        ruido = 1 + random.uniform(-self.variacao, self.variacao) if self.variacao else 1
+        time.sleep(latencia_ms * ruido / 1000)
+
+    # -----------------------------------------------------
+    def _handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _responde(self, corpo: bytes, tipo: str, status: int = 200):
+                self.send_response(status)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+
+                if url.path == "/planilha.csv":
+                    servidor.conta("planilha")
+                    servidor.espera(servidor.latencia_planilha_ms)
+                    self._responde(servidor.csv, "text/csv; charset=utf-8")
+                    return
+
+                if url.path == "/v1/leads":
+                    servidor.conta("leads")
+                    servidor.espera(servidor.latencia_leads_ms)
+                    try:
+                        pagina = int(parse_qs(url.query).get("pagina", ["1"])[0])
+                    except ValueError:
+                        pagina = 1
+                    # Depois da última página a API devolve lista vazia
+                    corpo = servidor.paginas[min(max(pagina, 1), len(servidor.paginas)) - 1]
+                    self._responde(corpo, "application/json")
+                    return
+
+                servidor.conta("desconhecida")
+                self._responde(b"nao encontrado", "text/plain", status=404)
+
+        return Handler
+
+    # -----------------------------------------------------
+    def iniciar(self) -> "ServidorLocal":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local da planilha e da API de leads")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--leads", type=int, default=1_000)
+    parser.add_argument("--latencia-planilha", type=float, default=0, help="ms por download da planilha")
+    parser.add_argument("--latencia-leads", type=float, default=0, help="ms por página de leads")
+    parser.add_argument("--variacao", type=float, default=0.0, help="ruído relativo da latência (0.2 = ±20%%)")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    args = parser.parse_args()
+
+    servidor = ServidorLocal(
+        n_linhas=args.linhas,
+        n_leads=args.leads,
+        latencia_planilha_ms=args.latencia_planilha,
+        latencia_leads_ms=args.latencia_leads,
+        variacao=args.variacao,
+        porta=args.porta,
+        semente=args.semente,
+    ).iniciar()
+
+    for nome, valor in servidor.variaveis_ambiente().items():
+        print(f"{nome}={valor}")
+    print("Ctrl+C para parar")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,164 +1,281 @@
+"""
+Relatório da imobiliária a partir de dados_imobiliaria.csv: KPIs e
+rankings no terminal e três gráficos PNG (300 dpi).
+
+Cada gráfico tem um hash do conteúdo que ele desenha (valores agregados,
+títulos, dpi) guardado em .graficos_hash.json na pasta de saída; se o hash
+não mudou e o PNG existe, o gráfico não é redesenhado. Os que mudaram são
+renderizados em paralelo, num pool de processos com o backend Agg (sem
+janela). Rodar de novo com os mesmos dados não desenha nada.
+
+Uso:
+    python dashboard.py
+    python dashboard.py --equipe ALFA --saida relatorios/alfa
+    python dashboard.py --forcar          # redesenha tudo
+    python dashboard.py --streaming       # CSV grande: lê em blocos
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import pandas as pd
-import matplotlib.pyplot as plt
+
+from utils.agregados_csv import LINHAS_POR_BLOCO, agrega_csv
 
 ARQUIVO = "dados_imobiliaria.csv"
+ARQ_HASHES = ".graficos_hash.json"
+DPI = 300
+
+
+# ---------------------------------------------------------
+# GRÁFICOS (RODAM NO PROCESSO FILHO)
+# ---------------------------------------------------------
+def renderiza_grafico(spec: dict) -> str:
+    """Desenha um gráfico a partir da spec (só listas/strings, vai por pickle para o pool)."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    if spec["tipo"] == "linha":
+        ax.plot(spec["x"], spec["series"][0][1], marker="o")
+    elif len(spec["series"]) == 1:
+        pd.Series(spec["series"][0][1], index=spec["x"]).plot(kind="bar", ax=ax)
+    else:
+        pd.DataFrame(dict(spec["series"]), index=spec["x"]).plot(kind="bar", ax=ax)
+
+    ax.set_title(spec["titulo"])
+    ax.set_xlabel(spec["xlabel"])
+    ax.set_ylabel(spec["ylabel"])
+    fig.tight_layout()
+    fig.savefig(spec["caminho"], dpi=spec["dpi"])
+    plt.close(fig)
+    return spec["caminho"]
+
+
+def hash_grafico(spec: dict) -> str:
+    # O caminho não entra: o mesmo gráfico em outra pasta tem o mesmo conteúdo
+    conteudo = {k: v for k, v in spec.items() if k != "caminho"}
+    return hashlib.sha1(json.dumps(conteudo, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _le_hashes(pasta: Path) -> dict:
+    try:
+        return json.loads((pasta / ARQ_HASHES).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _grava_hashes(pasta: Path, hashes: dict) -> None:
+    destino = pasta / ARQ_HASHES
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(hashes, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, destino)
+
+
+def gera_graficos(specs, pasta: Path, forcar: bool = False):
+    """Renderiza só os gráficos cujo hash mudou. Devolve (gerados, pulados)."""
+    hashes = _le_hashes(pasta)
+    pendentes = []
+    pulados = []
+    for spec in specs:
+        arquivo = Path(spec["caminho"]).name
+        novo = hash_grafico(spec)
+        if not forcar and hashes.get(arquivo) == novo and Path(spec["caminho"]).exists():
+            pulados.append(arquivo)
+        else:
+            pendentes.append((arquivo, novo, spec))
+
+    if len(pendentes) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(pendentes), os.cpu_count() or 1)) as pool:
+            list(pool.map(renderiza_grafico, [spec for _, _, spec in pendentes]))
+    elif pendentes:
+        renderiza_grafico(pendentes[0][2])
+
+    for arquivo, novo, _ in pendentes:
+        hashes[arquivo] = novo
+    if pendentes:
+        _grava_hashes(pasta, hashes)
+
+    return [arquivo for arquivo, _, _ in pendentes], pulados
+
+
+# ---------------------------------------------------------
+# RELATÓRIO
+# ---------------------------------------------------------
+def tabela_completa(contagens: pd.DataFrame) -> pd.DataFrame:
+    """Ranking de corretor/equipe a partir das contagens de agrega_csv."""
+    tabela = pd.DataFrame({
+        "em_analise":      contagens["EM_ANALISE"],
+        "reanalise":       contagens["REANALISE"],
+        "aprovacoes":      contagens["APROVACAO_TOTAL"],
+        "reprovacoes":     contagens["REPROVACAO"],
+        "venda_gerada":    contagens["VENDA_GERADA"],
+        "venda_informada": contagens["VENDA_INFORMADA"],
+        "vendas_total":    contagens["VENDAS_TOTAL"],
+    })
+    tabela["analises_total"] = tabela["em_analise"] + tabela["reanalise"]
+    return tabela
+
+
+def tabela_vendas(contagens: pd.DataFrame) -> pd.DataFrame:
+    """Construtora/empreendimento: análises, aprovações e vendas, por vendas."""
+    return pd.DataFrame({
+        "em_analise": contagens["EM_ANALISE"],
+        "reanalise":  contagens["REANALISE"],
+        "aprovacoes": contagens["APROVACAO_TOTAL"],
+        "vendas":     contagens["VENDAS_TOTAL"],
+    }).sort_values(by="vendas", ascending=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KPIs no terminal e gráficos PNG da imobiliária")
+    parser.add_argument("--arquivo", default=ARQUIVO, help="CSV exportado da planilha")
+    parser.add_argument("--equipe", default=None, help="só as linhas desta equipe")
+    parser.add_argument("--saida", type=Path, default=Path("."), help="pasta dos PNGs")
+    parser.add_argument("--forcar", action="store_true", help="redesenha mesmo sem mudança")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="lê o CSV em blocos (memória constante, para exportações de vários anos)",
+    )
+    parser.add_argument("--linhas-por-bloco", type=int, default=LINHAS_POR_BLOCO)
+    args = parser.parse_args()
+
+    # Lê o CSV (separado por vírgula, com acentos em UTF-8) e conta as situações
+    # por corretor/equipe/construtora/empreendimento; com --streaming, em blocos
+    agregado = agrega_csv(
+        args.arquivo,
+        linhas_por_bloco=args.linhas_por_bloco if args.streaming else None,
+        equipe=args.equipe,
+    )
+    total = agregado["TOTAL"]
+
+    # ==== KPI GERAL ====
+    total_registros       = total["REGISTROS"]
+    total_em_analise      = total["EM_ANALISE"]
+    total_reanalise       = total["REANALISE"]
+    total_aprovacoes      = total["APROVACAO_TOTAL"]
+    total_reprovacoes     = total["REPROVACAO"]
+    total_vendas          = total["VENDAS_TOTAL"]
+    total_venda_gerada    = total["VENDA_GERADA"]
+    total_venda_informada = total["VENDA_INFORMADA"]
+
+    etapa1 = total_em_analise
+    etapa2 = total_reanalise
+    etapa3 = total_aprovacoes
+    etapa4 = total_vendas
+
+    taxa_aprov_sobre_etapa1 = (total_aprovacoes / etapa1 * 100) if etapa1 > 0 else 0
+    taxa_venda_sobre_etapa1 = (total_vendas / etapa1 * 100) if etapa1 > 0 else 0
+    taxa_venda_sobre_aprov  = (total_vendas / total_aprovacoes * 100) if total_aprovacoes > 0 else 0
+
+    print("=== DASHBOARD GERAL IMOBILIÁRIA ===")
+    print(f"Registros no período: {total_registros}")
+    print(f"EM ANÁLISE: {total_em_analise}")
+    print(f"REANÁLISE: {total_reanalise}")
+    print(f"APROVAÇÕES (APROVAÇÃO + APROVADO BACEN): {total_aprovacoes}")
+    print(f"  - APROVAÇÃO: {total['APROVACAO']}")
+    print(f"  - APROVADO BACEN: {total['APROVADO_BACEN']}")
+    print(f"REPROVAÇÕES: {total_reprovacoes}")
+    print(f"VENDAS TOTAIS: {total_vendas}")
+    print(f"  - VENDA GERADA: {total_venda_gerada}")
+    print(f"  - VENDA INFORMADA: {total_venda_informada}")
+    print()
+    print(f"Taxa aprovações sobre EM ANÁLISE: {taxa_aprov_sobre_etapa1:.2f}%")
+    print(f"Taxa vendas sobre EM ANÁLISE: {taxa_venda_sobre_etapa1:.2f}%")
+    print(f"Taxa vendas sobre APROVAÇÕES: {taxa_venda_sobre_aprov:.2f}%")
+    print()
+
+    # ==== RANKING POR CORRETOR ====
+    tabela_corretor = tabela_completa(agregado["CORRETOR"])
+
+    print("=== TOP CORRETORES POR VENDAS (TOTAL) ===")
+    print(tabela_corretor.sort_values(by="vendas_total", ascending=False).head(10))
+    print()
+
+    print("=== TOP CORRETORES POR ANÁLISES (EM ANÁLISE + REANÁLISE) ===")
+    print(tabela_corretor.sort_values(by="analises_total", ascending=False).head(10))
+    print()
+
+    # ==== RANKING POR EQUIPE ====
+    tabela_equipe = tabela_completa(agregado["EQUIPE"])
+
+    print("=== PERFORMANCE POR EQUIPE ===")
+    print(tabela_equipe)
+    print()
+
+    # ==== CONSTRUTORA / EMPREENDIMENTO ====
+    tabela_construtora = tabela_vendas(agregado["CONSTRUTORA"])
+    tabela_empreendimento = tabela_vendas(agregado["EMPREENDIMENTO"])
+
+    print("=== TOP CONSTRUTORAS POR VENDAS ===")
+    print(tabela_construtora.head(10))
+    print()
+
+    print("=== TOP EMPREENDIMENTOS POR VENDAS ===")
+    print(tabela_empreendimento.head(10))
+    print()
+
+    # ==== GRÁFICOS ====
+    args.saida.mkdir(parents=True, exist_ok=True)
+    top10 = tabela_corretor.sort_values(by="vendas_total", ascending=False).head(10)["vendas_total"]
+
+    specs = [
+        # 1) Funil de conversão (4 etapas)
+        {
+            "caminho": str(args.saida / "funil_conversao_4_etapas.png"),
+            "tipo": "linha",
+            "x": ["Em análise", "Reanálise", "Aprovações", "Vendas"],
+            "series": [["Quantidade", [int(etapa1), int(etapa2), int(etapa3), int(etapa4)]]],
+            "titulo": "Funil de Conversão - Imobiliária",
+            "xlabel": "Etapa",
+            "ylabel": "Quantidade",
+            "dpi": DPI,
+        },
+        # 2) Top 10 corretores por vendas
+        {
+            "caminho": str(args.saida / "top10_corretores_vendas.png"),
+            "tipo": "barras",
+            "x": [str(c) for c in top10.index],
+            "series": [["vendas_total", [int(v) for v in top10]]],
+            "titulo": "Top 10 Corretores - Vendas Totais",
+            "xlabel": "Corretor",
+            "ylabel": "Qtd Vendas",
+            "dpi": DPI,
+        },
+        # 3) Equipes - Análises x Vendas
+        {
+            "caminho": str(args.saida / "equipes_analises_vendas.png"),
+            "tipo": "barras",
+            "x": [str(e) for e in tabela_equipe.index],
+            "series": [
+                ["analises_total", [int(v) for v in tabela_equipe["analises_total"]]],
+                ["vendas_total", [int(v) for v in tabela_equipe["vendas_total"]]],
+            ],
+            "titulo": "Equipes - Análises (EM + RE) x Vendas",
+            "xlabel": "Equipe",
+            "ylabel": "Quantidade",
+            "dpi": DPI,
+        },
+    ]
+
+    gerados, pulados = gera_graficos(specs, args.saida, forcar=args.forcar)
+
+    if gerados:
+        print(f"Gráficos gerados na pasta {args.saida}:")
+        for arquivo in gerados:
+            print(f"- {arquivo}")
+    if pulados:
+        print("Sem mudança (mantidos):")
+        for arquivo in pulados:
+            print(f"- {arquivo}")
+
 
-# Lê o CSV (separado por vírgula, com acentos em UTF-8)
-df = pd.read_csv(ARQUIVO, sep=",", encoding="utf-8-sig")
-
-# Padroniza os nomes das colunas
-df.columns = [c.strip().upper() for c in df.columns]
-
-# Confere se as colunas principais existem
-colunas_obrigatorias = ["DATA", "CORRETOR", "EQUIPE", "CONSTRUTORA", "EMPREENDIMENTO", "SITUAÇÃO"]
-for col in colunas_obrigatorias:
-    if col not in df.columns:
-        raise ValueError(f"Coluna obrigatória não encontrada no arquivo: {col}")
-
-# ==== CRIA COLUNAS PARA CADA SITUAÇÃO ====
-df["EM_ANALISE"]      = (df["SITUAÇÃO"] == "EM ANÁLISE").astype(int)
-df["REANALISE"]       = (df["SITUAÇÃO"] == "REANÁLISE").astype(int)
-df["APROVACAO"]       = (df["SITUAÇÃO"] == "APROVAÇÃO").astype(int)
-df["APROVADO_BACEN"]  = (df["SITUAÇÃO"] == "APROVADO BACEN").astype(int)
-df["REPROVACAO"]      = (df["SITUAÇÃO"] == "REPROVAÇÃO").astype(int)
-df["VENDA_GERADA"]    = (df["SITUAÇÃO"] == "VENDA GERADA").astype(int)
-df["VENDA_INFORMADA"] = (df["SITUAÇÃO"] == "VENDA INFORMADA").astype(int)
-
-# Agregados úteis
-df["APROVACAO_TOTAL"] = df["APROVACAO"] + df["APROVADO_BACEN"]
-df["VENDAS_TOTAL"]    = df["VENDA_GERADA"] + df["VENDA_INFORMADA"]
-
-# ==== KPI GERAL ====
-total_registros       = len(df)
-total_em_analise      = df["EM_ANALISE"].sum()
-total_reanalise       = df["REANALISE"].sum()
-total_aprovacoes      = df["APROVACAO_TOTAL"].sum()
-total_reprovacoes     = df["REPROVACAO"].sum()
-total_vendas          = df["VENDAS_TOTAL"].sum()
-total_venda_gerada    = df["VENDA_GERADA"].sum()
-total_venda_informada = df["VENDA_INFORMADA"].sum()
-
-etapa1 = total_em_analise
-etapa2 = total_reanalise
-etapa3 = total_aprovacoes
-etapa4 = total_vendas
-
-taxa_aprov_sobre_etapa1 = (total_aprovacoes / etapa1 * 100) if etapa1 > 0 else 0
-taxa_venda_sobre_etapa1 = (total_vendas / etapa1 * 100) if etapa1 > 0 else 0
-taxa_venda_sobre_aprov  = (total_vendas / total_aprovacoes * 100) if total_aprovacoes > 0 else 0
-
-print("=== DASHBOARD GERAL IMOBILIÁRIA ===")
-print(f"Registros no período: {total_registros}")
-print(f"EM ANÁLISE: {total_em_analise}")
-print(f"REANÁLISE: {total_reanalise}")
-print(f"APROVAÇÕES (APROVAÇÃO + APROVADO BACEN): {total_aprovacoes}")
-print(f"  - APROVAÇÃO: {df['APROVACAO'].sum()}")
-print(f"  - APROVADO BACEN: {df['APROVADO_BACEN'].sum()}")
-print(f"REPROVAÇÕES: {total_reprovacoes}")
-print(f"VENDAS TOTAIS: {total_vendas}")
-print(f"  - VENDA GERADA: {total_venda_gerada}")
-print(f"  - VENDA INFORMADA: {total_venda_informada}")
-print()
-print(f"Taxa aprovações sobre EM ANÁLISE: {taxa_aprov_sobre_etapa1:.2f}%")
-print(f"Taxa vendas sobre EM ANÁLISE: {taxa_venda_sobre_etapa1:.2f}%")
-print(f"Taxa vendas sobre APROVAÇÕES: {taxa_venda_sobre_aprov:.2f}%")
-print()
-
-# ==== RANKING POR CORRETOR ====
-tabela_corretor = df.groupby("CORRETOR").agg(
-    em_analise      = ("EM_ANALISE", "sum"),
-    reanalise       = ("REANALISE", "sum"),
-    aprovacoes      = ("APROVACAO_TOTAL", "sum"),
-    reprovacoes     = ("REPROVACAO", "sum"),
-    venda_gerada    = ("VENDA_GERADA", "sum"),
-    venda_informada = ("VENDA_INFORMADA", "sum"),
-    vendas_total    = ("VENDAS_TOTAL", "sum")
-)
-
-tabela_corretor["analises_total"] = tabela_corretor["em_analise"] + tabela_corretor["reanalise"]
-
-print("=== TOP CORRETORES POR VENDAS (TOTAL) ===")
-print(tabela_corretor.sort_values(by="vendas_total", ascending=False).head(10))
-print()
-
-print("=== TOP CORRETORES POR ANÁLISES (EM ANÁLISE + REANÁLISE) ===")
-print(tabela_corretor.sort_values(by="analises_total", ascending=False).head(10))
-print()
-
-# ==== RANKING POR EQUIPE ====
-tabela_equipe = df.groupby("EQUIPE").agg(
-    em_analise      = ("EM_ANALISE", "sum"),
-    reanalise       = ("REANALISE", "sum"),
-    aprovacoes      = ("APROVACAO_TOTAL", "sum"),
-    reprovacoes     = ("REPROVACAO", "sum"),
-    venda_gerada    = ("VENDA_GERADA", "sum"),
-    venda_informada = ("VENDA_INFORMADA", "sum"),
-    vendas_total    = ("VENDAS_TOTAL", "sum")
-)
-tabela_equipe["analises_total"] = tabela_equipe["em_analise"] + tabela_equipe["reanalise"]
-
-print("=== PERFORMANCE POR EQUIPE ===")
-print(tabela_equipe)
-print()
-
-# ==== CONSTRUTORA / EMPREENDIMENTO ====
-tabela_construtora = df.groupby("CONSTRUTORA").agg(
-    em_analise=("EM_ANALISE", "sum"),
-    reanalise=("REANALISE", "sum"),
-    aprovacoes=("APROVACAO_TOTAL", "sum"),
-    vendas=("VENDAS_TOTAL", "sum")
-).sort_values(by="vendas", ascending=False)
-
-tabela_empreendimento = df.groupby("EMPREENDIMENTO").agg(
-    em_analise=("EM_ANALISE", "sum"),
-    reanalise=("REANALISE", "sum"),
-    aprovacoes=("APROVACAO_TOTAL", "sum"),
-    vendas=("VENDAS_TOTAL", "sum")
-).sort_values(by="vendas", ascending=False)
-
-print("=== TOP CONSTRUTORAS POR VENDAS ===")
-print(tabela_construtora.head(10))
-print()
-
-print("=== TOP EMPREENDIMENTOS POR VENDAS ===")
-print(tabela_empreendimento.head(10))
-print()
-
-# ==== GRÁFICOS ====
-
-# 1) Funil de conversão (4 etapas)
-etapas = ["Em análise", "Reanálise", "Aprovações", "Vendas"]
-valores = [etapa1, etapa2, etapa3, etapa4]
-
-plt.figure()
-plt.plot(etapas, valores, marker="o")
-plt.title("Funil de Conversão - Imobiliária")
-plt.xlabel("Etapa")
-plt.ylabel("Quantidade")
-plt.tight_layout()
-plt.savefig("funil_conversao_4_etapas.png", dpi=300)
-
-# 2) Top 10 corretores por vendas
-plt.figure()
-tabela_corretor.sort_values(by="vendas_total", ascending=False).head(10)["vendas_total"].plot(kind="bar")
-plt.title("Top 10 Corretores - Vendas Totais")
-plt.xlabel("Corretor")
-plt.ylabel("Qtd Vendas")
-plt.tight_layout()
-plt.savefig("top10_corretores_vendas.png", dpi=300)
-
-# 3) Equipes - Análises x Vendas
-plt.figure()
-tabela_equipe[["analises_total", "vendas_total"]].plot(kind="bar")
-plt.title("Equipes - Análises (EM + RE) x Vendas")
-plt.xlabel("Equipe")
-plt.ylabel("Quantidade")
-plt.tight_layout()
-plt.savefig("equipes_analises_vendas.png", dpi=300)
-
-plt.close("all")
-
-print("Gráficos gerados na pasta:")
-print("- funil_conversao_4_etapas.png")
-print("- top10_corretores_vendas.png")
-print("- equipes_analises_vendas.png")
+if __name__ == "__main__":
+    main()
@@ -1,193 +1,215 @@
-import pandas as pd
+"""
+Site estático do dashboard a partir de dados_imobiliaria.csv, gravado na
+pasta de saída (--saida, padrão site/): a página geral (dashboard_web.html),
+uma página por equipe (equipes/) e uma por corretor (corretores/), para
+servir em qualquer servidor de arquivos, sem Python por visualização.
+
+Todas as páginas saem de uma única passada pelo CSV (o cubo de
+utils/agregados_csv.py). O build é incremental: o hash de cada página fica
+em .site_hash.json na pasta de saída e só é regravado o arquivo cujo
+conteúdo mudou; páginas de equipe/corretor que sumiram do CSV são apagadas.
+Cada página gravada ganha também .gz e, com `pip install brotli`, .br, já
+comprimidos para o servidor entregar direto (gzip_static / brotli_static).
+
+Os gráficos (funil, top 10 corretores, equipes) são SVG inline gerados das
+mesmas tabelas (utils/graficos_svg.py): não precisa rodar o dashboard.py
+nem ter matplotlib, e a página não depende de PNG nenhum.
+
+Uso:
+    python gera_dashboard_web.py               # grava em site/
+    python gera_dashboard_web.py --saida /var/www/dashboard
+    python gera_dashboard_web.py --streaming   # CSV grande: lê em blocos
+    python gera_dashboard_web.py --forcar      # regrava tudo
+"""
+
+import argparse
+import gzip
+import hashlib
+import html
+import json
+import os
 from pathlib import Path
 
-ARQUIVO = "dados_imobiliaria.csv"
+import pandas as pd
 
-# Lê o CSV
-df = pd.read_csv(ARQUIVO, sep=",", encoding="utf-8-sig")
-df.columns = [c.strip().upper() for c in df.columns]
-
-# Datas
-df["DATA"] = pd.to_datetime(df["DATA"], dayfirst=True, errors="coerce")
-
-# Situações
-df["EM_ANALISE"]      = (df["SITUAÇÃO"] == "EM ANÁLISE").astype(int)
-df["REANALISE"]       = (df["SITUAÇÃO"] == "REANÁLISE").astype(int)
-df["APROVACAO"]       = (df["SITUAÇÃO"] == "APROVAÇÃO").astype(int)
-df["APROVADO_BACEN"]  = (df["SITUAÇÃO"] == "APROVADO BACEN").astype(int)
-df["REPROVACAO"]      = (df["SITUAÇÃO"] == "REPROVAÇÃO").astype(int)
-df["VENDA_GERADA"]    = (df["SITUAÇÃO"] == "VENDA GERADA").astype(int)
-df["VENDA_INFORMADA"] = (df["SITUAÇÃO"] == "VENDA INFORMADA").astype(int)
-
-df["APROVACAO_TOTAL"] = df["APROVACAO"] + df["APROVADO_BACEN"]
-df["VENDAS_TOTAL"]    = df["VENDA_GERADA"] + df["VENDA_INFORMADA"]
-
-# ===== KPIs gerais =====
-total_em_analise      = int(df["EM_ANALISE"].sum())
-total_reanalise       = int(df["REANALISE"].sum())
-total_aprovacoes      = int(df["APROVACAO_TOTAL"].sum())
-total_reprovacoes     = int(df["REPROVACAO"].sum())
-total_vendas          = int(df["VENDAS_TOTAL"].sum())
-total_venda_gerada    = int(df["VENDA_GERADA"].sum())
-total_venda_informada = int(df["VENDA_INFORMADA"].sum())
-
-etapa1 = total_em_analise
-etapa2 = total_reanalise
-etapa3 = total_aprovacoes
-etapa4 = total_vendas
-
-taxa_aprov_sobre_etapa1 = (total_aprovacoes / etapa1 * 100) if etapa1 > 0 else 0
-taxa_venda_sobre_etapa1 = (total_vendas / etapa1 * 100) if etapa1 > 0 else 0
-taxa_venda_sobre_aprov  = (total_vendas / total_aprovacoes * 100) if total_aprovacoes > 0 else 0
-
-# ===== Rankings =====
-tabela_corretor = (
-    df.groupby("CORRETOR")
-    .agg(
-        em_analise=("EM_ANALISE", "sum"),
-        reanalise=("REANALISE", "sum"),
-        aprovacoes=("APROVACAO_TOTAL", "sum"),
-        vendas_total=("VENDAS_TOTAL", "sum")
-    )
-    .sort_values(by="vendas_total", ascending=False)
-)
+from utils import graficos_svg
+from utils.agregados_csv import LINHAS_POR_BLOCO, agrega_cubo, tabelas_do_cubo
+from utils.formatacao import slugs_arquivo
 
-tabela_corretor["analises_total"] = (
-    tabela_corretor["em_analise"] + tabela_corretor["reanalise"]
-)
+try:
+    import brotli
+except ImportError:  # opcional: sem ele, só .gz
+    brotli = None
 
-tabela_corretor_html = tabela_corretor.head(20).to_html(classes="tabela", border=0)
+ARQUIVO = "dados_imobiliaria.csv"
+PAGINA_GERAL = "dashboard_web.html"
+ARQ_HASHES = ".site_hash.json"
 
-tabela_equipe = (
-    df.groupby("EQUIPE")
-    .agg(
-        em_analise=("EM_ANALISE", "sum"),
-        reanalise=("REANALISE", "sum"),
-        vendas_total=("VENDAS_TOTAL", "sum")
-    )
-)
-tabela_equipe["analises_total"] = (
-    tabela_equipe["em_analise"] + tabela_equipe["reanalise"]
-)
-tabela_equipe = tabela_equipe[["analises_total", "vendas_total"]]
-tabela_equipe_html = tabela_equipe.to_html(classes="tabela", border=0)
-
-tabela_construtora = (
-    df.groupby("CONSTRUTORA")
-    .agg(vendas_total=("VENDAS_TOTAL", "sum"))
-    .sort_values(by="vendas_total", ascending=False)
-)
-tabela_construtora_html = tabela_construtora.head(15).to_html(classes="tabela", border=0)
-
-tabela_empreendimento = (
-    df.groupby("EMPREENDIMENTO")
-    .agg(vendas_total=("VENDAS_TOTAL", "sum"))
-    .sort_values(by="vendas_total", ascending=False)
-)
-tabela_empreendimento_html = tabela_empreendimento.head(15).to_html(classes="tabela", border=0)
-
-# ===== HTML =====
-html = f"""
-<!DOCTYPE html>
-<html lang="pt-br">
-<head>
-<meta charset="utf-8">
-<title>Dashboard Imobiliária</title>
-<style>
-    body {{
+CSS = """
+    body {
         font-family: Arial, sans-serif;
         margin: 20px;
         background-color: #f5f7fb;
-    }}
-    h1, h2, h3 {{
+    }
+    h1, h2, h3 {
         color: #0b2e4e;
-    }}
-    .kpis {{
+    }
+    .kpis {
         display: flex;
         flex-wrap: wrap;
         gap: 15px;
         margin-bottom: 25px;
-    }}
-    .card {{
+    }
+    .card {
         background: #ffffff;
         padding: 12px 16px;
         border-radius: 8px;
         box-shadow: 0 2px 4px rgba(0,0,0,0.05);
         min-width: 160px;
-    }}
-    .card .label {{
+    }
+    .card .label {
         font-size: 12px;
         color: #666;
-    }}
-    .card .value {{
+    }
+    .card .value {
         font-size: 20px;
         font-weight: bold;
         color: #0b2e4e;
-    }}
-    .card .sub {{
+    }
+    .card .sub {
         font-size: 11px;
         color: #888;
-    }}
-    .section {{
+    }
+    .section {
         margin-top: 30px;
         margin-bottom: 10px;
-    }}
-    .tabela {{
+    }
+    .tabela {
         border-collapse: collapse;
         width: 100%;
         font-size: 12px;
         background: #ffffff;
-    }}
-    .tabela th, .tabela td {{
+    }
+    .tabela th, .tabela td {
         border: 1px solid #ddd;
         padding: 6px 8px;
         text-align: left;
-    }}
-    .tabela th {{
+    }
+    .tabela th {
         background-color: #0b2e4e;
         color: #fff;
-    }}
-    img {{
-        max-width: 100%;
+    }
+    .grafico svg {
+        width: 100%;
+        max-width: 640px;
         height: auto;
         border-radius: 8px;
         box-shadow: 0 2px 4px rgba(0,0,0,0.05);
         background: #fff;
-    }}
-    .grid {{
+    }
+    .grid {
         display: grid;
         grid-template-columns: repeat(auto-fit, minmax(260px, 1fr));
         gap: 20px;
         align-items: start;
-    }}
-</style>
-</head>
-<body>
-    <h1>📊 Dashboard Imobiliária – Versão Web (HTML)</h1>
-    <p>Arquivo base: <strong>{ARQUIVO}</strong></p>
+    }
+    .links {
+        columns: 3 220px;
+        font-size: 13px;
+    }
+"""
+
+
+# ---------------------------------------------------------
+# TABELAS E BLOCOS DE HTML
+# ---------------------------------------------------------
+def tabela_corretor(agregado) -> pd.DataFrame:
+    contagens = agregado["CORRETOR"]
+    tabela = pd.DataFrame({
+        "em_analise": contagens["EM_ANALISE"],
+        "reanalise": contagens["REANALISE"],
+        "aprovacoes": contagens["APROVACAO_TOTAL"],
+        "vendas_total": contagens["VENDAS_TOTAL"],
+    }).sort_values(by="vendas_total", ascending=False)
+    tabela["analises_total"] = tabela["em_analise"] + tabela["reanalise"]
+    return tabela
+
+
+def tabela_equipe(agregado) -> pd.DataFrame:
+    return pd.DataFrame({
+        "analises_total": agregado["EQUIPE"]["ANALISES_TOTAL"],
+        "vendas_total": agregado["EQUIPE"]["VENDAS_TOTAL"],
+    })
+
+
+def tabela_vendas(agregado, dimensao) -> pd.DataFrame:
+    return (
+        agregado[dimensao][["VENDAS_TOTAL"]]
+        .rename(columns={"VENDAS_TOTAL": "vendas_total"})
+        .sort_values(by="vendas_total", ascending=False)
+    )
 
+
+def _html_tabela(tabela: pd.DataFrame) -> str:
+    return tabela.to_html(classes="tabela", border=0)
+
+
+def grafico_funil(total) -> str:
+    return graficos_svg.linha(
+        ["Em análise", "Reanálise", "Aprovações", "Vendas"],
+        [total["EM_ANALISE"], total["REANALISE"], total["APROVACAO_TOTAL"], total["VENDAS_TOTAL"]],
+        "Funil de Conversão - Imobiliária",
+        "Quantidade",
+    )
+
+
+def grafico_top10_corretores(agregado) -> str:
+    top10 = tabela_corretor(agregado).head(10)["vendas_total"]
+    return graficos_svg.barras(top10.index, {"Vendas": top10}, "Top 10 Corretores - Vendas Totais", "Qtd Vendas")
+
+
+def grafico_equipes(agregado) -> str:
+    tabela = tabela_equipe(agregado)
+    return graficos_svg.barras(
+        tabela.index,
+        {"Análises": tabela["analises_total"], "Vendas": tabela["vendas_total"]},
+        "Equipes - Análises (EM + RE) x Vendas",
+        "Quantidade",
+    )
+
+
+def _cards_kpis(total) -> str:
+    em_analise = int(total["EM_ANALISE"])
+    aprovacoes = int(total["APROVACAO_TOTAL"])
+    vendas = int(total["VENDAS_TOTAL"])
+
+    taxa_aprov_sobre_etapa1 = (aprovacoes / em_analise * 100) if em_analise > 0 else 0
+    taxa_venda_sobre_etapa1 = (vendas / em_analise * 100) if em_analise > 0 else 0
+    taxa_venda_sobre_aprov  = (vendas / aprovacoes * 100) if aprovacoes > 0 else 0
+
+    return f"""
     <div class="kpis">
         <div class="card">
             <div class="label">Em análise</div>
-            <div class="value">{total_em_analise}</div>
+            <div class="value">{em_analise}</div>
         </div>
         <div class="card">
             <div class="label">Reanálise</div>
-            <div class="value">{total_reanalise}</div>
+            <div class="value">{int(total["REANALISE"])}</div>
         </div>
         <div class="card">
             <div class="label">Aprovações (total)</div>
-            <div class="value">{total_aprovacoes}</div>
-            <div class="sub">Aprovação: {df['APROVACAO'].sum()} | Bacen: {df['APROVADO_BACEN'].sum()}</div>
+            <div class="value">{aprovacoes}</div>
+            <div class="sub">Aprovação: {int(total["APROVACAO"])} | Bacen: {int(total["APROVADO_BACEN"])}</div>
         </div>
         <div class="card">
             <div class="label">Reprovações</div>
-            <div class="value">{total_reprovacoes}</div>
+            <div class="value">{int(total["REPROVACAO"])}</div>
         </div>
         <div class="card">
             <div class="label">Vendas totais</div>
-            <div class="value">{total_vendas}</div>
-            <div class="sub">Gerada: {total_venda_gerada} | Informada: {total_venda_informada}</div>
+            <div class="value">{vendas}</div>
+            <div class="sub">Gerada: {int(total["VENDA_GERADA"])} | Informada: {int(total["VENDA_INFORMADA"])}</div>
         </div>
         <div class="card">
             <div class="label">Aprovações / Em análise</div>
@@ -202,60 +224,230 @@ html = f"""
             <div class="value">{taxa_venda_sobre_aprov:.1f}%</div>
         </div>
     </div>
+"""
+
 
+def _secao(titulo: str, conteudo: str) -> str:
+    return f"""
     <div class="section">
-        <h2>Funil de conversão</h2>
-        <p>Em análise → Reanálise → Aprovações → Vendas</p>
-        <img src="funil_conversao_4_etapas.png" alt="Funil de conversão">
+        <h2>{titulo}</h2>
+        {conteudo}
     </div>
+"""
 
-    <div class="section">
-        <h2>Equipes – Análises x Vendas</h2>
-        <div class="grid">
+
+def _lista_links(links: dict) -> str:
+    """{nome: href} → lista de links (nomes escapados)."""
+    itens = "\n".join(
+        f'            <li><a href="{html.escape(href)}">{html.escape(str(nome))}</a></li>'
+        for nome, href in links.items()
+    )
+    return f'<ul class="links">\n{itens}\n        </ul>'
+
+
+def _documento(titulo: str, corpo: str, arquivo_base: str, voltar: str = None) -> str:
+    aba = f"{titulo} – Dashboard Imobiliária" if voltar else "Dashboard Imobiliária"
+    navegacao = f'<p><a href="{voltar}">← Dashboard geral</a></p>' if voltar else ""
+    return f"""
+<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(aba)}</title>
+<style>{CSS}</style>
+</head>
+<body>
+    {navegacao}
+    <h1>{html.escape(titulo)}</h1>
+    <p>Arquivo base: <strong>{html.escape(arquivo_base)}</strong></p>
+{corpo}
+    <hr>
+    <p style="font-size: 11px; color: #777;">
+        Página gerada automaticamente em Python a partir de <strong>{html.escape(arquivo_base)}</strong>.
+    </p>
+</body>
+</html>
+"""
+
+
+# ---------------------------------------------------------
+# PÁGINAS
+# ---------------------------------------------------------
+def pagina_geral(agregado, arquivo_base, links_equipes, links_corretores) -> str:
+    corpo = _cards_kpis(agregado["TOTAL"])
+    corpo += _secao(
+        "Funil de conversão",
+        f"""<p>Em análise → Reanálise → Aprovações → Vendas</p>
+        <div class="grafico">{grafico_funil(agregado["TOTAL"])}</div>""",
+    )
+    corpo += _secao(
+        "Equipes – Análises x Vendas",
+        f"""<div class="grid">
             <div>
                 <h3>Gráfico</h3>
-                <img src="equipes_analises_vendas.png" alt="Equipes - Análises x Vendas">
+                <div class="grafico">{grafico_equipes(agregado)}</div>
             </div>
             <div>
                 <h3>Tabela</h3>
-                {tabela_equipe_html}
+                {_html_tabela(tabela_equipe(agregado))}
             </div>
-        </div>
-    </div>
-
-    <div class="section">
-        <h2>Top 20 Corretores por Vendas</h2>
-        <div class="grid">
+        </div>""",
+    )
+    corpo += _secao(
+        "Top 20 Corretores por Vendas",
+        f"""<div class="grid">
             <div>
                 <h3>Gráfico (Top 10)</h3>
-                <img src="top10_corretores_vendas.png" alt="Top 10 corretores por vendas">
+                <div class="grafico">{grafico_top10_corretores(agregado)}</div>
             </div>
             <div>
                 <h3>Tabela (Top 20)</h3>
-                {tabela_corretor_html}
+                {_html_tabela(tabela_corretor(agregado).head(20))}
             </div>
-        </div>
-    </div>
+        </div>""",
+    )
+    corpo += _secao("Top Construtoras por Vendas", _html_tabela(tabela_vendas(agregado, "CONSTRUTORA").head(15)))
+    corpo += _secao("Top Empreendimentos por Vendas", _html_tabela(tabela_vendas(agregado, "EMPREENDIMENTO").head(15)))
+    corpo += _secao("Páginas por equipe", _lista_links(links_equipes))
+    corpo += _secao("Páginas por corretor", _lista_links(links_corretores))
+    return _documento("📊 Dashboard Imobiliária – Versão Web (HTML)", corpo, arquivo_base)
 
-    <div class="section">
-        <h2>Top Construtoras por Vendas</h2>
-        {tabela_construtora_html}
-    </div>
 
-    <div class="section">
-        <h2>Top Empreendimentos por Vendas</h2>
-        {tabela_empreendimento_html}
-    </div>
+def pagina_equipe(equipe, agregado, arquivo_base, links_corretores) -> str:
+    corpo = _cards_kpis(agregado["TOTAL"])
+    corpo += _secao(
+        "Funil de conversão",
+        f"""<div class="grid">
+            <div class="grafico">{grafico_funil(agregado["TOTAL"])}</div>
+            <div class="grafico">{grafico_top10_corretores(agregado)}</div>
+        </div>""",
+    )
+    corpo += _secao("Corretores por Vendas", _html_tabela(tabela_corretor(agregado)))
+    corpo += _secao("Top Construtoras por Vendas", _html_tabela(tabela_vendas(agregado, "CONSTRUTORA").head(15)))
+    corpo += _secao("Top Empreendimentos por Vendas", _html_tabela(tabela_vendas(agregado, "EMPREENDIMENTO").head(15)))
+    corpo += _secao("Páginas dos corretores", _lista_links(links_corretores))
+    return _documento(f"Equipe {equipe}", corpo, arquivo_base, voltar=f"../{PAGINA_GERAL}")
+
+
+def pagina_corretor(corretor, agregado, arquivo_base, links_equipes) -> str:
+    corpo = _cards_kpis(agregado["TOTAL"])
+    corpo += _secao("Funil de conversão", f'<div class="grafico">{grafico_funil(agregado["TOTAL"])}</div>')
+    corpo += _secao("Equipes", _lista_links(links_equipes))
+    corpo += _secao("Construtoras por Vendas", _html_tabela(tabela_vendas(agregado, "CONSTRUTORA")))
+    corpo += _secao("Empreendimentos por Vendas", _html_tabela(tabela_vendas(agregado, "EMPREENDIMENTO")))
+    return _documento(f"Corretor {corretor}", corpo, arquivo_base, voltar=f"../{PAGINA_GERAL}")
+
+
+def monta_paginas(cubo: pd.DataFrame, arquivo_base: str) -> dict:
+    """{caminho relativo: html} de todas as páginas, a partir do cubo."""
+    geral = tabelas_do_cubo(cubo)
+    equipes = slugs_arquivo(geral["EQUIPE"].index)
+    corretores = slugs_arquivo(geral["CORRETOR"].index)
+
+    paginas = {
+        PAGINA_GERAL: pagina_geral(
+            geral,
+            arquivo_base,
+            {e: f"equipes/{s}.html" for e, s in equipes.items()},
+            {c: f"corretores/{s}.html" for c, s in corretores.items()},
+        )
+    }
+    for equipe, slug in equipes.items():
+        agregado = tabelas_do_cubo(cubo, equipe=equipe)
+        links = {c: f"../corretores/{corretores[c]}.html" for c in agregado["CORRETOR"].index}
+        paginas[f"equipes/{slug}.html"] = pagina_equipe(equipe, agregado, arquivo_base, links)
+    for corretor, slug in corretores.items():
+        agregado = tabelas_do_cubo(cubo, corretor=corretor)
+        links = {e: f"../equipes/{equipes[e]}.html" for e in agregado["EQUIPE"].index}
+        paginas[f"corretores/{slug}.html"] = pagina_corretor(corretor, agregado, arquivo_base, links)
+    return paginas
+
+
+# ---------------------------------------------------------
+# GRAVAÇÃO INCREMENTAL
+# ---------------------------------------------------------
+def _le_hashes(pasta: Path) -> dict:
+    try:
+        return json.loads((pasta / ARQ_HASHES).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _grava(destino: Path, dados: bytes) -> None:
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(dados)
+    os.replace(tmp, destino)
+
+
+def _comprimidos(destino: Path) -> list:
+    extensoes = [".gz", ".br"] if brotli is not None else [".gz"]
+    return [destino.with_name(destino.name + ext) for ext in extensoes]
+
+
+def grava_site(paginas: dict, pasta: Path, forcar: bool = False):
+    """Grava só as páginas cujo hash mudou. Devolve (gravadas, mantidas, removidas)."""
+    hashes_antigos = _le_hashes(pasta)
+    hashes = {}
+    gravadas = []
+    mantidas = []
+
+    for relativo, conteudo in paginas.items():
+        dados = conteudo.encode("utf-8")
+        novo = hashlib.sha1(dados).hexdigest()
+        hashes[relativo] = novo
+        destino = pasta / relativo
+        arquivos = [destino, *_comprimidos(destino)]
+        if not forcar and hashes_antigos.get(relativo) == novo and all(a.exists() for a in arquivos):
+            mantidas.append(relativo)
+            continue
+
+        _grava(destino, dados)
+        # mtime=0: o .gz só muda quando a página muda
+        _grava(destino.with_name(destino.name + ".gz"), gzip.compress(dados, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _grava(destino.with_name(destino.name + ".br"), brotli.compress(dados, quality=11))
+        else:
+            # .br de um build anterior (com brotli) não pode ficar com a página velha
+            destino.with_name(destino.name + ".br").unlink(missing_ok=True)
+        gravadas.append(relativo)
+
+    removidas = [r for r in hashes_antigos if r not in hashes]
+    for relativo in removidas:
+        destino = pasta / relativo
+        for arquivo in [destino, destino.with_name(destino.name + ".gz"), destino.with_name(destino.name + ".br")]:
+            arquivo.unlink(missing_ok=True)
+
+    if gravadas or removidas:
+        _grava(pasta / ARQ_HASHES, json.dumps(hashes, indent=2, sort_keys=True).encode("utf-8"))
+    return gravadas, mantidas, removidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o site estático do dashboard a partir do CSV")
+    parser.add_argument("--arquivo", default=ARQUIVO, help="CSV exportado da planilha")
+    parser.add_argument("--saida", type=Path, default=Path("site"), help="pasta do site (padrão: site)")
+    parser.add_argument("--forcar", action="store_true", help="regrava mesmo sem mudança")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="lê o CSV em blocos (memória constante, para exportações de vários anos)",
+    )
+    parser.add_argument("--linhas-por-bloco", type=int, default=LINHAS_POR_BLOCO)
+    args = parser.parse_args()
+
+    # Uma passada pelo CSV (só as colunas usadas); todas as páginas saem do cubo
+    cubo = agrega_cubo(args.arquivo, linhas_por_bloco=args.linhas_por_bloco if args.streaming else None)
+    paginas = monta_paginas(cubo, Path(args.arquivo).name)
+
+    gravadas, mantidas, removidas = grava_site(paginas, args.saida, forcar=args.forcar)
+    print(
+        f"Site gerado em {args.saida.resolve()}: {len(gravadas)} página(s) gravada(s), "
+        f"{len(mantidas)} sem mudança, {len(removidas)} removida(s)"
+        + ("" if brotli is not None else " (sem brotli: só .gz)")
+    )
+    print(f"Dashboard web: {(args.saida / PAGINA_GERAL).resolve()}")
 
-    <hr>
-    <p style="font-size: 11px; color: #777;">
-        Página gerada automaticamente em Python a partir de <strong>{ARQUIVO}</strong>.
-    </p>
-</body>
-</html>
-"""
 
-# Salva o HTML
-saida = Path("dashboard_web.html")
-saida.write_text(html, encoding="utf-8")
-print(f"Dashboard web gerado em: {saida.resolve()}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Relatórios de funil em lote: um HTML por equipe e um por corretor, com o
+conteúdo das páginas 04 e 05 (funil do período, taxas, tabela do funil e
+planejamento pelos últimos 3 meses), sem abrir o Streamlit.
+
+Lê a planilha uma vez (snapshot de utils/dados.ler_planilha ou --csv),
+normaliza, monta o cubo diário DIA × EQUIPE × CORRETOR e grava esse cubo
+como snapshot em .cache/. Os relatórios saem num pool de processos: cada
+processo abre o mesmo cubo somente leitura (Arrow mapeado em memória, sem
+cópia nem pickle da planilha) e só filtra a sua equipe/corretor.
+
+Mostra uma barra de progresso no stderr e grava o tempo de cada relatório
+em tempos.csv na pasta de saída, do mais lento para o mais rápido.
+
+Uso:
+    python gerar_relatorios.py                          # últimos 30 dias
+    python gerar_relatorios.py --inicio 2025-01-01 --fim 2025-01-31
+    python gerar_relatorios.py --so equipes --processos 4
+    python gerar_relatorios.py --csv dados_imobiliaria.csv --saida relatorios
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from utils.consultas import normalizar_planilha
+from utils.dados import DIR_CACHE, ler_planilha, salva_snapshot
+from utils.formatacao import slugs_arquivo
+from utils.relatorios_funil import META_CORRETOR, META_EQUIPE, cubo_funil, gera_relatorio, inicia_worker
+
+ARQ_CUBO = DIR_CACHE / "cubo_relatorios"
+DIAS_PADRAO = 30
+
+
+def barra_progresso(feitos: int, total: int, ini: float) -> None:
+    largura = 30
+    cheios = largura * feitos // max(total, 1)
+    decorrido = time.perf_counter() - ini
+    sys.stderr.write(f"\r[{'#' * cheios}{'.' * (largura - cheios)}] {feitos}/{total}  {decorrido:.1f}s")
+    if feitos == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+
+def tarefas(cubo: pd.DataFrame, saida: Path, data_ini, data_fim, so, meta_equipe, meta_corretor) -> list:
+    lista = []
+    if so in ("todos", "equipes"):
+        equipes = slugs_arquivo(sorted(cubo["EQUIPE"].dropna().unique()))
+        for nome, slug in equipes.items():
+            lista.append(("equipe", nome, str(saida / "equipes" / f"{slug}.html"), data_ini, data_fim, meta_equipe))
+    if so in ("todos", "corretores"):
+        corretores = slugs_arquivo(sorted(cubo["CORRETOR"].dropna().unique()))
+        for nome, slug in corretores.items():
+            lista.append(("corretor", nome, str(saida / "corretores" / f"{slug}.html"), data_ini, data_fim, meta_corretor))
+    return lista
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera os relatórios de funil de todas as equipes e corretores")
+    parser.add_argument("--csv", help="CSV da planilha (padrão: snapshot/download de utils/dados.py)")
+    parser.add_argument("--inicio", help="data inicial AAAA-MM-DD (padrão: 30 dias antes do fim)")
+    parser.add_argument("--fim", help="data final AAAA-MM-DD (padrão: última data da planilha)")
+    parser.add_argument("--saida", default="relatorios", help="pasta de saída (padrão: relatorios)")
+    parser.add_argument("--so", choices=["todos", "equipes", "corretores"], default="todos")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="processos do pool (padrão: nº de CPUs)")
+    parser.add_argument("--meta-equipe", type=int, default=META_EQUIPE, help="meta de vendas no mês por equipe")
+    parser.add_argument("--meta-corretor", type=int, default=META_CORRETOR, help="meta de vendas no mês por corretor")
+    args = parser.parse_args()
+
+    ini = time.perf_counter()
+    bruto = pd.read_csv(args.csv, dtype=str, encoding="utf-8-sig") if args.csv else ler_planilha()
+    cubo = cubo_funil(normalizar_planilha(bruto))
+    del bruto
+    if cubo.empty:
+        print("Planilha sem datas válidas: nenhum relatório gerado.")
+        return 1
+
+    data_fim = pd.Timestamp(args.fim) if args.fim else cubo["DIA"].max()
+    data_ini = pd.Timestamp(args.inicio) if args.inicio else data_fim - pd.Timedelta(days=DIAS_PADRAO)
+    salva_snapshot(cubo, ARQ_CUBO)
+    print(
+        f"Cubo: {len(cubo)} linhas (DIA × EQUIPE × CORRETOR) em {time.perf_counter() - ini:.1f}s → {ARQ_CUBO}"
+    )
+
+    saida = Path(args.saida)
+    lista = tarefas(cubo, saida, data_ini, data_fim, args.so, args.meta_equipe, args.meta_corretor)
+    del cubo
+    print(f"Período {data_ini:%d/%m/%Y} a {data_fim:%d/%m/%Y}: {len(lista)} relatórios com {args.processos} processos")
+
+    tempos = []
+    ini_lote = time.perf_counter()
+    with ProcessPoolExecutor(args.processos, initializer=inicia_worker, initargs=(str(ARQ_CUBO),)) as pool:
+        futuros = [pool.submit(gera_relatorio, tarefa) for tarefa in lista]
+        barra_progresso(0, len(futuros), ini_lote)
+        for feitos, futuro in enumerate(as_completed(futuros), start=1):
+            tempos.append(futuro.result())
+            barra_progresso(feitos, len(futuros), ini_lote)
+    total = time.perf_counter() - ini_lote
+
+    saida.mkdir(parents=True, exist_ok=True)
+    tempos.sort(key=lambda t: t[3], reverse=True)
+    with open(saida / "tempos.csv", "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["TIPO", "NOME", "ARQUIVO", "MS"])
+        escritor.writerows((tipo, nome, caminho, f"{ms:.1f}") for tipo, nome, caminho, ms in tempos)
+
+    if tempos:
+        media = sum(t[3] for t in tempos) / len(tempos)
+        print(f"{len(tempos)} relatórios em {total:.1f}s (média {media:.0f} ms por relatório) → {saida}")
+        print("Mais lentos:")
+        for tipo, nome, _, ms in tempos[:5]:
+            print(f"  {tipo:<9} {nome:<30} {ms:>8.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
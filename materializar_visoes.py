@@ -0,0 +1,75 @@
+"""
+Worker que materializa as visões das páginas fora do Streamlit.
+
+A cada rodada lê a planilha (utils/dados.ler_planilha: snapshot em disco
+se fresco, senão baixa) e, quando o CSV mudou desde a última publicação,
+normaliza e calcula as visões de utils/visoes.py (KPIs da home, ranking por
+DATA BASE, alertas, status atual por cliente), gravando cada uma em
+.cache/visoes/. As páginas só leem essas visões; enquanto a versão nova não
+sai, calculam na hora como antes. Com MR_PACOTE_JSON=1 publica também o
+pacote JSON e o visualizador estático de .cache/pacote/ (utils/pacote_json.py);
+com MR_HISTORICO=1 normaliza só o mês corrente, guardando os meses fechados
+em .cache/historico/ (utils/historico.py).
+
+Uso (roda ao lado do aquecer_cache.py / do Streamlit):
+    python materializar_visoes.py                 # uma rodada e sai
+    python materializar_visoes.py --intervalo 30  # fica acompanhando o snapshot
+    python materializar_visoes.py --forcar        # republica mesmo sem mudança
+"""
+
+import argparse
+import sys
+import time
+
+from utils.dados import CHAVE_ASSINATURA_CSV, ler_planilha
+from utils.visoes import DIR_VISOES, assinatura_publicada, materializar
+
+
+def rodada(forcar: bool = False) -> bool:
+    try:
+        df = ler_planilha()
+    except Exception as e:
+        print(f"Planilha: falhou ({e})")
+        return False
+
+    assinatura = df.attrs.get(CHAVE_ASSINATURA_CSV)
+    if not forcar and assinatura is not None and assinatura == assinatura_publicada():
+        return True
+
+    ini = time.perf_counter()
+    try:
+        tempos = materializar(df)
+    except Exception as e:
+        # Páginas seguem calculando na hora; tenta de novo na próxima rodada
+        print(f"Visões: falhou ({e})")
+        return False
+    for nome, (linhas, ms) in tempos.items():
+        print(f"  {nome:<20} {linhas:>8} linhas  {ms:>8.0f} ms")
+    print(
+        f"Visões publicadas (CSV {str(assinatura)[:10]}) em "
+        f"{time.perf_counter() - ini:.1f}s → {DIR_VISOES}"
+    )
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materializa as visões das páginas em .cache/visoes/")
+    parser.add_argument(
+        "--intervalo",
+        type=float,
+        default=0,
+        help="segundos entre verificações do snapshot (0 = roda uma vez e sai)",
+    )
+    parser.add_argument("--forcar", action="store_true", help="republica mesmo se o CSV não mudou")
+    args = parser.parse_args()
+
+    ok = rodada(forcar=args.forcar)
+    while args.intervalo > 0:
+        time.sleep(args.intervalo)
+        rodada()
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
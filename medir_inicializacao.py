@@ -0,0 +1,96 @@
+"""
+Relatório de tempo de importação (cold start) das entradas do Streamlit.
+
+Para cada página (app_dashboard.py + pages/*.py) lê os imports de nível de
+módulo, importa tudo num Python novo com `-X importtime` e compara o total
+com o orçamento de inicialização. Imports feitos dentro de funções (altair,
+requests) não entram na conta – é justamente o que queremos que fique de fora.
+
+Uso:
+    python medir_inicializacao.py                 # relatório
+    python medir_inicializacao.py --orcamento 800 # orçamento em ms
+    python medir_inicializacao.py --detalhe 15    # top 15 módulos por página
+Sai com código 1 se alguma entrada estourar o orçamento.
+"""
+
+import argparse
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent
+ORCAMENTO_MS = 1500
+
+
+def entradas_streamlit():
+    return [RAIZ / "app_dashboard.py"] + sorted((RAIZ / "pages").glob("*.py"))
+
+
+def imports_de_topo(caminho: Path):
+    """Módulos importados no nível do arquivo (fora de funções)."""
+    arvore = ast.parse(caminho.read_text(encoding="utf-8"))
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            modulos.extend(a.name for a in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module and no.level == 0:
+            modulos.append(no.module)
+    return list(dict.fromkeys(modulos))
+
+
+def medir_importacao(modulos):
+    """
+    Importa os módulos num processo novo com -X importtime.
+    Devolve (total_ms, [(modulo, ms_acumulado), ...]) só do nível de topo.
+    """
+    codigo = "\n".join(f"import {m}" for m in modulos) or "pass"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    por_modulo = []
+    for linha in proc.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha.split("|", 2)
+        # Recuo no nome = import aninhado; só soma os de topo
+        if nome.startswith(" ") and not nome.startswith("  "):
+            por_modulo.append((nome.strip(), int(acumulado) / 1000))
+
+    total_ms = sum(ms for _, ms in por_modulo)
+    return total_ms, sorted(por_modulo, key=lambda x: x[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório de import (cold start) das páginas")
+    parser.add_argument("--orcamento", type=float, default=ORCAMENTO_MS, help="orçamento em ms por página")
+    parser.add_argument("--detalhe", type=int, default=5, help="quantos módulos listar por página")
+    args = parser.parse_args()
+
+    estourou = False
+    for caminho in entradas_streamlit():
+        nome = caminho.relative_to(RAIZ)
+        try:
+            total_ms, por_modulo = medir_importacao(imports_de_topo(caminho))
+        except RuntimeError as e:
+            print(f"{nome}: não foi possível medir ({e})")
+            estourou = True
+            continue
+
+        status = "OK " if total_ms <= args.orcamento else "ACIMA"
+        estourou |= total_ms > args.orcamento
+        print(f"[{status}] {nome}: {total_ms:8.1f} ms (orçamento {args.orcamento:.0f} ms)")
+        for modulo, ms in por_modulo[: args.detalhe]:
+            print(f"          {modulo:<40} {ms:8.1f} ms")
+
+    sys.exit(1 if estourou else 0)
+
+
+if __name__ == "__main__":
+    main()
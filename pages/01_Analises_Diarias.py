@@ -1,7 +1,12 @@
 import streamlit as st
-import pandas as pd
 from datetime import date, datetime, timedelta
 
+from utils.cache import cache_dados
+from utils.desempenho import cronometro, etapa, fechar_rerun, iniciar_rerun, marco
+from utils.visoes import ler_planilha_normalizada
+
+iniciar_rerun("01_Analises_Diarias")
+
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
 # ---------------------------------------------------------
@@ -32,44 +37,29 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+marco()
+
 # ---------------------------------------------------------
 # LEITURA DA PLANILHA
 # ---------------------------------------------------------
-SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
-GID_ANALISES = "1574157905"
-URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}"
-
-@st.cache_data(ttl=60)
+@cache_dados(ttl=60, nome="01.carregar_planilha", compartilhado=True)
+@cronometro("carregar_planilha")
 def carregar_planilha():
-    df = pd.read_csv(URL)
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # Tratamento da coluna de data
-    possiveis_datas = ["DATA", "DIA", "DATA DA ANÁLISE"]
-    col_data = next((c for c in possiveis_datas if c in df.columns), None)
-
-    if col_data:
-        df["DIA"] = pd.to_datetime(df[col_data], errors="coerce", dayfirst=True).dt.date
-    else:
-        df["DIA"] = pd.NaT
-
-    # Normalização STATUS
-    df["STATUS_BASE"] = df["SITUAÇÃO"].astype(str).str.upper()
+    # Normalizada uma vez por CSV e mapeada do snapshot compartilhado (utils/visoes.py)
+    df = ler_planilha_normalizada()
 
-    df.loc[df["STATUS_BASE"].str.contains("EM ANÁLISE"), "STATUS_BASE"] = "EM ANÁLISE"
-    df.loc[df["STATUS_BASE"].str.contains("REANÁLISE"), "STATUS_BASE"] = "REANÁLISE"
-
-    # Normalização corretor & equipe
-    for col in ["CORRETOR", "EQUIPE"]:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.upper().str.strip()
-        else:
-            df[col] = "NÃO INFORMADO"
+    # Nesta página só EM ANÁLISE / REANÁLISE importam, pelo texto da SITUAÇÃO
+    situacao = df["SITUACAO_ORIGINAL"]
+    df["STATUS_BASE"] = situacao.mask(
+        situacao.str.contains("EM ANÁLISE", regex=False, na=False), "EM ANÁLISE"
+    ).mask(situacao.str.contains("REANÁLISE", regex=False, na=False), "REANÁLISE")
 
     return df
 
 df = carregar_planilha()
 
+etapa("LEITURA DA PLANILHA")
+
 # ---------------------------------------------------------
 # FILTRO DE DIA
 # ---------------------------------------------------------
@@ -83,12 +73,16 @@ dia_selecionado = st.sidebar.date_input(
 
 df_dia = df[df["DIA"] == dia_selecionado]
 
+etapa("FILTRO DE DIA")
+
 # ---------------------------------------------------------
 # CONTAGEM — SOMENTE “EM ANÁLISE”
 # ---------------------------------------------------------
 df_em_analise = df_dia[df_dia["STATUS_BASE"] == "EM ANÁLISE"]
 qtde_total_dia = len(df_em_analise)
 
+etapa("CONTAGEM — SOMENTE “EM ANÁLISE”")
+
 # ---------------------------------------------------------
 # FRASE ESPECIAL VERSÃO 1
 # ---------------------------------------------------------
@@ -105,6 +99,8 @@ st.markdown(
 st.subheader("Total de análises no dia")
 st.metric(label="", value=qtde_total_dia)
 
+marco()
+
 # ---------------------------------------------------------
 # ANALISES POR EQUIPE
 # ---------------------------------------------------------
@@ -115,6 +111,8 @@ df_equipes = df_equipes.sort_values("ANÁLISES", ascending=False)
 
 st.dataframe(df_equipes, use_container_width=True)
 
+etapa("ANALISES POR EQUIPE")
+
 # ---------------------------------------------------------
 # ANALISES POR CORRETOR
 # ---------------------------------------------------------
@@ -127,3 +125,6 @@ st.dataframe(df_corretor, use_container_width=True)
 
 st.markdown("---")
 st.caption("Dashboard MR Imóveis • Atualizado automaticamente • VERSÃO 1")
+
+etapa("ANALISES POR CORRETOR")
+fechar_rerun({"dia": dia_selecionado})
@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import altair as alt
 from datetime import date, timedelta
 
+from utils.cache import cache_dados
+from utils.consultas import ranking_por_data_base
+from utils.dados import versao_snapshot
+from utils.formatacao import formata_moeda_serie, formata_percentual_serie
+from utils.graficos import exibe_grafico, top_n_com_outros
+from utils.desempenho import cronometro, etapa, fechar_rerun, iniciar_rerun, marco, parar
+from utils.visoes import le_visao, ler_planilha_normalizada
+
+iniciar_rerun("02_Ranking_Corretores")
+
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
 # ---------------------------------------------------------
@@ -15,138 +23,26 @@ st.set_page_config(
 
 st.title("🏆 Ranking por Corretor – MR Imóveis")
 
-# ---------------------------------------------------------
-# CONFIG: LINK DA PLANILHA
-# ---------------------------------------------------------
-SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
-GID_ANALISES = "1574157905"
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}"
-
-# ---------------------------------------------------------
-# FUNÇÃO AUXILIAR PARA LIMPAR DATA
-# ---------------------------------------------------------
-def limpar_para_data(serie):
-    dt = pd.to_datetime(serie, dayfirst=True, errors="coerce")
-    return dt.dt.date
-
 # ---------------------------------------------------------
 # CARREGAR DADOS
 # ---------------------------------------------------------
+@cache_dados(ttl=60, nome="02.carregar_dados", compartilhado=True)
+@cronometro("carregar_dados")
 def carregar_dados():
-    df = pd.read_csv(CSV_URL)
-
-    # Padroniza nomes de colunas
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # DATA (DIA)
-    if "DATA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DATA"])
-    elif "DIA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DIA"])
-    else:
-        df["DIA"] = pd.NaT
-
-    # DATA BASE (para consolidar o ranking)
-    # Tenta achar qualquer coluna que contenha as palavras DATA e BASE
-    col_data_base = None
-    for c in df.columns:
-        if "DATA" in c and "BASE" in c:
-            col_data_base = c
-            break
-
-    if col_data_base is not None:
-        df["DATA_BASE"] = limpar_para_data(df[col_data_base])
-    else:
-        # fallback: se não tiver coluna de data base explícita,
-        # usa o próprio DIA como data base para não quebrar o ranking
-        df["DATA_BASE"] = df["DIA"]
-
-    # EQUIPE / CORRETOR
-    for col in ["EQUIPE", "CORRETOR"]:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .fillna("NÃO INFORMADO")
-                .astype(str)
-                .str.upper()
-                .str.strip()
-            )
-        else:
-            df[col] = "NÃO INFORMADO"
-
-    # STATUS_BASE
-    possiveis_cols_situacao = [
-        "SITUAÇÃO",
-        "SITUAÇÃO ATUAL",
-        "STATUS",
-        "SITUACAO",
-        "SITUACAO ATUAL",
-    ]
-    col_situacao = None
-    for c in possiveis_cols_situacao:
-        if c in df.columns:
-            col_situacao = c
-            break
-
-    df["STATUS_BASE"] = ""
-    if col_situacao is not None:
-        s = df[col_situacao].fillna("").astype(str).str.upper()
-        df.loc[s.str.contains("EM ANÁLISE"), "STATUS_BASE"] = "EM ANÁLISE"
-        df.loc[s.str.contains("REANÁLISE"), "STATUS_BASE"] = "REANÁLISE"
-        df.loc[s.str.contains("APROV"), "STATUS_BASE"] = "APROVADO"
-        df.loc[s.str.contains("REPROV"), "STATUS_BASE"] = "REPROVADO"
-        df.loc[s.str.contains("VENDA GERADA"), "STATUS_BASE"] = "VENDA GERADA"
-        df.loc[s.str.contains("VENDA INFORMADA"), "STATUS_BASE"] = "VENDA INFORMADA"
-
-    # VGV (OBSERVAÇÕES)
-    if "OBSERVAÇÕES" in df.columns:
-        df["VGV"] = pd.to_numeric(df["OBSERVAÇÕES"], errors="coerce").fillna(0)
-    else:
-        df["VGV"] = 0.0
-
-    # Nome / CPF base para chave de cliente
-    possiveis_nome = ["NOME", "CLIENTE", "NOME CLIENTE", "NOME DO CLIENTE"]
-    possiveis_cpf = ["CPF", "CPF CLIENTE", "CPF DO CLIENTE"]
-
-    col_nome = None
-    for c in possiveis_nome:
-        if c in df.columns:
-            col_nome = c
-            break
-
-    col_cpf = None
-    for c in possiveis_cpf:
-        if c in df.columns:
-            col_cpf = c
-            break
-
-    if col_nome is None:
-        df["NOME_CLIENTE_BASE"] = "NÃO INFORMADO"
-    else:
-        df["NOME_CLIENTE_BASE"] = (
-            df[col_nome].fillna("NÃO INFORMADO").astype(str).str.upper().str.strip()
-        )
-
-    if col_cpf is None:
-        df["CPF_CLIENTE_BASE"] = ""
-    else:
-        df["CPF_CLIENTE_BASE"] = (
-            df[col_cpf]
-            .fillna("")
-            .astype(str)
-            .str.replace(r"\D", "", regex=True)
-        )
-
-    return df
+    # Normalizada uma vez por CSV e mapeada do snapshot compartilhado (utils/visoes.py)
+    return ler_planilha_normalizada()
 
 # ---------------------------------------------------------
 # CARREGAR BASE
 # ---------------------------------------------------------
 df = carregar_dados()
+versao_dados = versao_snapshot(df)
 
 if df.empty:
     st.error("Erro ao carregar planilha.")
-    st.stop()
+    parar()
+
+etapa("CARREGAR BASE")
 
 # ---------------------------------------------------------
 # SIDEBAR – FILTROS
@@ -162,7 +58,7 @@ datas_base_validas = (
 
 if not datas_base_validas:
     st.error("Nenhuma DATA BASE encontrada na planilha (nem como fallback).")
-    st.stop()
+    parar()
 
 data_base_sel = st.sidebar.selectbox(
     "Data base",
@@ -190,87 +86,33 @@ st.caption(
 
 if df_ref.empty:
     st.warning("Sem registros para os filtros selecionados.")
-    st.stop()
+    parar()
+
+marco()
 
 # ---------------------------------------------------------
 # CÁLCULOS DE RANKING
 # ---------------------------------------------------------
 
-# Análises = EM ANÁLISE + REANÁLISE
-mask_analises = df_ref["STATUS_BASE"].isin(["EM ANÁLISE", "REANÁLISE"])
-df_analises = df_ref[mask_analises]
-
-analises_por_corretor = (
-    df_analises.groupby("CORRETOR").size().rename("ANALISES")
-)
+# Pronto no materializar_visoes.py (mesma regra, já ordenado) se ele
+# publicou para esta planilha; senão calcula aqui
+visao_ranking = le_visao("ranking_data_base", df)
 
-# Aprovações
-df_aprov = df_ref[df_ref["STATUS_BASE"] == "APROVADO"]
-aprov_por_corretor = df_aprov.groupby("CORRETOR").size().rename("APROVACOES")
-
-# Vendas (1 por cliente) e VGV
-df_vendas = df_ref[df_ref["STATUS_BASE"].isin(["VENDA GERADA", "VENDA INFORMADA"])].copy()
-
-if not df_vendas.empty:
-    df_vendas["CHAVE_CLIENTE"] = (
-        df_vendas["NOME_CLIENTE_BASE"].fillna("NÃO INFORMADO")
-        + " | "
-        + df_vendas["CPF_CLIENTE_BASE"].fillna("")
+if visao_ranking is not None:
+    ranking = (
+        visao_ranking[
+            (visao_ranking["DATA_BASE"] == data_base_sel)
+            & (visao_ranking["EQUIPE_FILTRO"] == equipe_sel)
+        ]
+        .drop(columns=["DATA_BASE", "EQUIPE_FILTRO"])
+        .reset_index(drop=True)
     )
-    df_vendas = df_vendas.sort_values("DIA")
-    df_vendas_ult = df_vendas.groupby("CHAVE_CLIENTE").tail(1)
 else:
-    df_vendas_ult = df_vendas.copy()
-
-vendas_por_corretor = (
-    df_vendas_ult.groupby("CORRETOR").size().rename("VENDAS")
-    if not df_vendas_ult.empty
-    else pd.Series(dtype=int, name="VENDAS")
-)
-
-vgv_por_corretor = (
-    df_vendas_ult.groupby("CORRETOR")["VGV"].sum().rename("VGV")
-    if not df_vendas_ult.empty
-    else pd.Series(dtype=float, name="VGV")
-)
-
-# Junta tudo
-ranking = (
-    pd.concat(
-        [analises_por_corretor, aprov_por_corretor, vendas_por_corretor, vgv_por_corretor],
-        axis=1,
-    )
-    .fillna(0)
-    .reset_index()
-)
+    ranking = ranking_por_data_base(df, data_base_sel, equipe_sel)
 
 if ranking.empty:
     st.warning("Não há dados suficientes para montar o ranking.")
-    st.stop()
-
-# Garante tipos
-ranking["ANALISES"] = ranking["ANALISES"].astype(int)
-ranking["APROVACOES"] = ranking["APROVACOES"].astype(int)
-ranking["VENDAS"] = ranking["VENDAS"].astype(int)
-ranking["VGV"] = ranking["VGV"].astype(float)
-
-# Taxas
-ranking["TAXA_APROV_ANALISES"] = np.where(
-    ranking["ANALISES"] > 0,
-    ranking["APROVACOES"] / ranking["ANALISES"] * 100,
-    0.0,
-)
-ranking["TAXA_VENDAS_ANALISES"] = np.where(
-    ranking["ANALISES"] > 0,
-    ranking["VENDAS"] / ranking["ANALISES"] * 100,
-    0.0,
-)
-
-# Ordenação do ranking: VGV, VENDAS, APROVACOES, ANALISES
-ranking = ranking.sort_values(
-    by=["VGV", "VENDAS", "APROVACOES", "ANALISES"],
-    ascending=[False, False, False, False],
-).reset_index(drop=True)
+    parar()
 
 # Posição com medalhas
 posicoes = []
@@ -287,13 +129,10 @@ for i in range(len(ranking)):
 
 ranking["POSICAO"] = posicoes
 
-# Formatação para exibição
-def formata_moeda(v):
-    return f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-ranking["VGV_FMT"] = ranking["VGV"].apply(formata_moeda)
-ranking["TAXA_APROV_ANALISES_FMT"] = ranking["TAXA_APROV_ANALISES"].map(lambda v: f"{v:.1f}%")
-ranking["TAXA_VENDAS_ANALISES_FMT"] = ranking["TAXA_VENDAS_ANALISES"].map(lambda v: f"{v:.1f}%")
+# Formatação para exibição (vetorizada; o ranking já foi ordenado pelos valores numéricos)
+ranking["VGV_FMT"] = formata_moeda_serie(ranking["VGV"])
+ranking["TAXA_APROV_ANALISES_FMT"] = formata_percentual_serie(ranking["TAXA_APROV_ANALISES"])
+ranking["TAXA_VENDAS_ANALISES_FMT"] = formata_percentual_serie(ranking["TAXA_VENDAS_ANALISES"])
 
 # Reordena colunas para ficar igual ao layout do print:
 # POSIÇÃO | CORRETOR | VGV | VENDAS | ANALISES | APROVACOES | TAXA_APROV_ANALISES | TAXA_VENDAS_ANALISES
@@ -321,6 +160,8 @@ ranking_exibe = ranking[
     }
 )
 
+etapa("CÁLCULOS DE RANKING")
+
 # ---------------------------------------------------------
 # EXIBIÇÃO DA TABELA
 # ---------------------------------------------------------
@@ -332,31 +173,57 @@ st.dataframe(
     hide_index=True,
 )
 
+etapa("EXIBIÇÃO DA TABELA")
+
 # ---------------------------------------------------------
-# GRÁFICO DE BARRAS – VGV POR CORRETOR
+# GRÁFICO DE BARRAS – VGV POR CORRETOR (TOP 15 + OUTROS)
 # ---------------------------------------------------------
-chart_data = ranking.copy()
-
-chart = (
-    alt.Chart(chart_data)
-    .mark_bar()
-    .encode(
-        x=alt.X("CORRETOR:N", sort="-y", title="Corretor"),
-        y=alt.Y("VGV:Q", title="VGV"),
-        tooltip=[
-            alt.Tooltip("CORRETOR:N", title="Corretor"),
-            alt.Tooltip("VGV:Q", title="VGV", format=",.2f"),
-            alt.Tooltip("VENDAS:Q", title="Vendas"),
-            alt.Tooltip("ANALISES:Q", title="Análises"),
-            alt.Tooltip("APROVACOES:Q", title="Aprovações"),
-            alt.Tooltip("TAXA_APROV_ANALISES:Q", title="% Aprov./Análises", format=".1f"),
-            alt.Tooltip("TAXA_VENDAS_ANALISES:Q", title="% Vendas/Análises", format=".1f"),
+def montar_grafico_vgv():
+    import altair as alt
+
+    chart_data = top_n_com_outros(
+        ranking[
+            [
+                "CORRETOR",
+                "VGV",
+                "VENDAS",
+                "ANALISES",
+                "APROVACOES",
+                "TAXA_APROV_ANALISES",
+                "TAXA_VENDAS_ANALISES",
+            ]
         ],
+        categoria="CORRETOR",
+        ordenar_por="VGV",
+        somar=["VGV", "VENDAS", "ANALISES", "APROVACOES"],
+    )
+
+    return (
+        alt.Chart(chart_data)
+        .mark_bar()
+        .encode(
+            x=alt.X("CORRETOR:N", sort="-y", title="Corretor"),
+            y=alt.Y("VGV:Q", title="VGV"),
+            tooltip=[
+                alt.Tooltip("CORRETOR:N", title="Corretor"),
+                alt.Tooltip("VGV:Q", title="VGV", format=",.2f"),
+                alt.Tooltip("VENDAS:Q", title="Vendas"),
+                alt.Tooltip("ANALISES:Q", title="Análises"),
+                alt.Tooltip("APROVACOES:Q", title="Aprovações"),
+                alt.Tooltip("TAXA_APROV_ANALISES:Q", title="% Aprov./Análises", format=".1f"),
+                alt.Tooltip("TAXA_VENDAS_ANALISES:Q", title="% Vendas/Análises", format=".1f"),
+            ],
+        )
+        .properties(height=500)
     )
-    .properties(height=500)
-)
 
-st.altair_chart(chart, use_container_width=True)
+
+exibe_grafico(
+    "ranking_corretor_vgv",
+    versao_dados,
+    (data_base_sel, equipe_sel),
+    montar_grafico_vgv,
+)
 
 st.markdown(
     "<hr><p style='text-align:center;color:#666;'>"
@@ -365,3 +232,6 @@ st.markdown(
     "</p>",
     unsafe_allow_html=True,
 )
+
+etapa("GRÁFICO DE BARRAS – VGV POR CORRETOR")
+fechar_rerun({"data_base": data_base_sel, "equipe": equipe_sel})
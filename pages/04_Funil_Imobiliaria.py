@@ -1,9 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
 from datetime import date, timedelta  # <-- acrescentei timedelta
 
+from utils.cache import cache_dados
+from utils.dados import versao_snapshot
+from utils.formatacao import formata_moeda
+from utils.graficos import exibe_grafico, montar_grafico_funil, top_n_com_outros
+from utils.tabelas import coluna_moeda, coluna_percentual
+from utils.desempenho import cronometro, etapa, fechar_rerun, iniciar_rerun, marco, parar
+from utils.motor_consultas import escolher_motor
+from utils.visoes import ler_planilha_normalizada
+
+iniciar_rerun("04_Funil_Imobiliaria")
+
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
 # ---------------------------------------------------------
@@ -20,90 +30,27 @@ st.caption(
     "planeje metas com base no histórico e compare o funil por equipe."
 )
 
-# ---------------------------------------------------------
-# CONFIG: LINK DA PLANILHA  (MESMO DO APP PRINCIPAL)
-# ---------------------------------------------------------
-SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
-GID_ANALISES = "1574157905"
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}"
-
-# ---------------------------------------------------------
-# FUNÇÃO AUXILIAR PARA LIMPAR DATA
-# ---------------------------------------------------------
-def limpar_para_data(serie):
-    dt = pd.to_datetime(serie, dayfirst=True, errors="coerce")
-    return dt.dt.date
-
 # ---------------------------------------------------------
 # CARREGAR E PREPARAR DADOS (PLANILHA)
 # ---------------------------------------------------------
-@st.cache_data(ttl=60)
+@cache_dados(ttl=60, nome="04.carregar_dados", compartilhado=True)
+@cronometro("carregar_dados")
 def carregar_dados():
-    df = pd.read_csv(CSV_URL)
-
-    # Padroniza colunas
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # DATA / DIA
-    if "DATA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DATA"])
-    elif "DIA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DIA"])
-    else:
-        df["DIA"] = pd.NaT
-
-    # EQUIPE / CORRETOR
-    for col in ["EQUIPE", "CORRETOR"]:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .fillna("NÃO INFORMADO")
-                .astype(str)
-                .str.upper()
-                .str.strip()
-            )
-        else:
-            df[col] = "NÃO INFORMADO"
-
-    # SITUAÇÃO BASE
-    possiveis_cols_situacao = [
-        "SITUAÇÃO",
-        "SITUAÇÃO ATUAL",
-        "STATUS",
-        "SITUACAO",
-        "SITUACAO ATUAL",
-    ]
-    col_situacao = None
-    for c in possiveis_cols_situacao:
-        if c in df.columns:
-            col_situacao = c
-            break
-
-    df["STATUS_BASE"] = ""
-    if col_situacao:
-        status = df[col_situacao].fillna("").astype(str).str.upper()
-
-        df.loc[status.str.contains("EM ANÁLISE"), "STATUS_BASE"] = "EM ANÁLISE"
-        df.loc[status.str.contains("REANÁLISE"), "STATUS_BASE"] = "REANÁLISE"
-        df.loc[status.str.contains("APROV"), "STATUS_BASE"] = "APROVADO"
-        df.loc[status.str.contains("REPROV"), "STATUS_BASE"] = "REPROVADO"
-        df.loc[status.str.contains("VENDA GERADA"), "STATUS_BASE"] = "VENDA GERADA"
-        df.loc[status.str.contains("VENDA INFORMADA"), "STATUS_BASE"] = "VENDA INFORMADA"
-
-    # VGV (via coluna OBSERVAÇÕES) – sempre em REAL
-    if "OBSERVAÇÕES" in df.columns:
-        df["VGV"] = pd.to_numeric(df["OBSERVAÇÕES"], errors="coerce").fillna(0.0)
-    else:
-        df["VGV"] = 0.0
-
-    return df
+    # Normalizada uma vez por CSV e mapeada do snapshot compartilhado (utils/visoes.py)
+    return ler_planilha_normalizada()
 
 
 df = carregar_dados()
+versao_dados = versao_snapshot(df)
+
+# pandas sobre o df da página, ou SQL na mesma planilha (MR_MOTOR=duckdb / sqlite)
+motor = escolher_motor(df)
 
 if df.empty:
     st.error("Não foi possível carregar dados da planilha. Verifique o link/gid.")
-    st.stop()
+    parar()
+
+etapa("CARREGAR E PREPARAR DADOS")
 
 # ---------------------------------------------------------
 # LEADS DO SUPREMO VINDOS DO app_dashboard (session_state)
@@ -140,20 +87,14 @@ if isinstance(periodo, tuple):
 else:
     data_ini, data_fim = data_ini_default, data_max
 
-# Filtro opcional por equipe (para funil detalhado)
-lista_equipes = sorted(df["EQUIPE"].dropna().unique())
-equipe_sel = st.sidebar.selectbox(
-    "Equipe (para funil detalhado)",
-    ["Todas"] + lista_equipes,
-)
+marco()
 
 # ---------------------------------------------------------
 # APLICA FILTROS (FUNIL GERAL)
 # ---------------------------------------------------------
-df_periodo = df.copy()
-dia_series_all = limpar_para_data(df_periodo["DIA"])
-mask_data_all = (dia_series_all >= data_ini) & (dia_series_all <= data_fim)
-df_periodo = df_periodo[mask_data_all]
+# DIA já chega normalizado do cache – não reprocessa as datas a cada rerun
+mask_data_all = (df["DIA"] >= data_ini) & (df["DIA"] <= data_fim)
+df_periodo = df[mask_data_all]
 
 registros_filtrados = len(df_periodo)
 
@@ -165,7 +106,9 @@ st.caption(
 
 if df_periodo.empty:
     st.warning("Não há registros para o período selecionado.")
-    st.stop()
+    parar()
+
+etapa("APLICA FILTROS")
 
 # ---------------------------------------------------------
 # LEADS NO PERÍODO (IMOBILIÁRIA INTEIRA)
@@ -185,39 +128,92 @@ if not df_leads.empty and "data_captura" in df_leads.columns:
     )
     total_leads_periodo = int(mask_leads.sum())
 
+etapa("LEADS NO PERÍODO")
+
 # ---------------------------------------------------------
 # FUNÇÕES AUXILIARES DO FUNIL
 # ---------------------------------------------------------
-def conta_analises(s):
-    """Análises totais (EM + RE) – volume."""
-    return s.isin(["EM ANÁLISE", "REANÁLISE"]).sum()
-
 def conta_analises_base(s):
     """Análises para base de conversão – SOMENTE EM ANÁLISE."""
     return (s == "EM ANÁLISE").sum()
 
-def conta_reanalises(s):
-    """Quantidade de REANÁLISE."""
-    return (s == "REANÁLISE").sum()
-
 def conta_aprovacoes(s):
     return (s == "APROVADO").sum()
 
 def conta_vendas(s):
     return s.isin(["VENDA GERADA", "VENDA INFORMADA"]).sum()
 
+# ---------------------------------------------------------
+# CALCULADORA DE METAS (FRAGMENTO – SÓ ELA RODA AO MUDAR A META)
+# ---------------------------------------------------------
+@st.fragment
+def calculadora_metas(
+    rotulo_input,
+    valor_padrao,
+    key,
+    rotulo_meta,
+    media_analise_por_venda,
+    media_aprov_por_venda,
+    vendas_3m,
+    texto_base,
+    msg_sem_vendas,
+):
+    """
+    Mexer na meta reexecuta só este bloco: as médias dos últimos 3 meses
+    chegam prontas como argumento, sem recarregar a planilha nem os funis.
+    """
+    vendas_planejadas = st.number_input(
+        rotulo_input,
+        min_value=0,
+        value=valor_padrao,
+        step=1,
+        key=key,
+    )
+
+    if vendas_planejadas > 0 and vendas_3m > 0:
+        analises_necessarias = media_analise_por_venda * vendas_planejadas
+        aprovacoes_necessarias = media_aprov_por_venda * vendas_planejadas
+
+        analises_necessarias_int = int(np.ceil(analises_necessarias))
+        aprovacoes_necessarias_int = int(np.ceil(aprovacoes_necessarias))
+
+        c_calc1, c_calc2, c_calc3 = st.columns(3)
+        with c_calc1:
+            st.metric(rotulo_meta, vendas_planejadas)
+        with c_calc2:
+            st.metric(
+                "Análises necessárias (aprox.)",
+                f"{analises_necessarias_int} análises",
+                help=f"Cálculo: {media_analise_por_venda:.2f} análises/venda × {vendas_planejadas}",
+            )
+        with c_calc3:
+            st.metric(
+                "Aprovações necessárias (aprox.)",
+                f"{aprovacoes_necessarias_int} aprovações",
+                help=f"Cálculo: {media_aprov_por_venda:.2f} aprovações/venda × {vendas_planejadas}",
+            )
+
+        st.caption(
+            "Os números são aproximados e arredondados para cima, "
+            f"baseados no {texto_base} nos últimos 3 meses."
+        )
+    elif vendas_planejadas > 0 and vendas_3m == 0:
+        st.info(msg_sem_vendas)
+
 # ---------------------------------------------------------
 # FUNIL GERAL DA IMOBILIÁRIA
 # ---------------------------------------------------------
 st.markdown("## 🏢 Funil Geral da Imobiliária")
 
-# Contagens gerais (respeitando o filtro de data)
-analises_em = conta_analises_base(df_periodo["STATUS_BASE"])    # só EM ANÁLISE
-reanalises_total = conta_reanalises(df_periodo["STATUS_BASE"])  # só REANÁLISE
-analises_total = conta_analises(df_periodo["STATUS_BASE"])      # EM + RE (volume)
-aprov_total = conta_aprovacoes(df_periodo["STATUS_BASE"])
-vendas_total = conta_vendas(df_periodo["STATUS_BASE"])
-vgv_total = df_periodo["VGV"].sum()
+# Contagens gerais (respeitando o filtro de data): funil do período pelo
+# motor (pandas, SQL ou histórico mensal), somado por equipe
+funil_equipes = motor.funil(data_ini, data_fim, "EQUIPE")
+analises_em = int(funil_equipes["ANALISES_BASE"].sum())    # só EM ANÁLISE
+reanalises_total = int(funil_equipes["REANALISES"].sum())  # só REANÁLISE
+analises_total = int(funil_equipes["ANALISES"].sum())      # EM + RE (volume)
+aprov_total = int(funil_equipes["APROVACOES"].sum())
+vendas_total = int(funil_equipes["VENDAS"].sum())
+vgv_total = float(funil_equipes["VGV"].sum())
 
 taxa_aprov_analise = (
     aprov_total / analises_em * 100 if analises_em > 0 else 0
@@ -263,7 +259,7 @@ col_vgv, col_t1, col_t2, col_t3 = st.columns(4)
 with col_vgv:
     st.metric(
         "VGV Total",
-        f"R$ {vgv_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+        formata_moeda(vgv_total),
     )
 with col_t1:
     st.metric("Taxa Aprov./Análises (só EM)", f"{taxa_aprov_analise:.1f}%")
@@ -296,37 +292,21 @@ df_funil_geral = pd.DataFrame(
 # 🔽 TABELA EM CIMA, GRÁFICO EMBAIXO
 st.markdown("### 📋 Tabela do Funil Geral")
 st.dataframe(
-    df_funil_geral.style.format(
-        {"Conversão da etapa anterior (%)": "{:.1f}%".format}
-    ),
+    df_funil_geral,
     use_container_width=True,
     hide_index=True,
+    column_config={"Conversão da etapa anterior (%)": coluna_percentual()},
 )
 
 st.markdown("### 📊 Gráfico do Funil Geral (Análises → Aprovações → Vendas)")
-chart_funil = (
-    alt.Chart(df_funil_geral)
-    .mark_bar(cornerRadiusTopLeft=6, cornerRadiusTopRight=6)
-    .encode(
-        x=alt.X("Quantidade:Q", title="Quantidade"),
-        y=alt.Y(
-            "Etapa:N",
-            sort=["Análises (só EM)", "Aprovações", "Vendas"],
-            title="Etapa",
-        ),
-        tooltip=[
-            "Etapa",
-            "Quantidade",
-            alt.Tooltip(
-                "Conversão da etapa anterior (%)",
-                title="Conversão",
-                format=".1f",
-            ),
-        ],
-    )
-    .properties(height=300)
+exibe_grafico(
+    "funil_geral",
+    versao_dados,
+    (data_ini, data_fim),
+    lambda: montar_grafico_funil(df_funil_geral),
 )
-st.altair_chart(chart_funil, use_container_width=True)
+
+etapa("FUNIL GERAL DA IMOBILIÁRIA")
 
 # ---------------------------------------------------------
 # PLANEJAMENTO DA IMOBILIÁRIA (ÚLTIMOS 3 MESES)
@@ -413,45 +393,21 @@ else:
             # Planejamento de metas
             st.markdown("### 🎯 Quantas análises/aprovações preciso para bater a meta de vendas da imobiliária?")
 
-            vendas_planejadas = st.number_input(
-                "Vendas desejadas no mês (imobiliária inteira)",
-                min_value=0,
-                value=10,
-                step=1,
+            calculadora_metas(
+                rotulo_input="Vendas desejadas no mês (imobiliária inteira)",
+                valor_padrao=10,
                 key="vendas_planejadas_imob",
+                rotulo_meta="Meta de vendas (mês)",
+                media_analise_por_venda=media_analise_por_venda_3m,
+                media_aprov_por_venda=media_aprov_por_venda_3m,
+                vendas_3m=vendas_3m,
+                texto_base="comportamento real da imobiliária",
+                msg_sem_vendas=(
+                    "Ainda não há vendas registradas nos últimos 3 meses para calcular as médias por venda."
+                ),
             )
 
-            if vendas_planejadas > 0 and vendas_3m > 0:
-                analises_necessarias = media_analise_por_venda_3m * vendas_planejadas
-                aprovacoes_necessarias = media_aprov_por_venda_3m * vendas_planejadas
-
-                analises_necessarias_int = int(np.ceil(analises_necessarias))
-                aprovacoes_necessarias_int = int(np.ceil(aprovacoes_necessarias))
-
-                c_calc1, c_calc2, c_calc3 = st.columns(3)
-                with c_calc1:
-                    st.metric("Meta de vendas (mês)", vendas_planejadas)
-                with c_calc2:
-                    st.metric(
-                        "Análises necessárias (aprox.)",
-                        f"{analises_necessarias_int} análises",
-                        help=f"Cálculo: {media_analise_por_venda_3m:.2f} análises/venda × {vendas_planejadas}",
-                    )
-                with c_calc3:
-                    st.metric(
-                        "Aprovações necessárias (aprox.)",
-                        f"{aprovacoes_necessarias_int} aprovações",
-                        help=f"Cálculo: {media_aprov_por_venda_3m:.2f} aprovações/venda × {vendas_planejadas}",
-                    )
-
-                st.caption(
-                    "Os números são aproximados e arredondados para cima, "
-                    "baseados no comportamento real da imobiliária nos últimos 3 meses."
-                )
-            elif vendas_planejadas > 0 and vendas_3m == 0:
-                st.info(
-                    "Ainda não há vendas registradas nos últimos 3 meses para calcular as médias por venda."
-                )
+etapa("PLANEJAMENTO DA IMOBILIÁRIA")
 
 # ---------------------------------------------------------
 # FUNIL POR EQUIPE (VISÃO COMPARATIVA)
@@ -459,18 +415,8 @@ else:
 st.markdown("---")
 st.markdown("## 👥 Funil por Equipe (comparativo)")
 
-rank_eq_funil = (
-    df_periodo.groupby("EQUIPE")
-    .agg(
-        ANALISES=("STATUS_BASE", conta_analises),           # EM + RE (volume)
-        ANALISES_BASE=("STATUS_BASE", conta_analises_base), # só EM ANÁLISE (conversão)
-        REANALISES=("STATUS_BASE", conta_reanalises),       # só REANÁLISE
-        APROVACOES=("STATUS_BASE", conta_aprovacoes),
-        VENDAS=("STATUS_BASE", conta_vendas),
-        VGV=("VGV", "sum"),
-    )
-    .reset_index()
-)
+# ANALISES = EM + RE (volume), ANALISES_BASE = só EM ANÁLISE (conversão)
+rank_eq_funil = funil_equipes.copy()
 
 rank_eq_funil = rank_eq_funil[
     (rank_eq_funil["ANALISES"] > 0)
@@ -503,53 +449,71 @@ else:
     # 🔽 TABELA EM CIMA, GRÁFICO EMBAIXO
     st.markdown("### 📋 Tabela do Funil por Equipe")
     st.dataframe(
-        rank_eq_funil.style.format(
-            {
-                "VGV": "R$ {:,.2f}".format,
-                "TAXA_APROV_ANALISES": "{:.1f}%".format,
-                "TAXA_VENDAS_ANALISES": "{:.1f}%".format,
-                "TAXA_VENDAS_APROV": "{:.1f}%".format,
-            }
-        ),
+        rank_eq_funil,
         use_container_width=True,
         hide_index=True,
+        column_config={
+            "VGV": coluna_moeda(),
+            "TAXA_APROV_ANALISES": coluna_percentual(),
+            "TAXA_VENDAS_ANALISES": coluna_percentual(),
+            "TAXA_VENDAS_APROV": coluna_percentual(),
+        },
     )
 
     st.markdown("### 💰 VGV por Equipe")
-    chart_eq_vgv = (
-        alt.Chart(rank_eq_funil)
-        .mark_bar(cornerRadiusTopLeft=4, cornerRadiusTopRight=4)
-        .encode(
-            x=alt.X("VGV:Q", title="VGV (R$)"),
-            y=alt.Y("EQUIPE:N", sort="-x", title="Equipe"),
-            tooltip=[
-                "EQUIPE",
-                alt.Tooltip("ANALISES_BASE:Q", title="Análises (só EM)"),
-                alt.Tooltip("REANALISES:Q", title="Reanálises"),
-                alt.Tooltip("ANALISES:Q", title="Análises (EM + RE)"),
-                "APROVACOES",
-                "VENDAS",
-                alt.Tooltip("VGV:Q", title="VGV"),
-                alt.Tooltip(
-                    "TAXA_APROV_ANALISES:Q",
-                    title="% Aprov./Análises (só EM)",
-                    format=".1f",
-                ),
-                alt.Tooltip(
-                    "TAXA_VENDAS_ANALISES:Q",
-                    title="% Vendas/Análises (só EM)",
-                    format=".1f",
-                ),
-                alt.Tooltip(
-                    "TAXA_VENDAS_APROV:Q",
-                    title="% Vendas/Aprovações",
-                    format=".1f",
-                ),
-            ],
+
+    def montar_grafico_vgv_equipe():
+        import altair as alt
+
+        chart_data = top_n_com_outros(
+            rank_eq_funil,
+            categoria="EQUIPE",
+            ordenar_por="VGV",
+            somar=["ANALISES", "ANALISES_BASE", "REANALISES", "APROVACOES", "VENDAS", "VGV"],
         )
-        .properties(height=400)
+
+        return (
+            alt.Chart(chart_data)
+            .mark_bar(cornerRadiusTopLeft=4, cornerRadiusTopRight=4)
+            .encode(
+                x=alt.X("VGV:Q", title="VGV (R$)"),
+                y=alt.Y("EQUIPE:N", sort="-x", title="Equipe"),
+                tooltip=[
+                    "EQUIPE",
+                    alt.Tooltip("ANALISES_BASE:Q", title="Análises (só EM)"),
+                    alt.Tooltip("REANALISES:Q", title="Reanálises"),
+                    alt.Tooltip("ANALISES:Q", title="Análises (EM + RE)"),
+                    "APROVACOES",
+                    "VENDAS",
+                    alt.Tooltip("VGV:Q", title="VGV"),
+                    alt.Tooltip(
+                        "TAXA_APROV_ANALISES:Q",
+                        title="% Aprov./Análises (só EM)",
+                        format=".1f",
+                    ),
+                    alt.Tooltip(
+                        "TAXA_VENDAS_ANALISES:Q",
+                        title="% Vendas/Análises (só EM)",
+                        format=".1f",
+                    ),
+                    alt.Tooltip(
+                        "TAXA_VENDAS_APROV:Q",
+                        title="% Vendas/Aprovações",
+                        format=".1f",
+                    ),
+                ],
+            )
+            .properties(height=400)
+        )
+
+    exibe_grafico(
+        "funil_equipe_vgv",
+        versao_dados,
+        (data_ini, data_fim),
+        montar_grafico_vgv_equipe,
     )
-    st.altair_chart(chart_eq_vgv, use_container_width=True)
+
+etapa("FUNIL POR EQUIPE")
 
 # ---------------------------------------------------------
 # FUNIL DETALHADO + PLANEJAMENTO POR EQUIPE
@@ -557,176 +521,170 @@ else:
 st.markdown("---")
 st.markdown("## 🔍 Funil detalhado e planejamento por equipe")
 
-if equipe_sel == "Todas":
-    st.info("Selecione uma equipe específica na barra lateral para ver o funil e o planejamento dessa equipe.")
-else:
+
+@st.fragment
+def funil_detalhado_equipe(df, df_periodo):
+    """
+    Seção isolada: trocar a equipe aqui só reexecuta este bloco,
+    usando a base e o recorte do período já carregados.
+    """
+    lista_equipes = sorted(df["EQUIPE"].dropna().unique())
+    equipe_sel = st.selectbox(
+        "Equipe (para funil detalhado)",
+        ["Todas"] + lista_equipes,
+        key="equipe_funil_detalhado",
+    )
+
+    if equipe_sel == "Todas":
+        st.info("Selecione uma equipe específica acima para ver o funil e o planejamento dessa equipe.")
+        return
+
     df_eq = df_periodo[df_periodo["EQUIPE"] == equipe_sel]
 
     if df_eq.empty:
         st.warning(f"A equipe **{equipe_sel}** não possui registros no período selecionado.")
-    else:
-        analises_eq_em = conta_analises_base(df_eq["STATUS_BASE"])   # só EM
-        reanalises_eq = conta_reanalises(df_eq["STATUS_BASE"])       # só RE
-        analises_eq_total = conta_analises(df_eq["STATUS_BASE"])     # EM + RE
-        aprov_eq = conta_aprovacoes(df_eq["STATUS_BASE"])
-        vendas_eq = conta_vendas(df_eq["STATUS_BASE"])
-        vgv_eq = df_eq["VGV"].sum()
-
-        taxa_aprov_eq = (
-            aprov_eq / analises_eq_em * 100 if analises_eq_em > 0 else 0
-        )
-        taxa_venda_analises_eq = (
-            vendas_eq / analises_eq_em * 100 if analises_eq_em > 0 else 0
+        return
+
+    funil_eq = motor.funil(data_ini, data_fim, "EQUIPE", equipe=equipe_sel)
+    analises_eq_em = int(funil_eq["ANALISES_BASE"].sum())   # só EM
+    reanalises_eq = int(funil_eq["REANALISES"].sum())       # só RE
+    analises_eq_total = int(funil_eq["ANALISES"].sum())     # EM + RE
+    aprov_eq = int(funil_eq["APROVACOES"].sum())
+    vendas_eq = int(funil_eq["VENDAS"].sum())
+    vgv_eq = float(funil_eq["VGV"].sum())
+
+    taxa_aprov_eq = (
+        aprov_eq / analises_eq_em * 100 if analises_eq_em > 0 else 0
+    )
+    taxa_venda_analises_eq = (
+        vendas_eq / analises_eq_em * 100 if analises_eq_em > 0 else 0
+    )
+    taxa_venda_aprov_eq = (
+        vendas_eq / aprov_eq * 100 if aprov_eq > 0 else 0
+    )
+
+    st.markdown(f"### Equipe: **{equipe_sel}**")
+
+    # Cards separando análise x reanálise na equipe
+    c1, c2, c3, c4, c5 = st.columns(5)
+    with c1:
+        st.metric("Análises (só EM)", analises_eq_em)
+    with c2:
+        st.metric("Reanálises", reanalises_eq)
+    with c3:
+        st.metric("Análises (EM + RE)", analises_eq_total)
+    with c4:
+        st.metric("Aprovações", aprov_eq)
+    with c5:
+        st.metric("Vendas (Total)", vendas_eq)
+
+    c6, c7, c8 = st.columns(3)
+    with c6:
+        st.metric(
+            "VGV da equipe",
+            formata_moeda(vgv_eq),
         )
-        taxa_venda_aprov_eq = (
-            vendas_eq / aprov_eq * 100 if aprov_eq > 0 else 0
+    with c7:
+        st.metric("Taxa Aprov./Análises (só EM)", f"{taxa_aprov_eq:.1f}%")
+    with c8:
+        st.metric("Taxa Vendas/Análises (só EM)", f"{taxa_venda_analises_eq:.1f}%")
+
+    c9, = st.columns(1)
+    with c9:
+        st.metric("Taxa Vendas/Aprovações", f"{taxa_venda_aprov_eq:.1f}%")
+
+    # ---------------------------------------------
+    # PLANEJAMENTO POR EQUIPE – ÚLTIMOS 3 MESES
+    # ---------------------------------------------
+    st.markdown("### 📊 Planejamento de vendas dessa equipe (base últimos 3 meses)")
+
+    # Usa a base TOTAL mas filtrando pela equipe
+    df_eq_full = df[df["EQUIPE"] == equipe_sel]
+
+    if df_eq_full["DIA"].isna().all():
+        st.info("Não há datas válidas na base para calcular os últimos 3 meses dessa equipe.")
+        return
+
+    dt_eq_all = pd.to_datetime(df_eq_full["DIA"], errors="coerce")
+    ref_date_eq = dt_eq_all.max()
+
+    if pd.isna(ref_date_eq):
+        st.info("Não foi possível identificar a data de referência da equipe na base.")
+        return
+
+    limite_3m_eq = ref_date_eq - pd.DateOffset(months=3)
+    mask_3m_eq = (dt_eq_all >= limite_3m_eq) & (dt_eq_all <= ref_date_eq)
+    df_eq_3m = df_eq_full[mask_3m_eq]
+
+    if df_eq_3m.empty:
+        st.info(
+            f"A equipe **{equipe_sel}** não possui registros nos últimos 3 meses "
+            f"(janela usada: {limite_3m_eq.date().strftime('%d/%m/%Y')} "
+            f"até {ref_date_eq.date().strftime('%d/%m/%Y')})."
         )
+        return
 
-        st.markdown(f"### Equipe: **{equipe_sel}**")
-
-        # Cards separando análise x reanálise na equipe
-        c1, c2, c3, c4, c5 = st.columns(5)
-        with c1:
-            st.metric("Análises (só EM)", analises_eq_em)
-        with c2:
-            st.metric("Reanálises", reanalises_eq)
-        with c3:
-            st.metric("Análises (EM + RE)", analises_eq_total)
-        with c4:
-            st.metric("Aprovações", aprov_eq)
-        with c5:
-            st.metric("Vendas (Total)", vendas_eq)
-
-        c6, c7, c8 = st.columns(3)
-        with c6:
-            st.metric(
-                "VGV da equipe",
-                f"R$ {vgv_eq:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
-            )
-        with c7:
-            st.metric("Taxa Aprov./Análises (só EM)", f"{taxa_aprov_eq:.1f}%")
-        with c8:
-            st.metric("Taxa Vendas/Análises (só EM)", f"{taxa_venda_analises_eq:.1f}%")
+    analises_eq_3m_base = conta_analises_base(df_eq_3m["STATUS_BASE"])  # só EM ANÁLISE
+    aprov_eq_3m = conta_aprovacoes(df_eq_3m["STATUS_BASE"])
+    vendas_eq_3m = conta_vendas(df_eq_3m["STATUS_BASE"])
+
+    if vendas_eq_3m > 0:
+        media_analise_por_venda_eq = (
+            analises_eq_3m_base / vendas_eq_3m
+            if analises_eq_3m_base > 0 else 0
+        )
+        media_aprov_por_venda_eq = (
+            aprov_eq_3m / vendas_eq_3m if aprov_eq_3m > 0 else 0
+        )
+    else:
+        media_analise_por_venda_eq = 0
+        media_aprov_por_venda_eq = 0
+
+    h1, h2, h3 = st.columns(3)
+    with h1:
+        st.metric("Análises (3m – só EM)", analises_eq_3m_base)
+    with h2:
+        st.metric("Aprovações (3m – equipe)", aprov_eq_3m)
+    with h3:
+        st.metric("Vendas (3m – equipe)", vendas_eq_3m)
+
+    h4, h5 = st.columns(2)
+    with h4:
+        st.metric(
+            "Média de ANÁLISES por venda (equipe, 3m, só EM)",
+            f"{media_analise_por_venda_eq:.1f}" if vendas_eq_3m > 0 else "—",
+        )
+    with h5:
+        st.metric(
+            "Média de APROVAÇÕES por venda (equipe, 3m)",
+            f"{media_aprov_por_venda_eq:.1f}" if vendas_eq_3m > 0 else "—",
+        )
 
-        c9, = st.columns(1)
-        with c9:
-            st.metric("Taxa Vendas/Aprovações", f"{taxa_venda_aprov_eq:.1f}%")
+    st.caption(
+        f"Janela histórica usada para a equipe **{equipe_sel}**: "
+        f"de {limite_3m_eq.date().strftime('%d/%m/%Y')} "
+        f"até {ref_date_eq.date().strftime('%d/%m/%Y')}."
+    )
 
-        # ---------------------------------------------
-        # PLANEJAMENTO POR EQUIPE – ÚLTIMOS 3 MESES
-        # ---------------------------------------------
-        st.markdown("### 📊 Planejamento de vendas dessa equipe (base últimos 3 meses)")
+    st.markdown("#### 🎯 Quantas análises/aprovações essa equipe precisa para bater a meta de vendas?")
+
+    calculadora_metas(
+        rotulo_input=f"Vendas desejadas no mês para a equipe {equipe_sel}",
+        valor_padrao=5,
+        key="vendas_planejadas_equipe",
+        rotulo_meta="Meta de vendas (equipe)",
+        media_analise_por_venda=media_analise_por_venda_eq,
+        media_aprov_por_venda=media_aprov_por_venda_eq,
+        vendas_3m=vendas_eq_3m,
+        texto_base="histórico real dessa equipe",
+        msg_sem_vendas=(
+            f"A equipe **{equipe_sel}** ainda não possui vendas registradas nos últimos 3 meses "
+            "para calcular as médias por venda."
+        ),
+    )
 
-        # Usa a base TOTAL mas filtrando pela equipe
-        df_eq_full = df[df["EQUIPE"] == equipe_sel].copy()
 
-        if df_eq_full["DIA"].isna().all():
-            st.info("Não há datas válidas na base para calcular os últimos 3 meses dessa equipe.")
-        else:
-            dt_eq_all = pd.to_datetime(df_eq_full["DIA"], errors="coerce")
-            ref_date_eq = dt_eq_all.max()
+funil_detalhado_equipe(df, df_periodo)
 
-            if pd.isna(ref_date_eq):
-                st.info("Não foi possível identificar a data de referência da equipe na base.")
-            else:
-                limite_3m_eq = ref_date_eq - pd.DateOffset(months=3)
-                mask_3m_eq = (dt_eq_all >= limite_3m_eq) & (dt_eq_all <= ref_date_eq)
-                df_eq_3m = df_eq_full[mask_3m_eq].copy()
-
-                if df_eq_3m.empty:
-                    st.info(
-                        f"A equipe **{equipe_sel}** não possui registros nos últimos 3 meses "
-                        f"(janela usada: {limite_3m_eq.date().strftime('%d/%m/%Y')} "
-                        f"até {ref_date_eq.date().strftime('%d/%m/%Y')})."
-                    )
-                else:
-                    analises_eq_3m_base = conta_analises_base(df_eq_3m["STATUS_BASE"])  # só EM ANÁLISE
-                    aprov_eq_3m = conta_aprovacoes(df_eq_3m["STATUS_BASE"])
-                    vendas_eq_3m = conta_vendas(df_eq_3m["STATUS_BASE"])
-
-                    if vendas_eq_3m > 0:
-                        media_analise_por_venda_eq = (
-                            analises_eq_3m_base / vendas_eq_3m
-                            if analises_eq_3m_base > 0 else 0
-                        )
-                        media_aprov_por_venda_eq = (
-                            aprov_eq_3m / vendas_eq_3m if aprov_eq_3m > 0 else 0
-                        )
-                    else:
-                        media_analise_por_venda_eq = 0
-                        media_aprov_por_venda_eq = 0
-
-                    h1, h2, h3 = st.columns(3)
-                    with h1:
-                        st.metric("Análises (3m – só EM)", analises_eq_3m_base)
-                    with h2:
-                        st.metric("Aprovações (3m – equipe)", aprov_eq_3m)
-                    with h3:
-                        st.metric("Vendas (3m – equipe)", vendas_eq_3m)
-
-                    h4, h5 = st.columns(2)
-                    with h4:
-                        st.metric(
-                            "Média de ANÁLISES por venda (equipe, 3m, só EM)",
-                            f"{media_analise_por_venda_eq:.1f}" if vendas_eq_3m > 0 else "—",
-                        )
-                    with h5:
-                        st.metric(
-                            "Média de APROVAÇÕES por venda (equipe, 3m)",
-                            f"{media_aprov_por_venda_eq:.1f}" if vendas_eq_3m > 0 else "—",
-                        )
-
-                    st.caption(
-                        f"Janela histórica usada para a equipe **{equipe_sel}**: "
-                        f"de {limite_3m_eq.date().strftime('%d/%m/%Y')} "
-                        f"até {ref_date_eq.date().strftime('%d/%m/%Y')}."
-                    )
-
-                    st.markdown("#### 🎯 Quantas análises/aprovações essa equipe precisa para bater a meta de vendas?")
-
-                    vendas_planejadas_eq = st.number_input(
-                        f"Vendas desejadas no mês para a equipe {equipe_sel}",
-                        min_value=0,
-                        value=5,
-                        step=1,
-                        key="vendas_planejadas_equipe",
-                    )
-
-                    if vendas_planejadas_eq > 0 and vendas_eq_3m > 0:
-                        analises_eq_necessarias = media_analise_por_venda_eq * vendas_planejadas_eq
-                        aprovacoes_eq_necessarias = media_aprov_por_venda_eq * vendas_planejadas_eq
-
-                        analises_eq_necessarias_int = int(np.ceil(analises_eq_necessarias))
-                        aprovacoes_eq_necessarias_int = int(np.ceil(aprovacoes_eq_necessarias))
-
-                        c_eq1, c_eq2, c_eq3 = st.columns(3)
-                        with c_eq1:
-                            st.metric("Meta de vendas (equipe)", vendas_planejadas_eq)
-                        with c_eq2:
-                            st.metric(
-                                "Análises necessárias (aprox.)",
-                                f"{analises_eq_necessarias_int} análises",
-                                help=(
-                                    f"Cálculo: {media_analise_por_venda_eq:.2f} análises/venda "
-                                    f"× {vendas_planejadas_eq}"
-                                ),
-                            )
-                        with c_eq3:
-                            st.metric(
-                                "Aprovações necessárias (aprox.)",
-                                f"{aprovacoes_eq_necessarias_int} aprovações",
-                                help=(
-                                    f"Cálculo: {media_aprov_por_venda_eq:.2f} aprovações/venda "
-                                    f"× {vendas_planejadas_eq}"
-                                ),
-                            )
-
-                        st.caption(
-                            "Os números são aproximados e arredondados para cima, "
-                            "baseados no histórico real dessa equipe nos últimos 3 meses."
-                        )
-                    elif vendas_planejadas_eq > 0 and vendas_eq_3m == 0:
-                        st.info(
-                            f"A equipe **{equipe_sel}** ainda não possui vendas registradas nos últimos 3 meses "
-                            "para calcular as médias por venda."
-                        )
+etapa("FUNIL DETALHADO + PLANEJAMENTO POR EQUIPE")
+fechar_rerun({"periodo": (data_ini, data_fim)})
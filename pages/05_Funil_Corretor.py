@@ -1,11 +1,21 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
-import requests
+import time
 from datetime import date, timedelta
 
 from utils.supremo_config import TOKEN_SUPREMO
+from utils.cache import cache_dados
+from utils.dados import ARQ_LEADS, BASE_URL_LEADS, le_snapshot, versao_snapshot
+from utils.formatacao import formata_moeda
+from utils.metricas_io import registrar_cache, registrar_requisicao
+from utils.graficos import exibe_grafico, montar_grafico_funil
+from utils.tabelas import coluna_percentual
+from utils.desempenho import cronometro, etapa, fechar_rerun, iniciar_rerun, marco, parar
+from utils.motor_consultas import escolher_motor
+from utils.visoes import ler_planilha_normalizada
+
+iniciar_rerun("05_Funil_Corretor")
 
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
@@ -23,98 +33,28 @@ st.caption(
     "e planeje quantas análises/aprovações ele precisará para bater a meta de vendas."
 )
 
-# ---------------------------------------------------------
-# CONFIG: LINK DA PLANILHA  (MESMO DO APP PRINCIPAL)
-# ---------------------------------------------------------
-SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
-GID_ANALISES = "1574157905"
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}"
-
-# ---------------------------------------------------------
-# CONFIG: API LEADS SUPREMO
-# ---------------------------------------------------------
-BASE_URL_LEADS = "https://api.supremocrm.com.br/v1/leads"
-
-
-# ---------------------------------------------------------
-# FUNÇÃO AUXILIAR PARA LIMPAR DATA
-# ---------------------------------------------------------
-def limpar_para_data(serie):
-    dt = pd.to_datetime(serie, dayfirst=True, errors="coerce")
-    return dt.dt.date
-
-
 # ---------------------------------------------------------
 # CARREGAR E PREPARAR DADOS
 # ---------------------------------------------------------
-@st.cache_data(ttl=60)
+@cache_dados(ttl=60, nome="05.carregar_dados", compartilhado=True)
+@cronometro("carregar_dados")
 def carregar_dados():
-    df = pd.read_csv(CSV_URL)
-
-    # Padroniza colunas
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # DATA / DIA
-    if "DATA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DATA"])
-    elif "DIA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DIA"])
-    else:
-        df["DIA"] = pd.NaT
-
-    # EQUIPE / CORRETOR
-    for col in ["EQUIPE", "CORRETOR"]:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .fillna("NÃO INFORMADO")
-                .astype(str)
-                .str.upper()
-                .str.strip()
-            )
-        else:
-            df[col] = "NÃO INFORMADO"
-
-    # SITUAÇÃO BASE
-    possiveis_cols_situacao = [
-        "SITUAÇÃO",
-        "SITUAÇÃO ATUAL",
-        "STATUS",
-        "SITUACAO",
-        "SITUACAO ATUAL",
-    ]
-    col_situacao = None
-    for c in possiveis_cols_situacao:
-        if c in df.columns:
-            col_situacao = c
-            break
-
-    df["STATUS_BASE"] = ""
-    if col_situacao:
-        status = df[col_situacao].fillna("").astype(str).str.upper()
-
-        df.loc[status.str.contains("EM ANÁLISE"), "STATUS_BASE"] = "EM ANÁLISE"
-        df.loc[status.str.contains("REANÁLISE"), "STATUS_BASE"] = "REANÁLISE"
-        df.loc[status.str.contains("APROV"), "STATUS_BASE"] = "APROVADO"
-        df.loc[status.str.contains("REPROV"), "STATUS_BASE"] = "REPROVADO"
-        df.loc[status.str.contains("VENDA GERADA"), "STATUS_BASE"] = "VENDA GERADA"
-        df.loc[status.str.contains("VENDA INFORMADA"), "STATUS_BASE"] = "VENDA INFORMADA"
-
-    # VGV (via coluna OBSERVAÇÕES) – sempre em REAL
-    if "OBSERVAÇÕES" in df.columns:
-        df["VGV"] = pd.to_numeric(df["OBSERVAÇÕES"], errors="coerce").fillna(0.0)
-    else:
-        df["VGV"] = 0.0
-
-    return df
+    # Normalizada uma vez por CSV e mapeada do snapshot compartilhado (utils/visoes.py)
+    return ler_planilha_normalizada()
 
 
 df = carregar_dados()
+versao_dados = versao_snapshot(df)
+
+# pandas sobre o df da página, ou SQL na mesma planilha (MR_MOTOR=duckdb / sqlite)
+motor = escolher_motor(df)
 
 if df.empty:
     st.error("Não foi possível carregar dados da planilha. Verifique o link/gid.")
-    st.stop()
+    parar()
+
 
+etapa("CARREGAR E PREPARAR DADOS")
 
 # ---------------------------------------------------------
 # CARREGAR LEADS DO SUPREMO (ATÉ ~1000 LEADS)
@@ -123,15 +63,21 @@ def get_leads_page(pagina: int = 1) -> pd.DataFrame:
     """
     Busca uma página de leads na API do Supremo.
     """
+    import requests  # só carrega o módulo quando realmente vai na API
+
     headers = {"Authorization": f"Bearer {TOKEN_SUPREMO}"}
     params = {"pagina": pagina}
 
+    ini = time.perf_counter()
     try:
         resp = requests.get(BASE_URL_LEADS, headers=headers, params=params, timeout=30)
     except Exception as e:
+        registrar_requisicao("leads", (time.perf_counter() - ini) * 1000, "erro")
         st.error(f"Erro de conexão com a API de leads: {e}")
         return pd.DataFrame()
 
+    registrar_requisicao("leads", (time.perf_counter() - ini) * 1000, resp.status_code, len(resp.content))
+
     if resp.status_code != 200:
         st.error(f"Erro ao buscar leads (HTTP {resp.status_code}): {resp.text}")
         return pd.DataFrame()
@@ -152,11 +98,19 @@ def get_leads_page(pagina: int = 1) -> pd.DataFrame:
     return pd.DataFrame()
 
 
-@st.cache_data(ttl=60)
+@cache_dados(ttl=60, nome="05.carregar_leads")
 def carregar_leads(limit: int = 1000, max_pages: int = 20) -> pd.DataFrame:
     """
     Busca até 'limit' leads no Supremo, varrendo páginas sequencialmente.
+    Se o snapshot em disco (home / aquecer_cache.py) estiver fresco, usa ele.
     """
+    df_snapshot = le_snapshot(ARQ_LEADS)
+    if df_snapshot is not None:
+        registrar_cache("leads", "hit")
+        return df_snapshot.head(limit)
+
+    registrar_cache("leads", "miss")
+
     dfs = []
     total = 0
     pagina = 1
@@ -197,6 +151,8 @@ if "df_leads" not in st.session_state:
     st.session_state["df_leads"] = df_leads
 
 
+etapa("CARREGAR LEADS DO SUPREMO")
+
 # ---------------------------------------------------------
 # FUNÇÕES AUXILIARES DO FUNIL
 # ---------------------------------------------------------
@@ -223,6 +179,63 @@ def conta_vendas(s):
     return s.isin(["VENDA GERADA", "VENDA INFORMADA"]).sum()
 
 
+# ---------------------------------------------------------
+# CALCULADORA DE METAS (FRAGMENTO – SÓ ELA RODA AO MUDAR A META)
+# ---------------------------------------------------------
+@st.fragment
+def calculadora_metas(corretor, media_analise_por_venda, media_aprov_por_venda, vendas_3m):
+    """
+    Mexer na meta reexecuta só este bloco: as médias do corretor nos
+    últimos 3 meses chegam prontas, sem recarregar planilha nem leads.
+    """
+    vendas_planejadas_cor = st.number_input(
+        f"Meta de vendas no mês para {corretor}",
+        min_value=0,
+        value=3,
+        step=1,
+        key="vendas_planejadas_corretor",
+    )
+
+    if vendas_planejadas_cor > 0 and vendas_3m > 0:
+        analises_cor_necessarias = media_analise_por_venda * vendas_planejadas_cor
+        aprovacoes_cor_necessarias = media_aprov_por_venda * vendas_planejadas_cor
+
+        analises_cor_necessarias_int = int(np.ceil(analises_cor_necessarias))
+        aprovacoes_cor_necessarias_int = int(np.ceil(aprovacoes_cor_necessarias))
+
+        c_cor1, c_cor2, c_cor3 = st.columns(3)
+        with c_cor1:
+            st.metric("Meta de vendas (corretor)", vendas_planejadas_cor)
+        with c_cor2:
+            st.metric(
+                "Análises necessárias (aprox.)",
+                f"{analises_cor_necessarias_int} análises",
+                help=(
+                    f"Cálculo: {media_analise_por_venda:.2f} análises/venda "
+                    f"× {vendas_planejadas_cor}"
+                ),
+            )
+        with c_cor3:
+            st.metric(
+                "Aprovações necessárias (aprox.)",
+                f"{aprovacoes_cor_necessarias_int} aprovações",
+                help=(
+                    f"Cálculo: {media_aprov_por_venda:.2f} aprovações/venda "
+                    f"× {vendas_planejadas_cor}"
+                ),
+            )
+
+        st.caption(
+            "Os números são aproximados e arredondados para cima, "
+            "baseados no histórico real desse corretor nos últimos 3 meses."
+        )
+    elif vendas_planejadas_cor > 0 and vendas_3m == 0:
+        st.info(
+            f"O corretor **{corretor}** ainda não possui vendas registradas "
+            "nos últimos 3 meses para calcular as médias por venda."
+        )
+
+
 # ---------------------------------------------------------
 # SIDEBAR – FILTROS
 # ---------------------------------------------------------
@@ -260,13 +273,14 @@ corretor_sel = st.sidebar.selectbox(
     ["Selecione um corretor"] + lista_corretor,
 )
 
+marco()
+
 # ---------------------------------------------------------
 # APLICA FILTRO DE PERÍODO
 # ---------------------------------------------------------
-df_periodo = df.copy()
-dia_series_all = limpar_para_data(df_periodo["DIA"])
-mask_data_all = (dia_series_all >= data_ini) & (dia_series_all <= data_fim)
-df_periodo = df_periodo[mask_data_all]
+# DIA já chega normalizado do cache – não reprocessa as datas a cada rerun
+mask_data_all = (df["DIA"] >= data_ini) & (df["DIA"] <= data_fim)
+df_periodo = df[mask_data_all]
 
 registros_filtrados = len(df_periodo)
 
@@ -278,14 +292,18 @@ st.caption(
 
 if corretor_sel == "Selecione um corretor":
     st.info("Selecione um corretor na barra lateral para ver o funil individual.")
-    st.stop()
+    parar({"periodo": (data_ini, data_fim), "corretor": corretor_sel})
+
+etapa("APLICA FILTRO DE PERÍODO")
 
 # ---------------------------------------------------------
 # FUNIL DO CORRETOR NO PERÍODO SELECIONADO
 # ---------------------------------------------------------
 st.markdown(f"## 🧑‍💼 Funil do Corretor: **{corretor_sel}**")
 
-df_cor_periodo = df_periodo[df_periodo["CORRETOR"] == corretor_sel].copy()
+funil_cor = motor.funil(data_ini, data_fim, "CORRETOR", corretor=corretor_sel)
+
+etapa("FUNIL DO CORRETOR NO PERÍODO SELECIONADO")
 
 # ---------------------------------------------------------
 # LEADS DO CORRETOR NO PERÍODO (API SUPREMO)
@@ -319,20 +337,22 @@ if not df_leads.empty and "data_captura" in df_leads.columns:
 
         total_leads_corretor_periodo = len(df_leads_cor)
 
-if df_cor_periodo.empty:
+if funil_cor.empty:
     st.warning(
         f"O corretor **{corretor_sel}** não possui registros na planilha "
         "para o período selecionado."
     )
 else:
+    linha_cor = funil_cor.iloc[0]
+
     # Separando análises
-    analises_em_cor = conta_analises_base(df_cor_periodo["STATUS_BASE"])   # só EM
-    reanalises_cor = conta_reanalises(df_cor_periodo["STATUS_BASE"])       # só RE
-    analises_total_cor = conta_analises(df_cor_periodo["STATUS_BASE"])     # EM + RE
+    analises_em_cor = int(linha_cor["ANALISES_BASE"])   # só EM
+    reanalises_cor = int(linha_cor["REANALISES"])       # só RE
+    analises_total_cor = int(linha_cor["ANALISES"])     # EM + RE
 
-    aprov_cor = conta_aprovacoes(df_cor_periodo["STATUS_BASE"])
-    vendas_cor = conta_vendas(df_cor_periodo["STATUS_BASE"])
-    vgv_cor = df_cor_periodo["VGV"].sum()
+    aprov_cor = int(linha_cor["APROVACOES"])
+    vendas_cor = int(linha_cor["VENDAS"])
+    vgv_cor = float(linha_cor["VGV"])
 
     taxa_aprov_cor = (aprov_cor / analises_em_cor * 100) if analises_em_cor > 0 else 0
     taxa_venda_analises_cor = (
@@ -375,7 +395,7 @@ else:
     with c6:
         st.metric(
             "VGV do corretor (período)",
-            f"R$ {vgv_cor:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+            formata_moeda(vgv_cor),
         )
     with c7:
         st.metric("Taxa Aprov./Análises (só EM)", f"{taxa_aprov_cor:.1f}%")
@@ -408,37 +428,21 @@ else:
     # 🔽 TABELA EM CIMA, GRÁFICO EMBAIXO
     st.markdown("### 📋 Tabela do Funil do Corretor (período)")
     st.dataframe(
-        df_funil_cor.style.format(
-            {"Conversão da etapa anterior (%)": "{:.1f}%".format}
-        ),
+        df_funil_cor,
         use_container_width=True,
         hide_index=True,
+        column_config={"Conversão da etapa anterior (%)": coluna_percentual()},
     )
 
     st.markdown("### 📊 Gráfico do Funil do Corretor (período)")
-    chart_funil_cor = (
-        alt.Chart(df_funil_cor)
-        .mark_bar(cornerRadiusTopLeft=6, cornerRadiusTopRight=6)
-        .encode(
-            x=alt.X("Quantidade:Q", title="Quantidade"),
-            y=alt.Y(
-                "Etapa:N",
-                sort=["Análises (só EM)", "Aprovações", "Vendas"],
-                title="Etapa",
-            ),
-            tooltip=[
-                "Etapa",
-                "Quantidade",
-                alt.Tooltip(
-                    "Conversão da etapa anterior (%)",
-                    title="Conversão",
-                    format=".1f",
-                ),
-            ],
-        )
-        .properties(height=300)
+    exibe_grafico(
+        "funil_corretor",
+        versao_dados,
+        (data_ini, data_fim, corretor_sel),
+        lambda: montar_grafico_funil(df_funil_cor),
     )
-    st.altair_chart(chart_funil_cor, use_container_width=True)
+
+etapa("LEADS DO CORRETOR NO PERÍODO")
 
 # ---------------------------------------------------------
 # PLANEJAMENTO INDIVIDUAL – BASEADO NOS ÚLTIMOS 3 MESES DO CORRETOR
@@ -516,49 +520,12 @@ else:
 
             st.markdown("### 🎯 Quantas análises/aprovações esse corretor precisa para bater a meta de vendas?")
 
-            vendas_planejadas_cor = st.number_input(
-                f"Meta de vendas no mês para {corretor_sel}",
-                min_value=0,
-                value=3,
-                step=1,
-                key="vendas_planejadas_corretor",
+            calculadora_metas(
+                corretor_sel,
+                media_analise_por_venda_cor,
+                media_aprov_por_venda_cor,
+                vendas_cor_3m,
             )
 
-            if vendas_planejadas_cor > 0 and vendas_cor_3m > 0:
-                analises_cor_necessarias = media_analise_por_venda_cor * vendas_planejadas_cor
-                aprovacoes_cor_necessarias = media_aprov_por_venda_cor * vendas_planejadas_cor
-
-                analises_cor_necessarias_int = int(np.ceil(analises_cor_necessarias))
-                aprovacoes_cor_necessarias_int = int(np.ceil(aprovacoes_cor_necessarias))
-
-                c_cor1, c_cor2, c_cor3 = st.columns(3)
-                with c_cor1:
-                    st.metric("Meta de vendas (corretor)", vendas_planejadas_cor)
-                with c_cor2:
-                    st.metric(
-                        "Análises necessárias (aprox.)",
-                        f"{analises_cor_necessarias_int} análises",
-                        help=(
-                            f"Cálculo: {media_analise_por_venda_cor:.2f} análises/venda "
-                            f"× {vendas_planejadas_cor}"
-                        ),
-                    )
-                with c_cor3:
-                    st.metric(
-                        "Aprovações necessárias (aprox.)",
-                        f"{aprovacoes_cor_necessarias_int} aprovações",
-                        help=(
-                            f"Cálculo: {media_aprov_por_venda_cor:.2f} aprovações/venda "
-                            f"× {vendas_planejadas_cor}"
-                        ),
-                    )
-
-                st.caption(
-                    "Os números são aproximados e arredondados para cima, "
-                    "baseados no histórico real desse corretor nos últimos 3 meses."
-                )
-            elif vendas_planejadas_cor > 0 and vendas_cor_3m == 0:
-                st.info(
-                    f"O corretor **{corretor_sel}** ainda não possui vendas registradas "
-                    "nos últimos 3 meses para calcular as médias por venda."
-                )
+etapa("PLANEJAMENTO INDIVIDUAL – BASEADO NOS ÚLTIMOS 3 MESES DO CORRETOR")
+fechar_rerun({"periodo": (data_ini, data_fim), "corretor": corretor_sel})
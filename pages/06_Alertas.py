@@ -2,6 +2,14 @@ import streamlit as st
 import pandas as pd
 from datetime import timedelta, date
 
+from utils.cache import cache_dados
+from utils.consultas import calcular_alertas
+from utils.tabelas import coluna_data
+from utils.desempenho import cronometro, etapa, fechar_rerun, iniciar_rerun, marco, parar
+from utils.visoes import le_visao, ler_planilha_normalizada
+
+iniciar_rerun("06_Alertas")
+
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
 # ---------------------------------------------------------
@@ -13,83 +21,23 @@ st.set_page_config(
 
 st.title("🔴 Corretores sem análises nos últimos 3 dias (janela de 30 dias)")
 
-# ---------------------------------------------------------
-# CONFIG: LINK DA PLANILHA  (MESMO DO APP PRINCIPAL)
-# ---------------------------------------------------------
-SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
-GID_ANALISES = "1574157905"
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}"
-
-# ---------------------------------------------------------
-# FUNÇÃO AUXILIAR PARA LIMPAR DATA
-# ---------------------------------------------------------
-def limpar_para_data(serie):
-    dt = pd.to_datetime(serie, dayfirst=True, errors="coerce")
-    return dt.dt.date
-
 # ---------------------------------------------------------
 # CARREGAR DADOS
 # ---------------------------------------------------------
-@st.cache_data(ttl=60)
+@cache_dados(ttl=60, nome="06.carregar_dados", compartilhado=True)
+@cronometro("carregar_dados")
 def carregar_dados():
-    df = pd.read_csv(CSV_URL)
-
-    # Padroniza colunas
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # DATA / DIA
-    if "DATA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DATA"])
-    elif "DIA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DIA"])
-    else:
-        df["DIA"] = pd.NaT
-
-    # EQUIPE / CORRETOR
-    for col in ["EQUIPE", "CORRETOR"]:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .fillna("NÃO INFORMADO")
-                .astype(str)
-                .str.upper()
-                .str.strip()
-            )
-        else:
-            df[col] = "NÃO INFORMADO"
-
-    # SITUAÇÃO BASE
-    possiveis_cols_situacao = [
-        "SITUAÇÃO",
-        "SITUAÇÃO ATUAL",
-        "STATUS",
-        "SITUACAO",
-        "SITUACAO ATUAL",
-    ]
-    col_situacao = None
-    for c in possiveis_cols_situacao:
-        if c in df.columns:
-            col_situacao = c
-            break
-
-    df["STATUS_BASE"] = ""
-    if col_situacao:
-        status = df[col_situacao].fillna("").astype(str).str.upper()
-        df.loc[status.str.contains("EM ANÁLISE"), "STATUS_BASE"] = "EM ANÁLISE"
-        df.loc[status.str.contains("REANÁLISE"), "STATUS_BASE"] = "REANÁLISE"
-        df.loc[status.str.contains("APROV"), "STATUS_BASE"] = "APROVADO"
-        df.loc[status.str.contains("REPROV"), "STATUS_BASE"] = "REPROVADO"
-        df.loc[status.str.contains("VENDA GERADA"), "STATUS_BASE"] = "VENDA GERADA"
-        df.loc[status.str.contains("VENDA INFORMADA"), "STATUS_BASE"] = "VENDA INFORMADA"
-
-    return df
+    # Normalizada uma vez por CSV e mapeada do snapshot compartilhado (utils/visoes.py)
+    return ler_planilha_normalizada()
 
 
 df = carregar_dados()
 
 if df.empty:
     st.error("Não foi possível carregar dados da planilha. Verifique o link/gid.")
-    st.stop()
+    parar()
+
+etapa("CARREGAR DADOS")
 
 # ---------------------------------------------------------
 # SIDEBAR – FILTRO DE EQUIPE
@@ -105,7 +53,9 @@ if equipe_sel != "Todas":
 
 if df.empty:
     st.warning("Não há registros para a equipe selecionada.")
-    st.stop()
+    parar()
+
+marco()
 
 # ---------------------------------------------------------
 # LÓGICA DO ALERTA (3 DIAS SEM ANÁLISE, DENTRO DA JANELA DE 30 DIAS)
@@ -119,7 +69,7 @@ if df_analise_base.empty or df_analise_base["DIA"].isna().all():
         st.info("Ainda não há análises registradas para calcular alertas.")
     else:
         st.info(f"A equipe **{equipe_sel}** não possui análises registradas para cálculo de alertas.")
-    st.stop()
+    parar()
 
 # Converte a data de análise
 dt_analise = pd.to_datetime(df_analise_base["DIA"], errors="coerce")
@@ -129,7 +79,7 @@ df_analise_base = df_analise_base.assign(DT_ANALISE=dt_analise)
 data_ref_ts = df_analise_base["DT_ANALISE"].max()
 if pd.isna(data_ref_ts):
     st.info("Não foi possível identificar a data de referência na base.")
-    st.stop()
+    parar()
 
 data_ref = data_ref_ts.date()
 data_inicio_janela = data_ref - timedelta(days=30)
@@ -147,40 +97,23 @@ if df_analise_30.empty:
     if equipe_sel != "Todas":
         msg_base = f"A equipe **{equipe_sel}** não possui análises nos últimos 30 dias."
     st.info(msg_base)
-    st.stop()
-
-# Última análise (dentro da janela de 30 dias) por corretor
-ultima_analise_corretor = (
-    df_analise_30.dropna(subset=["DT_ANALISE"])
-    .groupby("CORRETOR", as_index=False)["DT_ANALISE"]
-    .max()
-)
-
-# Lista de todos os corretores da base (já filtrada pela equipe, se tiver)
-corretores_todos = sorted(df["CORRETOR"].dropna().unique().tolist())
-
-registros_alerta = []
-
-for corr in corretores_todos:
-    linha = ultima_analise_corretor[ultima_analise_corretor["CORRETOR"] == corr]
+    parar()
 
-    if linha.empty:
-        # esse corretor NÃO teve análise nos últimos 30 dias
-        # ou nunca analisou – fica de fora do alerta
-        continue
+# Lista pronta do materializar_visoes.py (mesma regra, por equipe) se ele
+# publicou para esta planilha; senão calcula aqui
+visao_alertas = le_visao("alertas", df)
 
-    ultima_dt = linha["DT_ANALISE"].iloc[0].date()
-    dias_sem = (data_ref - ultima_dt).days
+if visao_alertas is not None:
+    registros_alerta = (
+        visao_alertas[visao_alertas["EQUIPE_FILTRO"] == equipe_sel]
+        .drop(columns=["EQUIPE_FILTRO"])
+        .to_dict("records")
+    )
+else:
+    # Mesma regra num groupby só (utils/consultas.py, medida no bench/benchmark.py)
+    registros_alerta = calcular_alertas(df).to_dict("records")
 
-    # entra no alerta apenas se estiver há 3 dias ou mais sem análise
-    if dias_sem >= 3:
-        registros_alerta.append(
-            {
-                "CORRETOR": corr,
-                "ÚLTIMA ANÁLISE": ultima_dt.strftime("%d/%m/%Y"),
-                "DIAS SEM ANÁLISE (janela 30d)": dias_sem,
-            }
-        )
+etapa("LÓGICA DO ALERTA")
 
 # ---------------------------------------------------------
 # EXIBIÇÃO
@@ -212,14 +145,21 @@ else:
         "DIAS SEM ANÁLISE (janela 30d)", ascending=False
     )
 
-    # Destaque em vermelho na coluna de dias
-    def colorir_dias(val):
-        return "color: #f97373; font-weight: bold;"
-
+    # Destaque visual da coluna de dias via column_config (sem Styler)
     st.dataframe(
-        df_alerta.style.applymap(
-            colorir_dias, subset=["DIAS SEM ANÁLISE (janela 30d)"]
-        ),
+        df_alerta,
         use_container_width=True,
         hide_index=True,
+        column_config={
+            "ÚLTIMA ANÁLISE": coluna_data(),
+            "DIAS SEM ANÁLISE (janela 30d)": st.column_config.ProgressColumn(
+                "DIAS SEM ANÁLISE (janela 30d)",
+                format="%d dias",
+                min_value=0,
+                max_value=30,
+            ),
+        },
     )
+
+etapa("EXIBIÇÃO")
+fechar_rerun({"equipe": equipe_sel})
@@ -1,8 +1,16 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 from datetime import date
 
+from utils.cache import cache_dados
+from utils.consultas import buscar_cliente
+from utils.formatacao import formata_data, formata_moeda
+from utils.tabelas import coluna_data, coluna_moeda
+from utils.desempenho import cronometro, etapa, fechar_rerun, iniciar_rerun, marco, parar
+from utils.visoes import ler_planilha_normalizada
+
+iniciar_rerun("07_Clientes_MR")
+
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
 # ---------------------------------------------------------
@@ -31,130 +39,18 @@ with col_logo:
         st.write("MR Imóveis")
 
 
-# ---------------------------------------------------------
-# FUNÇÃO AUXILIAR PARA LIMPAR DATA
-# ---------------------------------------------------------
-def limpar_para_data(serie):
-    dt = pd.to_datetime(serie, dayfirst=True, errors="coerce")
-    return dt.dt.date
-
-
-# ---------------------------------------------------------
-# CONFIG: LINK DA PLANILHA
-# ---------------------------------------------------------
-SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
-GID_ANALISES = "1574157905"
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}"
-
+marco()
 
 # ---------------------------------------------------------
 # CARREGAR E PREPARAR DADOS
 # ---------------------------------------------------------
-@st.cache_data(ttl=60)
+@cache_dados(ttl=60, nome="07.carregar_dados", compartilhado=True)
+@cronometro("carregar_dados")
 def carregar_dados():
-    df = pd.read_csv(CSV_URL)
-
-    # Padroniza nomes de colunas
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # DATA / DIA
-    if "DATA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DATA"])
-    elif "DIA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DIA"])
-    else:
-        df["DIA"] = pd.NaT
-
-    # EQUIPE / CORRETOR
-    for col in ["EQUIPE", "CORRETOR"]:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .fillna("NÃO INFORMADO")
-                .astype(str)
-                .str.upper()
-                .str.strip()
-            )
-        else:
-            df[col] = "NÃO INFORMADO"
-
-    # -------------------------------------------------
-    # CONSTRUTORA / EMPREENDIMENTO (para última mov.)
-    # -------------------------------------------------
-    possiveis_construtora = ["CONSTRUTORA", "INCORPORADORA"]
-    possiveis_empreend = ["EMPREENDIMENTO", "PRODUTO", "IMÓVEL", "IMOVEL"]
-
-    col_construtora = None
-    for c in possiveis_construtora:
-        if c in df.columns:
-            col_construtora = c
-            break
-
-    col_empreend = None
-    for c in possiveis_empreend:
-        if c in df.columns:
-            col_empreend = c
-            break
-
-    if col_construtora is None:
-        df["CONSTRUTORA_BASE"] = "NÃO INFORMADO"
-    else:
-        df["CONSTRUTORA_BASE"] = (
-            df[col_construtora].fillna("NÃO INFORMADO").astype(str).str.upper().str.strip()
-        )
-
-    if col_empreend is None:
-        df["EMPREENDIMENTO_BASE"] = "NÃO INFORMADO"
-    else:
-        df["EMPREENDIMENTO_BASE"] = (
-            df[col_empreend].fillna("NÃO INFORMADO").astype(str).str.upper().str.strip()
-        )
-
-    # STATUS BASE + COLUNA ORIGINAL DE SITUAÇÃO
-    possiveis_cols_situacao = [
-        "SITUAÇÃO",
-        "SITUAÇÃO ATUAL",
-        "STATUS",
-        "SITUACAO",
-        "SITUACAO ATUAL",
-    ]
-    col_situacao = None
-    for c in possiveis_cols_situacao:
-        if c in df.columns:
-            col_situacao = c
-            break
-
-    df["STATUS_BASE"] = ""
-    if col_situacao:
-        status = df[col_situacao].fillna("").astype(str).str.upper()
-        df.loc[status.str.contains("EM ANÁLISE"), "STATUS_BASE"] = "EM ANÁLISE"
-        df.loc[status.str.contains("REANÁLISE"), "STATUS_BASE"] = "REANÁLISE"
-        df.loc[status.str.contains("APROV"), "STATUS_BASE"] = "APROVADO"
-        df.loc[status.str.contains("REPROV"), "STATUS_BASE"] = "REPROVADO"
-        df.loc[status.str.contains("VENDA GERADA"), "STATUS_BASE"] = "VENDA GERADA"
-        df.loc[status.str.contains("VENDA INFORMADA"), "STATUS_BASE"] = "VENDA INFORMADA"
-
-        # Situação ORIGINAL – exatamente como na célula (só em maiúsculo e sem espaços extras)
-        df["SITUACAO_ORIGINAL"] = (
-            df[col_situacao].fillna("").astype(str).str.upper().str.strip()
-        )
-    else:
-        df["SITUACAO_ORIGINAL"] = "NÃO INFORMADO"
+    # Normalizada uma vez por CSV e mapeada do snapshot compartilhado (utils/visoes.py)
+    df = ler_planilha_normalizada()
 
-    # OBSERVAÇÕES – guarda texto original e extrai VGV numérico
-    if "OBSERVAÇÕES" in df.columns:
-        df["OBSERVACOES_RAW"] = (
-            df["OBSERVAÇÕES"]
-            .fillna("")
-            .astype(str)
-            .str.strip()
-        )
-        df["VGV"] = pd.to_numeric(df["OBSERVAÇÕES"], errors="coerce").fillna(0.0)
-    else:
-        df["OBSERVACOES_RAW"] = ""
-        df["VGV"] = 0.0
-
-    # NOVO: OBSERVAÇÕES 2 – para detalhamento de VENDA GERADA / VENDA INFORMADA
+    # OBSERVAÇÕES 2 – para detalhamento de VENDA GERADA / VENDA INFORMADA
     if "OBSERVAÇÕES 2" in df.columns:
         df["OBSERVACOES2_RAW"] = (
             df["OBSERVAÇÕES 2"]
@@ -165,41 +61,6 @@ def carregar_dados():
     else:
         df["OBSERVACOES2_RAW"] = ""
 
-    # TENTA IDENTIFICAR COLUNA DE NOME E CPF DO CLIENTE
-    possiveis_nome = ["NOME", "CLIENTE", "NOME CLIENTE", "NOME DO CLIENTE"]
-    possiveis_cpf = ["CPF", "CPF CLIENTE", "CPF DO CLIENTE"]
-
-    col_nome = None
-    for c in possiveis_nome:
-        if c in df.columns:
-            col_nome = c
-            break
-
-    col_cpf = None
-    for c in possiveis_cpf:
-        if c in df.columns:
-            col_cpf = c
-            break
-
-    # Nome base
-    if col_nome is None:
-        df["NOME_CLIENTE_BASE"] = "NÃO INFORMADO"
-    else:
-        df["NOME_CLIENTE_BASE"] = (
-            df[col_nome].fillna("NÃO INFORMADO").astype(str).str.upper().str.strip()
-        )
-
-    # CPF base (apenas dígitos)
-    if col_cpf is None:
-        df["CPF_CLIENTE_BASE"] = ""
-    else:
-        df["CPF_CLIENTE_BASE"] = (
-            df[col_cpf]
-            .fillna("")
-            .astype(str)
-            .str.replace(r"\D", "", regex=True)
-        )
-
     return df
 
 
@@ -207,7 +68,9 @@ df = carregar_dados()
 
 if df.empty:
     st.error("Não foi possível carregar dados da planilha. Verifique o link.")
-    st.stop()
+    parar()
+
+etapa("CARREGAR E PREPARAR DADOS")
 
 # ---------------------------------------------------------
 # BARRA LATERAL – BUSCA
@@ -229,23 +92,14 @@ st.sidebar.caption(
     "• CPF: digite só números (não precisa de ponto ou traço)"
 )
 
+marco()
+
 # ---------------------------------------------------------
 # FILTRO POR BUSCA
 # ---------------------------------------------------------
-df_resultado = pd.DataFrame()
-
-if termo.strip():
-    termo_limpo = termo.strip().upper()
+df_resultado = buscar_cliente(df, termo, por="nome" if tipo_busca.startswith("Nome") else "cpf").copy()
 
-    if tipo_busca.startswith("Nome"):
-        df_resultado = df[
-            df["NOME_CLIENTE_BASE"].str.contains(termo_limpo, na=False)
-        ].copy()
-    else:
-        termo_cpf = "".join(ch for ch in termo if ch.isdigit())
-        df_resultado = df[
-            df["CPF_CLIENTE_BASE"].str.contains(termo_cpf, na=False)
-        ].copy()
+etapa("FILTRO POR BUSCA")
 
 # ---------------------------------------------------------
 # EXIBIÇÃO DOS RESULTADOS
@@ -298,10 +152,10 @@ else:
         resumo[
             ["NOME", "CPF", "ULT_STATUS", "ULT_DATA", "ANALISES", "APROVACOES", "VENDAS", "VGV"]
         ]
-        .sort_values(["VENDAS", "VGV"], ascending=False)
-        .style.format({"VGV": "R$ {:,.2f}".format}),
+        .sort_values(["VENDAS", "VGV"], ascending=False),
         use_container_width=True,
         hide_index=True,
+        column_config={"ULT_DATA": coluna_data(), "VGV": coluna_moeda()},
     )
 
     st.markdown("#### 💳 Detalhes por cliente (cards)")
@@ -385,10 +239,7 @@ else:
 
             # ------- LADO DIREITO: ÚLTIMA MOVIMENTAÇÃO -------
             with col_top2:
-                if pd.notna(row["ULT_DATA"]):
-                    data_fmt = row["ULT_DATA"].strftime("%d/%m/%Y")
-                else:
-                    data_fmt = "NÃO INFORMADA"
+                data_fmt = formata_data(row["ULT_DATA"], vazio="NÃO INFORMADA")
                 st.write(f"**Última movimentação:** `{data_fmt}`")
 
             # Métricas separando análise / reanálise
@@ -408,5 +259,8 @@ else:
             with m6:
                 st.metric(
                     "VGV total",
-                    f"R$ {row['VGV']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+                    formata_moeda(row['VGV'])
                 )
+
+etapa("EXIBIÇÃO DOS RESULTADOS")
+fechar_rerun({"busca": (tipo_busca, termo)})
@@ -1,7 +1,15 @@
 import streamlit as st
-import pandas as pd
 from datetime import date, timedelta
 
+from utils.cache import cache_dados
+from utils.consultas import buscar_cliente, status_atual
+from utils.formatacao import formata_data, formata_data_serie, formata_moeda
+from utils.tabelas import tabela_paginada
+from utils.desempenho import cronometro, etapa, fechar_rerun, iniciar_rerun, marco, parar
+from utils.visoes import le_visao, ler_planilha_normalizada
+
+iniciar_rerun("08_Clientes_em_Analise")
+
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
 # ---------------------------------------------------------
@@ -32,172 +40,25 @@ with col_tit:
     )
 
 
-# ---------------------------------------------------------
-# FUNÇÃO AUXILIAR PARA LIMPAR DATA
-# ---------------------------------------------------------
-def limpar_para_data(serie):
-    dt = pd.to_datetime(serie, dayfirst=True, errors="coerce")
-    return dt.dt.date
-
-
-# ---------------------------------------------------------
-# CONFIG: LINK DA PLANILHA (MESMO DA PÁGINA CLIENTES MR)
-# ---------------------------------------------------------
-SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
-GID_ANALISES = "1574157905"
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}"
-
+marco()
 
 # ---------------------------------------------------------
 # CARREGAR E PREPARAR DADOS (MESMA LÓGICA DA CLIENTES MR)
 # ---------------------------------------------------------
-@st.cache_data(ttl=60)
+@cache_dados(ttl=60, nome="08.carregar_dados", compartilhado=True)
+@cronometro("carregar_dados")
 def carregar_dados():
-    df = pd.read_csv(CSV_URL)
-
-    # Padroniza nomes de colunas
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # DATA / DIA
-    if "DATA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DATA"])
-    elif "DIA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DIA"])
-    else:
-        df["DIA"] = pd.NaT
-
-    # EQUIPE / CORRETOR
-    for col in ["EQUIPE", "CORRETOR"]:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .fillna("NÃO INFORMADO")
-                .astype(str)
-                .str.upper()
-                .str.strip()
-            )
-        else:
-            df[col] = "NÃO INFORMADO"
-
-    # CONSTRUTORA / EMPREENDIMENTO
-    possiveis_construtora = ["CONSTRUTORA", "INCORPORADORA"]
-    possiveis_empreend = ["EMPREENDIMENTO", "PRODUTO", "IMÓVEL", "IMOVEL"]
-
-    col_construtora = None
-    for c in possiveis_construtora:
-        if c in df.columns:
-            col_construtora = c
-            break
-
-    col_empreend = None
-    for c in possiveis_empreend:
-        if c in df.columns:
-            col_empreend = c
-            break
-
-    if col_construtora is None:
-        df["CONSTRUTORA_BASE"] = "NÃO INFORMADO"
-    else:
-        df["CONSTRUTORA_BASE"] = (
-            df[col_construtora]
-            .fillna("NÃO INFORMADO")
-            .astype(str)
-            .str.upper()
-            .str.strip()
-        )
-
-    if col_empreend is None:
-        df["EMPREENDIMENTO_BASE"] = "NÃO INFORMADO"
-    else:
-        df["EMPREENDIMENTO_BASE"] = (
-            df[col_empreend]
-            .fillna("NÃO INFORMADO")
-            .astype(str)
-            .str.upper()
-            .str.strip()
-        )
-
-    # STATUS BASE + SITUAÇÃO ORIGINAL
-    possiveis_cols_situacao = [
-        "SITUAÇÃO",
-        "SITUAÇÃO ATUAL",
-        "STATUS",
-        "SITUACAO",
-        "SITUACAO ATUAL",
-    ]
-    col_situacao = None
-    for c in possiveis_cols_situacao:
-        if c in df.columns:
-            col_situacao = c
-            break
-
-    df["STATUS_BASE"] = ""
-    if col_situacao:
-        status = df[col_situacao].fillna("").astype(str).str.upper()
-        df.loc[status.str.contains("EM ANÁLISE"), "STATUS_BASE"] = "EM ANÁLISE"
-        df.loc[status.str.contains("REANÁLISE"), "STATUS_BASE"] = "REANÁLISE"
-        df.loc[status.str.contains("APROV"), "STATUS_BASE"] = "APROVADO"
-        df.loc[status.str.contains("REPROV"), "STATUS_BASE"] = "REPROVADO"
-        df.loc[status.str.contains("VENDA GERADA"), "STATUS_BASE"] = "VENDA GERADA"
-        df.loc[status.str.contains("VENDA INFORMADA"), "STATUS_BASE"] = "VENDA INFORMADA"
-
-        df["SITUACAO_ORIGINAL"] = (
-            df[col_situacao].fillna("").astype(str).str.upper().str.strip()
-        )
-    else:
-        df["SITUACAO_ORIGINAL"] = "NÃO INFORMADO"
-
-    # OBSERVAÇÕES / VGV
-    if "OBSERVAÇÕES" in df.columns:
-        df["OBSERVACOES_RAW"] = (
-            df["OBSERVAÇÕES"].fillna("").astype(str).str.strip()
-        )
-        df["VGV"] = pd.to_numeric(df["OBSERVAÇÕES"], errors="coerce").fillna(0.0)
-    else:
-        df["OBSERVACOES_RAW"] = ""
-        df["VGV"] = 0.0
-
-    # NOME / CPF
-    possiveis_nome = ["NOME", "CLIENTE", "NOME CLIENTE", "NOME DO CLIENTE"]
-    possiveis_cpf = ["CPF", "CPF CLIENTE", "CPF DO CLIENTE"]
-
-    col_nome = None
-    for c in possiveis_nome:
-        if c in df.columns:
-            col_nome = c
-            break
-
-    col_cpf = None
-    for c in possiveis_cpf:
-        if c in df.columns:
-            col_cpf = c
-            break
-
-    if col_nome is None:
-        df["NOME_CLIENTE_BASE"] = "NÃO INFORMADO"
-    else:
-        df["NOME_CLIENTE_BASE"] = (
-            df[col_nome].fillna("NÃO INFORMADO").astype(str).str.upper().str.strip()
-        )
-
-    if col_cpf is None:
-        df["CPF_CLIENTE_BASE"] = ""
-    else:
-        df["CPF_CLIENTE_BASE"] = (
-            df[col_cpf]
-            .fillna("")
-            .astype(str)
-            .str.replace(r"\D", "", regex=True)
-        )
-
-    return df
+    # Normalizada uma vez por CSV e mapeada do snapshot compartilhado (utils/visoes.py)
+    return ler_planilha_normalizada()
 
 
 df = carregar_dados()
 
 if df.empty:
     st.error("Não foi possível carregar dados da planilha.")
-    st.stop()
+    parar()
+
+etapa("CARREGAR E PREPARAR DADOS")
 
 # ---------------------------------------------------------
 # DEFINIÇÕES BÁSICAS
@@ -208,19 +69,23 @@ elif "CLIENTE" in df.columns:
     col_cliente = "CLIENTE"
 else:
     st.error("Não encontrei coluna de cliente na base.")
-    st.stop()
+    parar()
 
 if "DIA" not in df.columns:
     st.error("Não encontrei coluna DIA na base.")
-    st.stop()
+    parar()
 
-# Garantir datetime
-df["DIA"] = pd.to_datetime(df["DIA"], errors="coerce")
-df_valid = df.dropna(subset=["DIA"]).copy()
-df_valid = df_valid.sort_values(by=[col_cliente, "DIA"])
+# Última linha de cada cliente = status atual. Vem pronta do
+# materializar_visoes.py se ele publicou para esta planilha
+visao_status = le_visao("status_atual", df) if col_cliente == "NOME_CLIENTE_BASE" else None
 
-# Última linha = status atual
-df_status_atual = df_valid.drop_duplicates(subset=[col_cliente], keep="last").copy()
+if visao_status is not None:
+    df_status_atual = visao_status
+    # O último DIA da base é o último DIA de algum cliente
+    data_ref = visao_status["DIA"].max()
+else:
+    df_status_atual = status_atual(df, col_cliente)
+    data_ref = df_status_atual["DIA"].max()
 
 # Filtra quem está EM ANÁLISE / REANÁLISE
 status_em_analise = ["EM ANÁLISE", "REANÁLISE"]
@@ -230,7 +95,9 @@ df_em_analise_atual = df_status_atual[
 
 if df_em_analise_atual.empty:
     st.info("No momento não há clientes com status atual EM ANÁLISE ou REANÁLISE.")
-    st.stop()
+    parar()
+
+etapa("DEFINIÇÕES BÁSICAS")
 
 # ---------------------------------------------------------
 # BARRA LATERAL – BUSCA (NOME / CPF) + EQUIPE
@@ -264,7 +131,6 @@ periodo = st.radio(
     horizontal=True,
 )
 
-data_ref = df_valid["DIA"].max()
 limite_tempo = data_ref - timedelta(days=periodo)
 
 df_em_analise_periodo = df_em_analise_atual[
@@ -273,7 +139,9 @@ df_em_analise_periodo = df_em_analise_atual[
 
 if df_em_analise_periodo.empty:
     st.info(f"Não há clientes em análise nos últimos {periodo} dias.")
-    st.stop()
+    parar()
+
+marco()
 
 # ---------------------------------------------------------
 # FILTRO POR EQUIPE (AGORA NA LATERAL)
@@ -308,7 +176,9 @@ else:
 
 if df_filtrado.empty:
     st.info("Nenhum cliente em análise dentro desse filtro.")
-    st.stop()
+    parar()
+
+etapa("FILTRO POR EQUIPE")
 
 # ---------------------------------------------------------
 # KPIs GERAIS
@@ -322,25 +192,16 @@ k1.metric("Total em Análise (atual)", total)
 k2.metric("Em Análise", int(qtd_em))
 k3.metric("Reanálise", int(qtd_re))
 
+etapa("KPIs GERAIS")
+
 # ---------------------------------------------------------
 # DETALHES POR CLIENTE (CARDS) – ENTRE KPIs E TABELA
 # ---------------------------------------------------------
 # Só mostra cards se o usuário digitou algo na busca
 if termo_busca.strip():
     # Filtro inicial na base completa (para pegar histórico inteiro do cliente)
-    df_resultado = pd.DataFrame()
-
-    termo_limpo = termo_busca.strip().upper()
-
-    if tipo_busca.startswith("Nome"):
-        df_resultado = df[
-            df["NOME_CLIENTE_BASE"].str.contains(termo_limpo, na=False)
-        ].copy()
-    else:
-        termo_cpf = "".join(ch for ch in termo_busca if ch.isdigit())
-        df_resultado = df[
-            df["CPF_CLIENTE_BASE"].str.contains(termo_cpf, na=False)
-        ].copy()
+    por = "nome" if tipo_busca.startswith("Nome") else "cpf"
+    df_resultado = buscar_cliente(df, termo_busca, por=por).copy()
 
     if df_resultado.empty:
         st.warning("Nenhum cliente encontrado com esse critério de busca.")
@@ -458,10 +319,7 @@ if termo_busca.strip():
                         st.write(f"**Última observação:** `{ultima_obs}`")
 
                 with col_top2:
-                    if pd.notna(row["ULT_DATA"]):
-                        data_fmt = row["ULT_DATA"].strftime("%d/%m/%Y")
-                    else:
-                        data_fmt = "NÃO INFORMADA"
+                    data_fmt = formata_data(row["ULT_DATA"], vazio="NÃO INFORMADA")
                     st.write(f"**Última movimentação:** `{data_fmt}`")
 
                 m1, m2, m3 = st.columns(3)
@@ -474,16 +332,18 @@ if termo_busca.strip():
                 m5.metric("Vendas", int(row["VENDAS"]))
                 m6.metric(
                     "VGV total",
-                    f"R$ {row['VGV']:,.2f}".replace(",", "X")
-                    .replace(".", ",")
-                    .replace("X", "."),
+                    formata_moeda(row['VGV']),
                 )
 
+etapa("DETALHES POR CLIENTE")
+
 # ---------------------------------------------------------
 # LINHA DE SEPARAÇÃO
 # ---------------------------------------------------------
 st.markdown("---")
 
+marco()
+
 # ---------------------------------------------------------
 # TABELA MAIS CLEAN (RENOMEADA E FORMATADA)
 # ---------------------------------------------------------
@@ -500,13 +360,7 @@ colunas_preferidas = [
 ]
 colunas_existentes = [c for c in colunas_preferidas if c in df_filtrado.columns]
 
-df_tabela = df_filtrado[colunas_existentes].copy()
-
-# Formata data
-if "DIA" in df_tabela.columns:
-    df_tabela["DIA"] = pd.to_datetime(df_tabela["DIA"], errors="coerce").dt.strftime(
-        "%d/%m/%Y"
-    )
+df_tabela = df_filtrado[colunas_existentes]
 
 # Renomeia colunas para ficar mais bonito
 renomear = {
@@ -520,14 +374,16 @@ renomear = {
 }
 df_tabela = df_tabela.rename(columns=renomear)
 
-df_tabela = df_tabela.sort_values("Última atualização", ascending=False)
-
-st.dataframe(
+# DIA segue como data: a ordenação é cronológica, não pelo texto dd/mm/aaaa
+tabela_paginada(
     df_tabela,
-    use_container_width=True,
-    hide_index=True,
+    key="analise_lista",
+    ordenar_por="Última atualização",
+    formatadores={"Última atualização": formata_data_serie},
 )
 
+etapa("TABELA MAIS CLEAN")
+
 # ---------------------------------------------------------
 # RESUMO POR EQUIPE
 # ---------------------------------------------------------
@@ -542,3 +398,6 @@ if "Equipe" in df_tabela.columns:
     )
 
     st.dataframe(resumo_equipe, use_container_width=True, hide_index=True)
+
+etapa("RESUMO POR EQUIPE")
+fechar_rerun({"periodo": periodo, "busca": (tipo_busca, termo_busca)})
@@ -1,9 +1,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
 from datetime import date, timedelta
 
+from utils.cache import cache_dados
+from utils.dados import versao_snapshot
+from utils.formatacao import formata_data_serie, formata_moeda, formata_moeda_serie
+from utils.graficos import exibe_grafico, top_n_com_outros
+from utils.tabelas import coluna_moeda, coluna_percentual, tabela_paginada
+from utils.desempenho import cronometro, etapa, fechar_rerun, iniciar_rerun, marco, parar
+from utils.motor_consultas import escolher_motor
+from utils.visoes import ler_planilha_normalizada
+
+iniciar_rerun("10_Vendas")
+
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
 # ---------------------------------------------------------
@@ -20,130 +30,28 @@ st.caption(
     "evolução diária e mix por construtora/empreendimento."
 )
 
-# ---------------------------------------------------------
-# CONFIG: LINK DA PLANILHA  (MESMO DO APP PRINCIPAL)
-# ---------------------------------------------------------
-SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
-GID_ANALISES = "1574157905"
-CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}"
-
-
-# ---------------------------------------------------------
-# FUNÇÃO AUXILIAR PARA LIMPAR DATA
-# ---------------------------------------------------------
-def limpar_para_data(serie):
-    dt = pd.to_datetime(serie, dayfirst=True, errors="coerce")
-    return dt.dt.date
-
 
 # ---------------------------------------------------------
 # CARREGAR E PREPARAR DADOS (PLANILHA)
 # ---------------------------------------------------------
-@st.cache_data(ttl=60)
+@cache_dados(ttl=60, nome="10.carregar_dados", compartilhado=True)
+@cronometro("carregar_dados")
 def carregar_dados():
-    df = pd.read_csv(CSV_URL)
-
-    # Padroniza colunas
-    df.columns = [c.strip().upper() for c in df.columns]
-
-    # DATA / DIA
-    if "DATA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DATA"])
-    elif "DIA" in df.columns:
-        df["DIA"] = limpar_para_data(df["DIA"])
-    else:
-        df["DIA"] = pd.NaT
-
-    # EQUIPE / CORRETOR
-    for col in ["EQUIPE", "CORRETOR"]:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .fillna("NÃO INFORMADO")
-                .astype(str)
-                .str.upper()
-                .str.strip()
-            )
-        else:
-            df[col] = "NÃO INFORMADO"
-
-    # CONSTRUTORA / EMPREENDIMENTO (para mix de vendas)
-    possiveis_construtora = ["CONSTRUTORA", "INCORPORADORA"]
-    possiveis_empreend = ["EMPREENDIMENTO", "PRODUTO", "IMÓVEL", "IMOVEL"]
-
-    col_construtora = None
-    for c in possiveis_construtora:
-        if c in df.columns:
-            col_construtora = c
-            break
-
-    col_empreend = None
-    for c in possiveis_empreend:
-        if c in df.columns:
-            col_empreend = c
-            break
-
-    if col_construtora is None:
-        df["CONSTRUTORA_BASE"] = "NÃO INFORMADO"
-    else:
-        df["CONSTRUTORA_BASE"] = (
-            df[col_construtora]
-            .fillna("NÃO INFORMADO")
-            .astype(str)
-            .str.upper()
-            .str.strip()
-        )
-
-    if col_empreend is None:
-        df["EMPREENDIMENTO_BASE"] = "NÃO INFORMADO"
-    else:
-        df["EMPREENDIMENTO_BASE"] = (
-            df[col_empreend]
-            .fillna("NÃO INFORMADO")
-            .astype(str)
-            .str.upper()
-            .str.strip()
-        )
-
-    # SITUAÇÃO BASE
-    possiveis_cols_situacao = [
-        "SITUAÇÃO",
-        "SITUAÇÃO ATUAL",
-        "STATUS",
-        "SITUACAO",
-        "SITUACAO ATUAL",
-    ]
-    col_situacao = None
-    for c in possiveis_cols_situacao:
-        if c in df.columns:
-            col_situacao = c
-            break
-
-    df["STATUS_BASE"] = ""
-    if col_situacao:
-        status = df[col_situacao].fillna("").astype(str).str.upper()
-
-        df.loc[status.str.contains("EM ANÁLISE"), "STATUS_BASE"] = "EM ANÁLISE"
-        df.loc[status.str.contains("REANÁLISE"), "STATUS_BASE"] = "REANÁLISE"
-        df.loc[status.str.contains("APROV"), "STATUS_BASE"] = "APROVADO"
-        df.loc[status.str.contains("REPROV"), "STATUS_BASE"] = "REPROVADO"
-        df.loc[status.str.contains("VENDA GERADA"), "STATUS_BASE"] = "VENDA GERADA"
-        df.loc[status.str.contains("VENDA INFORMADA"), "STATUS_BASE"] = "VENDA INFORMADA"
-
-    # VGV (via coluna OBSERVAÇÕES) – sempre em REAL
-    if "OBSERVAÇÕES" in df.columns:
-        df["VGV"] = pd.to_numeric(df["OBSERVAÇÕES"], errors="coerce").fillna(0.0)
-    else:
-        df["VGV"] = 0.0
-
-    return df
+    # Normalizada uma vez por CSV e mapeada do snapshot compartilhado (utils/visoes.py)
+    return ler_planilha_normalizada()
 
 
 df = carregar_dados()
+versao_dados = versao_snapshot(df)
+
+# pandas sobre o df da página, ou SQL na mesma planilha (MR_MOTOR=duckdb / sqlite)
+motor = escolher_motor(df)
 
 if df.empty:
     st.error("Não foi possível carregar dados da planilha. Verifique o link/gid.")
-    st.stop()
+    parar()
+
+etapa("CARREGAR E PREPARAR DADOS")
 
 # ---------------------------------------------------------
 # LEADS DO SUPREMO (APROVEITA DF_LEADS DO app principal, SE EXISTIR)
@@ -214,15 +122,14 @@ meta_vendas = st.sidebar.number_input(
 )
 
 
+marco()
+
 # ---------------------------------------------------------
 # APLICA FILTROS PRINCIPAIS
 # ---------------------------------------------------------
-df_periodo = df.copy()
-
-# Período
-dia_series_all = limpar_para_data(df_periodo["DIA"])
-mask_data = (dia_series_all >= data_ini) & (dia_series_all <= data_fim)
-df_periodo = df_periodo[mask_data]
+# Período (DIA já chega normalizado do cache – não reprocessa as datas a cada rerun)
+mask_data = (df["DIA"] >= data_ini) & (df["DIA"] <= data_fim)
+df_periodo = df[mask_data]
 
 # Equipe
 if equipe_sel != "Todas":
@@ -243,7 +150,9 @@ st.caption(
 
 if df_periodo.empty:
     st.warning("Não há registros para os filtros selecionados.")
-    st.stop()
+    parar()
+
+etapa("APLICA FILTROS PRINCIPAIS")
 
 # ---------------------------------------------------------
 # FILTRA SÓ VENDAS PARA OS KPIs
@@ -282,6 +191,8 @@ if total_leads_periodo is not None and qtd_vendas > 0:
 # % meta atingida
 perc_meta = (qtd_vendas / meta_vendas * 100) if meta_vendas > 0 else 0
 
+etapa("FILTRA SÓ VENDAS PARA OS KPIs")
+
 # ---------------------------------------------------------
 # KPIs PRINCIPAIS (CARDS)
 # ---------------------------------------------------------
@@ -295,13 +206,13 @@ with c1:
 with c2:
     st.metric(
         "VGV Total",
-        f"R$ {vgv_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+        formata_moeda(vgv_total),
     )
 
 with c3:
     st.metric(
         "Ticket médio",
-        f"R$ {ticket_medio:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+        formata_moeda(ticket_medio),
     )
 
 with c4:
@@ -328,6 +239,8 @@ with c8:
         st.metric("Leads por venda (CRM)", f"{leads_por_venda:.1f}")
 
 
+etapa("KPIs PRINCIPAIS")
+
 # ---------------------------------------------------------
 # GRÁFICO DE EVOLUÇÃO DIÁRIA (VGV E VENDAS)
 # ---------------------------------------------------------
@@ -348,65 +261,81 @@ else:
         .sort_values("DIA")
     )
 
-    df_vendas_dia["DIA_STR"] = pd.to_datetime(df_vendas_dia["DIA"]).dt.strftime("%d/%m")
+    # Dia tipado (timeUnit no eixo): ordem cronológica mesmo virando o mês,
+    # sem montar string "dd/mm" linha a linha
+    df_vendas_dia["DIA"] = pd.to_datetime(df_vendas_dia["DIA"])
+    df_vendas_dia["VGV_ACUM"] = df_vendas_dia["VGV_DIA"].cumsum()
+
+    filtros_graficos = (data_ini, data_fim, equipe_sel, corretor_sel)
 
     # VGV diário (barras)
     st.markdown("### 💵 VGV por dia")
-    chart_vgv_dia = (
-        alt.Chart(df_vendas_dia)
-        .mark_bar(cornerRadiusTopLeft=4, cornerRadiusTopRight=4)
-        .encode(
-            x=alt.X("DIA_STR:N", title="Dia"),
-            y=alt.Y("VGV_DIA:Q", title="VGV do dia (R$)"),
-            tooltip=[
-                alt.Tooltip("DIA_STR:N", title="Dia"),
-                alt.Tooltip("VGV_DIA:Q", title="VGV do dia", format=",.2f"),
-                alt.Tooltip("QTD_VENDAS:Q", title="Qtde de vendas"),
-            ],
+
+    def montar_grafico_vgv_dia():
+        import altair as alt
+
+        return (
+            alt.Chart(df_vendas_dia)
+            .mark_bar(cornerRadiusTopLeft=4, cornerRadiusTopRight=4)
+            .encode(
+                x=alt.X("yearmonthdate(DIA):O", title="Dia", axis=alt.Axis(format="%d/%m")),
+                y=alt.Y("VGV_DIA:Q", title="VGV do dia (R$)"),
+                tooltip=[
+                    alt.Tooltip("DIA:T", title="Dia", format="%d/%m/%Y"),
+                    alt.Tooltip("VGV_DIA:Q", title="VGV do dia", format=",.2f"),
+                    alt.Tooltip("QTD_VENDAS:Q", title="Qtde de vendas"),
+                ],
+            )
+            .properties(height=300)
         )
-        .properties(height=300)
+
+    exibe_grafico(
+        "vendas_vgv_dia",
+        versao_dados,
+        filtros_graficos,
+        montar_grafico_vgv_dia,
     )
-    st.altair_chart(chart_vgv_dia, use_container_width=True)
 
     # VGV acumulado (linha)
-    df_vendas_dia["VGV_ACUM"] = df_vendas_dia["VGV_DIA"].cumsum()
-
     st.markdown("### 📊 VGV acumulado no período")
-    chart_vgv_acum = (
-        alt.Chart(df_vendas_dia)
-        .mark_line(point=True)
-        .encode(
-            x=alt.X("DIA_STR:N", title="Dia"),
-            y=alt.Y("VGV_ACUM:Q", title="VGV acumulado (R$)"),
-            tooltip=[
-                alt.Tooltip("DIA_STR:N", title="Dia"),
-                alt.Tooltip("VGV_ACUM:Q", title="VGV acumulado", format=",.2f"),
-            ],
+
+    def montar_grafico_vgv_acum():
+        import altair as alt
+
+        return (
+            alt.Chart(df_vendas_dia)
+            .mark_line(point=True)
+            .encode(
+                x=alt.X("yearmonthdate(DIA):O", title="Dia", axis=alt.Axis(format="%d/%m")),
+                y=alt.Y("VGV_ACUM:Q", title="VGV acumulado (R$)"),
+                tooltip=[
+                    alt.Tooltip("DIA:T", title="Dia", format="%d/%m/%Y"),
+                    alt.Tooltip("VGV_ACUM:Q", title="VGV acumulado", format=",.2f"),
+                ],
+            )
+            .properties(height=300)
         )
-        .properties(height=300)
+
+    exibe_grafico(
+        "vendas_vgv_acum",
+        versao_dados,
+        filtros_graficos,
+        montar_grafico_vgv_acum,
     )
-    st.altair_chart(chart_vgv_acum, use_container_width=True)
 
 
+etapa("GRÁFICO DE EVOLUÇÃO DIÁRIA")
+
 # ---------------------------------------------------------
 # RANKING POR EQUIPE
 # ---------------------------------------------------------
 st.markdown("---")
 st.markdown("## 👥 Ranking de Vendas por Equipe")
 
-df_vendas_eq = df_vendas.copy()
-
-if df_vendas_eq.empty:
+if df_vendas.empty:
     st.info("Não há vendas para montar o ranking de equipes neste período.")
 else:
-    rank_eq = (
-        df_vendas_eq.groupby("EQUIPE")
-        .agg(
-            VENDAS=("STATUS_BASE", "count"),
-            VGV=("VGV", "sum"),
-        )
-        .reset_index()
-    )
+    rank_eq = motor.vendas_por_grupo(data_ini, data_fim, ["EQUIPE"], equipe_sel, corretor_sel)
 
     rank_eq["TICKET_MEDIO"] = np.where(
         rank_eq["VENDAS"] > 0,
@@ -422,55 +351,66 @@ else:
     rank_eq = rank_eq.sort_values(["VENDAS", "VGV"], ascending=False)
 
     st.dataframe(
-        rank_eq.style.format(
-            {
-                "VGV": "R$ {:,.2f}".format,
-                "TICKET_MEDIO": "R$ {:,.2f}".format,
-                "%_VGV_IMOB": "{:.1f}%".format,
-            }
-        ),
+        rank_eq,
         use_container_width=True,
         hide_index=True,
+        column_config={
+            "VGV": coluna_moeda(),
+            "TICKET_MEDIO": coluna_moeda(),
+            "%_VGV_IMOB": coluna_percentual(),
+        },
     )
 
     st.markdown("### 💰 VGV por equipe")
-    chart_eq_vgv = (
-        alt.Chart(rank_eq)
-        .mark_bar(cornerRadiusTopLeft=4, cornerRadiusTopRight=4)
-        .encode(
-            x=alt.X("VGV:Q", title="VGV (R$)"),
-            y=alt.Y("EQUIPE:N", sort="-x", title="Equipe"),
-            tooltip=[
-                "EQUIPE",
-                alt.Tooltip("VENDAS:Q", title="Vendas"),
-                alt.Tooltip("VGV:Q", title="VGV", format=",.2f"),
-                alt.Tooltip("TICKET_MEDIO:Q", title="Ticket médio", format=",.2f"),
-                alt.Tooltip("%_VGV_IMOB:Q", title="% do VGV da imob", format=".1f"),
-            ],
+
+    def montar_grafico_vgv_equipe():
+        import altair as alt
+
+        chart_data = top_n_com_outros(
+            rank_eq,
+            categoria="EQUIPE",
+            ordenar_por="VGV",
+            somar=["VENDAS", "VGV", "%_VGV_IMOB"],
         )
-        .properties(height=400)
+
+        return (
+            alt.Chart(chart_data)
+            .mark_bar(cornerRadiusTopLeft=4, cornerRadiusTopRight=4)
+            .encode(
+                x=alt.X("VGV:Q", title="VGV (R$)"),
+                y=alt.Y("EQUIPE:N", sort="-x", title="Equipe"),
+                tooltip=[
+                    "EQUIPE",
+                    alt.Tooltip("VENDAS:Q", title="Vendas"),
+                    alt.Tooltip("VGV:Q", title="VGV", format=",.2f"),
+                    alt.Tooltip("TICKET_MEDIO:Q", title="Ticket médio", format=",.2f"),
+                    alt.Tooltip("%_VGV_IMOB:Q", title="% do VGV da imob", format=".1f"),
+                ],
+            )
+            .properties(height=400)
+        )
+
+    exibe_grafico(
+        "vendas_equipe_vgv",
+        versao_dados,
+        (data_ini, data_fim, equipe_sel, corretor_sel),
+        montar_grafico_vgv_equipe,
     )
-    st.altair_chart(chart_eq_vgv, use_container_width=True)
 
 
+etapa("RANKING POR EQUIPE")
+
 # ---------------------------------------------------------
 # RANKING POR CORRETOR
 # ---------------------------------------------------------
 st.markdown("---")
 st.markdown("## 🧑‍💼 Ranking de Vendas por Corretor")
 
-df_vendas_cor = df_vendas.copy()
-
-if df_vendas_cor.empty:
+if df_vendas.empty:
     st.info("Não há vendas para montar o ranking de corretores neste período.")
 else:
-    rank_cor = (
-        df_vendas_cor.groupby(["CORRETOR", "EQUIPE"])
-        .agg(
-            VENDAS=("STATUS_BASE", "count"),
-            VGV=("VGV", "sum"),
-        )
-        .reset_index()
+    rank_cor = motor.vendas_por_grupo(
+        data_ini, data_fim, ["CORRETOR", "EQUIPE"], equipe_sel, corretor_sel
     )
 
     rank_cor["TICKET_MEDIO"] = np.where(
@@ -487,44 +427,55 @@ else:
     rank_cor = rank_cor.sort_values(["VGV", "VENDAS"], ascending=False)
 
     st.dataframe(
-        rank_cor.style.format(
-            {
-                "VGV": "R$ {:,.2f}".format,
-                "TICKET_MEDIO": "R$ {:,.2f}".format,
-                "%_VGV_IMOB": "{:.1f}%".format,
-            }
-        ),
+        rank_cor,
         use_container_width=True,
         hide_index=True,
-    )
-
-    # Top 10 para gráfico
-    rank_cor_top = rank_cor.head(10).copy()
-    rank_cor_top["CORRETOR_LABEL"] = (
-        rank_cor_top["CORRETOR"].astype(str).str[:20] + " (" + rank_cor_top["EQUIPE"] + ")"
+        column_config={
+            "VGV": coluna_moeda(),
+            "TICKET_MEDIO": coluna_moeda(),
+            "%_VGV_IMOB": coluna_percentual(),
+        },
     )
 
     st.markdown("### 🏆 Top 10 corretores por VGV")
-    chart_cor_vgv = (
-        alt.Chart(rank_cor_top)
-        .mark_bar(cornerRadiusTopLeft=4, cornerRadiusTopRight=4)
-        .encode(
-            x=alt.X("VGV:Q", title="VGV (R$)"),
-            y=alt.Y("CORRETOR_LABEL:N", sort="-x", title="Corretor (Equipe)"),
-            tooltip=[
-                "CORRETOR",
-                "EQUIPE",
-                alt.Tooltip("VENDAS:Q", title="Vendas"),
-                alt.Tooltip("VGV:Q", title="VGV", format=",.2f"),
-                alt.Tooltip("TICKET_MEDIO:Q", title="Ticket médio", format=",.2f"),
-                alt.Tooltip("%_VGV_IMOB:Q", title="% do VGV da imob", format=".1f"),
-            ],
+
+    def montar_grafico_top_corretores():
+        import altair as alt
+
+        # Top 10 para gráfico
+        rank_cor_top = rank_cor.head(10).copy()
+        rank_cor_top["CORRETOR_LABEL"] = (
+            rank_cor_top["CORRETOR"].astype(str).str[:20] + " (" + rank_cor_top["EQUIPE"] + ")"
         )
-        .properties(height=400)
+
+        return (
+            alt.Chart(rank_cor_top)
+            .mark_bar(cornerRadiusTopLeft=4, cornerRadiusTopRight=4)
+            .encode(
+                x=alt.X("VGV:Q", title="VGV (R$)"),
+                y=alt.Y("CORRETOR_LABEL:N", sort="-x", title="Corretor (Equipe)"),
+                tooltip=[
+                    "CORRETOR",
+                    "EQUIPE",
+                    alt.Tooltip("VENDAS:Q", title="Vendas"),
+                    alt.Tooltip("VGV:Q", title="VGV", format=",.2f"),
+                    alt.Tooltip("TICKET_MEDIO:Q", title="Ticket médio", format=",.2f"),
+                    alt.Tooltip("%_VGV_IMOB:Q", title="% do VGV da imob", format=".1f"),
+                ],
+            )
+            .properties(height=400)
+        )
+
+    exibe_grafico(
+        "vendas_top_corretores",
+        versao_dados,
+        (data_ini, data_fim, equipe_sel, corretor_sel),
+        montar_grafico_top_corretores,
     )
-    st.altair_chart(chart_cor_vgv, use_container_width=True)
 
 
+etapa("RANKING POR CORRETOR")
+
 # ---------------------------------------------------------
 # MIX DE VENDAS (CONSTRUTORA / EMPREENDIMENTO)
 # ---------------------------------------------------------
@@ -539,33 +490,35 @@ else:
     with c_mix1:
         st.markdown("### Por Construtora")
         mix_const = (
-            df_vendas.groupby("CONSTRUTORA_BASE")["VGV"]
-            .sum()
-            .reset_index()
+            motor.vendas_por_grupo(data_ini, data_fim, ["CONSTRUTORA_BASE"], equipe_sel, corretor_sel)
+            [["CONSTRUTORA_BASE", "VGV"]]
             .sort_values("VGV", ascending=False)
         )
         st.dataframe(
-            mix_const.style.format({"VGV": "R$ {:,.2f}".format}),
+            mix_const,
             use_container_width=True,
             hide_index=True,
+            column_config={"VGV": coluna_moeda()},
         )
 
     with c_mix2:
         st.markdown("### Por Empreendimento")
         mix_empr = (
-            df_vendas.groupby("EMPREENDIMENTO_BASE")["VGV"]
-            .sum()
-            .reset_index()
+            motor.vendas_por_grupo(data_ini, data_fim, ["EMPREENDIMENTO_BASE"], equipe_sel, corretor_sel)
+            [["EMPREENDIMENTO_BASE", "VGV"]]
             .sort_values("VGV", ascending=False)
             .head(15)
         )
         st.dataframe(
-            mix_empr.style.format({"VGV": "R$ {:,.2f}".format}),
+            mix_empr,
             use_container_width=True,
             hide_index=True,
+            column_config={"VGV": coluna_moeda()},
         )
 
 
+etapa("MIX DE VENDAS")
+
 # ---------------------------------------------------------
 # TABELA DETALHADA DE VENDAS
 # ---------------------------------------------------------
@@ -585,11 +538,7 @@ colunas_preferidas = [
 ]
 colunas_existentes = [c for c in colunas_preferidas if c in df_vendas.columns]
 
-df_tab = df_vendas[colunas_existentes].copy()
-
-# Formata data
-if "DIA" in df_tab.columns:
-    df_tab["DIA"] = pd.to_datetime(df_tab["DIA"], errors="coerce").dt.strftime("%d/%m/%Y")
+df_tab = df_vendas[colunas_existentes]
 
 # Renomeia para ficar mais amigável
 renomear = {
@@ -605,12 +554,16 @@ renomear = {
 }
 df_tab = df_tab.rename(columns=renomear)
 
-# Ordena pela data mais recente
-if "Data" in df_tab.columns:
-    df_tab = df_tab.sort_values("Data", ascending=False)
-
-st.dataframe(
-    df_tab.style.format({"VGV": "R$ {:,.2f}".format}),
-    use_container_width=True,
-    hide_index=True,
+# Data/VGV continuam tipados (ordenação correta); formato só nas linhas da página
+tabela_paginada(
+    df_tab,
+    key="vendas_detalhe",
+    ordenar_por="Data",
+    formatadores={
+        "Data": formata_data_serie,
+        "VGV": formata_moeda_serie,
+    },
 )
+
+etapa("TABELA DETALHADA DE VENDAS")
+fechar_rerun({"periodo": (data_ini, data_fim), "equipe": equipe_sel, "corretor": corretor_sel})
@@ -0,0 +1,130 @@
+# utils/agregados_csv.py
+#
+# Agregação do dados_imobiliaria.csv para os relatórios de linha de comando
+# (dashboard.py e gera_dashboard_web.py), com ou sem streaming.
+#
+# Em vez de carregar o CSV inteiro e criar as sete colunas de situação em
+# todas as linhas, lê só as colunas usadas e, bloco a bloco, soma as
+# contagens por situação nos totais e em CORRETOR / EQUIPE / CONSTRUTORA /
+# EMPREENDIMENTO. O que fica em memória é um bloco mais uma linha por
+# combinação de equipe/corretor/construtora/empreendimento, não importa o
+# tamanho do arquivo. Sem `linhas_por_bloco` o arquivo é lido de uma vez
+# (um bloco só), e o resultado é o mesmo.
+#
+# A soma é feita num cubo EQUIPE × CORRETOR × CONSTRUTORA × EMPREENDIMENTO;
+# as tabelas do relatório geral e as de uma equipe ou um corretor saem todas
+# desse mesmo cubo (tabelas_do_cubo), sem reler o arquivo.
+#
+#     agregado = agrega_csv("dados_imobiliaria.csv", linhas_por_bloco=200_000)
+#     agregado["TOTAL"]["VENDAS_TOTAL"], agregado["CORRETOR"]
+
+import pandas as pd
+
+COLUNAS_OBRIGATORIAS = ["DATA", "CORRETOR", "EQUIPE", "CONSTRUTORA", "EMPREENDIMENTO", "SITUAÇÃO"]
+DIMENSOES = ["CORRETOR", "EQUIPE", "CONSTRUTORA", "EMPREENDIMENTO"]
+
+# Coluna de contagem -> valor de SITUAÇÃO na planilha
+SITUACOES = {
+    "EM_ANALISE": "EM ANÁLISE",
+    "REANALISE": "REANÁLISE",
+    "APROVACAO": "APROVAÇÃO",
+    "APROVADO_BACEN": "APROVADO BACEN",
+    "REPROVACAO": "REPROVAÇÃO",
+    "VENDA_GERADA": "VENDA GERADA",
+    "VENDA_INFORMADA": "VENDA INFORMADA",
+}
+
+LINHAS_POR_BLOCO = 200_000
+
+# Chave das células vazias no cubo (read_csv já traz vazio como NaN)
+SEM_VALOR = ""
+
+
+def _le_blocos(arquivo, linhas_por_bloco=None):
+    """DataFrames só com as colunas obrigatórias (nomes já padronizados)."""
+    leitor = pd.read_csv(
+        arquivo,
+        sep=",",
+        encoding="utf-8-sig",
+        usecols=lambda c: c.strip().upper() in COLUNAS_OBRIGATORIAS,
+        dtype=str,
+        chunksize=linhas_por_bloco or None,
+    )
+    blocos = [leitor] if not linhas_por_bloco else leitor
+    for bloco in blocos:
+        bloco.columns = [c.strip().upper() for c in bloco.columns]
+        faltando = [c for c in COLUNAS_OBRIGATORIAS if c not in bloco.columns]
+        if faltando:
+            raise ValueError(f"Coluna obrigatória não encontrada no arquivo: {faltando[0]}")
+        yield bloco
+
+
+def _contagens(bloco: pd.DataFrame) -> pd.DataFrame:
+    contagens = pd.DataFrame(
+        {col: (bloco["SITUAÇÃO"] == valor).astype("int64") for col, valor in SITUACOES.items()},
+        index=bloco.index,
+    )
+    for dim in DIMENSOES:
+        contagens[dim] = bloco[dim]
+    return contagens
+
+
+def _totais(tabela):
+    """Colunas derivadas usadas pelos relatórios (Series ou DataFrame)."""
+    tabela["APROVACAO_TOTAL"] = tabela["APROVACAO"] + tabela["APROVADO_BACEN"]
+    tabela["VENDAS_TOTAL"] = tabela["VENDA_GERADA"] + tabela["VENDA_INFORMADA"]
+    tabela["ANALISES_TOTAL"] = tabela["EM_ANALISE"] + tabela["REANALISE"]
+    return tabela
+
+
+def agrega_cubo(arquivo, linhas_por_bloco=None, equipe=None) -> pd.DataFrame:
+    """
+    Contagens por combinação EQUIPE × CORRETOR × CONSTRUTORA × EMPREENDIMENTO,
+    numa passada pelo CSV. Célula vazia da planilha vira SEM_VALOR na chave
+    (conta no total, mas não aparece nas tabelas daquela dimensão).
+    """
+    colunas = ["REGISTROS", *SITUACOES]
+    cubo = None
+
+    for bloco in _le_blocos(arquivo, linhas_por_bloco):
+        if equipe:
+            bloco = bloco[bloco["EQUIPE"] == equipe]
+        contagens = _contagens(bloco)
+        contagens.insert(0, "REGISTROS", 1)
+        contagens[DIMENSOES] = contagens[DIMENSOES].fillna(SEM_VALOR)
+
+        parcial = contagens.groupby(DIMENSOES)[colunas].sum()
+        cubo = parcial if cubo is None else cubo.add(parcial, fill_value=0)
+
+    if cubo is None:
+        indice = pd.MultiIndex.from_arrays([[] for _ in DIMENSOES], names=DIMENSOES)
+        cubo = pd.DataFrame(0, index=indice, columns=colunas)
+    return cubo.astype("int64")
+
+
+def tabelas_do_cubo(cubo: pd.DataFrame, equipe=None, corretor=None) -> dict:
+    """
+    Totais e tabelas por dimensão a partir do cubo, opcionalmente só de uma
+    equipe e/ou um corretor.
+
+    Devolve {"TOTAL": Series, "CORRETOR": DataFrame, "EQUIPE": ..., ...}.
+    Cada tabela é indexada pela dimensão (ordem alfabética, como o groupby)
+    e tem REGISTROS, as colunas de SITUACOES, APROVACAO_TOTAL, VENDAS_TOTAL
+    e ANALISES_TOTAL, todas inteiras.
+    """
+    if equipe is not None:
+        cubo = cubo[cubo.index.get_level_values("EQUIPE") == equipe]
+    if corretor is not None:
+        cubo = cubo[cubo.index.get_level_values("CORRETOR") == corretor]
+
+    agregado = {"TOTAL": _totais(cubo.sum().astype("int64"))}
+    for dim in DIMENSOES:
+        tabela = cubo.groupby(level=dim).sum()
+        tabela = tabela[tabela.index != SEM_VALOR].astype("int64").sort_index()
+        agregado[dim] = _totais(tabela)
+    return agregado
+
+
+def agrega_csv(arquivo, linhas_por_bloco=None, equipe=None) -> dict:
+    """Tabelas de tabelas_do_cubo para o CSV inteiro (ou só as linhas de `equipe`)."""
+    return tabelas_do_cubo(agrega_cubo(arquivo, linhas_por_bloco, equipe))
@@ -0,0 +1,302 @@
+# utils/banco_local.py
+#
+# Banco SQLite local (opcional) com os eventos normalizados da planilha.
+#
+# Nas páginas cada filtro é uma varredura do DataFrame inteiro; aqui o
+# período/equipe/corretor vão para o WHERE e o funil para um GROUP BY, e os
+# índices (DIA), (EQUIPE, DIA), (CORRETOR, DIA), (CHAVE_CLIENTE, DIA) e
+# (STATUS_COD) fazem o SQLite ler só as linhas do filtro. O status é
+# guardado como código inteiro (tabela status) em vez do texto.
+#
+# Quem alimenta é o mesmo pipeline das visões (utils/visoes.materializar,
+# rodado pelo materializar_visoes.py) quando MR_BANCO_LOCAL=1. O banco é
+# montado num arquivo temporário e trocado de uma vez, com a assinatura do
+# CSV na tabela meta; só usa sqlite3 da biblioteca padrão, nada de rede.
+#
+# As consultas repetem as de utils/consultas.py, recebendo a conexão no
+# lugar do DataFrame:
+#     con = conectar()
+#     funil_por_equipe(con, data_ini, data_fim)
+#
+# As páginas 03, 04, 05 e 10 chegam aqui pelo MotorSQLite de
+# utils/motor_consultas.py (MR_MOTOR=sqlite), que também liga a publicação.
+
+import os
+import sqlite3
+from datetime import date
+
+import pandas as pd
+
+from utils.consultas import STATUS_ANALISE, STATUS_VENDA
+from utils.dados import DIR_CACHE
+
+ATIVO = os.environ.get("MR_BANCO_LOCAL", "") not in ("", "0")
+ARQ_BANCO = DIR_CACHE / "eventos.sqlite"
+
+# Código de cada STATUS_BASE ("" = sem status reconhecido)
+STATUS_CODIGOS = {
+    "": 0,
+    "EM ANÁLISE": 1,
+    "REANÁLISE": 2,
+    "APROVADO": 3,
+    "REPROVADO": 4,
+    "VENDA GERADA": 5,
+    "VENDA INFORMADA": 6,
+}
+STATUS_ROTULOS = {cod: rotulo for rotulo, cod in STATUS_CODIGOS.items()}
+
+COLUNAS_TEXTO = [
+    "EQUIPE",
+    "CORRETOR",
+    "CONSTRUTORA_BASE",
+    "EMPREENDIMENTO_BASE",
+    "SITUACAO_ORIGINAL",
+    "NOME_CLIENTE_BASE",
+    "CPF_CLIENTE_BASE",
+    "CHAVE_CLIENTE",
+]
+COLUNAS_DATA = ["DIA", "DATA_BASE"]
+
+# Colunas aceitas como grupo do funil (entram no SQL sem parâmetro)
+GRUPOS = ["EQUIPE", "CORRETOR", "CONSTRUTORA_BASE", "EMPREENDIMENTO_BASE", "DIA", "DATA_BASE"]
+
+_ESQUEMA = """
+CREATE TABLE status (
+    STATUS_COD INTEGER PRIMARY KEY,
+    STATUS_BASE TEXT NOT NULL
+);
+CREATE TABLE eventos (
+    ID INTEGER PRIMARY KEY,
+    DIA TEXT,
+    DATA_BASE TEXT,
+    EQUIPE TEXT NOT NULL,
+    CORRETOR TEXT NOT NULL,
+    CONSTRUTORA_BASE TEXT,
+    EMPREENDIMENTO_BASE TEXT,
+    STATUS_COD INTEGER NOT NULL REFERENCES status (STATUS_COD),
+    SITUACAO_ORIGINAL TEXT,
+    VGV REAL NOT NULL,
+    NOME_CLIENTE_BASE TEXT,
+    CPF_CLIENTE_BASE TEXT,
+    CHAVE_CLIENTE TEXT
+);
+CREATE TABLE meta (
+    CHAVE TEXT PRIMARY KEY,
+    VALOR TEXT
+);
+CREATE INDEX idx_eventos_dia ON eventos (DIA);
+CREATE INDEX idx_eventos_equipe_dia ON eventos (EQUIPE, DIA);
+CREATE INDEX idx_eventos_corretor_dia ON eventos (CORRETOR, DIA);
+CREATE INDEX idx_eventos_cliente_dia ON eventos (CHAVE_CLIENTE, DIA);
+CREATE INDEX idx_eventos_status ON eventos (STATUS_COD);
+"""
+
+
+# ---------------------------------------------------------
+# CARGA (A PARTIR DO DATAFRAME NORMALIZADO)
+# ---------------------------------------------------------
+def _data_iso(serie: pd.Series) -> pd.Series:
+    """date → 'AAAA-MM-DD' (ordena igual à data); vazio vira NULL."""
+    dt = pd.to_datetime(serie, errors="coerce")
+    return dt.dt.strftime("%Y-%m-%d").astype(object).where(dt.notna(), None)
+
+
+def publicar(df: pd.DataFrame, assinatura=None, arquivo=ARQ_BANCO) -> int:
+    """
+    Grava o DataFrame de normalizar_planilha num banco novo e troca pelo
+    atual. Devolve o número de linhas.
+    """
+    tabela = pd.DataFrame({col: _data_iso(df[col]) for col in COLUNAS_DATA})
+    for col in COLUNAS_TEXTO:
+        tabela[col] = df[col].astype(object).to_numpy()
+    tabela["STATUS_COD"] = df["STATUS_BASE"].map(STATUS_CODIGOS).fillna(0).astype(int).to_numpy()
+    tabela["VGV"] = pd.to_numeric(df["VGV"], errors="coerce").fillna(0.0).to_numpy()
+
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    tmp = arquivo.with_name(f"{arquivo.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+
+    con = sqlite3.connect(tmp)
+    try:
+        # Banco descartável até a troca: sem journal nem fsync por linha
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        con.executescript(_ESQUEMA)
+        con.executemany("INSERT INTO status VALUES (?, ?)", sorted(STATUS_ROTULOS.items()))
+
+        colunas = list(tabela.columns)
+        sql = f"INSERT INTO eventos ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})"
+        con.executemany(sql, tabela.itertuples(index=False, name=None))
+
+        con.execute("INSERT INTO meta VALUES ('ASSINATURA_CSV', ?)", (assinatura,))
+        con.execute("ANALYZE")
+        con.commit()
+    finally:
+        con.close()
+
+    os.replace(tmp, arquivo)
+    return len(tabela)
+
+
+# ---------------------------------------------------------
+# CONEXÃO
+# ---------------------------------------------------------
+def conectar(arquivo=ARQ_BANCO):
+    """Conexão somente leitura (None se o banco ainda não foi publicado)."""
+    if not arquivo.exists():
+        return None
+    # check_same_thread=False: o Streamlit roda cada sessão numa thread
+    return sqlite3.connect(f"file:{arquivo}?mode=ro", uri=True, check_same_thread=False)
+
+
+def assinatura(con) -> str:
+    linha = con.execute("SELECT VALOR FROM meta WHERE CHAVE = 'ASSINATURA_CSV'").fetchone()
+    return linha[0] if linha else None
+
+
+def _iso(valor) -> str:
+    return valor.isoformat() if isinstance(valor, date) else str(valor)
+
+
+def _filtro(data_ini, data_fim, equipe=None, corretor=None):
+    condicoes = ["DIA BETWEEN ? AND ?"]
+    parametros = [_iso(data_ini), _iso(data_fim)]
+    if equipe not in (None, "Todas"):
+        condicoes.append("EQUIPE = ?")
+        parametros.append(equipe)
+    if corretor not in (None, "Todos"):
+        condicoes.append("CORRETOR = ?")
+        parametros.append(corretor)
+    return " AND ".join(condicoes), parametros
+
+
+def _para_pandas(df: pd.DataFrame) -> pd.DataFrame:
+    """Volta os tipos do normalizar_planilha: datas como date, STATUS_BASE como texto."""
+    for col in COLUNAS_DATA:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce").dt.date
+    if "STATUS_COD" in df.columns:
+        df.insert(df.columns.get_loc("STATUS_COD"), "STATUS_BASE", df["STATUS_COD"].map(STATUS_ROTULOS))
+        df = df.drop(columns="STATUS_COD")
+    return df
+
+
+# ---------------------------------------------------------
+# CONSULTAS (MESMO RESULTADO DE utils/consultas.py)
+# ---------------------------------------------------------
+def filtrar_periodo(con, data_ini, data_fim, equipe=None, corretor=None) -> pd.DataFrame:
+    """Linhas do período fechado [data_ini, data_fim] + equipe/corretor opcionais."""
+    where, parametros = _filtro(data_ini, data_fim, equipe, corretor)
+    df = pd.read_sql_query(f"SELECT * FROM eventos WHERE {where} ORDER BY ID", con, params=parametros)
+    return _para_pandas(df.drop(columns="ID"))
+
+
+def _codigos(rotulos) -> str:
+    return ", ".join(str(STATUS_CODIGOS[r]) for r in rotulos)
+
+
+def _inteiros(df: pd.DataFrame) -> pd.DataFrame:
+    for col in ["ANALISES", "ANALISES_BASE", "REANALISES", "APROVACOES", "VENDAS"]:
+        if col in df.columns:
+            df[col] = df[col].astype(int)
+    df["VGV"] = df["VGV"].astype(float)
+    return df
+
+
+def funil_por_grupo(con, data_ini, data_fim, grupo="EQUIPE", equipe=None, corretor=None) -> pd.DataFrame:
+    if grupo not in GRUPOS:
+        raise ValueError(f"Grupo inválido: {grupo} (use um de {GRUPOS})")
+
+    where, parametros = _filtro(data_ini, data_fim, equipe, corretor)
+    sql = f"""
+        SELECT
+            {grupo},
+            SUM(STATUS_COD IN ({_codigos(STATUS_ANALISE)})) AS ANALISES,
+            SUM(STATUS_COD = {STATUS_CODIGOS["EM ANÁLISE"]}) AS ANALISES_BASE,
+            SUM(STATUS_COD = {STATUS_CODIGOS["REANÁLISE"]}) AS REANALISES,
+            SUM(STATUS_COD = {STATUS_CODIGOS["APROVADO"]}) AS APROVACOES,
+            SUM(STATUS_COD IN ({_codigos(STATUS_VENDA)})) AS VENDAS,
+            SUM(VGV) AS VGV
+        FROM eventos
+        WHERE {where} AND {grupo} IS NOT NULL
+        GROUP BY {grupo}
+        ORDER BY {grupo}
+    """
+    return _inteiros(_para_pandas(pd.read_sql_query(sql, con, params=parametros)))
+
+
+def funil_por_equipe(con, data_ini, data_fim, equipe=None, corretor=None) -> pd.DataFrame:
+    return funil_por_grupo(con, data_ini, data_fim, "EQUIPE", equipe, corretor)
+
+
+def ranking_equipes(con, data_ini, data_fim) -> pd.DataFrame:
+    """Página 03: análises/aprovações por linha, vendas/VGV pelo status final de cada cliente."""
+    where, parametros = _filtro(data_ini, data_fim)
+    sql = f"""
+        WITH periodo AS (
+            SELECT * FROM eventos WHERE {where}
+        ),
+        base AS (
+            SELECT
+                EQUIPE,
+                SUM(STATUS_COD IN ({_codigos(STATUS_ANALISE)})) AS ANALISES,
+                SUM(STATUS_COD = {STATUS_CODIGOS["APROVADO"]}) AS APROVACOES
+            FROM periodo
+            GROUP BY EQUIPE
+        ),
+        ultima AS (
+            -- Empate de DIA: vale a linha que vem depois na planilha (ID)
+            SELECT
+                EQUIPE, STATUS_COD, VGV,
+                ROW_NUMBER() OVER (PARTITION BY CHAVE_CLIENTE ORDER BY DIA DESC, ID DESC) AS ORDEM
+            FROM periodo
+            WHERE CHAVE_CLIENTE IS NOT NULL
+        ),
+        vendas AS (
+            SELECT EQUIPE, COUNT(*) AS VENDAS, SUM(VGV) AS VGV
+            FROM ultima
+            WHERE ORDEM = 1 AND STATUS_COD IN ({_codigos(STATUS_VENDA)})
+            GROUP BY EQUIPE
+        )
+        SELECT
+            base.EQUIPE,
+            base.ANALISES,
+            base.APROVACOES,
+            COALESCE(vendas.VENDAS, 0) AS VENDAS,
+            COALESCE(vendas.VGV, 0.0) AS VGV
+        FROM base
+        LEFT JOIN vendas USING (EQUIPE)
+        ORDER BY base.EQUIPE
+    """
+    return _inteiros(pd.read_sql_query(sql, con, params=parametros))
+
+
+def vendas_por_grupo(con, data_ini, data_fim, grupos, equipe=None, corretor=None) -> pd.DataFrame:
+    """Página 10: linhas de venda e VGV por `grupos`, em ordem dos grupos."""
+    grupos = [grupos] if isinstance(grupos, str) else list(grupos)
+    invalidos = [g for g in grupos if g not in GRUPOS]
+    if invalidos:
+        raise ValueError(f"Grupo inválido: {invalidos} (use {GRUPOS})")
+
+    colunas = ", ".join(grupos)
+    where, parametros = _filtro(data_ini, data_fim, equipe, corretor)
+    sql = f"""
+        SELECT {colunas}, COUNT(*) AS VENDAS, SUM(VGV) AS VGV
+        FROM eventos
+        WHERE {where}
+          AND STATUS_COD IN ({_codigos(STATUS_VENDA)})
+          AND {" AND ".join(f"{g} IS NOT NULL" for g in grupos)}
+        GROUP BY {colunas}
+        ORDER BY {colunas}
+    """
+    return _inteiros(_para_pandas(pd.read_sql_query(sql, con, params=parametros)))
+
+
+def historico_cliente(con, chave_cliente: str) -> pd.DataFrame:
+    """Todas as linhas de um cliente em ordem de DIA (índice CHAVE_CLIENTE, DIA)."""
+    df = pd.read_sql_query(
+        "SELECT * FROM eventos WHERE CHAVE_CLIENTE = ? ORDER BY DIA, ID",
+        con,
+        params=[chave_cliente],
+    )
+    return _para_pandas(df.drop(columns="ID"))
@@ -0,0 +1,339 @@
+# utils/cache.py
+#
+# Cache em memória do processo com registro (no lugar do @st.cache_data).
+#
+# Cada função decorada com @cache_dados(ttl=...) vira um "conjunto" no
+# registro, com contagem de hits/misses, tamanho de cada entrada
+# (memory_usage(deep=True) para DataFrame), idade e evicções. Todas as
+# entradas dividem um orçamento de memória (MR_CACHE_ORCAMENTO_MB); passou
+# dele, sai a entrada usada há mais tempo (LRU).
+#
+# Como no st.cache_data, parâmetros que começam com "_" não entram na chave,
+# e o chamador recebe uma cópia (pode mexer no DataFrame à vontade).
+# Com compartilhado=True todas as sessões recebem o MESMO DataFrame, sem
+# cópia, embrulhado como somente leitura: filtrar/agrupar/assign funciona e
+# devolve DataFrame comum; df["X"] = ..., df.loc[...] = ... e inplace=True
+# levantam erro em vez de corromper o snapshot dos outros.
+# Duas sessões pedindo a mesma chave ao mesmo tempo calculam uma vez só.
+
+import copy
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import pandas as pd
+
+ORCAMENTO_MB = float(os.environ.get("MR_CACHE_ORCAMENTO_MB", 512))
+
+_trava = threading.Lock()
+_entradas = OrderedDict()  # (conjunto, chave) -> _Entrada, da menos para a mais recente
+_travas_calculo = defaultdict(threading.Lock)
+_estatisticas = defaultdict(lambda: {"hits": 0, "misses": 0, "evict_ttl": 0, "evict_lru": 0})
+
+
+class _Entrada:
+    __slots__ = ("valor", "tamanho", "criado", "ttl")
+
+    def __init__(self, valor, tamanho, ttl):
+        self.valor = valor
+        self.tamanho = tamanho
+        self.criado = time.time()
+        self.ttl = ttl
+
+    def vencida(self, agora) -> bool:
+        return self.ttl is not None and agora - self.criado > self.ttl
+
+
+# ---------------------------------------------------------
+# TAMANHO, CHAVE E CÓPIA
+# ---------------------------------------------------------
+def tamanho_bytes(valor) -> int:
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True, index=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True, index=True))
+    try:
+        return len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(valor)
+
+
+def _chave(assinatura, args, kwargs) -> str:
+    ligados = assinatura.bind(*args, **kwargs)
+    ligados.apply_defaults()
+    valores = tuple((k, v) for k, v in ligados.arguments.items() if not k.startswith("_"))
+    try:
+        bruto = pickle.dumps(valores, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        bruto = repr(valores).encode("utf-8")
+    return hashlib.sha1(bruto).hexdigest()
+
+
+def _copia(valor):
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return valor.copy()
+    return copy.deepcopy(valor)
+
+
+# ---------------------------------------------------------
+# SNAPSHOT COMPARTILHADO SOMENTE LEITURA
+# ---------------------------------------------------------
+class SnapshotSomenteLeitura(TypeError):
+    pass
+
+
+def _recusa(*args, **kwargs):
+    raise SnapshotSomenteLeitura(
+        "Snapshot compartilhado é somente leitura. Filtre antes de alterar "
+        "(df[mask].copy()) ou crie colunas com df.assign(...)."
+    )
+
+
+class _IndexadorSomenteLeitura:
+    __slots__ = ("_indexador",)
+
+    def __init__(self, indexador):
+        self._indexador = indexador
+
+    def __getitem__(self, chave):
+        return self._indexador[chave]
+
+    __setitem__ = _recusa
+
+
+class DataFrameSomenteLeitura(pd.DataFrame):
+    """
+    DataFrame do cache compartilhado. Qualquer operação que gera um novo
+    DataFrame (filtro, groupby, merge, assign, sort_values...) devolve um
+    pd.DataFrame comum; só a alteração no próprio objeto é barrada.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    __setitem__ = _recusa
+    __delitem__ = _recusa
+    insert = _recusa
+    pop = _recusa
+
+    @property
+    def loc(self):
+        return _IndexadorSomenteLeitura(super().loc)
+
+    @property
+    def iloc(self):
+        return _IndexadorSomenteLeitura(super().iloc)
+
+    @property
+    def at(self):
+        return _IndexadorSomenteLeitura(super().at)
+
+    @property
+    def iat(self):
+        return _IndexadorSomenteLeitura(super().iat)
+
+    def __setattr__(self, nome, valor):
+        # Troca de colunas/índice (df.columns = ...) também altera o compartilhado
+        if nome in ("columns", "index") or nome in getattr(self, "columns", ()):
+            _recusa()
+        super().__setattr__(nome, valor)
+
+
+def _sem_inplace(metodo):
+    original = getattr(pd.DataFrame, metodo)
+
+    @functools.wraps(original)
+    def envelope(self, *args, **kwargs):
+        if kwargs.get("inplace"):
+            _recusa()
+        return original(self, *args, **kwargs)
+
+    return envelope
+
+
+for _metodo in (
+    "drop",
+    "dropna",
+    "fillna",
+    "rename",
+    "replace",
+    "reset_index",
+    "set_index",
+    "sort_values",
+    "sort_index",
+    "drop_duplicates",
+    "query",
+    "eval",
+    "clip",
+    "where",
+    "mask",
+    "interpolate",
+):
+    setattr(DataFrameSomenteLeitura, _metodo, _sem_inplace(_metodo))
+
+for _metodo in ("update", "_update_inplace"):
+    setattr(DataFrameSomenteLeitura, _metodo, _recusa)
+
+
+def somente_leitura(df: pd.DataFrame) -> pd.DataFrame:
+    """Embrulha sem copiar os dados; df.attrs (versão do snapshot) vai junto."""
+    if isinstance(df, DataFrameSomenteLeitura) or not isinstance(df, pd.DataFrame):
+        return df
+    congelado = DataFrameSomenteLeitura(df)
+    congelado.attrs = dict(df.attrs)
+    return congelado
+
+
+# ---------------------------------------------------------
+# EVICÇÃO
+# ---------------------------------------------------------
+def _total_bytes() -> int:
+    return sum(e.tamanho for e in _entradas.values())
+
+
+def _aplica_orcamento() -> None:
+    """Chamar com _trava: tira vencidas e depois as menos usadas até caber no orçamento."""
+    agora = time.time()
+    for chave in [k for k, e in _entradas.items() if e.vencida(agora)]:
+        del _entradas[chave]
+        _estatisticas[chave[0]]["evict_ttl"] += 1
+
+    limite = ORCAMENTO_MB * 1024**2
+    total = _total_bytes()
+    # Sempre fica ao menos a entrada recém-criada, mesmo que sozinha estoure
+    while total > limite and len(_entradas) > 1:
+        chave, entrada = _entradas.popitem(last=False)
+        total -= entrada.tamanho
+        _estatisticas[chave[0]]["evict_lru"] += 1
+
+
+# ---------------------------------------------------------
+# DECORADOR
+# ---------------------------------------------------------
+def cache_dados(ttl=None, nome=None, copiar=True, compartilhado=False):
+    """
+    @cache_dados(ttl=60)
+    def carregar_dados(): ...
+
+    `ttl` em segundos (None = sem validade). `nome` é o rótulo no registro
+    (padrão: módulo.função). `copiar=False` devolve o próprio objeto
+    guardado – só para quem não altera o resultado. `compartilhado=True`
+    guarda o DataFrame como somente leitura e devolve ele mesmo (sem cópia).
+    """
+    if compartilhado:
+        copiar = False
+
+    def decorador(funcao):
+        conjunto = nome or f"{funcao.__module__}.{funcao.__qualname__}"
+        assinatura = inspect.signature(funcao)
+
+        @functools.wraps(funcao)
+        def envelope(*args, **kwargs):
+            chave = (conjunto, _chave(assinatura, args, kwargs))
+
+            valor = _busca(chave)
+            if valor is _AUSENTE:
+                with _trava:
+                    trava_calculo = _travas_calculo[chave]
+                try:
+                    with trava_calculo:
+                        # Outra sessão pode ter calculado enquanto esperávamos
+                        valor = _busca(chave, conta_miss=False)
+                        if valor is _AUSENTE:
+                            valor = funcao(*args, **kwargs)
+                            if compartilhado:
+                                valor = somente_leitura(valor)
+                            _guarda(chave, valor, ttl)
+                finally:
+                    # Também quando a função levanta: a trava não fica no dicionário
+                    with _trava:
+                        _travas_calculo.pop(chave, None)
+
+            return _copia(valor) if copiar else valor
+
+        envelope.limpar = lambda: limpar(conjunto)
+        return envelope
+
+    return decorador
+
+
+_AUSENTE = object()
+
+
+def _busca(chave, conta_miss=True):
+    agora = time.time()
+    with _trava:
+        entrada = _entradas.get(chave)
+        if entrada is not None and not entrada.vencida(agora):
+            _entradas.move_to_end(chave)
+            _estatisticas[chave[0]]["hits"] += 1
+            return entrada.valor
+        if entrada is not None:
+            del _entradas[chave]
+            _estatisticas[chave[0]]["evict_ttl"] += 1
+        if conta_miss:
+            _estatisticas[chave[0]]["misses"] += 1
+    return _AUSENTE
+
+
+def _guarda(chave, valor, ttl) -> None:
+    entrada = _Entrada(valor, tamanho_bytes(valor), ttl)
+    with _trava:
+        _entradas[chave] = entrada
+        _entradas.move_to_end(chave)
+        _aplica_orcamento()
+
+
+def limpar(conjunto=None) -> None:
+    """Esvazia o cache inteiro ou só um conjunto (as estatísticas ficam)."""
+    with _trava:
+        for chave in [k for k in _entradas if conjunto is None or k[0] == conjunto]:
+            del _entradas[chave]
+
+
+# ---------------------------------------------------------
+# RELATÓRIO
+# ---------------------------------------------------------
+def resumo_cache() -> pd.DataFrame:
+    agora = time.time()
+    with _trava:
+        por_conjunto = defaultdict(lambda: {"ENTRADAS": 0, "bytes": 0, "mais_antiga": None})
+        for (conjunto, _), e in _entradas.items():
+            c = por_conjunto[conjunto]
+            c["ENTRADAS"] += 1
+            c["bytes"] += e.tamanho
+            idade = agora - e.criado
+            c["mais_antiga"] = idade if c["mais_antiga"] is None else max(c["mais_antiga"], idade)
+        stats = {k: dict(v) for k, v in _estatisticas.items()}
+
+    linhas = []
+    for conjunto in sorted(set(stats) | set(por_conjunto)):
+        s = stats.get(conjunto, {"hits": 0, "misses": 0, "evict_ttl": 0, "evict_lru": 0})
+        c = por_conjunto.get(conjunto, {"ENTRADAS": 0, "bytes": 0, "mais_antiga": None})
+        pedidos = s["hits"] + s["misses"]
+        linhas.append(
+            {
+                "CONJUNTO": conjunto,
+                "ENTRADAS": c["ENTRADAS"],
+                "MB": c["bytes"] / 1024**2,
+                "HITS": s["hits"],
+                "MISSES": s["misses"],
+                "TAXA HIT (%)": s["hits"] / pedidos * 100 if pedidos else 0.0,
+                "EVICÇÕES TTL": s["evict_ttl"],
+                "EVICÇÕES LRU": s["evict_lru"],
+                "IDADE MÁX (s)": c["mais_antiga"] or 0.0,
+            }
+        )
+    return pd.DataFrame(linhas)
+
+
+def uso_total_mb() -> float:
+    with _trava:
+        return _total_bytes() / 1024**2
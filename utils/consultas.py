@@ -0,0 +1,320 @@
+# utils/consultas.py
+#
+# Caminhos quentes das páginas em funções puras de pandas (sem streamlit),
+# para poderem ser medidas offline (bench/benchmark.py) e reaproveitadas.
+# Cada função reproduz a regra da página indicada no comentário.
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+STATUS_ANALISE = ["EM ANÁLISE", "REANÁLISE"]
+STATUS_VENDA = ["VENDA GERADA", "VENDA INFORMADA"]
+
+# Ordem importa: quem casa depois sobrescreve (ex.: "REPROVADO" também contém "APROV")
+REGRAS_STATUS = [
+    ("EM ANÁLISE", "EM ANÁLISE"),
+    ("REANÁLISE", "REANÁLISE"),
+    ("APROV", "APROVADO"),
+    ("REPROV", "REPROVADO"),
+    ("VENDA GERADA", "VENDA GERADA"),
+    ("VENDA INFORMADA", "VENDA INFORMADA"),
+]
+
+POSSIVEIS_SITUACAO = ["SITUAÇÃO", "SITUAÇÃO ATUAL", "STATUS", "SITUACAO", "SITUACAO ATUAL"]
+POSSIVEIS_NOME = ["NOME", "CLIENTE", "NOME CLIENTE", "NOME DO CLIENTE"]
+POSSIVEIS_CPF = ["CPF", "CPF CLIENTE", "CPF DO CLIENTE"]
+POSSIVEIS_CONSTRUTORA = ["CONSTRUTORA", "INCORPORADORA"]
+POSSIVEIS_EMPREENDIMENTO = ["EMPREENDIMENTO", "PRODUTO", "IMÓVEL", "IMOVEL"]
+
+
+def _primeira_coluna(df, candidatas):
+    return next((c for c in candidatas if c in df.columns), None)
+
+
+def _texto_base(serie, vazio="NÃO INFORMADO"):
+    return serie.fillna(vazio).astype(str).str.upper().str.strip()
+
+
+def limpar_para_data(serie: pd.Series) -> pd.Series:
+    dt = pd.to_datetime(serie, dayfirst=True, errors="coerce")
+    return dt.dt.date
+
+
+# ---------------------------------------------------------
+# STATUS_BASE (mesma regra de todas as páginas)
+# ---------------------------------------------------------
+def mapear_status(situacao: pd.Series) -> pd.Series:
+    s = situacao.fillna("").astype(str).str.upper()
+    status = pd.Series("", index=s.index, dtype=object)
+    for trecho, rotulo in REGRAS_STATUS:
+        status[s.str.contains(trecho, regex=False)] = rotulo
+    return status
+
+
+# ---------------------------------------------------------
+# NORMALIZAÇÃO DA PLANILHA (carregar_dados das páginas 02/03/07)
+# ---------------------------------------------------------
+def normalizar_planilha(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df.columns = [c.strip().upper() for c in df.columns]
+
+    # DATA / DIA
+    if "DATA" in df.columns:
+        df["DIA"] = limpar_para_data(df["DATA"])
+    elif "DIA" in df.columns:
+        df["DIA"] = limpar_para_data(df["DIA"])
+    else:
+        df["DIA"] = pd.NaT
+
+    # DATA BASE (página 02): qualquer coluna com DATA e BASE, senão o próprio DIA
+    col_data_base = next((c for c in df.columns if "DATA" in c and "BASE" in c), None)
+    df["DATA_BASE"] = limpar_para_data(df[col_data_base]) if col_data_base else df["DIA"]
+
+    for col in ["EQUIPE", "CORRETOR"]:
+        df[col] = _texto_base(df[col]) if col in df.columns else "NÃO INFORMADO"
+
+    col_construtora = _primeira_coluna(df, POSSIVEIS_CONSTRUTORA)
+    col_empreend = _primeira_coluna(df, POSSIVEIS_EMPREENDIMENTO)
+    df["CONSTRUTORA_BASE"] = _texto_base(df[col_construtora]) if col_construtora else "NÃO INFORMADO"
+    df["EMPREENDIMENTO_BASE"] = _texto_base(df[col_empreend]) if col_empreend else "NÃO INFORMADO"
+
+    col_situacao = _primeira_coluna(df, POSSIVEIS_SITUACAO)
+    if col_situacao:
+        df["STATUS_BASE"] = mapear_status(df[col_situacao])
+        df["SITUACAO_ORIGINAL"] = _texto_base(df[col_situacao], vazio="")
+    else:
+        df["STATUS_BASE"] = ""
+        df["SITUACAO_ORIGINAL"] = "NÃO INFORMADO"
+
+    if "OBSERVAÇÕES" in df.columns:
+        df["OBSERVACOES_RAW"] = df["OBSERVAÇÕES"].fillna("").astype(str).str.strip()
+        df["VGV"] = pd.to_numeric(df["OBSERVAÇÕES"], errors="coerce").fillna(0.0)
+    else:
+        df["OBSERVACOES_RAW"] = ""
+        df["VGV"] = 0.0
+
+    col_nome = _primeira_coluna(df, POSSIVEIS_NOME)
+    col_cpf = _primeira_coluna(df, POSSIVEIS_CPF)
+    df["NOME_CLIENTE_BASE"] = _texto_base(df[col_nome]) if col_nome else "NÃO INFORMADO"
+    df["CPF_CLIENTE_BASE"] = (
+        df[col_cpf].fillna("").astype(str).str.replace(r"\D", "", regex=True)
+        if col_cpf
+        else ""
+    )
+
+    # Chave do cliente (página 03): nome + CPF
+    df["CHAVE_CLIENTE"] = df["NOME_CLIENTE_BASE"] + " | " + df["CPF_CLIENTE_BASE"]
+
+    return df
+
+
+# ---------------------------------------------------------
+# FILTROS
+# ---------------------------------------------------------
+def filtrar_periodo(df, data_ini, data_fim, equipe=None, corretor=None) -> pd.DataFrame:
+    """Período fechado [data_ini, data_fim] + equipe/corretor opcionais (None ou "Todas"/"Todos" = sem filtro)."""
+    mask = (df["DIA"] >= data_ini) & (df["DIA"] <= data_fim)
+    if equipe not in (None, "Todas"):
+        mask &= df["EQUIPE"] == equipe
+    if corretor not in (None, "Todos"):
+        mask &= df["CORRETOR"] == corretor
+    return df[mask]
+
+
+# ---------------------------------------------------------
+# FUNIL POR EQUIPE (página 04 – "Funil por Equipe (comparativo)")
+# ---------------------------------------------------------
+def funil_por_grupo(df_periodo: pd.DataFrame, grupo: str = "EQUIPE") -> pd.DataFrame:
+    """
+    Contagens por status somando colunas booleanas num único groupby,
+    em vez de uma função Python por grupo e por métrica.
+    """
+    s = df_periodo["STATUS_BASE"]
+    flags = pd.DataFrame(
+        {
+            grupo: df_periodo[grupo],
+            "ANALISES": s.isin(STATUS_ANALISE),
+            "ANALISES_BASE": s == "EM ANÁLISE",
+            "REANALISES": s == "REANÁLISE",
+            "APROVACOES": s == "APROVADO",
+            "VENDAS": s.isin(STATUS_VENDA),
+            "VGV": df_periodo["VGV"],
+        }
+    )
+    funil = flags.groupby(grupo, sort=True).sum().reset_index()
+    for col in ["ANALISES", "ANALISES_BASE", "REANALISES", "APROVACOES", "VENDAS"]:
+        funil[col] = funil[col].astype(int)
+    return funil
+
+
+def funil_por_equipe(df_periodo: pd.DataFrame) -> pd.DataFrame:
+    return funil_por_grupo(df_periodo, "EQUIPE")
+
+
+# ---------------------------------------------------------
+# VENDAS: 1 POR CLIENTE (ÚLTIMA MOVIMENTAÇÃO DE VENDA)
+# ---------------------------------------------------------
+def ultima_venda_por_cliente(df: pd.DataFrame) -> pd.DataFrame:
+    df_vendas = df[df["STATUS_BASE"].isin(STATUS_VENDA)]
+    if df_vendas.empty:
+        return df_vendas
+    return df_vendas.sort_values("DIA", kind="stable").groupby("CHAVE_CLIENTE").tail(1)
+
+
+# ---------------------------------------------------------
+# RANKING POR CORRETOR NUMA DATA BASE (página 02)
+# ---------------------------------------------------------
+def ranking_por_data_base(df: pd.DataFrame, data_base, equipe=None) -> pd.DataFrame:
+    df_ref = df[df["DATA_BASE"] == data_base]
+    if equipe not in (None, "Todas"):
+        df_ref = df_ref[df_ref["EQUIPE"] == equipe]
+
+    s = df_ref["STATUS_BASE"]
+    analises = df_ref[s.isin(STATUS_ANALISE)].groupby("CORRETOR").size().rename("ANALISES")
+    aprovacoes = df_ref[s == "APROVADO"].groupby("CORRETOR").size().rename("APROVACOES")
+
+    vendas_ult = ultima_venda_por_cliente(df_ref)
+    vendas = vendas_ult.groupby("CORRETOR").size().rename("VENDAS")
+    vgv = vendas_ult.groupby("CORRETOR")["VGV"].sum().rename("VGV")
+
+    ranking = pd.concat([analises, aprovacoes, vendas, vgv], axis=1).fillna(0)
+    ranking.index.name = "CORRETOR"
+    ranking = ranking.reset_index()
+
+    for col in ["ANALISES", "APROVACOES", "VENDAS"]:
+        ranking[col] = ranking[col].astype(int)
+    ranking["VGV"] = ranking["VGV"].astype(float)
+
+    ranking["TAXA_APROV_ANALISES"] = np.where(
+        ranking["ANALISES"] > 0, ranking["APROVACOES"] / ranking["ANALISES"] * 100, 0.0
+    )
+    ranking["TAXA_VENDAS_ANALISES"] = np.where(
+        ranking["ANALISES"] > 0, ranking["VENDAS"] / ranking["ANALISES"] * 100, 0.0
+    )
+
+    return ranking.sort_values(
+        by=["VGV", "VENDAS", "APROVACOES", "ANALISES"],
+        ascending=False,
+    ).reset_index(drop=True)
+
+
+# ---------------------------------------------------------
+# RANKING POR EQUIPE NO PERÍODO (página 03)
+# ---------------------------------------------------------
+def ranking_equipes(df_periodo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Análises/aprovações por linha; vendas e VGV pelo status final de cada
+    cliente no período (1 venda por cliente). Uma linha por equipe com
+    movimento no período, em ordem de EQUIPE; zeradas, taxas e ordenação
+    ficam com a página.
+    """
+    s = df_periodo["STATUS_BASE"]
+    base = (
+        pd.DataFrame(
+            {
+                "EQUIPE": df_periodo["EQUIPE"],
+                "ANALISES": s.isin(STATUS_ANALISE),
+                "APROVACOES": s == "APROVADO",
+            }
+        )
+        .groupby("EQUIPE", sort=True)
+        .sum()
+        .astype(int)
+        .reset_index()
+    )
+
+    # Empate de DIA: vale a linha que vem depois na planilha
+    df_ult = (
+        df_periodo.dropna(subset=["CHAVE_CLIENTE"])
+        .sort_values("DIA", kind="stable")
+        .groupby("CHAVE_CLIENTE")
+        .tail(1)
+    )
+    df_vendas = df_ult[df_ult["STATUS_BASE"].isin(STATUS_VENDA)]
+    vendas = (
+        df_vendas.groupby("EQUIPE")
+        .agg(VENDAS=("STATUS_BASE", "size"), VGV=("VGV", "sum"))
+        .reset_index()
+    )
+
+    ranking = base.merge(vendas, on="EQUIPE", how="left")
+    ranking["VENDAS"] = ranking["VENDAS"].fillna(0).astype(int)
+    ranking["VGV"] = ranking["VGV"].fillna(0.0).astype(float)
+    return ranking
+
+
+# ---------------------------------------------------------
+# VENDAS POR GRUPO E MIX (página 10 – cada linha de venda conta)
+# ---------------------------------------------------------
+def vendas_por_grupo(df_periodo: pd.DataFrame, grupos) -> pd.DataFrame:
+    """Quantidade de linhas de venda e VGV por `grupos` (lista de colunas), em ordem dos grupos."""
+    grupos = list(grupos)
+    df_vendas = df_periodo[df_periodo["STATUS_BASE"].isin(STATUS_VENDA)]
+    resultado = (
+        df_vendas.groupby(grupos, sort=True)
+        .agg(VENDAS=("STATUS_BASE", "size"), VGV=("VGV", "sum"))
+        .reset_index()
+    )
+    resultado["VENDAS"] = resultado["VENDAS"].astype(int)
+    resultado["VGV"] = resultado["VGV"].astype(float)
+    return resultado
+
+
+# ---------------------------------------------------------
+# STATUS ATUAL POR CLIENTE (páginas 08/09 – última linha do cliente)
+# ---------------------------------------------------------
+def status_atual(df: pd.DataFrame, col_cliente: str = "NOME_CLIENTE_BASE") -> pd.DataFrame:
+    dia = pd.to_datetime(df["DIA"], errors="coerce")
+    df_valid = df.assign(DIA=dia).dropna(subset=["DIA"])
+    df_valid = df_valid.sort_values(by=[col_cliente, "DIA"])
+    return df_valid.drop_duplicates(subset=[col_cliente], keep="last")
+
+
+# ---------------------------------------------------------
+# BUSCA DE CLIENTE (página 07)
+# ---------------------------------------------------------
+def buscar_cliente(df: pd.DataFrame, termo: str, por: str = "nome") -> pd.DataFrame:
+    if not termo.strip():
+        return df.iloc[0:0]
+
+    if por == "cpf":
+        termo_cpf = "".join(ch for ch in termo if ch.isdigit())
+        return df[df["CPF_CLIENTE_BASE"].str.contains(termo_cpf, regex=False, na=False)]
+
+    termo_limpo = termo.strip().upper()
+    return df[df["NOME_CLIENTE_BASE"].str.contains(termo_limpo, regex=False, na=False)]
+
+
+# ---------------------------------------------------------
+# ALERTAS: CORRETORES PARADOS (página 06)
+# ---------------------------------------------------------
+def calcular_alertas(df: pd.DataFrame, dias_sem: int = 3, janela: int = 30) -> pd.DataFrame:
+    """
+    Corretores com análise nos últimos `janela` dias mas nenhuma nos
+    últimos `dias_sem`, relativo à última análise da base. Um groupby
+    no lugar do laço por corretor.
+    """
+    colunas = ["CORRETOR", "ÚLTIMA ANÁLISE", "DIAS SEM ANÁLISE (janela 30d)"]
+
+    df_analise = df[df["STATUS_BASE"].isin(STATUS_ANALISE)]
+    dt_analise = pd.to_datetime(df_analise["DIA"], errors="coerce")
+    if dt_analise.isna().all():
+        return pd.DataFrame(columns=colunas)
+
+    data_ref = dt_analise.max().normalize()
+    na_janela = dt_analise >= data_ref - timedelta(days=janela)
+
+    ultima = dt_analise[na_janela].groupby(df_analise.loc[na_janela, "CORRETOR"]).max()
+    dias = (data_ref - ultima).dt.days
+
+    alerta = pd.DataFrame(
+        {
+            "CORRETOR": ultima.index,
+            "ÚLTIMA ANÁLISE": ultima.dt.date.to_numpy(),
+            "DIAS SEM ANÁLISE (janela 30d)": dias.to_numpy(),
+        }
+    )
+    alerta = alerta[alerta["DIAS SEM ANÁLISE (janela 30d)"] >= dias_sem]
+    return alerta.sort_values("DIAS SEM ANÁLISE (janela 30d)", ascending=False).reset_index(drop=True)
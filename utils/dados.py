@@ -0,0 +1,374 @@
+# utils/dados.py
+
+import hashlib
+import io
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from utils.metricas_io import registrar_cache, registrar_requisicao
+
+# ---------------------------------------------------------
+# PLANILHA (GOOGLE SHEETS) E API DE LEADS
+# ---------------------------------------------------------
+SHEET_ID = "1Ir_fPugLsfHNk6iH0XPCA6xM92bq8tTrn7UnunGRwCw"
+GID_ANALISES = "1574157905"
+
+# As variáveis de ambiente apontam o app para um servidor local
+# (bench/servidor_local.py) nas medições; em produção ficam vazias.
+CSV_URL = os.environ.get(
+    "MR_CSV_URL",
+    f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_ANALISES}",
+)
+
+BASE_URL_LEADS = os.environ.get("MR_LEADS_URL", "https://api.supremocrm.com.br/v1/leads")
+
+# ---------------------------------------------------------
+# SNAPSHOT EM DISCO (COMPARTILHADO ENTRE PÁGINAS E COM O AQUECIMENTO)
+# ---------------------------------------------------------
+DIR_CACHE = Path(os.environ.get("MR_DIR_CACHE") or Path(__file__).resolve().parent.parent / ".cache")
+ARQ_PLANILHA = DIR_CACHE / "planilha_analises.pkl"
+ARQ_LEADS = DIR_CACHE / "leads_supremo.pkl"
+
+# Mesmo tempo de vida do @cache_dados(ttl=60) das páginas
+IDADE_MAX_SNAPSHOT = 60
+
+CHAVE_VERSAO = "VERSAO_SNAPSHOT"
+CHAVE_ASSINATURA_CSV = "ASSINATURA_CSV"
+
+
+# ---------------------------------------------------------
+# VERSÃO DO SNAPSHOT DA PLANILHA
+# ---------------------------------------------------------
+def carimba_versao(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Marca o DataFrame carregado com uma versão (hash do conteúdo).
+    Chamar dentro do carregador com @cache_dados: roda uma vez por
+    download e a versão vai junto no cache (df.attrs sobrevive ao pickle).
+    """
+    try:
+        hash_linhas = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        assinatura = f"{int(hash_linhas.sum(dtype='uint64')):016x}"
+    except TypeError:
+        # Coluna com tipo não-hasheável: cai pro texto do CSV normalizado
+        assinatura = f"{hash(df.to_csv(index=False)) & 0xFFFFFFFFFFFFFFFF:016x}"
+
+    df.attrs[CHAVE_VERSAO] = f"{len(df)}-{assinatura}"
+    return df
+
+
+def versao_snapshot(df: pd.DataFrame) -> str:
+    return df.attrs.get(CHAVE_VERSAO, "sem-versao")
+
+
+# ---------------------------------------------------------
+# GRAVAÇÃO / LEITURA DO SNAPSHOT
+#
+# Com pyarrow (vem junto com o Streamlit) o snapshot é publicado como
+# arquivo Arrow IPC versionado (<nome>.<versão>.arrow) e um ponteiro
+# <nome>.atual diz qual versão vale. Cada processo mapeia o arquivo em
+# memória (somente leitura): várias réplicas do Streamlit no mesmo host
+# dividem as mesmas páginas de memória do SO em vez de cada uma ter a sua
+# cópia. Trocar o ponteiro é atômico; quem lê pega a versão nova no
+# próximo acesso, sem reiniciar. Sem pyarrow, cai no pickle de antes.
+# ---------------------------------------------------------
+VERSOES_MANTIDAS = 3
+
+_mapeados = {}  # ponteiro -> (arquivo de dados, DataFrame mapeado)
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pa
+
+
+def _ponteiro(arquivo: Path) -> Path:
+    return arquivo.with_suffix(".atual")
+
+
+def _controle(arquivo: Path) -> Path:
+    """Arquivo cujo mtime é a data do snapshot: o ponteiro Arrow se existir, senão o pickle."""
+    ponteiro = _ponteiro(arquivo)
+    if _pyarrow() is not None and ponteiro.exists():
+        return ponteiro
+    return arquivo
+
+
+def _troca_atomica(destino: Path, escreve) -> None:
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    escreve(tmp)
+    os.replace(tmp, destino)
+
+
+def _tipo_texto_arrow():
+    """Texto continua apontando pro buffer Arrow (sem virar objeto Python), com NaN como nulo."""
+    for criar in (
+        lambda: pd.StringDtype("pyarrow", na_value=float("nan")),
+        lambda: pd.StringDtype("pyarrow_numpy"),
+    ):
+        try:
+            return criar()
+        except (TypeError, ValueError, ImportError):
+            continue
+    return None
+
+
+def _publica_arrow(pa, df: pd.DataFrame, arquivo: Path) -> None:
+    import json
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[b"mr_attrs"] = json.dumps(df.attrs, default=str).encode("utf-8")
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    dados = arquivo.with_name(f"{arquivo.stem}.{time.time_ns()}.arrow")
+
+    def escreve_dados(tmp):
+        # Sem compressão: o arquivo é mapeado direto em memória
+        with pa.OSFile(str(tmp), "wb") as saida, pa.ipc.new_file(saida, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+
+    _troca_atomica(dados, escreve_dados)
+    _troca_atomica(_ponteiro(arquivo), lambda tmp: tmp.write_text(dados.name, encoding="utf-8"))
+
+    _remove_versoes(arquivo, VERSOES_MANTIDAS)
+
+
+def _remove_versoes(arquivo: Path, manter: int) -> None:
+    """
+    Apaga as versões Arrow antigas, deixando as `manter` mais novas. Quem
+    ainda tem o mapa aberto continua lendo (o SO só libera o espaço quando o
+    último fecha).
+    """
+    antigas = sorted(arquivo.parent.glob(f"{arquivo.stem}.*.arrow"), key=lambda a: a.stat().st_mtime)
+    for velha in antigas[: max(len(antigas) - manter, 0)]:
+        try:
+            velha.unlink()
+        except OSError:
+            pass
+
+
+def _le_arrow(pa, ponteiro: Path):
+    import json
+
+    nome_dados = ponteiro.read_text(encoding="utf-8").strip()
+    memo = _mapeados.get(ponteiro)
+    if memo is None or memo[0] != nome_dados:
+        mapa = pa.memory_map(str(ponteiro.with_name(nome_dados)), "r")
+        tabela = pa.ipc.open_file(mapa).read_all()
+
+        tipo_texto = _tipo_texto_arrow()
+        mapeador = None
+        if tipo_texto is not None:
+            mapeador = lambda t: tipo_texto if pa.types.is_string(t) or pa.types.is_large_string(t) else None
+
+        df = tabela.to_pandas(types_mapper=mapeador, self_destruct=False)
+        attrs = (tabela.schema.metadata or {}).get(b"mr_attrs")
+        if attrs:
+            df.attrs.update(json.loads(attrs))
+        memo = _mapeados[ponteiro] = (nome_dados, df)
+
+    # Cópia rasa: quem chama pode renomear/criar colunas sem mexer no mapeado
+    return memo[1].copy(deep=False)
+
+
+def salva_snapshot(df: pd.DataFrame, arquivo: Path) -> None:
+    """Grava num temporário e troca de uma vez: quem lê nunca pega arquivo pela metade."""
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+
+    pa = _pyarrow()
+    if pa is not None:
+        try:
+            _publica_arrow(pa, df, arquivo)
+            return
+        except (pa.ArrowException, TypeError, ValueError):
+            # Coluna que o Arrow não representa: esse snapshot vai em pickle
+            # e as versões Arrow de antes deixam de ser lidas
+            _ponteiro(arquivo).unlink(missing_ok=True)
+            _remove_versoes(arquivo, 0)
+
+    _troca_atomica(arquivo, df.to_pickle)
+
+
+def le_snapshot(arquivo: Path, idade_max=IDADE_MAX_SNAPSHOT):
+    """DataFrame do disco se existir e tiver no máximo `idade_max` segundos (None = qualquer idade)."""
+    controle = _controle(arquivo)
+    try:
+        idade = time.time() - controle.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    if idade_max is not None and idade > idade_max:
+        return None
+
+    try:
+        if controle != arquivo:
+            return _le_arrow(_pyarrow(), controle)
+        return pd.read_pickle(arquivo)
+    except Exception:
+        return None
+
+
+def renova_snapshot(arquivo: Path) -> None:
+    """Conteúdo não mudou: só marca o snapshot como recente."""
+    os.utime(_controle(arquivo))
+
+
+def data_snapshot(arquivo: Path):
+    """Quando o snapshot foi gravado (None se ainda não existe)."""
+    try:
+        return datetime.fromtimestamp(_controle(arquivo).stat().st_mtime)
+    except FileNotFoundError:
+        return None
+
+
+# ---------------------------------------------------------
+# LEITURA DA PLANILHA (DISCO RECENTE → REDE → DISCO ANTIGO)
+# ---------------------------------------------------------
+def baixar_csv(url: str = CSV_URL, timeout: float = 30) -> bytes:
+    """Download cru da planilha, registrando latência, status e bytes (utils/metricas_io.py)."""
+    from urllib.error import HTTPError
+    from urllib.request import urlopen
+
+    ini = time.perf_counter()
+    try:
+        with urlopen(url, timeout=timeout) as resp:
+            corpo = resp.read()
+            status = resp.status
+    except HTTPError as e:
+        registrar_requisicao("planilha", (time.perf_counter() - ini) * 1000, e.code)
+        raise
+    except Exception:
+        registrar_requisicao("planilha", (time.perf_counter() - ini) * 1000, "erro")
+        raise
+
+    registrar_requisicao("planilha", (time.perf_counter() - ini) * 1000, status, len(corpo))
+    return corpo
+
+
+def ler_planilha(idade_max=IDADE_MAX_SNAPSHOT) -> pd.DataFrame:
+    """
+    Planilha crua (sem normalização). Usa o snapshot em disco se estiver
+    fresco – o aquecimento (aquecer_cache.py) deixa ele pronto antes do
+    primeiro acesso; senão baixa e atualiza o disco. Se o CSV baixado for
+    idêntico ao do snapshot, só renova o snapshot (não reprocessa). Se a
+    rede falhar, serve o último snapshot que tiver.
+    """
+    df = le_snapshot(ARQ_PLANILHA, idade_max)
+    if df is not None:
+        registrar_cache("planilha", "hit")
+        return df
+
+    try:
+        corpo = baixar_csv()
+    except Exception:
+        df = le_snapshot(ARQ_PLANILHA, None)
+        if df is None:
+            raise
+        registrar_cache("planilha", "stale")
+        return df
+
+    assinatura = hashlib.sha1(corpo).hexdigest()
+    anterior = le_snapshot(ARQ_PLANILHA, None)
+    if anterior is not None and anterior.attrs.get(CHAVE_ASSINATURA_CSV) == assinatura:
+        renova_snapshot(ARQ_PLANILHA)
+        registrar_cache("planilha", "revalidated")
+        return anterior
+
+    df = pd.read_csv(io.BytesIO(corpo))
+    df.attrs[CHAVE_ASSINATURA_CSV] = assinatura
+    salva_snapshot(df, ARQ_PLANILHA)
+    registrar_cache("planilha", "miss")
+    return df
+
+
+# ---------------------------------------------------------
+# LEADS DO SUPREMO
+# ---------------------------------------------------------
+def baixar_leads(limit: int = 1000, max_pages: int = 100) -> pd.DataFrame:
+    """
+    Varre as páginas da API do Supremo até `limit` leads. Em erro de
+    conexão/HTTP/JSON interrompe e fica com o que já veio.
+    """
+    import requests  # só carrega o módulo quando realmente vai na API
+
+    from utils.supremo_config import TOKEN_SUPREMO
+
+    headers = {"Authorization": f"Bearer {TOKEN_SUPREMO}"}
+
+    dfs = []
+    total = 0
+    pagina = 1
+
+    while total < limit and pagina <= max_pages:
+        params = {"pagina": pagina}
+        ini = time.perf_counter()
+        try:
+            resp = requests.get(
+                BASE_URL_LEADS,
+                headers=headers,
+                params=params,
+                timeout=30,
+            )
+        except Exception:
+            registrar_requisicao("leads", (time.perf_counter() - ini) * 1000, "erro")
+            break
+
+        registrar_requisicao("leads", (time.perf_counter() - ini) * 1000, resp.status_code, len(resp.content))
+        if resp.status_code != 200:
+            break
+
+        try:
+            data = resp.json()
+        except Exception:
+            break
+
+        if isinstance(data, dict) and "data" in data:
+            df_page = pd.DataFrame(data["data"])
+        elif isinstance(data, list):
+            df_page = pd.DataFrame(data)
+        else:
+            df_page = pd.DataFrame()
+
+        if df_page.empty:
+            break
+
+        dfs.append(df_page)
+        total += len(df_page)
+        pagina += 1
+
+    if not dfs:
+        return pd.DataFrame()
+
+    df_all = pd.concat(dfs, ignore_index=True)
+
+    if "id" in df_all.columns:
+        df_all = df_all.drop_duplicates(subset="id")
+
+    if "data_captura" in df_all.columns:
+        df_all["data_captura"] = pd.to_datetime(
+            df_all["data_captura"], errors="coerce"
+        )
+
+    return df_all.head(limit)
+
+
+def ler_leads(idade_max=IDADE_MAX_SNAPSHOT) -> pd.DataFrame:
+    """Leads do snapshot em disco se frescos; senão baixa e grava (vazio não é gravado)."""
+    df = le_snapshot(ARQ_LEADS, idade_max)
+    if df is not None:
+        registrar_cache("leads", "hit")
+        return df
+
+    df = baixar_leads()
+    if not df.empty:
+        salva_snapshot(df, ARQ_LEADS)
+    registrar_cache("leads", "miss")
+    return df
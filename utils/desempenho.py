@@ -0,0 +1,257 @@
+# utils/desempenho.py
+#
+# Cronometragem por trecho de página, acumulada por processo.
+#
+#   cronometro("nome")     context manager / decorador para um trecho isolado
+#   iniciar_rerun(pagina)  no topo da página, logo depois dos imports
+#   etapa("nome")          fecha o trecho desde a última etapa (scripts lineares)
+#   marco()                recomeça a contar daqui: o trecho anterior (CSS,
+#                          widgets da sidebar) não entra na próxima etapa
+#   fechar_rerun(filtros)  no fim da página: registra o rerun, loga se estiver
+#                          lento e desenha o painel "⚙️ Performance"
+#   parar(filtros)         no lugar de st.stop(): fecha o rerun antes de parar
+#
+# Só viram etapa carga, normalização, agregações e renderização de gráficos e
+# tabelas; o resto da página fica fora das etapas, mas dentro do rerun.
+#
+# O painel só aparece com ?perf=1 na URL. Reruns acima de
+# LIMITE_RERUN_LENTO_MS (variável MR_RERUN_LENTO_MS) vão para o log com os
+# filtros ativos e o tempo de cada etapa.
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator
+
+import pandas as pd
+
+LIMITE_RERUN_LENTO_MS = float(os.environ.get("MR_RERUN_LENTO_MS", 3000))
+
+# Limites superiores (ms) das faixas do histograma; a última faixa é "acima"
+FAIXAS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+AMOSTRAS_MAX = 500
+
+PARAMETRO_PAINEL = "perf"
+
+_log = logging.getLogger("mr_imoveis.desempenho")
+
+_trava = threading.Lock()
+_secoes = {}
+
+# Cada sessão roda o script na sua própria thread: o rerun em andamento é por thread
+_rerun = threading.local()
+
+
+# ---------------------------------------------------------
+# REGISTRO POR PROCESSO
+# ---------------------------------------------------------
+class _Secao:
+    __slots__ = ("n", "total_ms", "max_ms", "faixas", "amostras")
+
+    def __init__(self):
+        self.n = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.faixas = [0] * (len(FAIXAS_MS) + 1)
+        self.amostras = deque(maxlen=AMOSTRAS_MAX)
+
+    def adiciona(self, ms: float) -> None:
+        self.n += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.amostras.append(ms)
+        for i, limite in enumerate(FAIXAS_MS):
+            if ms <= limite:
+                self.faixas[i] += 1
+                return
+        self.faixas[-1] += 1
+
+
+def _pagina_atual() -> str:
+    return getattr(_rerun, "pagina", "-")
+
+
+def registrar(nome: str, ms: float, pagina=None) -> None:
+    chave = (pagina or _pagina_atual(), nome)
+    with _trava:
+        secao = _secoes.get(chave)
+        if secao is None:
+            secao = _secoes[chave] = _Secao()
+        secao.adiciona(ms)
+
+    partes = getattr(_rerun, "partes", None)
+    if partes is not None:
+        partes.append((nome, ms))
+
+
+def zerar() -> None:
+    with _trava:
+        _secoes.clear()
+
+
+def resumo(pagina=None) -> pd.DataFrame:
+    """Uma linha por (página, trecho): contagem, média, p50/p95, máximo e histograma."""
+    with _trava:
+        itens = [(k, s.n, s.total_ms, s.max_ms, list(s.faixas), list(s.amostras)) for k, s in _secoes.items()]
+
+    rotulos = [f"≤{l}ms" for l in FAIXAS_MS] + [f">{FAIXAS_MS[-1]}ms"]
+    linhas = []
+    for (pag, nome), n, total, maximo, faixas, amostras in itens:
+        if pagina is not None and pag != pagina:
+            continue
+        serie = pd.Series(amostras, dtype=float)
+        linha = {
+            "PÁGINA": pag,
+            "TRECHO": nome,
+            "N": n,
+            "MÉDIA (ms)": total / n if n else 0.0,
+            "P50 (ms)": serie.quantile(0.5) if n else 0.0,
+            "P95 (ms)": serie.quantile(0.95) if n else 0.0,
+            "MÁX (ms)": maximo,
+        }
+        linha.update(dict(zip(rotulos, faixas)))
+        linhas.append(linha)
+
+    if not linhas:
+        return pd.DataFrame(columns=["PÁGINA", "TRECHO", "N", "MÉDIA (ms)", "P50 (ms)", "P95 (ms)", "MÁX (ms)"] + rotulos)
+    return pd.DataFrame(linhas).sort_values(["PÁGINA", "MÉDIA (ms)"], ascending=[True, False]).reset_index(drop=True)
+
+
+# ---------------------------------------------------------
+# API DE CRONOMETRAGEM
+# ---------------------------------------------------------
+class cronometro(ContextDecorator):
+    """
+    with cronometro("normalização"):
+        ...
+
+    @cronometro("carregar_dados")
+    def carregar_dados(): ...
+
+    Abaixo de @cache_dados só mede quando a função realmente roda (miss).
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    def __enter__(self):
+        self._ini = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registrar(self.nome, (time.perf_counter() - self._ini) * 1000)
+        return False
+
+
+def iniciar_rerun(pagina: str) -> None:
+    agora = time.perf_counter()
+    _rerun.pagina = pagina
+    _rerun.inicio = agora
+    _rerun.ultimo = agora
+    _rerun.partes = []
+
+
+def etapa(nome: str) -> None:
+    """Registra o tempo desde a etapa anterior (ou do início do rerun) sob `nome`."""
+    ultimo = getattr(_rerun, "ultimo", None)
+    if ultimo is None:
+        return
+    agora = time.perf_counter()
+    registrar(nome, (agora - ultimo) * 1000)
+    _rerun.ultimo = agora
+
+
+def marco() -> None:
+    """Descarta o tempo desde a última etapa: a próxima etapa conta a partir daqui."""
+    if getattr(_rerun, "ultimo", None) is not None:
+        _rerun.ultimo = time.perf_counter()
+
+
+def fechar_rerun(filtros=None) -> None:
+    inicio = getattr(_rerun, "inicio", None)
+    if inicio is None:
+        return
+
+    total_ms = (time.perf_counter() - inicio) * 1000
+    partes = _rerun.partes
+    _rerun.partes = None
+    _rerun.inicio = _rerun.ultimo = None
+    registrar("RERUN COMPLETO", total_ms)
+
+    if total_ms > LIMITE_RERUN_LENTO_MS:
+        detalhes = ", ".join(f"{nome}={ms:.0f}ms" for nome, ms in sorted(partes, key=lambda p: -p[1])[:8])
+        _log.warning(
+            "Rerun lento em %s: %.0f ms • filtros=%s • %s",
+            _pagina_atual(),
+            total_ms,
+            filtros or {},
+            detalhes,
+        )
+
+    painel_desempenho(total_ms, partes)
+
+
+def parar(filtros=None) -> None:
+    """st.stop() que ainda registra o rerun, loga se lento e desenha o painel."""
+    import streamlit as st
+
+    fechar_rerun(filtros)
+    st.stop()
+
+
+# ---------------------------------------------------------
+# PAINEL ESCONDIDO (?perf=1)
+# ---------------------------------------------------------
+def painel_ativo() -> bool:
+    import streamlit as st
+
+    return st.query_params.get(PARAMETRO_PAINEL, "") not in ("", "0", "false")
+
+
+def painel_desempenho(total_ms: float, partes) -> None:
+    if not painel_ativo():
+        return
+
+    import streamlit as st
+
+    pagina = _pagina_atual()
+    with st.sidebar.expander("⚙️ Performance", expanded=True):
+        st.caption(f"Este rerun: {total_ms:.0f} ms • processo {os.getpid()}")
+        if partes:
+            st.dataframe(
+                pd.DataFrame(partes, columns=["TRECHO", "ms"]).sort_values("ms", ascending=False),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+        st.caption("Acumulado do processo nesta página")
+        st.dataframe(
+            resumo(pagina).drop(columns=["PÁGINA"]),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                c: st.column_config.NumberColumn(format="%.1f")
+                for c in ["MÉDIA (ms)", "P50 (ms)", "P95 (ms)", "MÁX (ms)"]
+            },
+        )
+
+        from utils.cache import ORCAMENTO_MB, resumo_cache, uso_total_mb
+        from utils.metricas_io import texto_metricas
+
+        st.caption(f"Cache do processo: {uso_total_mb():.1f} de {ORCAMENTO_MB:.0f} MB")
+        st.dataframe(
+            resumo_cache(),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                c: st.column_config.NumberColumn(format="%.1f") for c in ["MB", "TAXA HIT (%)", "IDADE MÁX (s)"]
+            },
+        )
+
+        st.caption("Chamadas externas (Sheets / Supremo)")
+        st.code(texto_metricas(), language=None)
+
+        if st.button("Zerar métricas", key="perf_zerar"):
+            zerar()
@@ -0,0 +1,85 @@
+# utils/formatacao.py
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Troca separadores do padrão americano (1,234.56) pro brasileiro (1.234,56)
+_TROCA_SEPARADORES = str.maketrans(",.", ".,")
+
+
+# ---------------------------------------------------------
+# VALORES ÚNICOS (CARDS / st.metric)
+# ---------------------------------------------------------
+def formata_moeda(valor) -> str:
+    if round(valor, 2) == 0:
+        # -0.004 arredonda para -0,00: sem sinal quando não sobra centavo
+        valor = 0.0
+    return f"R$ {valor:,.2f}".translate(_TROCA_SEPARADORES)
+
+
+def formata_percentual(valor, casas: int = 1) -> str:
+    return f"{valor:.{casas}f}%"
+
+
+def formata_data(valor, vazio: str = "") -> str:
+    if valor is None or pd.isna(valor):
+        return vazio
+    return valor.strftime("%d/%m/%Y")
+
+
+# ---------------------------------------------------------
+# SÉRIES INTEIRAS (SÓ NAS LINHAS QUE VÃO PRA TELA)
+# ---------------------------------------------------------
+def formata_moeda_serie(serie: pd.Series) -> pd.Series:
+    """
+    R$ 1.234,56 em bloco: separa reais/centavos com numpy e agrupa
+    os milhares com uma única regex, sem chamar Python linha a linha.
+    """
+    valores = pd.to_numeric(serie, errors="coerce")
+    nulos = valores.isna().to_numpy()
+
+    centavos = np.rint(np.abs(valores.fillna(0.0).to_numpy(dtype=float)) * 100).astype(np.int64)
+
+    reais = pd.Series(centavos // 100, index=serie.index).astype(str)
+    reais = reais.str.replace(r"\B(?=(\d{3})+(?!\d))", ".", regex=True)
+    cents = pd.Series(centavos % 100, index=serie.index).astype(str).str.zfill(2)
+    # Sinal só se sobrar centavo depois de arredondar (nada de "R$ -0,00")
+    sinal = np.where((valores.to_numpy(dtype=float, na_value=0.0) < 0) & (centavos > 0), "-", "")
+
+    texto = "R$ " + sinal + reais + "," + cents
+    texto[nulos] = ""
+    return texto
+
+
+def formata_percentual_serie(serie: pd.Series, casas: int = 1) -> pd.Series:
+    valores = pd.to_numeric(serie, errors="coerce").to_numpy(dtype=float)
+    texto = pd.Series(np.char.mod(f"%.{casas}f%%", valores), index=serie.index)
+    texto[np.isnan(valores)] = ""
+    return texto
+
+
+def formata_data_serie(serie: pd.Series) -> pd.Series:
+    return pd.to_datetime(serie, errors="coerce").dt.strftime("%d/%m/%Y").fillna("")
+
+
+# ---------------------------------------------------------
+# NOMES DE ARQUIVO (RELATÓRIOS POR EQUIPE / CORRETOR)
+# ---------------------------------------------------------
+def slugs_arquivo(nomes) -> dict:
+    """Nome → nome de arquivo ASCII único ("JOÃO SILVA" → "joao-silva")."""
+    slugs = {}
+    usados = set()
+    for nome in nomes:
+        texto = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode("ascii")
+        base = re.sub(r"[^a-z0-9]+", "-", texto.lower()).strip("-") or "sem-nome"
+        slug = base
+        n = 2
+        while slug in usados:
+            slug = f"{base}-{n}"
+            n += 1
+        usados.add(slug)
+        slugs[nome] = slug
+    return slugs
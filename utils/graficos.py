@@ -0,0 +1,86 @@
+# utils/graficos.py
+
+import pandas as pd
+import streamlit as st
+
+from utils.cache import cache_dados
+
+TOP_N_PADRAO = 15
+ROTULO_OUTROS = "OUTROS"
+
+
+# ---------------------------------------------------------
+# PRÉ-AGREGAÇÃO (LIMITA O NÚMERO DE BARRAS)
+# ---------------------------------------------------------
+def top_n_com_outros(
+    df: pd.DataFrame,
+    categoria: str,
+    ordenar_por: str,
+    somar,
+    n: int = TOP_N_PADRAO,
+) -> pd.DataFrame:
+    """
+    Mantém as `n` maiores categorias e junta o resto numa linha só
+    ("OUTROS (k)"), somando as colunas de `somar`. Taxas e demais colunas
+    ficam vazias nessa linha – não faz sentido somar percentual.
+    """
+    if len(df) <= n:
+        return df
+
+    df_ord = df.sort_values(ordenar_por, ascending=False, kind="stable")
+    topo = df_ord.iloc[:n]
+    resto = df_ord.iloc[n:]
+
+    outros = {col: resto[col].sum() for col in somar}
+    outros[categoria] = f"{ROTULO_OUTROS} ({len(resto)})"
+
+    return pd.concat([topo, pd.DataFrame([outros])], ignore_index=True)
+
+
+# ---------------------------------------------------------
+# GRÁFICO DO FUNIL (ANÁLISES → APROVAÇÕES → VENDAS)
+# ---------------------------------------------------------
+ETAPAS_FUNIL = ["Análises (só EM)", "Aprovações", "Vendas"]
+
+
+def montar_grafico_funil(df_funil: pd.DataFrame):
+    import altair as alt
+
+    return (
+        alt.Chart(df_funil)
+        .mark_bar(cornerRadiusTopLeft=6, cornerRadiusTopRight=6)
+        .encode(
+            x=alt.X("Quantidade:Q", title="Quantidade"),
+            y=alt.Y("Etapa:N", sort=ETAPAS_FUNIL, title="Etapa"),
+            tooltip=[
+                "Etapa",
+                "Quantidade",
+                alt.Tooltip(
+                    "Conversão da etapa anterior (%)",
+                    title="Conversão",
+                    format=".1f",
+                ),
+            ],
+        )
+        .properties(height=300)
+    )
+
+
+# ---------------------------------------------------------
+# SPEC VEGA-LITE EM CACHE POR (VERSÃO DO SNAPSHOT, FILTROS)
+# ---------------------------------------------------------
+@cache_dados(nome="graficos.spec")
+def _spec_em_cache(chave: str, versao: str, filtros, _montar) -> dict:
+    # _montar não entra no hash: a identidade do gráfico é (chave, versao, filtros)
+    return _montar().to_dict()
+
+
+def exibe_grafico(chave: str, versao: str, filtros, montar):
+    """
+    `montar()` devolve o alt.Chart já com o DataFrame pequeno (agregado).
+    Só é chamado quando muda a versão da planilha ou algum filtro; nos
+    outros reruns o spec sai pronto do cache. O altair só é importado
+    dentro de montar(), então em cache hit ele nem entra no processo.
+    """
+    spec = _spec_em_cache(chave, versao, filtros, montar)
+    st.vega_lite_chart(spec, use_container_width=True)
@@ -0,0 +1,167 @@
+# utils/graficos_svg.py
+#
+# Gráficos SVG pequenos, em texto, para o site estático do
+# gera_dashboard_web.py: barras (uma ou mais séries) e linha com pontos.
+# Saem direto das tabelas agregadas, sem matplotlib nem arquivo à parte:
+# o SVG vai inline no HTML (alguns KB, comprime junto com a página) e
+# escala com a largura da tela pelo viewBox.
+#
+#     svg = barras(["ALFA", "BETA"], {"Análises": [10, 7], "Vendas": [3, 2]}, "Equipes")
+
+import math
+from html import escape
+
+LARGURA = 640
+ALTURA = 300
+MARGEM_ESQ = 52
+MARGEM_DIR = 12
+MARGEM_TOPO = 46
+MARGEM_BASE = 78
+CORES = ["#0b2e4e", "#f28c28", "#2a9d8f", "#c0392b"]
+MAX_CARACTERES_ROTULO = 18
+
+
+def _n(valor: float) -> str:
+    """Coordenada curta: no máximo uma casa decimal."""
+    return f"{valor:.1f}".rstrip("0").rstrip(".")
+
+
+def _numero(valor) -> str:
+    """Número no formato brasileiro (1.234 / 0,5)."""
+    texto = f"{valor:,.0f}" if float(valor).is_integer() else f"{valor:,.1f}"
+    return texto.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def _escala(maximo: float, divisoes: int = 4):
+    """Topo "redondo" do eixo (1, 2 ou 5 × 10^k por divisão) e o passo."""
+    if maximo <= 0:
+        return 1, 1 / divisoes
+    bruto = maximo / divisoes
+    potencia = 10 ** math.floor(math.log10(bruto))
+    passo = next(m * potencia for m in (1, 2, 5, 10) if m * potencia >= bruto)
+    return passo * divisoes, passo
+
+
+def _rotulo(texto) -> str:
+    texto = str(texto)
+    return texto if len(texto) <= MAX_CARACTERES_ROTULO else texto[: MAX_CARACTERES_ROTULO - 1] + "…"
+
+
+def _moldura(titulo: str, topo: float, passo: float, rotulo_y: str) -> list:
+    """Abertura do SVG, título, grade horizontal e eixo Y."""
+    base = ALTURA - MARGEM_BASE
+    altura_util = base - MARGEM_TOPO
+    partes = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {LARGURA} {ALTURA}" '
+        f'role="img" aria-label="{escape(titulo)}" font-family="Arial, sans-serif" font-size="11">',
+        f'<text x="{LARGURA / 2:.0f}" y="18" text-anchor="middle" font-size="14" '
+        f'font-weight="bold" fill="#0b2e4e">{escape(titulo)}</text>',
+    ]
+    valor = 0.0
+    while valor <= topo + passo / 2:
+        y = base - valor / topo * altura_util
+        partes.append(
+            f'<line x1="{MARGEM_ESQ}" y1="{_n(y)}" x2="{LARGURA - MARGEM_DIR}" y2="{_n(y)}" stroke="#e3e7ee"/>'
+            f'<text x="{MARGEM_ESQ - 6}" y="{_n(y + 4)}" text-anchor="end" fill="#666">{_numero(valor)}</text>'
+        )
+        valor += passo
+    if rotulo_y:
+        partes.append(
+            f'<text transform="translate(12 {_n(MARGEM_TOPO + altura_util / 2)}) rotate(-90)" '
+            f'text-anchor="middle" fill="#666">{escape(rotulo_y)}</text>'
+        )
+    return partes
+
+
+def _rotulos_x(rotulos, centros, girar: bool) -> list:
+    y = ALTURA - MARGEM_BASE + 14
+    partes = []
+    for rotulo, x in zip(rotulos, centros):
+        if girar:
+            partes.append(
+                f'<text transform="translate({_n(x)} {y}) rotate(-35)" text-anchor="end" fill="#333">'
+                f"{escape(_rotulo(rotulo))}</text>"
+            )
+        else:
+            partes.append(f'<text x="{_n(x)}" y="{y}" text-anchor="middle" fill="#333">{escape(_rotulo(rotulo))}</text>')
+    return partes
+
+
+def _legenda(nomes) -> list:
+    """Legenda numa linha entre o título e o gráfico (embaixo ficam os rótulos girados)."""
+    partes = []
+    x = MARGEM_ESQ
+    for i, nome in enumerate(nomes):
+        cor = CORES[i % len(CORES)]
+        partes.append(
+            f'<rect x="{x}" y="26" width="10" height="10" fill="{cor}"/>'
+            f'<text x="{x + 14}" y="35" fill="#333">{escape(nome)}</text>'
+        )
+        x += 24 + 7 * len(nome)
+    return partes
+
+
+def barras(rotulos, series: dict, titulo: str, rotulo_y: str = "") -> str:
+    """Barras verticais; com mais de uma série, agrupadas e com legenda."""
+    rotulos = list(rotulos)
+    series = {nome: [float(v) for v in valores] for nome, valores in series.items()}
+    maximo = max((max(v) for v in series.values() if v), default=0)
+    topo, passo = _escala(maximo)
+
+    partes = _moldura(titulo, topo, passo, rotulo_y)
+    base = ALTURA - MARGEM_BASE
+    altura_util = base - MARGEM_TOPO
+    largura_grupo = (LARGURA - MARGEM_ESQ - MARGEM_DIR) / max(len(rotulos), 1)
+    largura_barra = largura_grupo * 0.75 / max(len(series), 1)
+
+    centros = []
+    for i, rotulo in enumerate(rotulos):
+        inicio = MARGEM_ESQ + i * largura_grupo + largura_grupo * 0.125
+        centros.append(MARGEM_ESQ + (i + 0.5) * largura_grupo)
+        for j, (nome, valores) in enumerate(series.items()):
+            valor = valores[i]
+            h = valor / topo * altura_util
+            partes.append(
+                f'<rect x="{_n(inicio + j * largura_barra)}" y="{_n(base - h)}" '
+                f'width="{_n(largura_barra)}" height="{_n(h)}" fill="{CORES[j % len(CORES)]}">'
+                f"<title>{escape(str(rotulo))} – {escape(nome)}: {_numero(valor)}</title></rect>"
+            )
+
+    partes.append(f'<line x1="{MARGEM_ESQ}" y1="{base}" x2="{LARGURA - MARGEM_DIR}" y2="{base}" stroke="#999"/>')
+    partes += _rotulos_x(rotulos, centros, girar=len(rotulos) > 5)
+    if len(series) > 1:
+        partes += _legenda(series)
+    partes.append("</svg>")
+    return "".join(partes)
+
+
+def linha(rotulos, valores, titulo: str, rotulo_y: str = "") -> str:
+    """Linha com pontos e o valor em cima de cada ponto (o funil de etapas)."""
+    rotulos = list(rotulos)
+    valores = [float(v) for v in valores]
+    topo, passo = _escala(max(valores, default=0))
+
+    partes = _moldura(titulo, topo, passo, rotulo_y)
+    base = ALTURA - MARGEM_BASE
+    altura_util = base - MARGEM_TOPO
+    largura_ponto = (LARGURA - MARGEM_ESQ - MARGEM_DIR) / max(len(rotulos), 1)
+
+    centros = [MARGEM_ESQ + (i + 0.5) * largura_ponto for i in range(len(rotulos))]
+    pontos = [(x, base - v / topo * altura_util) for x, v in zip(centros, valores)]
+    if pontos:
+        partes.append(
+            '<polyline fill="none" stroke="#0b2e4e" stroke-width="2" points="'
+            + " ".join(f"{_n(x)},{_n(y)}" for x, y in pontos)
+            + '"/>'
+        )
+    for (x, y), rotulo, valor in zip(pontos, rotulos, valores):
+        partes.append(
+            f'<circle cx="{_n(x)}" cy="{_n(y)}" r="4" fill="#0b2e4e">'
+            f"<title>{escape(str(rotulo))}: {_numero(valor)}</title></circle>"
+            f'<text x="{_n(x)}" y="{_n(y - 9)}" text-anchor="middle" fill="#0b2e4e">{_numero(valor)}</text>'
+        )
+
+    partes.append(f'<line x1="{MARGEM_ESQ}" y1="{base}" x2="{LARGURA - MARGEM_DIR}" y2="{base}" stroke="#999"/>')
+    partes += _rotulos_x(rotulos, centros, girar=False)
+    partes.append("</svg>")
+    return "".join(partes)
@@ -0,0 +1,354 @@
+# utils/historico.py
+#
+# Arquivo histórico da planilha normalizada, particionado por mês.
+#
+# A planilha só cresce e o materializar_visoes.py normalizava tudo a cada
+# CSV novo, embora quase toda visão olhe os últimos 30–90 dias. Aqui cada
+# mês (pela DATA da linha) vira uma partição Parquet em .cache/historico/:
+#
+#   eventos/MES=2024-11/fechado-<hash>.parquet   mês fechado (imutável)
+#   eventos/MES=2024-12/aberto.parquet           mês corrente (regravado)
+#   eventos/MES=sem-data/aberto.parquet          linhas sem DATA
+#   rollups/MES=2024-11-<hash>.parquet           funil do mês fechado por
+#                                                EQUIPE × CORRETOR ×
+#                                                CONSTRUTORA × EMPREENDIMENTO
+#   manifesto.json                               partições em vigor e dtypes
+#                                                do normalizar_planilha
+#
+# O mês da maior DATA da planilha é o aberto; os anteriores são fechados.
+# A cada CSV (atualizar / normalizar) as linhas cruas são separadas por mês
+# e cada mês leva um hash do seu conteúdo e da posição das linhas. Só é
+# normalizado de novo o que mudou: na prática o mês aberto e as linhas sem
+# data. Um mês fechado só é refeito se a planilha for editada para trás
+# (hash diferente), e aí ganha arquivos novos em vez de sobrescrever os
+# antigos; quem lê pelo manifesto anterior continua lendo arquivos
+# inteiros.
+#
+# normalizar(df_bruto) devolve o mesmo DataFrame de normalizar_planilha,
+# montado com os meses fechados lidos do Parquet. As consultas por período
+# (ler_eventos, ler_rollups, funil) abrem só as partições dos meses do
+# período; funil usa o rollup nos meses fechados inteiros dentro do
+# período e os eventos só nas pontas e no mês aberto. As páginas 04 e 05
+# chegam no funil pelo MotorHistorico de utils/motor_consultas.py, quando
+# o manifesto é da mesma planilha que a página carregou.
+#
+# Liga com MR_HISTORICO=1 (precisa de pyarrow).
+#
+#     df = historico.normalizar(df_bruto)
+#     funil = historico.funil(data_ini, data_fim, "EQUIPE")
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.consultas import STATUS_ANALISE, STATUS_VENDA, funil_por_grupo, normalizar_planilha
+from utils.dados import CHAVE_ASSINATURA_CSV, DIR_CACHE
+
+ATIVO = os.environ.get("MR_HISTORICO", "").strip().lower() in ("1", "true", "sim")
+DIR_HISTORICO = DIR_CACHE / "historico"
+ARQ_MANIFESTO = DIR_HISTORICO / "manifesto.json"
+
+# Muda quando o layout ou a normalização mudam: força refazer todos os meses
+FORMATO = 2
+
+SEM_DATA = "sem-data"
+
+# Dimensões do rollup mensal (grupos aceitos por funil sem ler eventos)
+DIMENSOES_ROLLUP = ["EQUIPE", "CORRETOR", "CONSTRUTORA_BASE", "EMPREENDIMENTO_BASE"]
+CONTAGENS = ["ANALISES", "ANALISES_BASE", "REANALISES", "APROVACOES", "VENDAS"]
+
+
+# ---------------------------------------------------------
+# MESES DA PLANILHA CRUA
+# ---------------------------------------------------------
+def _meses(df_bruto: pd.DataFrame) -> pd.Series:
+    """"AAAA-MM" de cada linha pela mesma coluna de data do normalizar_planilha (SEM_DATA se vazia)."""
+    colunas = {c.strip().upper(): c for c in df_bruto.columns}
+    coluna = colunas.get("DATA") or colunas.get("DIA")
+    if coluna is None:
+        return pd.Series(SEM_DATA, index=df_bruto.index)
+    # Mesma conversão de limpar_para_data; AAAAMM inteiro em vez de strftime linha a linha
+    dia = pd.to_datetime(df_bruto[coluna], dayfirst=True, errors="coerce")
+    codigo = (dia.dt.year * 100 + dia.dt.month).fillna(0).astype("int64")
+    nomes = {c: (f"{c // 100:04d}-{c % 100:02d}" if c else SEM_DATA) for c in codigo.unique()}
+    return codigo.map(nomes)
+
+
+def _hash_mes(tabela, linhas: np.ndarray) -> str:
+    """
+    Conteúdo + posição na planilha + colunas: muda se qualquer célula do
+    mês mudar. Lê os buffers Arrow das linhas do mês direto, bem mais
+    rápido que hash_pandas_object em colunas de texto.
+    """
+    h = hashlib.sha1(f"{FORMATO}|{tabela.schema}".encode("utf-8"))
+    h.update(linhas.astype(np.int64).tobytes())
+    for coluna in tabela.take(linhas).columns:
+        for pedaco in coluna.chunks:
+            for buffer in pedaco.buffers():
+                if buffer is not None:
+                    h.update(buffer)
+    return h.hexdigest()
+
+
+def _limites(mes: str):
+    """Primeiro e último dia do mês "AAAA-MM"."""
+    ini = pd.Timestamp(f"{mes}-01")
+    return ini.date(), (ini + pd.offsets.MonthEnd(0)).date()
+
+
+# ---------------------------------------------------------
+# MANIFESTO E ARQUIVOS
+# ---------------------------------------------------------
+def _manifesto_vazio() -> dict:
+    return {"formato": FORMATO, "colunas": [], "tipos": {}, "meses": {}}
+
+
+def _manifesto_em_disco() -> dict:
+    """Manifesto gravado, de qualquer FORMATO (vazio se não houver)."""
+    try:
+        return json.loads(ARQ_MANIFESTO.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return _manifesto_vazio()
+
+
+def le_manifesto() -> dict:
+    manifesto = _manifesto_em_disco()
+    if manifesto.get("formato") != FORMATO:
+        return _manifesto_vazio()
+    return manifesto
+
+
+def assinatura():
+    """Assinatura do CSV das partições em vigor (None se nunca atualizado)."""
+    return le_manifesto().get("assinatura")
+
+
+def _grava_json(destino, conteudo: dict) -> None:
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(conteudo, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, destino)
+
+
+def _grava_parquet(df: pd.DataFrame, relativo: str) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    destino = DIR_HISTORICO / relativo
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+    os.replace(tmp, destino)
+
+
+def _le_parquet(relativo: str, colunas=None) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+
+    return pq.read_table(DIR_HISTORICO / relativo, columns=colunas).to_pandas()
+
+
+def rollup_mensal(eventos: pd.DataFrame) -> pd.DataFrame:
+    """Contagens do funil (como funil_por_grupo) por EQUIPE × CORRETOR × CONSTRUTORA × EMPREENDIMENTO."""
+    s = eventos["STATUS_BASE"]
+    flags = eventos[DIMENSOES_ROLLUP].assign(
+        ANALISES=s.isin(STATUS_ANALISE).astype("int64"),
+        ANALISES_BASE=(s == "EM ANÁLISE").astype("int64"),
+        REANALISES=(s == "REANÁLISE").astype("int64"),
+        APROVACOES=(s == "APROVADO").astype("int64"),
+        VENDAS=s.isin(STATUS_VENDA).astype("int64"),
+        VGV=eventos["VGV"].astype(float),
+    )
+    return flags.groupby(DIMENSOES_ROLLUP, sort=True).sum().reset_index()
+
+
+# ---------------------------------------------------------
+# ATUALIZAÇÃO (WORKER)
+# ---------------------------------------------------------
+def atualizar(df_bruto: pd.DataFrame) -> dict:
+    """
+    Publica as partições do CSV e devolve {"meses": {mes: DataFrame
+    normalizado}, "refeitos": [...], "mantidos": [...]}; os DataFrames
+    levam a coluna LINHA (posição na planilha). Meses mantidos não são
+    lidos aqui.
+    """
+    # O gravado pode ser descartado (FORMATO ou colunas mudaram), mas os
+    # arquivos dele ainda saem do disco no fim
+    em_disco = _manifesto_em_disco()
+    anterior = em_disco
+    if em_disco.get("formato") != FORMATO or em_disco.get("colunas") != list(df_bruto.columns):
+        anterior = _manifesto_vazio()
+
+    import pyarrow as pa
+
+    meses = _meses(df_bruto)
+    tabela = pa.Table.from_pandas(df_bruto, preserve_index=False)
+    datados = sorted(m for m in meses.unique() if m != SEM_DATA)
+    aberto = datados[-1] if datados else None
+    posicoes = np.arange(len(df_bruto))
+
+    novo = {
+        "formato": FORMATO,
+        "colunas": list(df_bruto.columns),
+        "assinatura": df_bruto.attrs.get(CHAVE_ASSINATURA_CSV),
+        "tipos": anterior.get("tipos", {}),
+        "meses": {},
+    }
+    normalizados, refeitos, mantidos = {}, [], []
+    for mes, indices in meses.groupby(meses, sort=True).indices.items():
+        assinatura = _hash_mes(tabela, indices)
+        fechado = mes not in (aberto, SEM_DATA)
+
+        info = anterior["meses"].get(mes)
+        if info is not None and info["hash"] == assinatura and info["fechado"] == fechado:
+            novo["meses"][mes] = info
+            mantidos.append(mes)
+            continue
+
+        eventos = normalizar_planilha(df_bruto.iloc[indices]).reset_index(drop=True)
+        eventos.insert(0, "LINHA", posicoes[indices])
+        # dtypes do normalizar_planilha: o Parquet devolve texto como str
+        novo["tipos"] = {coluna: str(tipo) for coluna, tipo in eventos.dtypes.items()}
+        info = {"hash": assinatura, "fechado": fechado, "linhas": len(eventos)}
+        if fechado:
+            info["eventos"] = f"eventos/MES={mes}/fechado-{assinatura[:12]}.parquet"
+            info["rollup"] = f"rollups/MES={mes}-{assinatura[:12]}.parquet"
+            _grava_parquet(rollup_mensal(eventos), info["rollup"])
+        else:
+            info["eventos"] = f"eventos/MES={mes}/aberto.parquet"
+        _grava_parquet(eventos, info["eventos"])
+
+        novo["meses"][mes] = info
+        normalizados[mes] = eventos
+        refeitos.append(mes)
+
+    DIR_HISTORICO.mkdir(parents=True, exist_ok=True)
+    _grava_json(ARQ_MANIFESTO, novo)
+    _remove_substituidos(em_disco, novo)
+    return {"meses": normalizados, "refeitos": refeitos, "mantidos": mantidos}
+
+
+def _remove_substituidos(anterior: dict, novo: dict) -> None:
+    em_uso = {info[chave] for info in novo["meses"].values() for chave in ("eventos", "rollup") if chave in info}
+    for info in anterior.get("meses", {}).values():
+        for chave in ("eventos", "rollup"):
+            relativo = info.get(chave)
+            if relativo and relativo not in em_uso:
+                try:
+                    (DIR_HISTORICO / relativo).unlink()
+                except FileNotFoundError:
+                    pass
+
+
+def normalizar(df_bruto: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mesmo resultado de normalizar_planilha(df_bruto), normalizando só os
+    meses que mudaram; os outros vêm das partições em Parquet.
+    """
+    resultado = atualizar(df_bruto)
+    manifesto = le_manifesto()
+    partes = [
+        resultado["meses"][mes] if mes in resultado["meses"] else _le_parquet(info["eventos"])
+        for mes, info in manifesto["meses"].items()
+    ]
+    if not partes:
+        return normalizar_planilha(df_bruto)
+
+    df = pd.concat(partes, ignore_index=True).sort_values("LINHA", kind="stable")
+    df.index = df_bruto.index[df.pop("LINHA").to_numpy()]
+    trocar = {c: t for c, t in manifesto.get("tipos", {}).items() if c in df.columns and str(df[c].dtype) != t}
+    if trocar:
+        df = df.astype(trocar)
+    df.attrs = dict(df_bruto.attrs)
+    return df
+
+
+# ---------------------------------------------------------
+# CONSULTAS POR PERÍODO (SÓ AS PARTIÇÕES DO PERÍODO)
+# ---------------------------------------------------------
+def meses_do_periodo(data_ini, data_fim, manifesto=None) -> list:
+    manifesto = manifesto or le_manifesto()
+    ini = f"{data_ini:%Y-%m}"
+    fim = f"{data_fim:%Y-%m}"
+    return [mes for mes in sorted(manifesto["meses"]) if mes != SEM_DATA and ini <= mes <= fim]
+
+
+def ler_eventos(data_ini, data_fim, colunas=None, manifesto=None) -> pd.DataFrame:
+    """Eventos normalizados com DIA em [data_ini, data_fim], lendo só os meses do período."""
+    manifesto = manifesto or le_manifesto()
+    if colunas is not None and "DIA" not in colunas:
+        colunas = ["DIA", *colunas]
+    partes = [
+        _le_parquet(manifesto["meses"][mes]["eventos"], colunas)
+        for mes in meses_do_periodo(data_ini, data_fim, manifesto)
+    ]
+    if not partes:
+        return pd.DataFrame(columns=colunas or [])
+    df = pd.concat(partes, ignore_index=True)
+    return df[(df["DIA"] >= data_ini) & (df["DIA"] <= data_fim)].reset_index(drop=True)
+
+
+def ler_rollups(data_ini, data_fim, manifesto=None) -> pd.DataFrame:
+    """Rollups (com coluna MES) dos meses fechados inteiramente dentro de [data_ini, data_fim]."""
+    manifesto = manifesto or le_manifesto()
+    partes = []
+    for mes in meses_do_periodo(data_ini, data_fim, manifesto):
+        info = manifesto["meses"][mes]
+        primeiro, ultimo = _limites(mes)
+        if info["fechado"] and data_ini <= primeiro and ultimo <= data_fim:
+            partes.append(_le_parquet(info["rollup"]).assign(MES=mes))
+    if not partes:
+        return pd.DataFrame(columns=["MES", *DIMENSOES_ROLLUP, *CONTAGENS, "VGV"])
+    return pd.concat(partes, ignore_index=True)
+
+
+def funil(data_ini, data_fim, grupo: str = "EQUIPE", equipe=None, corretor=None) -> pd.DataFrame:
+    """
+    funil_por_grupo do período (e equipe/corretor, como filtrar_periodo) a
+    partir do arquivo: rollups nos meses fechados inteiros e eventos nas
+    pontas e no mês aberto.
+    """
+    filtros = {}
+    if equipe not in (None, "Todas"):
+        filtros["EQUIPE"] = equipe
+    if corretor not in (None, "Todos"):
+        filtros["CORRETOR"] = corretor
+
+    if grupo not in DIMENSOES_ROLLUP:
+        raise ValueError(f"Grupo inválido: {grupo} (use {DIMENSOES_ROLLUP})")
+    if isinstance(data_ini, pd.Timestamp):
+        data_ini = data_ini.date()
+    if isinstance(data_fim, pd.Timestamp):
+        data_fim = data_fim.date()
+
+    manifesto = le_manifesto()
+    rollups = ler_rollups(data_ini, data_fim, manifesto)
+    cobertos = set(rollups["MES"])
+    for coluna, valor in filtros.items():
+        rollups = rollups[rollups[coluna] == valor]
+
+    partes = []
+    if not rollups.empty:
+        partes.append(rollups.groupby(grupo, sort=True)[[*CONTAGENS, "VGV"]].sum())
+    for mes in meses_do_periodo(data_ini, data_fim, manifesto):
+        if mes in cobertos:
+            continue
+        primeiro, ultimo = _limites(mes)
+        colunas = list(dict.fromkeys([grupo, "STATUS_BASE", "VGV", *filtros]))
+        eventos = ler_eventos(max(data_ini, primeiro), min(data_fim, ultimo), colunas, manifesto)
+        for coluna, valor in filtros.items():
+            eventos = eventos[eventos[coluna] == valor]
+        if not eventos.empty:
+            partes.append(funil_por_grupo(eventos, grupo).set_index(grupo))
+
+    if not partes:
+        return pd.DataFrame(columns=[grupo, *CONTAGENS, "VGV"])
+    resultado = pd.concat(partes).groupby(level=0, sort=True).sum()
+    resultado.index.name = grupo
+    resultado = resultado.reset_index()
+    for col in CONTAGENS:
+        resultado[col] = resultado[col].astype(int)
+    resultado["VGV"] = resultado["VGV"].astype(float)
+    return resultado
+
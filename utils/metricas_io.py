@@ -0,0 +1,117 @@
+# utils/metricas_io.py
+#
+# Métricas das chamadas externas (Google Sheets e API do Supremo), por processo.
+#
+# Cada requisição registra latência, status HTTP e bytes; cada leitura
+# registra o resultado do cache:
+#   hit          snapshot em disco fresco, nem foi na rede
+#   revalidated  foi na rede, mas o conteúdo veio igual ao snapshot (só renova)
+#   miss         foi na rede e o conteúdo mudou (ou não tinha snapshot)
+#   stale        rede falhou, serviu snapshot antigo
+#
+# texto_metricas() devolve tudo no formato texto do Prometheus (aparece no
+# painel "⚙️ Performance"); a cada MR_LOG_IO_INTERVALO segundos uma linha
+# resumo vai para o log.
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+INTERVALO_LOG_S = float(os.environ.get("MR_LOG_IO_INTERVALO", 300))
+
+_log = logging.getLogger("mr_imoveis.io")
+if not _log.handlers:
+    # O Streamlit só configura os loggers dele; sem isso o INFO some
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    _log.addHandler(_handler)
+    _log.setLevel(logging.INFO)
+    _log.propagate = False
+
+_trava = threading.Lock()
+_requisicoes = defaultdict(lambda: {"n": 0, "total_ms": 0.0, "max_ms": 0.0, "bytes": 0})
+_cache = defaultdict(int)
+_ultimo_log = time.monotonic()
+
+
+def registrar_requisicao(fonte: str, latencia_ms: float, status, n_bytes: int = 0) -> None:
+    """`status` é o código HTTP ou "erro" quando nem houve resposta."""
+    with _trava:
+        r = _requisicoes[(fonte, str(status))]
+        r["n"] += 1
+        r["total_ms"] += latencia_ms
+        r["max_ms"] = max(r["max_ms"], latencia_ms)
+        r["bytes"] += n_bytes
+    _talvez_logar()
+
+
+def registrar_cache(fonte: str, resultado: str) -> None:
+    with _trava:
+        _cache[(fonte, resultado)] += 1
+    _talvez_logar()
+
+
+def texto_metricas() -> str:
+    with _trava:
+        requisicoes = {k: dict(v) for k, v in _requisicoes.items()}
+        cache = dict(_cache)
+
+    linhas = [
+        "# TYPE mr_io_requisicoes_total counter",
+        *(
+            f'mr_io_requisicoes_total{{fonte="{f}",status="{s}"}} {r["n"]}'
+            for (f, s), r in sorted(requisicoes.items())
+        ),
+        "# TYPE mr_io_latencia_ms_soma counter",
+        *(
+            f'mr_io_latencia_ms_soma{{fonte="{f}",status="{s}"}} {r["total_ms"]:.1f}'
+            for (f, s), r in sorted(requisicoes.items())
+        ),
+        "# TYPE mr_io_latencia_ms_max gauge",
+        *(
+            f'mr_io_latencia_ms_max{{fonte="{f}",status="{s}"}} {r["max_ms"]:.1f}'
+            for (f, s), r in sorted(requisicoes.items())
+        ),
+        "# TYPE mr_io_bytes_total counter",
+        *(
+            f'mr_io_bytes_total{{fonte="{f}",status="{s}"}} {r["bytes"]}'
+            for (f, s), r in sorted(requisicoes.items())
+        ),
+        "# TYPE mr_io_cache_total counter",
+        *(f'mr_io_cache_total{{fonte="{f}",resultado="{res}"}} {n}' for (f, res), n in sorted(cache.items())),
+    ]
+    return "\n".join(linhas) + "\n"
+
+
+def linha_resumo() -> str:
+    with _trava:
+        por_fonte = defaultdict(lambda: {"n": 0, "total_ms": 0.0, "bytes": 0})
+        for (fonte, _), r in _requisicoes.items():
+            por_fonte[fonte]["n"] += r["n"]
+            por_fonte[fonte]["total_ms"] += r["total_ms"]
+            por_fonte[fonte]["bytes"] += r["bytes"]
+        cache = dict(_cache)
+
+    partes = []
+    for fonte in sorted(set(por_fonte) | {f for f, _ in cache}):
+        r = por_fonte[fonte]
+        media = r["total_ms"] / r["n"] if r["n"] else 0.0
+        resultados = " ".join(f"{res}={n}" for (f, res), n in sorted(cache.items()) if f == fonte)
+        partes.append(
+            f"{fonte}: {r['n']} req, média {media:.0f} ms, {r['bytes'] / 1024**2:.1f} MB, {resultados}"
+        )
+    return " | ".join(partes) or "sem chamadas"
+
+
+def _talvez_logar() -> None:
+    global _ultimo_log
+    if INTERVALO_LOG_S <= 0:
+        return
+    agora = time.monotonic()
+    with _trava:
+        if agora - _ultimo_log < INTERVALO_LOG_S:
+            return
+        _ultimo_log = agora
+    _log.info("I/O externo (pid %s): %s", os.getpid(), linha_resumo())
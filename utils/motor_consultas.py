@@ -0,0 +1,354 @@
+# utils/motor_consultas.py
+#
+# Funil, ranking e mix das páginas 03, 04, 05 e 10 atrás de uma mesma API,
+# com três motores:
+#
+#   pandas  (padrão) utils/consultas.py sobre o DataFrame da própria página
+#   duckdb  SQL num DuckDB em memória lendo o Parquet que o
+#           materializar_visoes.py publica (.cache/eventos.parquet)
+#   sqlite  SQL no banco local de utils/banco_local.py (.cache/eventos.sqlite),
+#           também publicado pelo materializar_visoes.py
+#
+# Para períodos longos (anos de funil, comparação de equipes, mix por
+# construtora/empreendimento) o DuckDB lê só as colunas da consulta e
+# agrega em paralelo, sem os groupby do pandas em colunas object. O SQLite
+# leva período/equipe/corretor para o WHERE e usa os índices por DIA, sem
+# dependência nenhuma além da biblioteca padrão.
+#
+# Liga com MR_MOTOR=duckdb (e `pip install duckdb`) ou MR_MOTOR=sqlite. O
+# motor SQL só é usado se o Parquet / banco tiver a mesma assinatura de CSV
+# da planilha que a página carregou; senão, ou sem duckdb, fica no pandas.
+# Os motores devolvem o mesmo DataFrame (bench/comparar_motores.py confere).
+#
+# No motor pandas, com MR_HISTORICO=1 o funil vem do arquivo mensal de
+# utils/historico.py (MotorHistorico): rollups nos meses fechados e só as
+# partições do período, em vez de filtrar o DataFrame inteiro.
+#
+#     motor = escolher_motor(df)
+#     funil = motor.funil(data_ini, data_fim, "EQUIPE")
+
+import os
+import threading
+
+import pandas as pd
+
+from utils import banco_local, consultas, historico
+from utils.dados import CHAVE_ASSINATURA_CSV, DIR_CACHE
+
+MOTOR = os.environ.get("MR_MOTOR", "pandas").strip().lower()
+ARQ_PARQUET = DIR_CACHE / "eventos.parquet"
+
+# Só o que as consultas usam; LINHA é a ordem original (desempate do "último")
+COLUNAS_PARQUET = [
+    "DIA",
+    "EQUIPE",
+    "CORRETOR",
+    "CONSTRUTORA_BASE",
+    "EMPREENDIMENTO_BASE",
+    "STATUS_BASE",
+    "VGV",
+    "CHAVE_CLIENTE",
+]
+
+# Colunas aceitas como grupo (entram no SQL sem parâmetro)
+GRUPOS = ["EQUIPE", "CORRETOR", "CONSTRUTORA_BASE", "EMPREENDIMENTO_BASE", "DIA"]
+
+_CHAVE_METADADOS = b"mr_assinatura_csv"
+
+
+def _grupos_validos(grupos):
+    grupos = [grupos] if isinstance(grupos, str) else list(grupos)
+    invalidos = [g for g in grupos if g not in GRUPOS]
+    if invalidos:
+        raise ValueError(f"Grupo inválido: {invalidos} (use {GRUPOS})")
+    return grupos
+
+
+# ---------------------------------------------------------
+# MOTOR PANDAS (REFERÊNCIA)
+# ---------------------------------------------------------
+class MotorPandas:
+    nome = "pandas"
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def _periodo(self, data_ini, data_fim, equipe=None, corretor=None):
+        return consultas.filtrar_periodo(self.df, data_ini, data_fim, equipe, corretor)
+
+    def funil(self, data_ini, data_fim, grupo="EQUIPE", equipe=None, corretor=None) -> pd.DataFrame:
+        """ANALISES, ANALISES_BASE, REANALISES, APROVACOES, VENDAS (linhas) e VGV por grupo."""
+        _grupos_validos(grupo)
+        return consultas.funil_por_grupo(self._periodo(data_ini, data_fim, equipe, corretor), grupo)
+
+    def ranking_equipes(self, data_ini, data_fim) -> pd.DataFrame:
+        """Página 03: análises/aprovações por linha, vendas/VGV 1 por cliente."""
+        return consultas.ranking_equipes(self._periodo(data_ini, data_fim))
+
+    def vendas_por_grupo(self, data_ini, data_fim, grupos, equipe=None, corretor=None) -> pd.DataFrame:
+        """Página 10: linhas de venda e VGV por grupo (ranking e mix)."""
+        grupos = _grupos_validos(grupos)
+        return consultas.vendas_por_grupo(self._periodo(data_ini, data_fim, equipe, corretor), grupos)
+
+
+class MotorHistorico(MotorPandas):
+    """Funil pelas partições de utils/historico.py; o resto como o pandas."""
+
+    nome = "historico"
+
+    def funil(self, data_ini, data_fim, grupo="EQUIPE", equipe=None, corretor=None) -> pd.DataFrame:
+        _grupos_validos(grupo)
+        if grupo not in historico.DIMENSOES_ROLLUP:
+            return super().funil(data_ini, data_fim, grupo, equipe, corretor)
+        return historico.funil(data_ini, data_fim, grupo, equipe, corretor)
+
+
+# ---------------------------------------------------------
+# MOTOR DUCKDB (PARQUET)
+# ---------------------------------------------------------
+def _lista_sql(valores):
+    return ", ".join("'" + v.replace("'", "''") + "'" for v in valores)
+
+
+def _filtro(data_ini, data_fim, equipe=None, corretor=None):
+    condicoes = ["DIA BETWEEN ? AND ?"]
+    parametros = [data_ini, data_fim]
+    if equipe not in (None, "Todas"):
+        condicoes.append("EQUIPE = ?")
+        parametros.append(equipe)
+    if corretor not in (None, "Todos"):
+        condicoes.append("CORRETOR = ?")
+        parametros.append(corretor)
+    return " AND ".join(condicoes), parametros
+
+
+class MotorDuckDB:
+    nome = "duckdb"
+
+    def __init__(self, arquivo=ARQ_PARQUET):
+        import duckdb
+
+        self.arquivo = arquivo
+        self._con = duckdb.connect(":memory:")
+        # A view relê o arquivo a cada consulta: a troca do Parquet vale na hora
+        caminho = str(arquivo).replace("'", "''")
+        self._con.execute(f"CREATE VIEW eventos AS SELECT * FROM read_parquet('{caminho}')")
+
+    def _consulta(self, sql, parametros) -> pd.DataFrame:
+        # Um cursor por chamada: cada sessão do Streamlit roda numa thread
+        cursor = self._con.cursor()
+        try:
+            df = cursor.execute(sql, parametros).df()
+        finally:
+            cursor.close()
+        if "DIA" in df.columns:
+            df["DIA"] = pd.to_datetime(df["DIA"]).dt.date
+        return df
+
+    def funil(self, data_ini, data_fim, grupo="EQUIPE", equipe=None, corretor=None) -> pd.DataFrame:
+        _grupos_validos(grupo)
+        where, parametros = _filtro(data_ini, data_fim, equipe, corretor)
+        sql = f"""
+            SELECT
+                {grupo},
+                COUNT(*) FILTER (WHERE STATUS_BASE IN ({_lista_sql(consultas.STATUS_ANALISE)})) AS ANALISES,
+                COUNT(*) FILTER (WHERE STATUS_BASE = 'EM ANÁLISE') AS ANALISES_BASE,
+                COUNT(*) FILTER (WHERE STATUS_BASE = 'REANÁLISE') AS REANALISES,
+                COUNT(*) FILTER (WHERE STATUS_BASE = 'APROVADO') AS APROVACOES,
+                COUNT(*) FILTER (WHERE STATUS_BASE IN ({_lista_sql(consultas.STATUS_VENDA)})) AS VENDAS,
+                SUM(VGV) AS VGV
+            FROM eventos
+            WHERE {where} AND {grupo} IS NOT NULL
+            GROUP BY {grupo}
+            ORDER BY {grupo}
+        """
+        return self._tipos(self._consulta(sql, parametros))
+
+    def ranking_equipes(self, data_ini, data_fim) -> pd.DataFrame:
+        where, parametros = _filtro(data_ini, data_fim)
+        sql = f"""
+            WITH periodo AS (
+                SELECT * FROM eventos WHERE {where}
+            ),
+            base AS (
+                SELECT
+                    EQUIPE,
+                    COUNT(*) FILTER (WHERE STATUS_BASE IN ({_lista_sql(consultas.STATUS_ANALISE)})) AS ANALISES,
+                    COUNT(*) FILTER (WHERE STATUS_BASE = 'APROVADO') AS APROVACOES
+                FROM periodo
+                WHERE EQUIPE IS NOT NULL
+                GROUP BY EQUIPE
+            ),
+            ultima AS (
+                SELECT EQUIPE, STATUS_BASE, VGV
+                FROM periodo
+                WHERE CHAVE_CLIENTE IS NOT NULL
+                QUALIFY ROW_NUMBER() OVER (
+                    PARTITION BY CHAVE_CLIENTE ORDER BY DIA DESC, LINHA DESC
+                ) = 1
+            ),
+            vendas AS (
+                SELECT EQUIPE, COUNT(*) AS VENDAS, SUM(VGV) AS VGV
+                FROM ultima
+                WHERE STATUS_BASE IN ({_lista_sql(consultas.STATUS_VENDA)})
+                GROUP BY EQUIPE
+            )
+            SELECT
+                base.EQUIPE,
+                base.ANALISES,
+                base.APROVACOES,
+                COALESCE(vendas.VENDAS, 0) AS VENDAS,
+                COALESCE(vendas.VGV, 0.0) AS VGV
+            FROM base
+            LEFT JOIN vendas USING (EQUIPE)
+            ORDER BY base.EQUIPE
+        """
+        return self._tipos(self._consulta(sql, parametros))
+
+    def vendas_por_grupo(self, data_ini, data_fim, grupos, equipe=None, corretor=None) -> pd.DataFrame:
+        grupos = _grupos_validos(grupos)
+        colunas = ", ".join(grupos)
+        where, parametros = _filtro(data_ini, data_fim, equipe, corretor)
+        sql = f"""
+            SELECT {colunas}, COUNT(*) AS VENDAS, SUM(VGV) AS VGV
+            FROM eventos
+            WHERE {where}
+              AND STATUS_BASE IN ({_lista_sql(consultas.STATUS_VENDA)})
+              AND {" AND ".join(f"{g} IS NOT NULL" for g in grupos)}
+            GROUP BY {colunas}
+            ORDER BY {colunas}
+        """
+        return self._tipos(self._consulta(sql, parametros))
+
+    @staticmethod
+    def _tipos(df: pd.DataFrame) -> pd.DataFrame:
+        """Mesmos tipos do pandas: contagens int, VGV float, texto como object."""
+        for col in df.columns:
+            if col == "VGV":
+                df[col] = df[col].astype(float)
+            elif col in ("ANALISES", "ANALISES_BASE", "REANALISES", "APROVACOES", "VENDAS"):
+                df[col] = df[col].astype(int)
+        return df
+
+
+# ---------------------------------------------------------
+# MOTOR SQLITE (utils/banco_local.py)
+# ---------------------------------------------------------
+class MotorSQLite:
+    nome = "sqlite"
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or banco_local.ARQ_BANCO
+
+    def _consulta(self, consulta, *args, **kwargs) -> pd.DataFrame:
+        # Conexão por chamada: o banco é trocado com os.replace e uma conexão
+        # aberta continuaria lendo o arquivo antigo
+        con = banco_local.conectar(self.arquivo)
+        try:
+            return consulta(con, *args, **kwargs)
+        finally:
+            con.close()
+
+    def funil(self, data_ini, data_fim, grupo="EQUIPE", equipe=None, corretor=None) -> pd.DataFrame:
+        _grupos_validos(grupo)
+        return self._consulta(banco_local.funil_por_grupo, data_ini, data_fim, grupo, equipe, corretor)
+
+    def ranking_equipes(self, data_ini, data_fim) -> pd.DataFrame:
+        return self._consulta(banco_local.ranking_equipes, data_ini, data_fim)
+
+    def vendas_por_grupo(self, data_ini, data_fim, grupos, equipe=None, corretor=None) -> pd.DataFrame:
+        grupos = _grupos_validos(grupos)
+        return self._consulta(banco_local.vendas_por_grupo, data_ini, data_fim, grupos, equipe, corretor)
+
+
+# ---------------------------------------------------------
+# PUBLICAÇÃO DO PARQUET (WORKER) E ESCOLHA DO MOTOR (PÁGINAS)
+# ---------------------------------------------------------
+def publicar_parquet(df: pd.DataFrame, assinatura=None, arquivo=ARQ_PARQUET) -> int:
+    """Grava as colunas das consultas do DataFrame de normalizar_planilha, com a assinatura do CSV."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabela_df = df[COLUNAS_PARQUET].copy()
+    tabela_df["DIA"] = pd.to_datetime(tabela_df["DIA"], errors="coerce").astype("datetime64[s]")
+    tabela_df.insert(0, "LINHA", range(len(tabela_df)))
+
+    tabela = pa.Table.from_pandas(tabela_df, preserve_index=False)
+    tabela = tabela.set_column(
+        tabela.schema.get_field_index("DIA"), "DIA", tabela.column("DIA").cast(pa.date32())
+    )
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[_CHAVE_METADADOS] = (assinatura or "").encode("utf-8")
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    tmp = arquivo.with_name(f"{arquivo.name}.{os.getpid()}.tmp")
+    pq.write_table(tabela, tmp, row_group_size=128_000)
+    os.replace(tmp, arquivo)
+    return len(tabela_df)
+
+
+_trava = threading.Lock()
+_duckdb = None  # MotorDuckDB compartilhado pelo processo
+_assinatura_parquet = (None, None)  # (mtime, assinatura)
+_assinatura_banco = (None, None)  # (mtime, assinatura)
+
+
+def _assinatura_do_parquet(arquivo=ARQ_PARQUET):
+    global _assinatura_parquet
+    try:
+        mtime = arquivo.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if _assinatura_parquet[0] != mtime:
+        import pyarrow.parquet as pq
+
+        metadados = pq.read_schema(arquivo).metadata or {}
+        _assinatura_parquet = (mtime, metadados.get(_CHAVE_METADADOS, b"").decode("utf-8") or None)
+    return _assinatura_parquet[1]
+
+
+def _assinatura_do_banco(arquivo=None):
+    global _assinatura_banco
+    arquivo = arquivo or banco_local.ARQ_BANCO
+    try:
+        mtime = arquivo.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if _assinatura_banco[0] != mtime:
+        con = banco_local.conectar(arquivo)
+        try:
+            _assinatura_banco = (mtime, banco_local.assinatura(con))
+        finally:
+            con.close()
+    return _assinatura_banco[1]
+
+
+def escolher_motor(df: pd.DataFrame):
+    """
+    DuckDB / SQLite se ligado (MR_MOTOR) e com o Parquet / banco da mesma
+    planilha de `df`; senão pandas (com o funil do histórico mensal se
+    MR_HISTORICO=1 e o manifesto for da mesma planilha).
+    """
+    global _duckdb
+    assinatura = df.attrs.get(CHAVE_ASSINATURA_CSV)
+
+    if MOTOR == "sqlite":
+        if assinatura is None or _assinatura_do_banco() != assinatura:
+            return MotorPandas(df)
+        return MotorSQLite()
+
+    if MOTOR != "duckdb":
+        if historico.ATIVO and assinatura is not None and historico.assinatura() == assinatura:
+            return MotorHistorico(df)
+        return MotorPandas(df)
+
+    try:
+        if assinatura is None or _assinatura_do_parquet() != assinatura:
+            return MotorPandas(df)
+        with _trava:
+            if _duckdb is None:
+                _duckdb = MotorDuckDB()
+        return _duckdb
+    except ImportError:
+        return MotorPandas(df)
@@ -0,0 +1,393 @@
+# utils/pacote_json.py
+#
+# Pacote JSON pré-agregado para o visualizador estático (TVs do escritório,
+# celular): os mesmos KPIs sem abrir uma sessão do Streamlit por tela.
+#
+# A cada CSV novo o materializar_visoes.py (com MR_PACOTE_JSON=1) grava em
+# .cache/pacote/ (ou MR_DIR_PACOTE):
+#
+#   pacote-<versão>.json(.gz)  cubo diário DIA × EQUIPE × CORRETOR ×
+#                              CONSTRUTORA × EMPREENDIMENTO com as contagens
+#                              por status e o VGV das vendas, mais o que não
+#                              sai do cubo (1 venda por cliente): KPIs da home
+#                              e ranking de equipes no período padrão, e os
+#                              alertas de corretores parados por equipe
+#   atual.json                 ponteiro para o pacote da versão atual
+#   index.html                 visualizador (HTML + JS, sem dependências)
+#
+# O cubo vai em colunas, com os textos trocados por índices nas listas de
+# `dimensoes` e o DIA como número de dias desde `dia_ini`. O visualizador
+# filtra período/equipe/corretor no navegador, e relê atual.json de tempos
+# em tempos para trocar de versão sozinho. A versão é o começo da
+# assinatura do CSV; ficam as últimas VERSOES_MANTIDAS.
+#
+# Para servir: qualquer servidor de arquivos na pasta, por exemplo
+#     python -m http.server -d .cache/pacote 8080
+
+import gzip
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from utils.consultas import STATUS_VENDA, filtrar_periodo, ranking_equipes
+from utils.dados import DIR_CACHE, VERSOES_MANTIDAS
+
+ATIVO = os.environ.get("MR_PACOTE_JSON", "") not in ("", "0")
+DIR_PACOTE = Path(os.environ.get("MR_DIR_PACOTE") or DIR_CACHE / "pacote")
+
+FORMATO = 1  # muda quando o visualizador precisar ler o pacote de outro jeito
+ARQ_ATUAL = "atual.json"
+
+# Coluna no pacote -> coluna do DataFrame normalizado
+DIMENSOES = {
+    "EQUIPE": "EQUIPE",
+    "CORRETOR": "CORRETOR",
+    "CONSTRUTORA": "CONSTRUTORA_BASE",
+    "EMPREENDIMENTO": "EMPREENDIMENTO_BASE",
+}
+
+# Contagem no cubo -> STATUS_BASE (uma linha da planilha = 1)
+CONTAGENS = {
+    "EM_ANALISE": "EM ANÁLISE",
+    "REANALISE": "REANÁLISE",
+    "APROVADO": "APROVADO",
+    "REPROVADO": "REPROVADO",
+    "VENDA_GERADA": "VENDA GERADA",
+    "VENDA_INFORMADA": "VENDA INFORMADA",
+}
+
+
+# ---------------------------------------------------------
+# CONTEÚDO DO PACOTE
+# ---------------------------------------------------------
+def cubo_diario(df: pd.DataFrame) -> pd.DataFrame:
+    """Contagens por status e VGV das vendas por DIA e dimensões (linhas sem DIA ficam fora)."""
+    base = df.dropna(subset=["DIA"])
+    s = base["STATUS_BASE"]
+    flags = pd.DataFrame({"DIA": pd.to_datetime(base["DIA"])})
+    for nome, coluna in DIMENSOES.items():
+        flags[nome] = base[coluna]
+    for nome, status in CONTAGENS.items():
+        flags[nome] = (s == status).astype(int)
+    flags["VGV"] = base["VGV"].where(s.isin(STATUS_VENDA), 0.0)
+
+    # Linha sem status reconhecido nem VGV não soma nada em nenhum filtro
+    flags = flags[flags[list(CONTAGENS)].any(axis=1) | (flags["VGV"] != 0)]
+    return flags.groupby(["DIA", *DIMENSOES], sort=True).sum().reset_index()
+
+
+def _registros(df: pd.DataFrame, colunas: dict = None) -> list:
+    """Linhas como dicts (só `colunas`, origem -> nome no pacote, se dado); datas em ISO."""
+    if df is None or df.empty:
+        return []
+    saida = df.copy() if colunas is None else df[list(colunas)].rename(columns=colunas)
+    for col in saida.columns:
+        if saida[col].map(lambda v: hasattr(v, "isoformat")).any():
+            saida[col] = saida[col].map(lambda v: v.isoformat() if hasattr(v, "isoformat") else None)
+        elif pd.api.types.is_float_dtype(saida[col]):
+            saida[col] = saida[col].round(2)
+    return saida.to_dict(orient="records")
+
+
+def monta_pacote(df: pd.DataFrame, visoes: dict, assinatura=None, dias_periodo: int = 30) -> dict:
+    """
+    Pacote de um snapshot. `df` é o normalizado; `visoes` são as de
+    utils/visoes.MATERIALIZADORES já calculadas (kpis_home, alertas).
+    """
+    cubo = cubo_diario(df)
+    dia_ini = cubo["DIA"].min() if not cubo.empty else pd.Timestamp.today().normalize()
+
+    dimensoes = {}
+    colunas = {"DIA": (cubo["DIA"] - dia_ini).dt.days.tolist()}
+    for nome in DIMENSOES:
+        categorias = pd.Categorical(cubo[nome])
+        dimensoes[nome] = [str(v) for v in categorias.categories]
+        colunas[nome] = categorias.codes.tolist()
+    for nome in CONTAGENS:
+        colunas[nome] = cubo[nome].astype(int).tolist()
+    colunas["VGV"] = cubo["VGV"].round(2).tolist()
+
+    # Ranking por equipe no período padrão da home (1 venda por cliente)
+    kpis = visoes.get("kpis_home")
+    ranking = None
+    if kpis is not None and not kpis.empty:
+        data_ini, data_fim = kpis["DATA_INI"].iloc[0], kpis["DATA_FIM"].iloc[0]
+        ranking = ranking_equipes(filtrar_periodo(df, data_ini, data_fim))
+
+    return {
+        "formato": FORMATO,
+        "versao": (assinatura or "")[:12] or None,
+        "assinatura_csv": assinatura,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "dia_ini": dia_ini.date().isoformat(),
+        "dia_fim": (cubo["DIA"].max() if not cubo.empty else dia_ini).date().isoformat(),
+        "dias_periodo": dias_periodo,
+        "dimensoes": dimensoes,
+        "cubo": colunas,
+        "kpis_periodo": _registros(kpis),
+        "ranking_equipes": _registros(ranking),
+        "alertas": _registros(
+            visoes.get("alertas"),
+            {
+                "EQUIPE_FILTRO": "EQUIPE_FILTRO",
+                "CORRETOR": "CORRETOR",
+                "ÚLTIMA ANÁLISE": "ULTIMA_ANALISE",
+                "DIAS SEM ANÁLISE (janela 30d)": "DIAS_SEM_ANALISE",
+            },
+        ),
+    }
+
+
+# ---------------------------------------------------------
+# PUBLICAÇÃO
+# ---------------------------------------------------------
+def _grava(destino: Path, dados: bytes) -> None:
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(dados)
+    os.replace(tmp, destino)
+
+
+def publicar(df: pd.DataFrame, visoes: dict, assinatura=None, pasta=DIR_PACOTE, dias_periodo: int = 30) -> int:
+    """Grava o pacote, o visualizador e por último o ponteiro atual.json. Devolve o tamanho do JSON."""
+    pacote = monta_pacote(df, visoes, assinatura, dias_periodo)
+    dados = json.dumps(pacote, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    pasta.mkdir(parents=True, exist_ok=True)
+    nome = f"pacote-{pacote['versao'] or 'sem-assinatura'}.json"
+    _grava(pasta / nome, dados)
+    # Nível 6: o 9 leva ~15x mais tempo para ganhar ~8% no pacote
+    _grava(pasta / f"{nome}.gz", gzip.compress(dados, compresslevel=6, mtime=0))
+
+    visualizador = VISUALIZADOR.encode("utf-8")
+    arq_html = pasta / "index.html"
+    if not arq_html.exists() or arq_html.read_bytes() != visualizador:
+        _grava(arq_html, visualizador)
+
+    ponteiro = {"formato": FORMATO, "versao": pacote["versao"], "arquivo": nome, "gerado_em": pacote["gerado_em"]}
+    _grava(pasta / ARQ_ATUAL, json.dumps(ponteiro, ensure_ascii=False).encode("utf-8"))
+
+    # Mantém as últimas versões (quem está com uma aberta ainda consegue ler)
+    antigos = sorted(pasta.glob("pacote-*.json"), key=lambda a: a.stat().st_mtime, reverse=True)
+    for arquivo in antigos[VERSOES_MANTIDAS:]:
+        arquivo.unlink(missing_ok=True)
+        arquivo.with_name(arquivo.name + ".gz").unlink(missing_ok=True)
+    return len(dados)
+
+
+# ---------------------------------------------------------
+# VISUALIZADOR (index.html)
+# ---------------------------------------------------------
+VISUALIZADOR = """<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Dashboard Imobiliária</title>
+<style>
+    body { font-family: Arial, sans-serif; margin: 16px; background: #f5f7fb; color: #222; }
+    h1, h2 { color: #0b2e4e; }
+    h2 { font-size: 17px; margin-top: 26px; }
+    .filtros { display: flex; flex-wrap: wrap; gap: 10px; align-items: end; margin-bottom: 18px; }
+    .filtros label { font-size: 12px; color: #555; display: flex; flex-direction: column; gap: 3px; }
+    .kpis { display: flex; flex-wrap: wrap; gap: 12px; }
+    .card { background: #fff; padding: 10px 14px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.05); min-width: 140px; }
+    .card .label { font-size: 12px; color: #666; }
+    .card .value { font-size: 20px; font-weight: bold; color: #0b2e4e; }
+    .grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(320px, 1fr)); gap: 18px; }
+    table { border-collapse: collapse; width: 100%; font-size: 12px; background: #fff; }
+    th, td { border: 1px solid #ddd; padding: 5px 7px; text-align: left; }
+    th { background: #0b2e4e; color: #fff; }
+    td.n { text-align: right; }
+    .rodape { font-size: 11px; color: #777; margin-top: 24px; }
+</style>
+</head>
+<body>
+<h1>📊 Dashboard Imobiliária</h1>
+<div class="filtros">
+    <label>De <input type="date" id="ini"></label>
+    <label>Até <input type="date" id="fim"></label>
+    <label>Equipe <select id="equipe"></select></label>
+    <label>Corretor <select id="corretor"></select></label>
+</div>
+<div class="kpis" id="kpis"></div>
+<div class="grid">
+    <div><h2>Funil por equipe</h2><div id="funil"></div></div>
+    <div><h2>Ranking de corretores (VGV)</h2><div id="ranking"></div></div>
+    <div><h2>Vendas por construtora</h2><div id="construtora"></div></div>
+    <div><h2>Vendas por empreendimento</h2><div id="empreendimento"></div></div>
+</div>
+<h2 id="titulo-periodo">Período padrão (1 venda por cliente)</h2>
+<div class="grid">
+    <div><div class="kpis" id="kpis-periodo"></div></div>
+    <div id="ranking-equipes"></div>
+</div>
+<h2>Alertas: corretores sem análise</h2>
+<div id="alertas"></div>
+<p class="rodape" id="rodape"></p>
+<script>
+"use strict";
+const ATUALIZAR_MS = 60000;
+let pacote = null;
+let versao = null;
+
+const inteiro = new Intl.NumberFormat("pt-BR");
+const moeda = new Intl.NumberFormat("pt-BR", { style: "currency", currency: "BRL", maximumFractionDigits: 0 });
+const el = (id) => document.getElementById(id);
+const esc = (t) => String(t).replace(/[&<>"]/g, (c) => ({ "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;" })[c]);
+
+function diaIso(offset) {
+    const d = new Date(pacote.dia_ini + "T00:00:00Z");
+    d.setUTCDate(d.getUTCDate() + offset);
+    return d.toISOString().slice(0, 10);
+}
+function offsetDia(iso) {
+    return Math.round((Date.parse(iso + "T00:00:00Z") - Date.parse(pacote.dia_ini + "T00:00:00Z")) / 86400000);
+}
+
+function tabela(colunas, linhas) {
+    if (!linhas.length) return "<p>Sem dados no filtro.</p>";
+    const cab = colunas.map((c) => `<th>${esc(c[0])}</th>`).join("");
+    const corpo = linhas.map((l) => "<tr>" + colunas.map((c) => {
+        const v = c[2] ? c[2](l[c[1]]) : l[c[1]];
+        return `<td class="${typeof l[c[1]] === "number" ? "n" : ""}">${esc(v)}</td>`;
+    }).join("") + "</tr>").join("");
+    return `<table><tr>${cab}</tr>${corpo}</table>`;
+}
+
+function cards(alvo, itens) {
+    el(alvo).innerHTML = itens.map(([rotulo, valor]) =>
+        `<div class="card"><div class="label">${esc(rotulo)}</div><div class="value">${esc(valor)}</div></div>`).join("");
+}
+
+// Soma as métricas das linhas do cubo no filtro, agrupando por uma dimensão (ou tudo junto)
+function agrega(grupo) {
+    const c = pacote.cubo, d = pacote.dimensoes;
+    const ini = offsetDia(el("ini").value), fim = offsetDia(el("fim").value);
+    const eq = el("equipe").value, cor = el("corretor").value;
+    const grupos = new Map();
+    for (let i = 0; i < c.DIA.length; i++) {
+        if (c.DIA[i] < ini || c.DIA[i] > fim) continue;
+        if (eq !== "" && c.EQUIPE[i] !== +eq) continue;
+        if (cor !== "" && c.CORRETOR[i] !== +cor) continue;
+        const chave = grupo ? d[grupo][c[grupo][i]] : "";
+        let g = grupos.get(chave);
+        if (!g) {
+            g = { nome: chave, ANALISES: 0, REANALISES: 0, APROVACOES: 0, REPROVACOES: 0, VENDAS: 0, VGV: 0 };
+            grupos.set(chave, g);
+        }
+        g.ANALISES += c.EM_ANALISE[i] + c.REANALISE[i];
+        g.REANALISES += c.REANALISE[i];
+        g.APROVACOES += c.APROVADO[i];
+        g.REPROVACOES += c.REPROVADO[i];
+        g.VENDAS += c.VENDA_GERADA[i] + c.VENDA_INFORMADA[i];
+        g.VGV += c.VGV[i];
+    }
+    return [...grupos.values()];
+}
+
+function nomeEquipe() {
+    const eq = el("equipe").value;
+    return eq === "" ? "Todas" : pacote.dimensoes.EQUIPE[+eq];
+}
+
+function desenha() {
+    const total = agrega(null)[0] || { ANALISES: 0, APROVACOES: 0, REPROVACOES: 0, VENDAS: 0, VGV: 0 };
+    const taxa = total.ANALISES ? (total.APROVACOES / total.ANALISES * 100).toFixed(1) + "%" : "-";
+    cards("kpis", [
+        ["Análises", inteiro.format(total.ANALISES)],
+        ["Aprovações", inteiro.format(total.APROVACOES)],
+        ["Aprovações / Análises", taxa],
+        ["Reprovações", inteiro.format(total.REPROVACOES)],
+        ["Vendas", inteiro.format(total.VENDAS)],
+        ["VGV", moeda.format(total.VGV)],
+    ]);
+
+    const porNome = (a, b) => a.nome.localeCompare(b.nome);
+    const porVenda = (a, b) => b.VGV - a.VGV || b.VENDAS - a.VENDAS;
+    el("funil").innerHTML = tabela(
+        [["Equipe", "nome"], ["Análises", "ANALISES"], ["Reanálises", "REANALISES"], ["Aprovações", "APROVACOES"],
+         ["Vendas", "VENDAS"], ["VGV", "VGV", moeda.format]],
+        agrega("EQUIPE").sort(porNome));
+    el("ranking").innerHTML = tabela(
+        [["Corretor", "nome"], ["Vendas", "VENDAS"], ["VGV", "VGV", moeda.format], ["Análises", "ANALISES"],
+         ["Aprovações", "APROVACOES"]],
+        agrega("CORRETOR").filter((g) => g.VENDAS || g.ANALISES || g.APROVACOES).sort(porVenda).slice(0, 20));
+    for (const dim of ["CONSTRUTORA", "EMPREENDIMENTO"]) {
+        el(dim.toLowerCase()).innerHTML = tabela(
+            [[dim === "CONSTRUTORA" ? "Construtora" : "Empreendimento", "nome"], ["Vendas", "VENDAS"],
+             ["VGV", "VGV", moeda.format]],
+            agrega(dim).filter((g) => g.VENDAS).sort(porVenda).slice(0, 15));
+    }
+
+    const equipe = nomeEquipe();
+    const k = pacote.kpis_periodo.find((l) => l.EQUIPE_FILTRO === equipe);
+    if (k) {
+        el("titulo-periodo").textContent =
+            `Período padrão ${k.DATA_INI} a ${k.DATA_FIM} (1 venda por cliente) – ${equipe}`;
+        cards("kpis-periodo", [
+            ["Em análise", inteiro.format(k.EM_ANALISE)],
+            ["Reanálise", inteiro.format(k.REANALISE)],
+            ["Aprovações", inteiro.format(k.APROVACOES)],
+            ["Vendas", inteiro.format(k.VENDA_GERADA + k.VENDA_INFORMADA)],
+            ["VGV", moeda.format(k.VGV_TOTAL)],
+        ]);
+    } else {
+        el("kpis-periodo").innerHTML = "";
+    }
+    el("ranking-equipes").innerHTML = tabela(
+        [["Equipe", "EQUIPE"], ["Análises", "ANALISES"], ["Aprovações", "APROVACOES"], ["Vendas", "VENDAS"],
+         ["VGV", "VGV", moeda.format]],
+        [...pacote.ranking_equipes].sort((a, b) => b.VGV - a.VGV));
+    el("alertas").innerHTML = tabela(
+        [["Corretor", "CORRETOR"], ["Última análise", "ULTIMA_ANALISE"], ["Dias sem análise", "DIAS_SEM_ANALISE"]],
+        pacote.alertas.filter((a) => a.EQUIPE_FILTRO === equipe));
+}
+
+function opcoes(select, rotuloTodos, nomes, indices) {
+    const atual = select.value;
+    select.innerHTML = `<option value="">${rotuloTodos}</option>` +
+        indices.map((i) => `<option value="${i}">${esc(nomes[i])}</option>`).join("");
+    if ([...select.options].some((o) => o.value === atual)) select.value = atual;
+}
+
+function corretoresDaEquipe() {
+    const c = pacote.cubo, eq = el("equipe").value;
+    const vistos = new Set();
+    for (let i = 0; i < c.CORRETOR.length; i++) {
+        if (eq === "" || c.EQUIPE[i] === +eq) vistos.add(c.CORRETOR[i]);
+    }
+    const nomes = pacote.dimensoes.CORRETOR;
+    opcoes(el("corretor"), "Todos", nomes, [...vistos].sort((a, b) => nomes[a].localeCompare(nomes[b])));
+}
+
+async function carrega() {
+    const atual = await (await fetch("atual.json", { cache: "no-store" })).json();
+    if (atual.versao === versao && pacote) return;
+    const novo = await (await fetch(atual.arquivo)).json();
+    const primeiro = pacote === null;
+    pacote = novo;
+    versao = atual.versao;
+
+    const nomes = pacote.dimensoes.EQUIPE;
+    opcoes(el("equipe"), "Todas", nomes, nomes.map((_, i) => i));
+    corretoresDaEquipe();
+    if (primeiro) {
+        el("fim").value = pacote.dia_fim;
+        el("ini").value = diaIso(Math.max(0, offsetDia(pacote.dia_fim) - pacote.dias_periodo));
+    }
+    el("rodape").textContent =
+        `Versão ${pacote.versao} · gerado em ${pacote.gerado_em} · dados de ${pacote.dia_ini} a ${pacote.dia_fim}`;
+    desenha();
+}
+
+el("equipe").addEventListener("change", () => { corretoresDaEquipe(); desenha(); });
+for (const id of ["ini", "fim", "corretor"]) el(id).addEventListener("change", desenha);
+carrega();
+setInterval(() => carrega().catch(() => {}), ATUALIZAR_MS);
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,270 @@
+# utils/relatorios_funil.py
+#
+# Relatórios de funil em HTML, um por equipe e um por corretor, com o
+# conteúdo das páginas 04 (funil detalhado + planejamento da equipe) e 05
+# (funil + planejamento do corretor), para o gerar_relatorios.py rodar em
+# lote.
+#
+# Tudo o que esses relatórios mostram é soma de linhas da planilha
+# (análises só EM, reanálises, aprovações, vendas, VGV) num período: o
+# período escolhido e a janela dos últimos 3 meses de cada equipe/corretor.
+# Por isso saem de um cubo diário DIA × EQUIPE × CORRETOR montado uma vez
+# (cubo_funil), bem menor que a planilha. O lote publica o cubo como
+# snapshot (utils/dados.salva_snapshot, Arrow mapeado em memória) e cada
+# processo do pool o abre somente leitura (inicia_worker), sem copiar nem
+# renormalizar a planilha por relatório.
+#
+# Leads do CRM ficam de fora: os cards de leads das páginas dependem da API
+# do Supremo na hora.
+
+import time
+from html import escape
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils import graficos_svg
+from utils.consultas import STATUS_VENDA
+from utils.dados import le_snapshot
+from utils.formatacao import formata_data, formata_moeda, formata_percentual
+
+COLUNAS_CUBO = ["REGISTROS", "ANALISES_BASE", "REANALISES", "APROVACOES", "VENDAS", "VGV"]
+
+# Meta de vendas do exemplo da calculadora (mesmo valor padrão das páginas)
+META_EQUIPE = 5
+META_CORRETOR = 3
+
+CSS = """
+    body { font-family: Arial, sans-serif; margin: 20px; background: #f5f7fb; color: #222; }
+    h1, h2, h3 { color: #0b2e4e; }
+    .kpis { display: flex; flex-wrap: wrap; gap: 12px; margin-bottom: 18px; }
+    .card { background: #fff; padding: 10px 14px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.05); min-width: 150px; }
+    .card .label { font-size: 12px; color: #666; }
+    .card .value { font-size: 19px; font-weight: bold; color: #0b2e4e; }
+    .tabela { border-collapse: collapse; width: 100%; font-size: 12px; background: #fff; }
+    .tabela th, .tabela td { border: 1px solid #ddd; padding: 6px 8px; text-align: left; }
+    .tabela th { background-color: #0b2e4e; color: #fff; }
+    .grafico svg { width: 100%; max-width: 640px; height: auto; background: #fff; border-radius: 8px; }
+    .nota { font-size: 12px; color: #666; }
+"""
+
+
+# ---------------------------------------------------------
+# CUBO (UMA VEZ POR LOTE)
+# ---------------------------------------------------------
+def cubo_funil(df: pd.DataFrame) -> pd.DataFrame:
+    """Somas por DIA × EQUIPE × CORRETOR do DataFrame de normalizar_planilha (linhas sem DIA ficam fora)."""
+    base = df.dropna(subset=["DIA"])
+    s = base["STATUS_BASE"]
+    flags = pd.DataFrame(
+        {
+            "DIA": pd.to_datetime(base["DIA"]),
+            "EQUIPE": base["EQUIPE"],
+            "CORRETOR": base["CORRETOR"],
+            "REGISTROS": 1,
+            "ANALISES_BASE": (s == "EM ANÁLISE").astype(int),
+            "REANALISES": (s == "REANÁLISE").astype(int),
+            "APROVACOES": (s == "APROVADO").astype(int),
+            "VENDAS": s.isin(STATUS_VENDA).astype(int),
+            "VGV": base["VGV"].astype(float),
+        }
+    )
+    return flags.groupby(["DIA", "EQUIPE", "CORRETOR"], sort=True).sum().reset_index()
+
+
+# ---------------------------------------------------------
+# CONTAS DAS PÁGINAS 04/05
+# ---------------------------------------------------------
+def _somas(cubo: pd.DataFrame) -> dict:
+    somas = {col: int(cubo[col].sum()) for col in COLUNAS_CUBO if col != "VGV"}
+    somas["VGV"] = float(cubo["VGV"].sum())
+    return somas
+
+
+def funil_periodo(cubo: pd.DataFrame, data_ini, data_fim) -> dict:
+    """Cards e taxas do funil no período (base de conversão = só EM ANÁLISE)."""
+    no_periodo = cubo[(cubo["DIA"] >= data_ini) & (cubo["DIA"] <= data_fim)]
+    f = _somas(no_periodo)
+    f["ANALISES"] = f["ANALISES_BASE"] + f["REANALISES"]
+    f["TAXA_APROV_ANALISES"] = f["APROVACOES"] / f["ANALISES_BASE"] * 100 if f["ANALISES_BASE"] > 0 else 0
+    f["TAXA_VENDAS_ANALISES"] = f["VENDAS"] / f["ANALISES_BASE"] * 100 if f["ANALISES_BASE"] > 0 else 0
+    f["TAXA_VENDAS_APROV"] = f["VENDAS"] / f["APROVACOES"] * 100 if f["APROVACOES"] > 0 else 0
+    return f
+
+
+def planejamento_3m(cubo: pd.DataFrame, meta: int):
+    """
+    Últimos 3 meses até o último DIA da equipe/corretor (toda a base, não
+    só o período), médias por venda e o necessário para `meta` vendas.
+    None se não houver data.
+    """
+    if cubo.empty:
+        return None
+    ref = cubo["DIA"].max()
+    limite = ref - pd.DateOffset(months=3)
+    p = _somas(cubo[(cubo["DIA"] >= limite) & (cubo["DIA"] <= ref)])
+    p["REF"] = ref
+    p["LIMITE"] = limite
+
+    vendas = p["VENDAS"]
+    p["MEDIA_ANALISES_VENDA"] = p["ANALISES_BASE"] / vendas if vendas > 0 else 0
+    p["MEDIA_APROV_VENDA"] = p["APROVACOES"] / vendas if vendas > 0 else 0
+    p["META"] = meta
+    p["ANALISES_NECESSARIAS"] = int(np.ceil(p["MEDIA_ANALISES_VENDA"] * meta)) if vendas > 0 else None
+    p["APROV_NECESSARIAS"] = int(np.ceil(p["MEDIA_APROV_VENDA"] * meta)) if vendas > 0 else None
+    return p
+
+
+def funil_por_corretor(cubo: pd.DataFrame, data_ini, data_fim) -> pd.DataFrame:
+    """Tabela comparativa da equipe (como o "Funil por Equipe" da 04, mas por corretor)."""
+    no_periodo = cubo[(cubo["DIA"] >= data_ini) & (cubo["DIA"] <= data_fim)]
+    tabela = no_periodo.groupby("CORRETOR", sort=True)[COLUNAS_CUBO[1:]].sum()
+    tabela = tabela[(tabela[["ANALISES_BASE", "REANALISES", "APROVACOES", "VENDAS"]].sum(axis=1) > 0) | (tabela["VGV"] > 0)]
+    tabela["TAXA_APROV_ANALISES"] = np.where(
+        tabela["ANALISES_BASE"] > 0, tabela["APROVACOES"] / tabela["ANALISES_BASE"] * 100, 0
+    )
+    tabela["TAXA_VENDAS_APROV"] = np.where(tabela["APROVACOES"] > 0, tabela["VENDAS"] / tabela["APROVACOES"] * 100, 0)
+    return tabela.sort_values(["VENDAS", "VGV"], ascending=False)
+
+
+# ---------------------------------------------------------
+# HTML
+# ---------------------------------------------------------
+def _cards(itens) -> str:
+    return '<div class="kpis">' + "".join(
+        f'<div class="card"><div class="label">{escape(rotulo)}</div><div class="value">{escape(str(valor))}</div></div>'
+        for rotulo, valor in itens
+    ) + "</div>"
+
+
+def relatorio_html(tipo: str, nome: str, cubo: pd.DataFrame, data_ini, data_fim, meta: int) -> str:
+    """Relatório de uma equipe (tipo "equipe") ou corretor ("corretor"); `cubo` já filtrado."""
+    f = funil_periodo(cubo, data_ini, data_fim)
+    rotulo = "Equipe" if tipo == "equipe" else "Corretor"
+
+    partes = [
+        f"<h1>🔻 Funil – {rotulo}: {escape(nome)}</h1>",
+        f'<p class="nota">Período: {formata_data(data_ini)} até {formata_data(data_fim)} • '
+        f"Registros considerados: {f['REGISTROS']}</p>",
+        _cards(
+            [
+                ("Análises (só EM)", f["ANALISES_BASE"]),
+                ("Reanálises", f["REANALISES"]),
+                ("Análises (EM + RE)", f["ANALISES"]),
+                ("Aprovações", f["APROVACOES"]),
+                ("Vendas (Total)", f["VENDAS"]),
+            ]
+        ),
+        _cards(
+            [
+                ("VGV", formata_moeda(f["VGV"])),
+                ("Taxa Aprov./Análises (só EM)", formata_percentual(f["TAXA_APROV_ANALISES"])),
+                ("Taxa Vendas/Análises (só EM)", formata_percentual(f["TAXA_VENDAS_ANALISES"])),
+                ("Taxa Vendas/Aprovações", formata_percentual(f["TAXA_VENDAS_APROV"])),
+            ]
+        ),
+    ]
+
+    tabela_funil = pd.DataFrame(
+        {
+            "Etapa": ["Análises (só EM)", "Aprovações", "Vendas"],
+            "Quantidade": [f["ANALISES_BASE"], f["APROVACOES"], f["VENDAS"]],
+            "Conversão da etapa anterior (%)": [
+                100.0 if f["ANALISES_BASE"] > 0 else 0.0,
+                f["TAXA_APROV_ANALISES"],
+                f["TAXA_VENDAS_APROV"],
+            ],
+        }
+    )
+    partes += [
+        "<h2>📋 Funil do período</h2>",
+        tabela_funil.to_html(classes="tabela", border=0, index=False, float_format="{:.1f}".format),
+        '<div class="grafico">'
+        + graficos_svg.barras(
+            tabela_funil["Etapa"], {"Quantidade": tabela_funil["Quantidade"]}, "Análises → Aprovações → Vendas"
+        )
+        + "</div>",
+    ]
+
+    if tipo == "equipe":
+        corretores = funil_por_corretor(cubo, data_ini, data_fim)
+        partes.append("<h2>👥 Corretores da equipe no período</h2>")
+        partes.append(
+            corretores.to_html(classes="tabela", border=0, float_format="{:.1f}".format)
+            if not corretores.empty
+            else '<p class="nota">Nenhum corretor com movimentação no período.</p>'
+        )
+
+    p = planejamento_3m(cubo, meta)
+    partes.append("<h2>📈 Planejamento de vendas (base últimos 3 meses)</h2>")
+    if p is None:
+        partes.append('<p class="nota">Sem datas válidas para calcular os últimos 3 meses.</p>')
+    else:
+        com_vendas = p["VENDAS"] > 0
+        partes += [
+            _cards(
+                [
+                    ("Análises (3m – só EM)", p["ANALISES_BASE"]),
+                    ("Aprovações (3m)", p["APROVACOES"]),
+                    ("Vendas (3m)", p["VENDAS"]),
+                    ("Média de ANÁLISES por venda", f"{p['MEDIA_ANALISES_VENDA']:.1f}" if com_vendas else "—"),
+                    ("Média de APROVAÇÕES por venda", f"{p['MEDIA_APROV_VENDA']:.1f}" if com_vendas else "—"),
+                ]
+            ),
+            f'<p class="nota">Janela histórica: de {formata_data(p["LIMITE"])} até {formata_data(p["REF"])}.</p>',
+        ]
+        if com_vendas:
+            partes += [
+                f"<h3>🎯 Para {p['META']} vendas no mês</h3>",
+                _cards(
+                    [
+                        ("Análises necessárias (aprox.)", p["ANALISES_NECESSARIAS"]),
+                        ("Aprovações necessárias (aprox.)", p["APROV_NECESSARIAS"]),
+                    ]
+                ),
+                '<p class="nota">Aproximado e arredondado para cima, pelo histórico real dos últimos 3 meses.</p>',
+            ]
+        else:
+            partes.append('<p class="nota">Sem vendas nos últimos 3 meses para calcular as médias por venda.</p>')
+
+    corpo = "\n".join(partes)
+    return f"""<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>Funil – {escape(nome)}</title>
+<style>{CSS}</style>
+</head>
+<body>
+{corpo}
+</body>
+</html>
+"""
+
+
+# ---------------------------------------------------------
+# PROCESSOS DO POOL
+# ---------------------------------------------------------
+_cubo = None  # cubo somente leitura do processo (mapeado do snapshot)
+
+
+def inicia_worker(arquivo_cubo) -> None:
+    global _cubo
+    _cubo = le_snapshot(Path(arquivo_cubo), None)
+    if _cubo is None:
+        raise RuntimeError(f"Cubo não encontrado em {arquivo_cubo}")
+
+
+def gera_relatorio(tarefa) -> tuple:
+    """tarefa = (tipo, nome, caminho, data_ini, data_fim, meta). Devolve (tipo, nome, caminho, ms)."""
+    tipo, nome, caminho, data_ini, data_fim, meta = tarefa
+    ini = time.perf_counter()
+    coluna = "EQUIPE" if tipo == "equipe" else "CORRETOR"
+    cubo = _cubo[_cubo[coluna] == nome]
+    html = relatorio_html(tipo, nome, cubo, data_ini, data_fim, meta)
+
+    destino = Path(caminho)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    destino.write_text(html, encoding="utf-8")
+    return tipo, nome, caminho, (time.perf_counter() - ini) * 1000
@@ -0,0 +1,101 @@
+# utils/tabelas.py
+
+import math
+
+import pandas as pd
+import streamlit as st
+
+TAMANHO_PAGINA_PADRAO = 100
+
+
+# ---------------------------------------------------------
+# CONFIGURAÇÃO DE COLUNAS (NO LUGAR DO pandas Styler)
+# ---------------------------------------------------------
+def coluna_moeda(titulo=None):
+    return st.column_config.NumberColumn(titulo, format="R$ %.2f")
+
+
+def coluna_percentual(titulo=None):
+    return st.column_config.NumberColumn(titulo, format="%.1f%%")
+
+
+def coluna_data(titulo=None):
+    return st.column_config.DateColumn(titulo, format="DD/MM/YYYY")
+
+
+# ---------------------------------------------------------
+# TABELA PAGINADA (ORDENA NO SERVIDOR, ENVIA SÓ A PÁGINA)
+# ---------------------------------------------------------
+@st.fragment
+def tabela_paginada(
+    df: pd.DataFrame,
+    key: str,
+    ordenar_por=None,
+    decrescente: bool = True,
+    colunas_config=None,
+    formatadores=None,
+    tamanho_pagina: int = TAMANHO_PAGINA_PADRAO,
+):
+    """
+    Ordena pelos valores tipados (datas, números) no servidor, recorta só a
+    página atual e manda pro navegador apenas essas linhas.
+    `formatadores` ({coluna: função de utils.formatacao}) roda só na página.
+    Trocar ordem/página reexecuta só a tabela (st.fragment).
+    """
+    if df.empty:
+        st.info("Nenhum registro para exibir.")
+        return
+
+    colunas = list(df.columns)
+    idx_ordem = colunas.index(ordenar_por) if ordenar_por in colunas else 0
+
+    total_linhas = len(df)
+    total_paginas = max(1, math.ceil(total_linhas / tamanho_pagina))
+
+    # Se o filtro da página diminuiu a base, volta pra primeira página
+    key_pagina = f"{key}_pagina"
+    if st.session_state.get(key_pagina, 1) > total_paginas:
+        st.session_state[key_pagina] = 1
+
+    c_ordem, c_dir, c_pag = st.columns([3, 1, 1])
+    with c_ordem:
+        col_ordem = st.selectbox(
+            "Ordenar por",
+            colunas,
+            index=idx_ordem,
+            key=f"{key}_ordem",
+        )
+    with c_dir:
+        desc = st.toggle("Decrescente", value=decrescente, key=f"{key}_desc")
+    with c_pag:
+        pagina = st.number_input(
+            f"Página (de {total_paginas})",
+            min_value=1,
+            max_value=total_paginas,
+            step=1,
+            key=key_pagina,
+        )
+
+    df_ordenado = df.sort_values(
+        col_ordem,
+        ascending=not desc,
+        kind="stable",
+        na_position="last",
+    )
+
+    ini = (int(pagina) - 1) * tamanho_pagina
+    fim = min(ini + tamanho_pagina, total_linhas)
+    df_pagina = df_ordenado.iloc[ini:fim]
+
+    if formatadores:
+        df_pagina = df_pagina.assign(
+            **{col: func(df_pagina[col]) for col, func in formatadores.items() if col in df_pagina.columns}
+        )
+
+    st.dataframe(
+        df_pagina,
+        use_container_width=True,
+        hide_index=True,
+        column_config=colunas_config,
+    )
+    st.caption(f"Linhas {ini + 1}–{fim} de {total_linhas}")
@@ -0,0 +1,274 @@
+# utils/visoes.py
+#
+# Visões materializadas fora do caminho da requisição.
+#
+# O materializar_visoes.py (processo à parte) acompanha o snapshot da
+# planilha e, a cada CSV novo, calcula com utils/consultas.py o que as
+# páginas recalculavam na thread de quem abrisse primeiro: KPIs da home no
+# período padrão, ranking por DATA BASE (02), alertas (06) e o status atual
+# por cliente (08). Cada visão é publicada como snapshot (utils/dados.py,
+# Arrow mapeado em memória) em .cache/visoes/ e leva a assinatura do CSV de
+# onde saiu. Com MR_BANCO_LOCAL=1 ou MR_MOTOR=sqlite o mesmo DataFrame
+# normalizado também alimenta o SQLite de utils/banco_local.py, e com
+# MR_MOTOR=duckdb o Parquet de utils/motor_consultas.py; com
+# MR_PACOTE_JSON=1, visões e cubo diário viram o pacote do visualizador
+# estático (utils/pacote_json.py).
+# Com MR_HISTORICO=1 a normalização passa pelo arquivo mensal de
+# utils/historico.py: só o mês corrente (e o que mudou) é normalizado de
+# novo, os meses fechados vêm das partições Parquet.
+#
+# O próprio DataFrame normalizado também é publicado (planilha_normalizada):
+# as páginas mapeiam esse snapshot em vez de normalizar cada uma a sua
+# cópia (ler_planilha_normalizada).
+#
+# A página só usa a visão se a assinatura bater com a da planilha que ela
+# mesma carregou; se não bater (worker parado ou ainda calculando a versão
+# nova), calcula na hora como antes.
+
+import os
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from utils import banco_local, historico, motor_consultas, pacote_json
+from utils.cache import somente_leitura
+from utils.consultas import (
+    STATUS_ANALISE,
+    calcular_alertas,
+    normalizar_planilha,
+    ranking_por_data_base,
+    status_atual,
+    ultima_venda_por_cliente,
+)
+from utils.dados import (
+    CHAVE_ASSINATURA_CSV,
+    DIR_CACHE,
+    carimba_versao,
+    data_snapshot,
+    le_snapshot,
+    ler_planilha,
+    salva_snapshot,
+)
+
+DIR_VISOES = DIR_CACHE / "visoes"
+
+# Assinatura do CSV da última rodada em que TODAS as saídas ligadas foram
+# publicadas; gravado por último, então rodada que falha no meio é refeita
+ARQ_RODADA_COMPLETA = DIR_VISOES / "rodada_completa.txt"
+
+# Planilha inteira já normalizada, mapeada por todas as páginas
+ARQ_NORMALIZADA = DIR_VISOES / "planilha_normalizada.pkl"
+
+# Período padrão da home: últimos 30 dias até o último DIA da base
+DIAS_PERIODO_HOME = 30
+
+_lidas = {}  # nome -> (data do snapshot, visão somente leitura)
+
+
+def arquivo_visao(nome: str):
+    return DIR_VISOES / f"{nome}.pkl"
+
+
+# ---------------------------------------------------------
+# VISÕES (df já normalizado por utils/consultas.normalizar_planilha)
+# ---------------------------------------------------------
+def _equipes(df: pd.DataFrame):
+    return ["Todas"] + sorted(df["EQUIPE"].dropna().unique())
+
+
+def kpis_home(df: pd.DataFrame) -> pd.DataFrame:
+    """Cards da home no período padrão, uma linha por equipe (e "Todas"), corretor = Todos."""
+    dias = df["DIA"].dropna()
+    if dias.empty:
+        return pd.DataFrame()
+    data_fim = dias.max()
+    data_ini = max(dias.min(), data_fim - timedelta(days=DIAS_PERIODO_HOME))
+
+    df_periodo = df[(df["DIA"] >= data_ini) & (df["DIA"] <= data_fim)]
+
+    linhas = []
+    for equipe in _equipes(df):
+        df_eq = df_periodo if equipe == "Todas" else df_periodo[df_periodo["EQUIPE"] == equipe]
+        s = df_eq["STATUS_BASE"]
+        vendas_ult = ultima_venda_por_cliente(df_eq)
+        linhas.append(
+            {
+                "EQUIPE_FILTRO": equipe,
+                "DATA_INI": data_ini,
+                "DATA_FIM": data_fim,
+                "REGISTROS": len(df_eq),
+                "EM_ANALISE": int((s == "EM ANÁLISE").sum()),
+                "REANALISE": int((s == "REANÁLISE").sum()),
+                "APROVACOES": int((s == "APROVADO").sum()),
+                "REPROVACOES": int((s == "REPROVADO").sum()),
+                "VENDA_GERADA": int((vendas_ult["STATUS_BASE"] == "VENDA GERADA").sum()),
+                "VENDA_INFORMADA": int((vendas_ult["STATUS_BASE"] == "VENDA INFORMADA").sum()),
+                "VGV_TOTAL": float(vendas_ult["VGV"].sum()),
+                "MAIOR_VGV": float(vendas_ult["VGV"].max()) if not vendas_ult.empty else 0.0,
+            }
+        )
+    return pd.DataFrame(linhas)
+
+
+def ranking_data_base(df: pd.DataFrame) -> pd.DataFrame:
+    """Ranking da página 02 para cada DATA BASE × equipe (coluna EQUIPE_FILTRO)."""
+    partes = []
+    for data_base, df_db in df.dropna(subset=["DATA_BASE"]).groupby("DATA_BASE", sort=True):
+        for equipe in _equipes(df_db):
+            ranking = ranking_por_data_base(df_db, data_base, equipe)
+            partes.append(ranking.assign(DATA_BASE=data_base, EQUIPE_FILTRO=equipe))
+    if not partes:
+        return pd.DataFrame()
+    return pd.concat(partes, ignore_index=True)
+
+
+def alertas(df: pd.DataFrame) -> pd.DataFrame:
+    """Corretores parados da página 06, por equipe (coluna EQUIPE_FILTRO)."""
+    partes = []
+    for equipe in _equipes(df):
+        df_eq = df if equipe == "Todas" else df[df["EQUIPE"] == equipe]
+        if not df_eq["STATUS_BASE"].isin(STATUS_ANALISE).any():
+            continue
+        partes.append(calcular_alertas(df_eq).assign(EQUIPE_FILTRO=equipe))
+    if not partes:
+        return pd.DataFrame()
+    return pd.concat(partes, ignore_index=True)
+
+
+def status_atual_clientes(df: pd.DataFrame) -> pd.DataFrame:
+    """Índice de clientes: última linha de cada cliente (página 08)."""
+    return status_atual(df, "NOME_CLIENTE_BASE").reset_index(drop=True)
+
+
+MATERIALIZADORES = {
+    "kpis_home": kpis_home,
+    "ranking_data_base": ranking_data_base,
+    "alertas": alertas,
+    "status_atual": status_atual_clientes,
+}
+
+
+# ---------------------------------------------------------
+# PUBLICAÇÃO (WORKER) E LEITURA (PÁGINAS)
+# ---------------------------------------------------------
+def assinatura_publicada():
+    """Assinatura do CSV da última rodada completa (None se nunca rodou)."""
+    try:
+        return ARQ_RODADA_COMPLETA.read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publicar_normalizada(df: pd.DataFrame, assinatura) -> None:
+    """Publica a planilha normalizada (com versão e assinatura do CSV) para as páginas mapearem."""
+    df = carimba_versao(df)
+    df.attrs[CHAVE_ASSINATURA_CSV] = assinatura
+    salva_snapshot(df, ARQ_NORMALIZADA)
+
+
+def _normalizada_publicada(assinatura):
+    df = le_snapshot(ARQ_NORMALIZADA, None)
+    if df is None or df.attrs.get(CHAVE_ASSINATURA_CSV) != assinatura:
+        return None
+    return df
+
+
+def ler_planilha_normalizada() -> pd.DataFrame:
+    """
+    Planilha de ler_planilha() já normalizada (utils/consultas.normalizar_planilha)
+    e carimbada com a versão. Normaliza uma vez por CSV: quem chega primeiro
+    (materializar_visoes.py, aquecer_cache.py ou a primeira página) publica o
+    snapshot e os outros processos só mapeiam o mesmo arquivo Arrow.
+    Cópia rasa: a página pode criar colunas sem mexer no mapeado.
+    """
+    df_bruto = ler_planilha()
+    assinatura = df_bruto.attrs.get(CHAVE_ASSINATURA_CSV)
+    if assinatura is not None:
+        df = _normalizada_publicada(assinatura)
+        if df is not None:
+            return df
+
+    df = normalizar_planilha(df_bruto)
+    if assinatura is None:
+        # Sem assinatura não dá pra saber se o publicado é da mesma planilha
+        return carimba_versao(df)
+
+    publicar_normalizada(df, assinatura)
+    mapeada = _normalizada_publicada(assinatura)
+    return df if mapeada is None else mapeada
+
+
+def _marca_rodada_completa(assinatura) -> None:
+    tmp = ARQ_RODADA_COMPLETA.with_name(f"{ARQ_RODADA_COMPLETA.name}.{os.getpid()}.tmp")
+    tmp.write_text(assinatura or "", encoding="utf-8")
+    os.replace(tmp, ARQ_RODADA_COMPLETA)
+
+
+def materializar(df_bruto: pd.DataFrame) -> dict:
+    """Normaliza a planilha crua, calcula e publica todas as visões. Devolve {nome: (linhas, ms)}."""
+    assinatura = df_bruto.attrs.get(CHAVE_ASSINATURA_CSV)
+
+    ini = time.perf_counter()
+    df = historico.normalizar(df_bruto) if historico.ATIVO else normalizar_planilha(df_bruto)
+    tempos = {"normalizacao": (len(df), (time.perf_counter() - ini) * 1000)}
+
+    # A planilha normalizada que as páginas mapeiam (ler_planilha_normalizada)
+    ini = time.perf_counter()
+    publicar_normalizada(df, assinatura)
+    tempos["planilha_normalizada"] = (len(df), (time.perf_counter() - ini) * 1000)
+
+    calculadas = {}
+    for nome, calcular in MATERIALIZADORES.items():
+        ini = time.perf_counter()
+        visao = calcular(df)
+        visao.attrs = {CHAVE_ASSINATURA_CSV: assinatura}
+        salva_snapshot(visao, arquivo_visao(nome))
+        calculadas[nome] = visao
+        tempos[nome] = (len(visao), (time.perf_counter() - ini) * 1000)
+
+    # Mesmo DataFrame normalizado alimenta o SQLite local, se ligado
+    if banco_local.ATIVO or motor_consultas.MOTOR == "sqlite":
+        ini = time.perf_counter()
+        linhas = banco_local.publicar(df, assinatura)
+        tempos["banco_local"] = (linhas, (time.perf_counter() - ini) * 1000)
+
+    # ... e o Parquet do motor DuckDB (utils/motor_consultas.py)
+    if motor_consultas.MOTOR == "duckdb":
+        ini = time.perf_counter()
+        linhas = motor_consultas.publicar_parquet(df, assinatura)
+        tempos["eventos_parquet"] = (linhas, (time.perf_counter() - ini) * 1000)
+
+    # ... e o pacote JSON do visualizador estático (tamanho em bytes no lugar de linhas)
+    if pacote_json.ATIVO:
+        ini = time.perf_counter()
+        tamanho = pacote_json.publicar(df, calculadas, assinatura, dias_periodo=DIAS_PERIODO_HOME)
+        tempos["pacote_json"] = (tamanho, (time.perf_counter() - ini) * 1000)
+
+    # Só depois de todas as saídas: se alguma falhou, a próxima rodada refaz tudo
+    _marca_rodada_completa(assinatura)
+    return tempos
+
+
+def le_visao(nome: str, df_pagina: pd.DataFrame):
+    """
+    Visão publicada para a mesma planilha que a página carregou, ou None
+    (a página calcula na hora). Somente leitura, como o snapshot compartilhado.
+    """
+    assinatura = df_pagina.attrs.get(CHAVE_ASSINATURA_CSV)
+    if assinatura is None:
+        return None
+
+    arquivo = arquivo_visao(nome)
+    data = data_snapshot(arquivo)
+    memo = _lidas.get(nome)
+    if memo is None or memo[0] != data:
+        visao = le_snapshot(arquivo, None)
+        if visao is None:
+            return None
+        memo = _lidas[nome] = (data, somente_leitura(visao))
+
+    visao = memo[1]
+    if visao.attrs.get(CHAVE_ASSINATURA_CSV) != assinatura:
+        return None
+    return visao